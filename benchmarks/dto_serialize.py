@@ -0,0 +1,171 @@
+"""DTO 构造与序列化基准。
+
+对 1 万条结果的 ``QueryResponse`` / ``ClassSearchResponse`` / ``BackupOperationResponse``
+比较工具返回路径的两种实现（构造响应对象 → ``to_dict`` → 编码为工具结果文本）：
+
+- ``legacy``：改造前的行为——普通 dataclass（带 ``__dict__``），时间戳字段各调用一次
+  ``datetime.now()``，``to_dict`` 遍历 ``__dict__`` 逐值探测类型，文本由 ``pydantic_core`` 编码；
+- ``fast``：当前的 DTO——``slots`` dataclass、时间戳首次序列化时补齐、按类生成的 ``to_dict``，
+  文本由 ``dumps`` 编码（安装 ``orjson`` 时使用它）。
+
+使用方法::
+
+    python -m benchmarks.dto_serialize
+    python -m benchmarks.dto_serialize --items 50000 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping
+
+import pydantic_core
+
+from magicapi_tools.domain.dtos.backup_dtos import BackupInfo, BackupOperationResponse
+from magicapi_tools.domain.dtos.class_method_dtos import ClassInfo, ClassSearchResponse, FieldInfo, MethodInfo
+from magicapi_tools.domain.dtos.query_dtos import EndpointFilter, QueryResponse
+from magicapi_tools.domain.models.base_model import TIMESTAMP_FIELDS, dumps, orjson
+
+DEFAULT_ITEMS = 10000
+DEFAULT_ROUNDS = 3
+
+DTO_CLASSES = (
+    QueryResponse, EndpointFilter, ClassSearchResponse, ClassInfo, MethodInfo, FieldInfo,
+    BackupOperationResponse, BackupInfo,
+)
+
+
+def _legacy_to_dict(self: Any) -> Dict[str, Any]:
+    result = {}
+    for key, value in self.__dict__.items():
+        if value is not None:
+            if isinstance(value, datetime):
+                result[key] = value.isoformat()
+            elif isinstance(value, list):
+                result[key] = [item.to_dict() if hasattr(item, "to_dict") else item for item in value]
+            elif hasattr(value, "to_dict"):
+                result[key] = value.to_dict()
+            else:
+                result[key] = value
+    return result
+
+
+def _legacy_class(cls: type) -> type:
+    """按当前 DTO 的字段生成改造前形式的普通 dataclass。"""
+    specs = []
+    for item in dataclasses.fields(cls):
+        if item.name in TIMESTAMP_FIELDS:
+            specs.append((item.name, Any, dataclasses.field(default_factory=datetime.now)))
+        elif item.default_factory is not dataclasses.MISSING:
+            specs.append((item.name, Any, dataclasses.field(default_factory=item.default_factory)))
+        else:
+            specs.append((item.name, Any, dataclasses.field(default=item.default)))
+    namespace = {"to_dict": _legacy_to_dict}
+    if "__post_init__" in cls.__dict__:
+        namespace["__post_init__"] = lambda self: None
+    return dataclasses.make_dataclass(f"Legacy{cls.__name__}", specs, namespace=namespace)
+
+
+LEGACY: Dict[str, type] = {cls.__name__: _legacy_class(cls) for cls in DTO_CLASSES}
+FAST: Dict[str, type] = {cls.__name__: cls for cls in DTO_CLASSES}
+
+
+def _query(kinds: Mapping[str, type], count: int) -> Any:
+    results = [
+        {"id": f"a{index:07d}", "method": "GET", "path": f"/order{index % 10}/v0/list{index}",
+         "name": f"订单列表{index}", "display": f"GET /order{index % 10}/v0/list{index}", "group_id": "g1"}
+        for index in range(count)
+    ]
+    return kinds["QueryResponse"](
+        success=True, query_type="endpoints", total_count=count, filtered_count=count, returned_count=count,
+        limit=count, filters_applied=kinds["EndpointFilter"](path_filter="order"), results=results,
+    )
+
+
+def _class_search(kinds: Mapping[str, type], count: int) -> Any:
+    method, field_info, info = kinds["MethodInfo"], kinds["FieldInfo"], kinds["ClassInfo"]
+    details = [
+        info(
+            class_name=f"org.ssssssss.magicapi.Class{index}",
+            methods=[method(name=f"get{slot}", return_type="String",
+                            parameters=[{"name": "key", "type": "String"}]) for slot in range(2)],
+            fields=[field_info(name="value", type="Object")],
+        )
+        for index in range(count)
+    ]
+    return kinds["ClassSearchResponse"](
+        success=True, query_type="search", pattern="Class", total_count=count, page_size=count,
+        displayed_count=count, classes=[item.class_name for item in details], class_details=details,
+    )
+
+
+def _backups(kinds: Mapping[str, type], count: int) -> Any:
+    backup = kinds["BackupInfo"]
+    created = datetime(2024, 1, 1, 8, 30)
+    items = [
+        backup(id=f"a{index:07d}", type="api", name=f"订单列表{index}", create_by="admin",
+               create_time=created, tag=None)
+        for index in range(count)
+    ]
+    return kinds["BackupOperationResponse"](success=True, operation="list", backups=items)
+
+
+CASES: Dict[str, Callable[[Mapping[str, type], int], Any]] = {
+    "QueryResponse": _query,
+    "ClassSearchResponse": _class_search,
+    "BackupOperationResponse": _backups,
+}
+
+MODES: Dict[str, tuple] = {
+    "legacy": (LEGACY, lambda data: pydantic_core.to_json(data, fallback=str).decode()),
+    "fast": (FAST, dumps),
+}
+
+
+def run_benchmark(items: int = DEFAULT_ITEMS, rounds: int = DEFAULT_ROUNDS) -> Dict[str, Any]:
+    """对每个用例、每种模式取多轮中的最快一轮（构造 + to_dict + 编码文本）。"""
+    cases: Dict[str, Any] = {}
+    for name, build in CASES.items():
+        modes: Dict[str, Any] = {}
+        for mode, (kinds, encode) in MODES.items():
+            best = float("inf")
+            size = 0
+            for _ in range(rounds):
+                started = time.perf_counter()
+                text = encode(build(kinds, items).to_dict())
+                best = min(best, time.perf_counter() - started)
+                size = len(text)
+            modes[mode] = {"seconds": round(best, 4), "chars": size}
+        legacy, fast = modes["legacy"]["seconds"], modes["fast"]["seconds"]
+        cases[name] = {"modes": modes, "speedup": round(legacy / fast, 2) if fast else None}
+    return {
+        "items": items,
+        "json_backend": "orjson" if orjson is not None else "pydantic_core",
+        "cases": cases,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="DTO 构造与序列化基准")
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS, help="每个响应的结果条数")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="每种模式运行轮数")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.items, args.rounds)
+    print(f"📦 每个响应 {report['items']} 条结果，JSON 后端: {report['json_backend']}")
+    for name, case in report["cases"].items():
+        legacy, fast = case["modes"]["legacy"], case["modes"]["fast"]
+        print(f"  {name:<24} legacy {legacy['seconds'] * 1000:>8.1f}ms  fast {fast['seconds'] * 1000:>8.1f}ms  "
+              f"⚡ {case['speedup']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+__all__ = ["CASES", "MODES", "run_benchmark"]
@@ -0,0 +1,498 @@
+"""本地 Magic-API 替身服务。
+
+基于合成数据集提供 MCP 工具用到的编辑器端点与控制台 WebSocket，用于离线基准测试：
+
+- ``/magic/web/resource``、``/magic/web/resource/file/{id}``：资源树与接口详情；
+- ``/magic/web/resource/file/{kind}/save``：保存脚本并更新 ``updateTime``（``edit_script()`` 模拟他人在编辑器中修改）；
+- ``/magic/web/search``、``/magic/web/todo``：脚本搜索；
+- ``/magic/web/classes``、``/magic/web/classes.txt``、``/magic/web/class``：类信息；
+- ``/magic/web/backups``、``/magic/web/backup/{id}``：备份记录；
+- ``/magic/web/download``、``/magic/web/upload``：工作区 zip 批量导出/导入（上传内容记录在 ``uploads``）；
+- ``/magic/web/console``：控制台 WebSocket（登录应答、日志与断点推送），收到的指令记录在 ``console_messages``，
+  ``drop_connections()`` 主动断开所有控制台连接（用于重连测试）；
+- 其余路径视为业务接口（响应带脚本的 ``updateTime``，保存后可观察到变化）：请求头带断点时先向 WebSocket
+  推送 ``BREAKPOINT`` 帧，再推送日志并返回；
+  ``step_timeout`` 大于 0 时按可执行行逐行“执行”脚本（每行耗时取 ``line_latency``），在断点或单步处
+  推送断点帧并等待 ``resume_breakpoint`` 指令（超时后不再暂停）。
+
+服务按路由统计请求数（``GET /__bench__/counts`` 返回当前计数，本身不计数）。
+``FakeMagicAPIServer`` 在后台线程中运行，适合测试；基准测试使用 ``spawn_server`` 在子进程中
+运行替身服务，避免服务端的 CPU 与内存开销混入被测进程的测量结果。
+
+命令行::
+
+    python -m benchmarks.fake_server --apis 10000 --port 10712
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import requests
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from benchmarks.synthetic import SyntheticDataset, build_dataset
+from magicapi_tools.utils.script_linter import executable_lines
+from magicapi_tools.utils.workspace_archive import GROUP_FILE, format_script_file
+
+try:
+    import uvicorn
+except ImportError:  # pragma: no cover - uvicorn 随 fastmcp 安装
+    uvicorn = None  # type: ignore[assignment]
+
+COUNTS_PATH = "/__bench__/counts"
+_FILE_ID = re.compile(r"/magic/web/resource/file/[^/]+$")
+_BACKUP_ID = re.compile(r"/magic/web/backup/[^/]+$")
+
+
+def _ok(data: Any) -> JSONResponse:
+    return JSONResponse({"code": 1, "message": "success", "data": data})
+
+
+def _route_key(path: str) -> str:
+    if _FILE_ID.match(path):
+        return "/magic/web/resource/file/{id}"
+    if _BACKUP_ID.match(path) and not path.endswith("/rollback") and not path.endswith("/full"):
+        return "/magic/web/backup/{id}"
+    if path.startswith("/magic/web/"):
+        return path
+    return "business"
+
+
+class FakeMagicAPIServer:
+    """以合成数据集响应的 Magic-API 替身服务。
+
+    Args:
+        dataset: 合成数据集
+        script_latency: 业务接口的模拟执行耗时（秒）
+    """
+
+    def __init__(self, dataset: SyntheticDataset, script_latency: float = 0.002) -> None:
+        self.dataset = dataset
+        self.script_latency = script_latency
+        self.port = 0
+        self._counts: Counter = Counter()
+        self._counts_lock = threading.Lock()
+        self._sockets: Set[WebSocket] = set()
+        self.console_messages: List[str] = []
+        self.uploads: List[Dict[str, Any]] = []
+        self.step_timeout = 0.0
+        self.line_latency: Dict[int, float] = {}
+        # 业务接口并发上限（模拟 JVM 工作线程池），0 表示不限制
+        self.business_concurrency = 0
+        self._business_slots: Optional[asyncio.Semaphore] = None
+        self._resumes: Dict[str, asyncio.Queue] = {}
+        self._server: Optional["uvicorn.Server"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tree_body: Optional[bytes] = None
+        self.app = Starlette(routes=[
+            Route("/magic/web/login", self._login, methods=["POST"]),
+            Route("/magic/web/resource", self._resource_tree, methods=["GET", "POST"]),
+            Route("/magic/web/resource/file/{file_id}", self._file, methods=["GET"]),
+            Route("/magic/web/resource/file/{kind}/save", self._save_file, methods=["POST"]),
+            Route("/magic/web/search", self._search, methods=["POST"]),
+            Route("/magic/web/todo", self._todo, methods=["GET", "POST"]),
+            Route("/magic/web/classes", self._classes, methods=["GET", "POST"]),
+            Route("/magic/web/classes.txt", self._classes_txt, methods=["GET"]),
+            Route("/magic/web/class", self._class_detail, methods=["POST"]),
+            Route("/magic/web/backups", self._backups, methods=["GET"]),
+            Route("/magic/web/backup/{backup_id}", self._backup, methods=["GET"]),
+            Route("/magic/web/download", self._download, methods=["GET", "POST"]),
+            Route("/magic/web/upload", self._upload, methods=["POST"]),
+            Route(COUNTS_PATH, self._counts_endpoint, methods=["GET"]),
+            WebSocketRoute("/magic/web/console", self._console),
+            Route("/{path:path}", self._business, methods=["GET", "POST", "PUT", "DELETE", "PATCH"]),
+        ])
+        self.app.add_middleware(_CountingMiddleware, server=self)
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/magic/web/console"
+
+    def start(self, timeout: float = 10.0) -> "FakeMagicAPIServer":
+        sock = self._bind()
+        self._server = self._uvicorn()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._server.serve(sockets=[sock]))
+
+        self._thread = threading.Thread(target=run, name="fake-magic-api", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("替身服务启动超时")
+            time.sleep(0.01)
+        return self
+
+    def serve_forever(self, port: int = 0) -> None:
+        """在当前线程运行服务，就绪后向标准输出打印 ``READY <port>``。"""
+        sock = self._bind(port)
+        self._server = self._uvicorn()
+
+        async def announce() -> None:
+            while not self._server.started:
+                await asyncio.sleep(0.01)
+            print(f"READY {self.port}", flush=True)
+
+        async def serve() -> None:
+            asyncio.ensure_future(announce())
+            await self._server.serve(sockets=[sock])
+
+        asyncio.run(serve())
+
+    def _bind(self, port: int = 0) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", port))
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def _uvicorn(self) -> "uvicorn.Server":
+        if uvicorn is None:
+            raise RuntimeError("未检测到 uvicorn，请先安装 fastmcp 依赖。")
+        return uvicorn.Server(uvicorn.Config(self.app, log_level="warning", lifespan="off", ws="auto"))
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def __enter__(self) -> "FakeMagicAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+    def record(self, path: str) -> None:
+        if path == COUNTS_PATH:
+            return
+        with self._counts_lock:
+            self._counts[_route_key(path)] += 1
+
+    def request_counts(self) -> Dict[str, int]:
+        with self._counts_lock:
+            return dict(self._counts)
+
+    async def _counts_endpoint(self, request: Request) -> Response:
+        return JSONResponse(self.request_counts())
+
+    # ------------------------------------------------------------------
+    # 编辑器端点
+    # ------------------------------------------------------------------
+    async def _login(self, request: Request) -> Response:
+        response = _ok("bench-token")
+        response.headers["magic-token"] = "bench-token"
+        return response
+
+    async def _resource_tree(self, request: Request) -> Response:
+        # 大数据集的资源树序列化耗时较长，只序列化一次
+        if self._tree_body is None:
+            self._tree_body = json.dumps({"code": 1, "message": "success", "data": self.dataset.tree}).encode("utf-8")
+        return Response(self._tree_body, media_type="application/json")
+
+    async def _file(self, request: Request) -> Response:
+        detail = self.dataset.files.get(request.path_params["file_id"])
+        if detail is None:
+            return JSONResponse({"code": 0, "message": "文件不存在", "data": None})
+        return _ok(detail)
+
+    async def _save_file(self, request: Request) -> Response:
+        body = await request.json()
+        file_id = body.get("id")
+        if file_id not in self.dataset.files:
+            return JSONResponse({"code": 0, "message": "文件不存在", "data": None})
+        self.edit_script(file_id, str(body.get("script") or ""))
+        return _ok(file_id)
+
+    def edit_script(self, file_id: str, script: str) -> None:
+        """修改脚本并推进 ``updateTime``，同时更新详情与资源树节点。"""
+        detail = self.dataset.files[file_id]
+        update_time = max(int(time.time() * 1000), int(detail.get("updateTime") or 0) + 1)
+        detail["script"] = script
+        detail["updateTime"] = update_time
+        stack = [section for section in self.dataset.tree.values()]
+        while stack:
+            entry = stack.pop()
+            if entry["node"].get("id") == file_id:
+                entry["node"]["updateTime"] = update_time
+                break
+            stack.extend(entry["children"])
+        self._tree_body = None
+
+    async def _search(self, request: Request) -> Response:
+        form = await request.form()
+        keyword = str(form.get("keyword") or "")
+        return _ok(self.dataset.script_hits(keyword) if keyword else [])
+
+    async def _todo(self, request: Request) -> Response:
+        return _ok(self.dataset.script_hits("TODO"))
+
+    async def _classes(self, request: Request) -> Response:
+        return _ok(self.dataset.classes)
+
+    async def _classes_txt(self, request: Request) -> Response:
+        return PlainTextResponse("\n".join(self.dataset.classes["classes"]))
+
+    async def _class_detail(self, request: Request) -> Response:
+        form = await request.form()
+        methods = self.dataset.classes["classes"].get(str(form.get("className") or ""))
+        return _ok([{"methods": methods, "fields": []}] if methods else [])
+
+    async def _backups(self, request: Request) -> Response:
+        return _ok(self.dataset.backups)
+
+    async def _backup(self, request: Request) -> Response:
+        detail = self.dataset.files.get(request.path_params["backup_id"])
+        return _ok(detail["script"] if detail else None)
+
+    async def _download(self, request: Request) -> Response:
+        group_id = request.query_params.get("groupId")
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for kind, root in self.dataset.tree.items():
+                self._write_group(archive, root, kind, group_id is None, group_id)
+        return Response(buffer.getvalue(), media_type="application/octet-stream",
+                        headers={"Content-Disposition": 'attachment; filename="magic-api.zip"'})
+
+    def _write_group(self, archive: zipfile.ZipFile, entry: Dict[str, Any], directory: str,
+                     included: bool, group_id: Optional[str]) -> None:
+        node = entry["node"]
+        included = included or node.get("id") == group_id
+        if included and node.get("id") != "0":
+            archive.writestr(f"{directory}/{GROUP_FILE}", json.dumps(node, ensure_ascii=False))
+        for child in entry["children"]:
+            child_node = child["node"]
+            if "groupId" in child_node:
+                if included:
+                    detail = self.dataset.files[child_node["id"]]
+                    archive.writestr(f"{directory}/{child_node['name']}.ms",
+                                     format_script_file(detail, detail["script"]))
+            else:
+                self._write_group(archive, child, f"{directory}/{child_node['name']}", included, group_id)
+
+    async def _upload(self, request: Request) -> Response:
+        form = await request.form()
+        upload = form.get("file")
+        with zipfile.ZipFile(io.BytesIO(await upload.read())) as archive:
+            names = archive.namelist()
+        self.uploads.append({"mode": form.get("mode"), "names": names})
+        return _ok(True)
+
+    # ------------------------------------------------------------------
+    # 控制台 WebSocket 与业务接口
+    # ------------------------------------------------------------------
+    async def _console(self, websocket: WebSocket) -> None:
+        await websocket.accept()
+        self._sockets.add(websocket)
+        try:
+            while True:
+                message = await websocket.receive_text()
+                self.console_messages.append(message)
+                if message.startswith("login,"):
+                    client_id = message.rsplit(",", 1)[-1]
+                    await websocket.send_text(
+                        "login_response,1," + json.dumps({"clientId": client_id, "username": "bench"})
+                    )
+                elif message.startswith("resume_breakpoint,"):
+                    script_id = message.split(",", 2)[1]
+                    self._resumes.setdefault(script_id, asyncio.Queue()).put_nowait(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self._sockets.discard(websocket)
+
+    def drop_connections(self, timeout: float = 5.0) -> None:
+        """关闭所有控制台 WebSocket 连接（模拟网络中断或服务重启）。"""
+
+        async def close_all() -> None:
+            for websocket in list(self._sockets):
+                self._sockets.discard(websocket)
+                try:
+                    await websocket.close(code=1012)
+                except Exception:  # noqa: BLE001 - 连接已关闭
+                    pass
+
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result(timeout)
+
+    def broadcast(self, message: str, timeout: float = 5.0) -> None:
+        """向所有控制台连接推送一帧。"""
+        asyncio.run_coroutine_threadsafe(self._broadcast(message), self._loop).result(timeout)
+
+    async def _broadcast(self, message: str) -> None:
+        for websocket in list(self._sockets):
+            try:
+                await websocket.send_text(message)
+            except Exception:  # noqa: BLE001 - 客户端已断开
+                self._sockets.discard(websocket)
+
+    async def _business(self, request: Request) -> Response:
+        if self.business_concurrency <= 0:
+            return await self._execute(request)
+        if self._business_slots is None:
+            self._business_slots = asyncio.Semaphore(self.business_concurrency)
+        async with self._business_slots:
+            return await self._execute(request)
+
+    async def _execute(self, request: Request) -> Response:
+        path = "/" + request.path_params["path"]
+        script_id = self.dataset.paths.get((request.method, path))
+        if script_id is None:
+            return JSONResponse({"code": 404, "message": "接口不存在", "data": None}, status_code=404)
+        client_id = request.headers.get("magic-request-client-id", "")
+        breakpoints = request.headers.get("magic-request-breakpoints", "")
+        if breakpoints and self.step_timeout > 0:
+            await self._run_steps(script_id, client_id, {int(line) for line in breakpoints.split(",")})
+        elif breakpoints:
+            await self._broadcast(self._breakpoint_frame(script_id, client_id, int(breakpoints.split(",")[0])))
+        await asyncio.sleep(self.script_latency)
+        await self._broadcast(f"log,{script_id} 执行完成")
+        return _ok({"id": script_id, "updateTime": self.dataset.files[script_id].get("updateTime"),
+                    "page": 1, "total": 0, "list": []})
+
+    async def _run_steps(self, script_id: str, client_id: str, breakpoints: Set[int]) -> None:
+        """逐行执行脚本：命中断点或处于单步状态时推送断点帧并等待恢复指令。"""
+        resumes = self._resumes.setdefault(script_id, asyncio.Queue())
+        stepping = False
+        for line in executable_lines(self.dataset.files[script_id].get("script") or ""):
+            if stepping or line in breakpoints:
+                await self._broadcast(self._breakpoint_frame(script_id, client_id, line))
+                try:
+                    command = await asyncio.wait_for(resumes.get(), self.step_timeout)
+                except asyncio.TimeoutError:
+                    stepping, breakpoints = False, set()
+                else:
+                    _, _, step_type, lines = (command.split(",", 3) + [""])[:4]
+                    stepping = step_type != "0"
+                    breakpoints = {int(item) for item in lines.split("|") if item}
+            await asyncio.sleep(self.line_latency.get(line, 0))
+
+    @staticmethod
+    def _breakpoint_frame(script_id: str, client_id: str, line: int) -> str:
+        frame = {
+            "variables": [
+                {"name": "page", "type": "java.lang.Integer", "value": "1"},
+                {"name": "header", "type": "java.util.Map",
+                 "value": json.dumps({"magic-request-client-id": client_id})},
+            ],
+            "range": [line, 1, line, 20],
+        }
+        return f"breakpoint,{script_id},{json.dumps(frame)}"
+
+
+class _CountingMiddleware:
+    """按路由统计 HTTP 请求数（不计 WebSocket）。"""
+
+    def __init__(self, app: Any, server: FakeMagicAPIServer) -> None:
+        self.app = app
+        self.server = server
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            self.server.record(scope["path"])
+        await self.app(scope, receive, send)
+
+
+class RemoteFakeServer:
+    """子进程中运行的替身服务句柄。"""
+
+    def __init__(self, port: int, process: subprocess.Popen) -> None:
+        self.port = port
+        self.process = process
+        self.session = requests.Session()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/magic/web/console"
+
+    def request_counts(self) -> Dict[str, int]:
+        return self.session.get(f"{self.base_url}{COUNTS_PATH}", timeout=10).json()
+
+
+@contextmanager
+def spawn_server(api_count: int, seed: int = 42, timeout: float = 120.0) -> Iterator[RemoteFakeServer]:
+    """在子进程中生成数据集并启动替身服务。"""
+    package_root = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_server", "--apis", str(api_count), "--seed", str(seed)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        text=True,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        port = None
+        while port is None:
+            line = process.stdout.readline()
+            if line.startswith("READY "):
+                port = int(line.split()[1])
+            elif not line and process.poll() is not None:
+                raise RuntimeError("替身服务进程异常退出")
+            elif time.monotonic() > deadline:
+                raise RuntimeError("替身服务启动超时")
+        server = RemoteFakeServer(port, process)
+        yield server
+        server.session.close()
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Magic-API 替身服务（合成数据集）")
+    parser.add_argument("--apis", type=int, default=1000, help="接口数量")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--port", type=int, default=0, help="监听端口，0 表示随机端口")
+    parser.add_argument("--script-latency", type=float, default=0.002, help="业务接口模拟执行耗时（秒）")
+    args = parser.parse_args()
+    FakeMagicAPIServer(build_dataset(args.apis, args.seed), args.script_latency).serve_forever(args.port)
+
+
+if __name__ == "__main__":
+    main()
+
+
+__all__ = ["FakeMagicAPIServer", "RemoteFakeServer", "spawn_server"]
@@ -0,0 +1,281 @@
+"""MCP 工具离线基准测试。
+
+对每个数据集规模启动一个替身服务（子进程），通过进程内 MCP 客户端调用各类工具，记录：
+
+- 冷启动耗时（首次调用，包含资源树下载等缓存填充）与热调用的 p50/p90/max 耗时；
+- 每次调用向 Magic-API 发出的请求数（按端点统计，冷/热分开）；
+- 单次调用的 Python 内存分配峰值（``tracemalloc``）与响应大小；
+- 每个规模结束时的进程最大 RSS。
+
+结果可保存为 JSON，并与基线比较：热调用 p50 变慢超过阈值，或任一端点的请求数增加，
+视为性能回退（退出码 2），便于在 CI 中跟踪。
+
+使用方法::
+
+    python -m benchmarks.suite                          # 默认 1k / 10k / 100k
+    python -m benchmarks.suite --sizes 1000 --repeat 3 --output bench.json
+    python -m benchmarks.suite --sizes 1000 --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.fake_server import spawn_server
+from benchmarks.synthetic import SEARCH_MARKER
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.load_test import percentile
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows 无 resource 模块
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+# 任意规模的合成数据集都包含该接口
+SAMPLE_PATH = "/order0/v0/list0"
+
+
+@dataclass(slots=True)
+class BenchmarkCase:
+    """单个基准用例：以固定参数调用一个 MCP 工具。"""
+
+    name: str
+    category: str
+    tool: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+DEFAULT_CASES: List[BenchmarkCase] = [
+    BenchmarkCase("search_endpoints", "query", "search_api_endpoints", {"path_filter": "order0/v1"}),
+    BenchmarkCase("api_details_by_path", "query", "get_api_details_by_path", {"path": f"GET {SAMPLE_PATH}"}),
+    BenchmarkCase("resource_tree_depth2", "resource", "get_resource_tree", {"depth": 2}),
+    BenchmarkCase("resource_statistics", "resource", "get_resource_statistics"),
+    BenchmarkCase("search_scripts", "search", "search_api_scripts", {"keyword": SEARCH_MARKER}),
+    BenchmarkCase("list_backups", "backup", "list_backups", {"limit": 10}),
+    BenchmarkCase("list_classes", "classes", "list_magic_api_classes", {"page": 1, "page_size": 20}),
+    BenchmarkCase("call_api", "api", "call_magic_api",
+                  {"method": "GET", "path": SAMPLE_PATH, "include_ws_logs": {"pre": 0, "post": 0}}),
+    BenchmarkCase("debug_call_with_breakpoint", "debug", "call_magic_api_with_debug",
+                  {"method": "GET", "path": SAMPLE_PATH, "breakpoints": [3], "timeout": 10}),
+    BenchmarkCase("knowledge_search", "knowledge", "search_knowledge", {"keyword": "分页"}),
+    BenchmarkCase("knowledge_syntax", "knowledge", "get_magic_script_syntax", {"topic": "loops"}),
+]
+
+
+def _diff_counts(before: Dict[str, int], after: Dict[str, int], calls: int = 1) -> Dict[str, float]:
+    diff: Dict[str, float] = {}
+    for route, count in after.items():
+        delta = count - before.get(route, 0)
+        if delta:
+            diff[route] = round(delta / calls, 2)
+    return diff
+
+
+def _response_size(result: Any) -> int:
+    return sum(len(getattr(block, "text", "") or "") for block in getattr(result, "content", []) or [])
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 计，macOS 以字节计
+    return round(usage / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _run_case(client: Any, server: Any, case: BenchmarkCase, repeat: int) -> Dict[str, Any]:
+    async def call() -> Any:
+        return await client.call_tool(case.tool, case.arguments, raise_on_error=False)
+
+    before = server.request_counts()
+    started = time.perf_counter()
+    result = await call()
+    cold_ms = (time.perf_counter() - started) * 1000
+    after_cold = server.request_counts()
+
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    after_warm = server.request_counts()
+
+    tracemalloc.start()
+    try:
+        await call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(timings)
+    record: Dict[str, Any] = {
+        "category": case.category,
+        "tool": case.tool,
+        "cold_ms": round(cold_ms, 2),
+        "p50_ms": round(percentile(ordered, 50), 2) if ordered else None,
+        "p90_ms": round(percentile(ordered, 90), 2) if ordered else None,
+        "max_ms": round(ordered[-1], 2) if ordered else None,
+        "requests_cold": _diff_counts(before, after_cold),
+        "requests_per_call": _diff_counts(after_cold, after_warm, max(repeat, 1)),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "response_bytes": _response_size(result),
+    }
+    if getattr(result, "is_error", False):
+        record["error"] = (getattr(result.content[0], "text", "") if result.content else "")[:300]
+    return record
+
+
+async def run_size(api_count: int, cases: Sequence[BenchmarkCase], repeat: int,
+                   composition: str = "full", seed: int = 42,
+                   progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """对一个数据集规模运行全部用例。"""
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    with spawn_server(api_count, seed) as server:
+        settings = MagicAPISettings(
+            base_url=server.base_url,
+            ws_url=server.ws_url,
+            # 缩短日志捕获窗口，避免固定等待掩盖调试工具自身的开销
+            ws_log_capture_window=0.05,
+        )
+        started = time.perf_counter()
+        app = create_app(composition, settings)
+        startup_ms = (time.perf_counter() - started) * 1000
+        results: Dict[str, Any] = {}
+        try:
+            async with Client(app) as client:
+                for case in cases:
+                    if progress:
+                        progress(f"  {api_count:>7} {case.name}")
+                    results[case.name] = await _run_case(client, server, case, repeat)
+        finally:
+            if tool_registry.context is not None:
+                tool_registry.context.close()
+    return {
+        "api_count": api_count,
+        "startup_ms": round(startup_ms, 2),
+        "max_rss_mb": _max_rss_mb(),
+        "cases": results,
+    }
+
+
+async def run_suite(sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT,
+                    cases: Optional[Sequence[BenchmarkCase]] = None, composition: str = "full",
+                    seed: int = 42, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """运行基准测试并返回完整报告。"""
+    cases = list(cases or DEFAULT_CASES)
+    report: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "repeat": repeat,
+            "seed": seed,
+            "composition": composition,
+        },
+        "sizes": {},
+    }
+    for size in sizes:
+        report["sizes"][str(size)] = await run_size(size, cases, repeat, composition, seed, progress)
+    return report
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any],
+                    tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, Any]:
+    """与基线比较：热调用 p50 变慢超过 ``tolerance`` 或端点请求数增加视为回退。"""
+    regressions: List[Dict[str, Any]] = []
+    for size, size_report in current["sizes"].items():
+        base_cases = baseline.get("sizes", {}).get(size, {}).get("cases", {})
+        for name, result in size_report["cases"].items():
+            base = base_cases.get(name)
+            if not base:
+                continue
+            if base.get("p50_ms") and result.get("p50_ms") is not None:
+                change = (result["p50_ms"] - base["p50_ms"]) / base["p50_ms"]
+                if change > tolerance:
+                    regressions.append({"size": size, "case": name, "metric": "p50_ms",
+                                        "baseline": base["p50_ms"], "current": result["p50_ms"],
+                                        "change_pct": round(change * 100, 1)})
+            for key in ("requests_cold", "requests_per_call"):
+                for route, count in result.get(key, {}).items():
+                    previous = base.get(key, {}).get(route, 0)
+                    if count > previous:
+                        regressions.append({"size": size, "case": name, "metric": f"{key}:{route}",
+                                            "baseline": previous, "current": count})
+    return {"tolerance": tolerance, "regressed": bool(regressions), "regressions": regressions}
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    header = f"{'用例':<28}{'冷启动ms':>10}{'p50ms':>10}{'p90ms':>10}{'请求/次':>9}{'峰值KB':>10}{'响应B':>10}"
+    for size, size_report in report["sizes"].items():
+        print("-" * len(header))
+        print(f"📦 {int(size):,} 个接口  启动 {size_report['startup_ms']}ms  最大 RSS {size_report['max_rss_mb']}MB")
+        print(header)
+        for name, result in size_report["cases"].items():
+            requests_per_call = sum(result["requests_per_call"].values())
+            flag = " ⚠️" if "error" in result else ""
+            print(
+                f"{name:<28}{result['cold_ms']:>10}{result['p50_ms']:>10}{result['p90_ms']:>10}"
+                f"{requests_per_call:>9g}{result['peak_alloc_kb']:>10}{result['response_bytes']:>10}{flag}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Magic-API MCP 工具离线基准测试")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="数据集接口数量，逗号分隔（默认 1000,10000,100000）")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每个用例的热调用次数")
+    parser.add_argument("--cases", help="只运行指定用例或类别，逗号分隔")
+    parser.add_argument("--composition", default="full", help="工具组合")
+    parser.add_argument("--seed", type=int, default=42, help="数据集随机种子")
+    parser.add_argument("--output", help="保存 JSON 报告的文件")
+    parser.add_argument("--compare", help="对比的基线 JSON 报告")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="p50 回退阈值（默认 0.25）")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    cases = DEFAULT_CASES
+    if args.cases:
+        selected = {item.strip() for item in args.cases.split(",")}
+        cases = [case for case in DEFAULT_CASES if case.name in selected or case.category in selected]
+
+    print(f"🚀 基准测试: 规模 {sizes}，每个用例热调用 {args.repeat} 次")
+    report = asyncio.run(run_suite(sizes, args.repeat, cases, args.composition, args.seed, progress=print))
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+        print(f"💾 报告已保存: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            comparison = compare_reports(report, json.load(handle), args.tolerance)
+        if comparison["regressed"]:
+            print(f"❌ 发现 {len(comparison['regressions'])} 项性能回退:")
+            for item in comparison["regressions"]:
+                print(f"   {item['size']} {item['case']} {item['metric']}: {item['baseline']} → {item['current']}")
+            return 2
+        print("✅ 未发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+__all__ = ["BenchmarkCase", "DEFAULT_CASES", "compare_reports", "run_size", "run_suite"]
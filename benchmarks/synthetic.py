@@ -0,0 +1,195 @@
+"""合成 Magic-API 数据集。
+
+按接口数量生成结构与真实实例一致的资源树、脚本、类信息与备份记录。同一 ``seed`` 生成的数据
+完全相同，基准结果可跨机器、跨提交对比。
+
+资源树布局：每个模块（一级分组）包含 20 个二级分组，每个二级分组最多 50 个接口，
+即每 1000 个接口一个模块；``SEARCH_MARKER`` 只出现在固定数量的脚本中，使脚本搜索的
+结果规模不随数据集增长。
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+SEARCH_MARKER = "BENCH_MARKER"
+SEARCH_MARKER_HITS = 20
+APIS_PER_GROUP = 50
+GROUPS_PER_MODULE = 20
+CLASS_COUNT = 200
+MAX_BACKUPS = 2000
+
+_DOMAINS = ("order", "user", "product", "payment", "stock", "report", "message", "audit")
+_ACTIONS = (
+    ("GET", "list", "查询{}列表"),
+    ("GET", "detail", "查询{}详情"),
+    ("POST", "create", "新增{}"),
+    ("POST", "update", "修改{}"),
+    ("POST", "delete", "删除{}"),
+    ("GET", "export", "导出{}"),
+)
+_DOMAIN_NAMES = {
+    "order": "订单", "user": "用户", "product": "商品", "payment": "支付",
+    "stock": "库存", "report": "报表", "message": "消息", "audit": "审计",
+}
+
+
+@dataclass(slots=True)
+class SyntheticDataset:
+    """合成数据集。"""
+
+    api_count: int
+    tree: Dict[str, Any]
+    files: Dict[str, Dict[str, Any]]
+    paths: Dict[Tuple[str, str], str]
+    classes: Dict[str, Any]
+    backups: List[Dict[str, Any]]
+    sample_paths: List[str] = field(default_factory=list)
+
+    def script_hits(self, keyword: str) -> List[Dict[str, Any]]:
+        """模拟 ``/magic/web/search``：返回包含关键词的脚本行。"""
+        hits: List[Dict[str, Any]] = []
+        for file_id, detail in self.files.items():
+            script = detail["script"]
+            if keyword not in script:
+                continue
+            for number, line in enumerate(script.splitlines(), start=1):
+                if keyword in line:
+                    hits.append({"id": file_id, "text": line.strip(), "line": number})
+                    break
+        return hits
+
+
+def _script(rng: random.Random, domain: str, action: str, marker: bool) -> str:
+    table = f"t_{domain}"
+    lines = [
+        f"// {_DOMAIN_NAMES[domain]} {action}",
+        "import log",
+        f"var page = body.page ?: {rng.randint(1, 5)}",
+        f"var size = body.size ?: {rng.choice((10, 20, 50))}",
+        f"log.info('{action} {domain} page=' + page)",
+    ]
+    if marker:
+        lines.append(f"// {SEARCH_MARKER}: 基准搜索命中")
+    if action in {"list", "export"}:
+        lines.append(f"return db.table('{table}').where().eq('deleted', 0).page()")
+    elif action == "detail":
+        lines.append(f"return db.selectOne('select * from {table} where id = #{{id}}')")
+    else:
+        lines.append(f"return db.table('{table}').primary('id').saveOrUpdate(body)")
+    return "\n".join(lines)
+
+
+def build_dataset(api_count: int, seed: int = 42) -> SyntheticDataset:
+    """生成包含 ``api_count`` 个接口的数据集。"""
+    rng = random.Random(seed)
+    files: Dict[str, Dict[str, Any]] = {}
+    paths: Dict[Tuple[str, str], str] = {}
+    sample_paths: List[str] = []
+    marker_every = max(1, api_count // SEARCH_MARKER_HITS)
+    base_time = 1_700_000_000_000
+
+    modules: List[Dict[str, Any]] = []
+    api_index = 0
+    module_index = 0
+    while api_index < api_count:
+        domain = _DOMAINS[module_index % len(_DOMAINS)]
+        module_id = f"m{module_index:05d}"
+        module_path = f"{domain}{module_index}"
+        groups: List[Dict[str, Any]] = []
+        for group_index in range(GROUPS_PER_MODULE):
+            if api_index >= api_count:
+                break
+            group_id = f"{module_id}g{group_index:02d}"
+            group_path = f"v{group_index}"
+            apis: List[Dict[str, Any]] = []
+            for slot in range(APIS_PER_GROUP):
+                if api_index >= api_count:
+                    break
+                method, action, label = _ACTIONS[slot % len(_ACTIONS)]
+                api_id = f"a{api_index:07d}"
+                api_path = f"{action}{slot}"
+                full_path = f"/{module_path}/{group_path}/{api_path}"
+                node = {
+                    "id": api_id,
+                    "name": f"{label.format(_DOMAIN_NAMES[domain])}{api_index}",
+                    "path": api_path,
+                    "method": method,
+                    "groupId": group_id,
+                    "type": "api",
+                    "createBy": "bench",
+                    "updateBy": "bench",
+                    "createTime": base_time + api_index,
+                    "updateTime": base_time + api_index * 7,
+                    "locked": False,
+                }
+                apis.append({"node": node, "children": []})
+                files[api_id] = {
+                    **node,
+                    "script": _script(rng, domain, action, api_index % marker_every == 0
+                                      and api_index // marker_every < SEARCH_MARKER_HITS),
+                    "parameters": [{"name": "page", "value": "1", "dataType": "Integer", "required": False}],
+                    "headers": [],
+                    "options": [],
+                    "requestBody": "",
+                    "responseBody": "",
+                    "description": "",
+                }
+                paths[(method, full_path)] = api_id
+                if len(sample_paths) < 16 and slot == 0:
+                    sample_paths.append(f"{method} {full_path}")
+                api_index += 1
+            groups.append({
+                "node": {"id": group_id, "name": f"{domain}-v{group_index}", "path": group_path,
+                         "parentId": module_id, "type": "api"},
+                "children": apis,
+            })
+        modules.append({
+            "node": {"id": module_id, "name": f"{_DOMAIN_NAMES[domain]}模块{module_index}",
+                     "path": module_path, "parentId": "0", "type": "api"},
+            "children": groups,
+        })
+        module_index += 1
+
+    tree = {
+        "api": {"node": {"id": "0", "name": "接口", "type": "api"}, "children": modules},
+        "function": {"node": {"id": "0", "name": "函数", "type": "function"}, "children": []},
+        "task": {"node": {"id": "0", "name": "任务", "type": "task"}, "children": []},
+        "datasource": {"node": {"id": "0", "name": "数据源", "type": "datasource"}, "children": []},
+    }
+
+    class_names = [f"org.ssssssss.bench.{_DOMAINS[i % len(_DOMAINS)]}.Service{i}" for i in range(CLASS_COUNT)]
+    classes = {
+        "classes": {name: [{"name": f"method{j}", "returnType": "java.lang.Object",
+                            "parameters": [{"name": "arg0", "type": "java.lang.String"}]} for j in range(5)]
+                    for name in class_names},
+        "extensions": {f"java.util.Bench{i}": [{"name": f"ext{i}", "returnType": "void"}] for i in range(20)},
+        "functions": [{"name": f"bench_fn{i}", "returnType": "java.lang.Object"} for i in range(50)],
+    }
+
+    backups = [
+        {
+            "id": f"a{index % max(api_count, 1):07d}",
+            "type": "api",
+            "name": f"备份{index}",
+            "createBy": "bench",
+            "createDate": base_time + index * 1000,
+            "tag": None,
+        }
+        for index in range(min(api_count, MAX_BACKUPS))
+    ]
+
+    return SyntheticDataset(
+        api_count=api_count,
+        tree=tree,
+        files=files,
+        paths=paths,
+        classes=classes,
+        backups=backups,
+        sample_paths=sample_paths,
+    )
+
+
+__all__ = ["SEARCH_MARKER", "SEARCH_MARKER_HITS", "SyntheticDataset", "build_dataset"]
@@ -0,0 +1,135 @@
+"""WebSocket 帧解析吞吐基准。
+
+对一段控制台帧序列比较两种处理方式：
+
+- ``eager``：逐帧完整解码（解析 JSON、生成 ``text`` 摘要），即改造前 ``parse_ws_message`` 的行为；
+- ``fast``：监听循环的实际路径——只按前缀识别类型，丢弃 PING/PONG，其余帧延迟解码。
+
+默认使用按真实控制台会话比例合成的帧（大量 LOG/LOGS，夹杂断点、异常、在线用户与心跳），
+也可通过 ``--frames`` 读取录制文件（每行一个 JSON 字符串，即 ``json.dumps(raw_frame)``）。
+
+使用方法::
+
+    python -m benchmarks.ws_parse
+    python -m benchmarks.ws_parse --count 200000 --frames console.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from magicapi_tools.ws.messages import WSMessage, classify_ws_frame, is_heartbeat, orjson, parse_ws_message
+
+DEFAULT_FRAME_COUNT = 50000
+DEFAULT_ROUNDS = 3
+
+# (权重, 帧生成函数)：比例参考一次带大量日志输出的脚本调试会话
+_FRAME_KINDS: List[tuple] = [
+    (60, lambda rnd, i: f"log,[INFO] 处理第 {i} 条记录，耗时 {rnd.randint(1, 50)}ms"),
+    (25, lambda rnd, i: "logs," + json.dumps(
+        [f"[DEBUG] batch {i} row {row} value={rnd.random():.6f}" for row in range(rnd.randint(5, 20))],
+        ensure_ascii=False)),
+    (5, lambda rnd, i: "ping"),
+    (2, lambda rnd, i: "pong"),
+    (3, lambda rnd, i: "online_users," + json.dumps(
+        [{"clientId": f"c{n}", "username": f"user{n}", "ip": "127.0.0.1"} for n in range(rnd.randint(1, 8))])),
+    (2, lambda rnd, i: f"breakpoint,a{i % 97:04d}," + json.dumps({
+        "range": [rnd.randint(1, 80), 1, 0, 0],
+        "variables": [{"name": f"v{n}", "type": "java.lang.String", "value": "x" * 40} for n in range(12)],
+    })),
+    (1, lambda rnd, i: "exception," + json.dumps({"message": f"NPE at line {i % 50}", "headers": "{}"})),
+    (2, lambda rnd, i: f"set_file_id,a{i % 97:04d}"),
+]
+
+
+def recorded_frames(count: int = DEFAULT_FRAME_COUNT, seed: int = 7) -> List[str]:
+    """生成固定种子的控制台帧序列。"""
+    rnd = random.Random(seed)
+    weights = [weight for weight, _ in _FRAME_KINDS]
+    makers = [maker for _, maker in _FRAME_KINDS]
+    return [rnd.choices(makers, weights)[0](rnd, index) for index in range(count)]
+
+
+def load_frames(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _eager(frames: Sequence[str]) -> int:
+    kept = 0
+    for raw in frames:
+        message = parse_ws_message(raw)
+        message.data  # 强制解码，等价于改造前的逐帧解析
+        kept += 1
+    return kept
+
+
+def _fast(frames: Sequence[str]) -> int:
+    kept = 0
+    now = time.time
+    for raw in frames:
+        message_type, offset = classify_ws_frame(raw)
+        if is_heartbeat(message_type):
+            continue
+        WSMessage.lazy(message_type, raw, offset, now())
+        kept += 1
+    return kept
+
+
+MODES: Dict[str, Callable[[Sequence[str]], int]] = {"eager": _eager, "fast": _fast}
+
+
+def run_benchmark(frames: Sequence[str], rounds: int = DEFAULT_ROUNDS) -> Dict[str, Any]:
+    """对每种模式取多轮中的最快一轮，返回帧吞吐量与加速比。"""
+    total_bytes = sum(len(raw) for raw in frames)
+    results: Dict[str, Any] = {}
+    for mode, handler in MODES.items():
+        best = float("inf")
+        kept = 0
+        for _ in range(rounds):
+            started = time.perf_counter()
+            kept = handler(frames)
+            best = min(best, time.perf_counter() - started)
+        results[mode] = {
+            "seconds": round(best, 4),
+            "frames_per_second": round(len(frames) / best) if best else None,
+            "mb_per_second": round(total_bytes / best / 1e6, 1) if best else None,
+            "messages": kept,
+        }
+    eager, fast = results["eager"]["seconds"], results["fast"]["seconds"]
+    return {
+        "frames": len(frames),
+        "bytes": total_bytes,
+        "json_backend": "orjson" if orjson is not None else "json",
+        "modes": results,
+        "speedup": round(eager / fast, 1) if fast else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="WebSocket 帧解析吞吐基准")
+    parser.add_argument("--count", type=int, default=DEFAULT_FRAME_COUNT, help="合成帧数量")
+    parser.add_argument("--frames", help="录制的帧文件（每行一个 JSON 字符串）")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="每种模式运行轮数")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames) if args.frames else recorded_frames(args.count)
+    report = run_benchmark(frames, args.rounds)
+    print(f"📦 {report['frames']} 帧 / {report['bytes'] / 1e6:.1f} MB，JSON 后端: {report['json_backend']}")
+    for mode, item in report["modes"].items():
+        print(f"  {mode:<6} {item['frames_per_second']:>10} 帧/s  {item['mb_per_second']:>7} MB/s  "
+              f"({item['messages']} 条消息)")
+    print(f"⚡ 加速比: {report['speedup']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+__all__ = ["MODES", "load_frames", "recorded_frames", "run_benchmark"]
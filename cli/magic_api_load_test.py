@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Magic-API 接口压测 CLI。
+
+使用方法:
+# 10 并发压测 30 秒
+python3 magic_api_load_test.py "GET /order/list" -c 10 -d 30
+
+# 50 并发、5 秒爬坡、共 2000 次请求，参数使用模板
+python3 magic_api_load_test.py "GET /order/list" -c 50 --ramp-up 5 -n 2000 --params '{"page": "{{random:1:20}}"}'
+
+# 保存基线，修改脚本后与基线对比（出现回退时退出码为 2）
+python3 magic_api_load_test.py "GET /order/list" -d 30 --save-baseline baselines/order-list.json
+python3 magic_api_load_test.py "GET /order/list" -d 30 --baseline baselines/order-list.json
+
+连接信息读取 MAGIC_API_BASE_URL、MAGIC_API_USERNAME 等环境变量。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import replace
+from typing import Any, Dict
+
+from magicapi_tools import MagicAPIHTTPClient, MagicAPISettings
+from magicapi_tools.utils.load_test import (
+    DEFAULT_REGRESSION_TOLERANCE,
+    LoadTestConfig,
+    compare_with_baseline,
+    load_baseline,
+    run_load_test,
+    save_baseline,
+)
+
+
+def _parse_json(value: str | None, name: str) -> Any:
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError as exc:
+        raise SystemExit(f"❌ {name} 不是合法的 JSON: {exc}")
+
+
+def _print_progress(snapshot: Dict[str, Any]) -> None:
+    print(
+        f"⏱️  {snapshot['elapsed_seconds']:>6.1f}s  "
+        f"请求 {snapshot['completed']:>7}  "
+        f"{snapshot['throughput_rps']:>8.1f} req/s  "
+        f"错误 {snapshot['errors']:>5}  "
+        f"p50 {snapshot['p50_ms']:.1f}ms",
+        flush=True,
+    )
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    sizes = report["response_size_bytes"]
+    print("-" * 60)
+    print(f"🎯 目标: {report['target']}")
+    print(f"📊 请求: {report['requests']}  错误: {report['errors']}  错误率: {report['error_rate']:.2%}")
+    print(f"🚀 吞吐量: {report['throughput_rps']} req/s  耗时: {report['duration_seconds']}s")
+    scheduler = report.get("scheduler") or {}
+    if scheduler.get("enabled"):
+        print(f"🚦 按 {scheduler['priority']} 类别排队，实际并发 {scheduler['effective_concurrency']}，延迟含排队时间")
+    if latency.get("count"):
+        print(
+            f"⏳ 延迟(ms): min {latency['min']}  p50 {latency['p50']}  p90 {latency['p90']}  "
+            f"p99 {latency['p99']}  max {latency['max']}"
+        )
+        total = latency["count"]
+        for bucket in latency["histogram"]:
+            bar = "█" * max(1, round(40 * bucket["count"] / total))
+            print(f"   ≤{bucket['le']:>6}ms {bucket['count']:>7} {bar}")
+    if sizes.get("count"):
+        print(f"📦 响应大小(bytes): min {sizes['min']:.0f}  p50 {sizes['p50']:.0f}  p90 {sizes['p90']:.0f}  max {sizes['max']:.0f}")
+    print(f"🔢 状态码: {report['status_codes']}")
+    for sample in report["error_samples"]:
+        print(f"   ⚠️ {sample['message']}")
+
+
+def _print_comparison(comparison: Dict[str, Any]) -> None:
+    print("-" * 60)
+    print(f"📐 基线对比（阈值 {comparison['tolerance']:.0%}）")
+    for name, metric in comparison["metrics"].items():
+        flag = "❌" if name in comparison["regressions"] else "✅"
+        print(f"   {flag} {name}: {metric['baseline']} → {metric['current']} ({metric['change_pct']:+}%)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Magic-API 接口压测")
+    parser.add_argument("target", help="压测目标，如 'GET /order/list'")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="并发数（默认 10）")
+    parser.add_argument("-d", "--duration", type=float, help="持续时间（秒）")
+    parser.add_argument("-n", "--requests", type=int, help="总请求数")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="爬坡时间（秒）")
+    parser.add_argument("--params", help="查询参数模板（JSON）")
+    parser.add_argument("--data", help="请求体模板（JSON）")
+    parser.add_argument("--headers", help="请求头模板（JSON）")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单次请求超时（秒）")
+    parser.add_argument("--baseline", help="对比的基线文件")
+    parser.add_argument("--save-baseline", help="保存本次报告为基线文件")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_REGRESSION_TOLERANCE, help="回退判定阈值（默认 0.2）")
+    parser.add_argument("--base-url", help="Magic-API 基础 URL（默认读取 MAGIC_API_BASE_URL）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出报告")
+    args = parser.parse_args()
+
+    method, _, path = args.target.strip().partition(" ")
+    if not path:
+        method, path = "GET", method
+    config = LoadTestConfig(
+        method=method.upper(),
+        path=path.strip(),
+        concurrency=args.concurrency,
+        duration_seconds=args.duration,
+        total_requests=args.requests,
+        ramp_up_seconds=args.ramp_up,
+        params=_parse_json(args.params, "--params"),
+        data=_parse_json(args.data, "--data"),
+        headers=_parse_json(args.headers, "--headers") or {},
+        timeout_seconds=args.timeout,
+    )
+    errors = config.validate()
+    if errors:
+        print(f"❌ 参数错误: {'; '.join(errors)}")
+        return 1
+
+    settings = MagicAPISettings.from_env()
+    if args.base_url:
+        settings = replace(settings, base_url=args.base_url.rstrip("/"))
+    baseline = load_baseline(args.baseline) if args.baseline else None
+
+    if not args.json:
+        print(f"🎯 压测 {config.method} {settings.base_url}{config.path}  并发 {config.concurrency}")
+    report = run_load_test(MagicAPIHTTPClient(settings), config, None if args.json else _print_progress)
+    comparison = compare_with_baseline(report, baseline, args.tolerance) if baseline else None
+
+    if args.json:
+        print(json.dumps({**report, "comparison": comparison}, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+        if comparison:
+            _print_comparison(comparison)
+    if args.save_baseline:
+        saved = save_baseline(args.save_baseline, report)
+        if not args.json:
+            print(f"💾 基线已保存: {saved}")
+    return 2 if comparison and comparison["regressed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
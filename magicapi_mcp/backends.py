@@ -0,0 +1,335 @@
+"""多 Magic-API 后端的路由与并发扇出。
+
+按业务域部署的多个 Magic-API 实例可以由同一个 MCP 服务管理：
+
+- 每个后端拥有独立的 HTTP 客户端（连接池、认证、熔断状态）、资源管理器与资源树缓存，首次使用时创建；
+- ``ToolContext`` 的后端相关属性（``settings`` / ``http_client`` / ``resource_manager`` /
+  ``resource_tools`` / ``tree_cache``）按当前绑定的后端返回，因此现有工具无需改动即可路由；
+- 变更类工具路由到会话选择的后端（``use_backend``），``BackendRoutingMiddleware`` 在调用期间绑定；
+- 读类工具通过 ``fan_out_reads`` 获得 ``backend`` 参数，未指定时并发查询所有后端，
+  结果合并并标注来源后端，单个后端超时不会拖住整个查询。
+
+WebSocket 调试仍连接默认后端。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.dependency_graph import DependencyGraph
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.resource_manager import MagicAPIResourceManager, MagicAPIResourceTools
+from magicapi_tools.utils.response_cache import ResponseCache
+from magicapi_tools.utils.tree_cache import ResourceTreeCache
+
+try:
+    from fastmcp.server.middleware import Middleware
+except ImportError:  # pragma: no cover - fastmcp 缺失时不注册中间件
+    Middleware = object  # type: ignore[misc,assignment]
+
+if TYPE_CHECKING:
+    from magicapi_mcp.tool_registry import ToolContext
+
+logger = get_logger('backends')
+
+# 指定该值时对所有后端扇出
+ALL_BACKENDS = "*"
+
+_current_backend: contextvars.ContextVar[Optional["BackendHandle"]] = contextvars.ContextVar(
+    "magicapi_backend", default=None
+)
+
+
+def current_backend() -> Optional["BackendHandle"]:
+    """返回当前调用绑定的后端，未绑定时返回 ``None``（使用默认后端）。"""
+    return _current_backend.get()
+
+
+class BackendNotFoundError(KeyError):
+    """引用了未配置的后端名称。"""
+
+    def __init__(self, name: str, available: List[str]) -> None:
+        super().__init__(name)
+        self.name = name
+        self.available = available
+
+    def __str__(self) -> str:
+        return f"未配置的后端 '{self.name}'，可用后端: {', '.join(self.available)}"
+
+
+class BackendHandle:
+    """单个后端的连接与缓存。"""
+
+    def __init__(self, name: str, settings: MagicAPISettings, http_client: Optional[MagicAPIHTTPClient] = None,
+                 resource_manager: Optional[MagicAPIResourceManager] = None,
+                 tree_cache: Optional[ResourceTreeCache] = None) -> None:
+        self.name = name
+        self.settings = settings
+        self.http_client = http_client or MagicAPIHTTPClient(settings)
+        self.resource_manager = resource_manager or MagicAPIResourceManager(
+            settings.base_url,
+            settings.username if settings.auth_enabled else None,
+            settings.password if settings.auth_enabled else None,
+            http_client=self.http_client,
+        )
+        self.resource_tools = MagicAPIResourceTools(self.resource_manager)
+        self.tree_cache = tree_cache or ResourceTreeCache(self.http_client, settings.tree_cache_ttl_seconds)
+        # 首次查询依赖关系时才拉取全部脚本
+        self.dependency_graph = DependencyGraph(self.http_client, self.tree_cache)
+        # call_magic_api 的 GET 响应缓存，接口被修改或删除时失效；
+        # 按依赖图扩展到导入它的接口，依赖图未构建时无法确定影响范围，全部失效
+        self.response_cache = ResponseCache(
+            settings.response_cache_max_entries, expand=self.dependency_graph.affected_ids
+        )
+        self.tree_cache.add_listener(self.response_cache.on_tree_change)
+
+    @property
+    def fanout_timeout(self) -> float:
+        return self.settings.fanout_timeout_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "base_url": self.settings.base_url,
+            "auth_enabled": self.settings.auth_enabled,
+            "fanout_timeout_seconds": self.fanout_timeout,
+        }
+
+
+class BackendRegistry:
+    """后端注册表：按名称懒加载后端、维护会话选择并执行扇出查询。
+
+    Args:
+        settings: 进程配置（包含 ``backends`` 映射）
+        primary: 默认后端（复用 ``ToolContext`` 已创建的客户端）
+    """
+
+    def __init__(self, settings: MagicAPISettings, primary: BackendHandle) -> None:
+        self.settings = settings
+        self.primary = primary
+        self._handles: Dict[str, BackendHandle] = {primary.name: primary}
+        self._active: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> List[str]:
+        return self.settings.backend_names
+
+    @property
+    def is_multi(self) -> bool:
+        return len(self.names) > 1
+
+    def get(self, name: Optional[str] = None) -> BackendHandle:
+        """按名称获取后端，首次访问时创建其客户端与缓存。"""
+        name = name or self.primary.name
+        with self._lock:
+            handle = self._handles.get(name)
+            if handle is not None:
+                return handle
+            try:
+                backend_settings = self.settings.for_backend(name)
+            except KeyError:
+                raise BackendNotFoundError(name, self.names) from None
+            handle = BackendHandle(name, backend_settings)
+            self._handles[name] = handle
+            logger.info(f"初始化后端 '{name}': {backend_settings.base_url}")
+            return handle
+
+    # ------------------------------------------------------------------
+    # 会话选择
+    # ------------------------------------------------------------------
+    def active_name(self, session_key: str = "") -> str:
+        with self._lock:
+            return self._active.get(session_key, self.primary.name)
+
+    def set_active(self, name: str, session_key: str = "") -> BackendHandle:
+        handle = self.get(name)
+        with self._lock:
+            self._active[session_key] = handle.name
+        return handle
+
+    @contextmanager
+    def bind(self, name: Optional[str]) -> Iterator[BackendHandle]:
+        """在上下文内把后端相关属性路由到指定后端。"""
+        handle = self.get(name)
+        token = _current_backend.set(handle)
+        try:
+            yield handle
+        finally:
+            _current_backend.reset(token)
+
+    # ------------------------------------------------------------------
+    # 扇出
+    # ------------------------------------------------------------------
+    def fan_out(self, fn: Callable[[], Any], names: Optional[List[str]] = None,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """并发地在多个后端上执行 ``fn`` 并合并结果。
+
+        每个后端有独立的超时（默认取后端配置的 ``fanout_timeout``），超时的后端记入
+        ``fan_out.timed_out``，不等待其完成。
+
+        Returns:
+            合并后的结果，列表字段中的每项都带有 ``backend`` 标签
+        """
+        names = names or self.names
+        handles = [self.get(name) for name in names]
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=len(handles), thread_name_prefix="backend-fanout")
+
+        def _run(handle: BackendHandle) -> Any:
+            with self.bind(handle.name):
+                return fn()
+
+        # 线程池不继承调用方上下文：每个后端复制一份，保留追踪 span、指标作用域、上游优先级与会话绑定
+        futures = {
+            handle.name: executor.submit(contextvars.copy_context().run, _run, handle) for handle in handles
+        }
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        timed_out: List[str] = []
+        try:
+            for handle in handles:
+                budget = timeout if timeout is not None else handle.fanout_timeout
+                remaining = max(0.0, started + budget - time.monotonic())
+                try:
+                    results[handle.name] = futures[handle.name].result(timeout=remaining)
+                except FutureTimeoutError:
+                    timed_out.append(handle.name)
+                except Exception as exc:  # noqa: BLE001 - 单个后端失败不影响其他后端
+                    errors[handle.name] = str(exc)
+        finally:
+            # 不等待超时的后端，让其在后台自然结束
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        merged = merge_backend_results(results)
+        for name, error in merged.pop("_failed").items():
+            errors.setdefault(name, error)
+        merged["fan_out"] = {
+            "backends": names,
+            "succeeded": [name for name in names if name in results and name not in errors],
+            "failed": errors,
+            "timed_out": timed_out,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 2),
+        }
+        return merged
+
+    def dispatch(self, backend: Optional[str], fn: Callable[[], Any]) -> Any:
+        """读类工具的统一入口：指定后端时单独执行，否则在多后端时扇出。"""
+        if backend and backend != ALL_BACKENDS:
+            with self.bind(backend) as handle:
+                result = fn()
+            if isinstance(result, dict) and "error" not in result:
+                result = {**result, "backend": handle.name}
+            return result
+        if backend == ALL_BACKENDS or self.is_multi:
+            return self.fan_out(fn)
+        return fn()
+
+    def snapshot(self, session_key: str = "") -> Dict[str, Any]:
+        with self._lock:
+            created = set(self._handles)
+            active = self._active.get(session_key, self.primary.name)
+        backends = []
+        for name in self.names:
+            if name in created:
+                info = self._handles[name].snapshot()
+            else:
+                info = {"name": name, "base_url": self.settings.for_backend(name).base_url}
+            info["initialized"] = name in created
+            info["active"] = name == active
+            info["default"] = name == self.primary.name
+            backends.append(info)
+        return {"active": active, "default": self.primary.name, "backends": backends}
+
+
+def merge_backend_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """合并各后端的工具结果。
+
+    列表字段拼接，且每项标注 ``backend``；其余字段按后端归入 ``by_backend``；
+    返回错误结构的后端记入 ``_failed``。
+    """
+    merged: Dict[str, Any] = {"success": True}
+    by_backend: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, str] = {}
+    for name, result in results.items():
+        if not isinstance(result, dict):
+            by_backend[name] = {"result": result}
+            continue
+        if "error" in result or result.get("success") is False:
+            error = result.get("error")
+            failed[name] = error.get("message", str(error)) if isinstance(error, dict) else str(error or result)
+            continue
+        scalars: Dict[str, Any] = {}
+        for key, value in result.items():
+            if isinstance(value, list):
+                merged.setdefault(key, []).extend(_tag(item, name) for item in value)
+            elif key != "success":
+                scalars[key] = value
+        by_backend[name] = scalars
+    merged["by_backend"] = by_backend
+    merged["_failed"] = failed
+    return merged
+
+
+def _tag(item: Any, backend: str) -> Any:
+    if isinstance(item, dict):
+        return {**item, "backend": backend}
+    return {"backend": backend, "value": item}
+
+
+def fan_out_reads(context: "ToolContext") -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """读类工具装饰器：按 ``backend`` 参数单独执行或扇出到所有后端。
+
+    被装饰的工具需声明 ``backend`` 参数（供 MCP 生成参数说明），函数体无需使用它。
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            backend = kwargs.pop("backend", None)
+            if isinstance(backend, str):
+                backend = backend.strip() or None
+            try:
+                return context.backends.dispatch(backend, lambda: fn(*args, **kwargs))
+            except BackendNotFoundError as exc:
+                return {"error": {"code": "backend_not_found", "message": str(exc)}}
+
+        return wrapper
+
+    return decorator
+
+
+class BackendRoutingMiddleware(Middleware):
+    """工具调用期间绑定当前会话选择的后端。"""
+
+    def __init__(self, registry: BackendRegistry) -> None:
+        self.registry = registry
+
+    async def on_call_tool(self, context, call_next):
+        from magicapi_mcp.session_context import session_key
+
+        name = self.registry.active_name(session_key(context))
+        if name == self.registry.primary.name:
+            return await call_next(context)
+        with self.registry.bind(name):
+            return await call_next(context)
+
+
+__all__ = [
+    "ALL_BACKENDS",
+    "BackendHandle",
+    "BackendNotFoundError",
+    "BackendRegistry",
+    "BackendRoutingMiddleware",
+    "current_backend",
+    "fan_out_reads",
+    "merge_backend_results",
+]
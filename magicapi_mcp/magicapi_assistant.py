@@ -30,14 +30,20 @@
 
     # 指定传输协议
     uvx magic-api-mcp --transport http --port 8000
+
+    # sidecar 模式：多个 stdio 进程共享一个本地守护进程
+    uvx magic-api-mcp --sidecar
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import sys
 import signal
 import atexit
+from dataclasses import replace
+from pathlib import Path
 from typing import Any, List, Optional
 
 from magicapi_mcp.settings import MagicAPISettings
@@ -73,12 +79,10 @@ def _cleanup_resources():
     """清理资源，特别是 WebSocket 管理器"""
     # 获取工具注册器中的上下文
     if tool_registry.context:
-        # 获取并关闭 WebSocket 管理器
+        # 关闭会话级与进程级 WebSocket 管理器
         try:
-            ws_manager = tool_registry.context.ws_manager
-            if ws_manager and hasattr(ws_manager, 'stop_sync'):
-                ws_manager.stop_sync()
-                print("WebSocket 管理器已关闭")
+            tool_registry.context.close()
+            print("WebSocket 管理器已关闭")
         except Exception as e:
             print(f"关闭 WebSocket 管理器时出错: {e}")
         
@@ -126,6 +130,7 @@ def main() -> None:
   uvx magic-api-mcp-server                           # 运行完整工具集
   uvx magic-api-mcp-server --composition development  # 运行开发工具集
   uvx magic-api-mcp-server --transport http --port 8000  # HTTP模式运行
+  uvx magic-api-mcp-server --sidecar                 # 多个 IDE 窗口共享本地守护进程
         """
     )
 
@@ -156,9 +161,44 @@ def main() -> None:
         help="HTTP服务器端口 (默认: 8000)"
     )
 
+    parser.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="stdio 前端模式：转发给本地共享守护进程（不存在时自动启动）"
+    )
+
+    parser.add_argument(
+        "--sidecar-daemon",
+        action="store_true",
+        help=argparse.SUPPRESS,
+    )
+
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="sidecar 守护进程 Unix Socket 路径 (默认按 Magic-API 地址自动生成)"
+    )
+
     args = parser.parse_args()
 
-    app = create_app(args.composition)
+    # HTTP 传输下多个客户端共享进程，按 MCP 会话隔离调试状态
+    settings = replace(MagicAPISettings.from_env(), transport=args.transport)
+    socket_path = Path(args.socket) if args.socket else None
+
+    if args.sidecar_daemon:
+        from magicapi_mcp.sidecar import run_daemon
+        run_daemon(args.composition, settings, socket_path)
+        return
+
+    if (args.sidecar or settings.sidecar) and args.transport == "stdio":
+        from magicapi_mcp.sidecar import run_frontend
+        try:
+            asyncio.run(run_frontend(args.composition, settings, socket_path))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    app = create_app(args.composition, settings)
 
     try:
         if args.transport == "http":
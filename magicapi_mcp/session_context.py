@@ -0,0 +1,242 @@
+"""按 MCP 会话隔离的工具上下文。
+
+HTTP 传输下多个智能体共享同一进程。断点、最近调试的脚本 ID、WebSocket 客户端 ID 以及
+调试会话表属于单个使用者，按 MCP 会话隔离；HTTP 连接池、认证状态、资源树缓存与知识库
+仍由进程级 ``ToolContext`` 共享。
+
+- ``SessionContextMiddleware`` 在每次工具调用时根据 MCP 会话 ID 选出会话上下文，
+  通过 ``contextvars`` 传递给工具（包括工具内创建的后台任务）；
+- ``ToolContext`` 的会话级属性（``ws_manager`` / ``ws_debug_service`` / ``debug_sessions``）
+  优先返回当前会话的实例；
+- 会话级 WebSocket 连接在首次使用时才建立，空闲超时或超过容量时回收。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.ws.debug_service import WebSocketDebugService
+from magicapi_tools.ws.manager import WSManager
+
+try:
+    from fastmcp.server.middleware import Middleware
+except ImportError:  # pragma: no cover - fastmcp 缺失时不注册中间件
+    Middleware = object  # type: ignore[misc,assignment]
+
+if TYPE_CHECKING:
+    from magicapi_mcp.tool_registry import ToolContext
+
+logger = get_logger('session_context')
+
+_current_session: contextvars.ContextVar[Optional["SessionContext"]] = contextvars.ContextVar(
+    "magicapi_session_context", default=None
+)
+
+
+def current_session() -> Optional["SessionContext"]:
+    """返回当前工具调用所属的会话上下文，不在会话内时返回 ``None``。"""
+    return _current_session.get()
+
+
+class SessionContext:
+    """单个 MCP 会话的调试状态。"""
+
+    def __init__(self, session_id: str, shared: "ToolContext") -> None:
+        self.session_id = session_id
+        self.shared = shared
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.debug_sessions: Dict[str, Dict[str, Any]] = {}
+        self._ws_manager: Optional[WSManager] = None
+        self._ws_debug_service: Optional[WebSocketDebugService] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ws_manager(self) -> WSManager:
+        """会话独立的 WebSocket 管理器（独立客户端 ID），首次访问时创建。"""
+        with self._lock:
+            if self._ws_manager is None:
+                # WebSocket 调试固定连接默认后端
+                primary = self.shared.backends.primary
+                manager = WSManager(primary.settings, primary.resource_manager)
+                auth = primary.http_client.auth
+                if auth.enabled:
+                    manager.update_token(auth.token)
+                self._ws_manager = manager
+                logger.debug(f"会话 {self.session_id} 创建 WebSocket 客户端 {manager.client.client_id}")
+            return self._ws_manager
+
+    @property
+    def ws_debug_service(self) -> WebSocketDebugService:
+        """会话独立的断点调试服务。"""
+        manager = self.ws_manager
+        with self._lock:
+            if self._ws_debug_service is None:
+                self._ws_debug_service = WebSocketDebugService(manager, self.shared.backends.primary.http_client)
+            return self._ws_debug_service
+
+    @property
+    def has_ws(self) -> bool:
+        return self._ws_manager is not None
+
+    def update_token(self, token: str) -> None:
+        if self._ws_manager is not None:
+            self._ws_manager.update_token(token)
+
+    def close(self) -> None:
+        """关闭会话级 WebSocket 连接与事件循环线程。"""
+        with self._lock:
+            manager, self._ws_manager = self._ws_manager, None
+            self._ws_debug_service = None
+        if manager is not None:
+            manager.shutdown_sync()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at,
+            "idle_seconds": round(time.monotonic() - self.last_used, 3),
+            "ws_client_id": self._ws_manager.client.client_id if self._ws_manager else None,
+            "breakpoints": sorted(self._ws_debug_service.breakpoints) if self._ws_debug_service else [],
+            "debug_sessions": len(self.debug_sessions),
+        }
+
+
+class SessionContextPool:
+    """会话上下文池：按 MCP 会话 ID 创建、复用并回收会话上下文。
+
+    Args:
+        shared: 进程级共享的工具上下文
+        idle_ttl: 会话空闲多久后回收（秒）
+        max_sessions: 同时保留的会话数上限，超出时回收最久未使用的会话
+    """
+
+    def __init__(self, shared: "ToolContext", idle_ttl: float = 900.0, max_sessions: int = 64) -> None:
+        self.shared = shared
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max(1, max_sessions)
+        self.evicted = 0
+        self._sessions: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        # 令牌刷新后同步给所有会话的 WebSocket 客户端
+        shared.backends.primary.http_client.auth.add_listener(self._on_token)
+
+    def get(self, session_id: str) -> SessionContext:
+        """获取（必要时创建）会话上下文，并顺带回收空闲会话。"""
+        now = time.monotonic()
+        evicted: List[SessionContext] = []
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = SessionContext(session_id, self.shared)
+                self._sessions[session_id] = session
+                logger.info(f"创建会话上下文: {session_id}")
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_used = now
+
+            if now - self._last_sweep >= min(self.idle_ttl, 60.0):
+                self._last_sweep = now
+                for key, candidate in list(self._sessions.items()):
+                    if key != session_id and now - candidate.last_used >= self.idle_ttl:
+                        evicted.append(self._sessions.pop(key))
+            while len(self._sessions) > self.max_sessions:
+                _, oldest = self._sessions.popitem(last=False)
+                evicted.append(oldest)
+
+        if evicted:
+            self._close_async(evicted)
+        return session
+
+    def peek(self, session_id: str) -> Optional[SessionContext]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def evict_idle(self) -> int:
+        """立即回收所有空闲超时的会话，返回回收数量。"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, session in self._sessions.items() if now - session.last_used >= self.idle_ttl]
+            evicted = [self._sessions.pop(key) for key in expired]
+        self._close(evicted)
+        return len(evicted)
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        self._close(sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = [session.snapshot() for session in self._sessions.values()]
+        return {
+            "active": len(sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl,
+            "evicted": self.evicted,
+            "sessions": sessions,
+        }
+
+    def _on_token(self, token: str) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            session.update_token(token)
+
+    def _close(self, sessions: List[SessionContext]) -> None:
+        for session in sessions:
+            self.evicted += 1
+            try:
+                session.close()
+            except Exception as exc:  # noqa: BLE001 - 回收失败仅记录
+                logger.warning(f"回收会话 {session.session_id} 失败: {exc}")
+            else:
+                logger.info(f"已回收会话上下文: {session.session_id}")
+
+    def _close_async(self, sessions: List[SessionContext]) -> None:
+        # 关闭 WebSocket 需要等待握手结束，放到后台线程避免阻塞工具调用
+        threading.Thread(target=self._close, args=(sessions,), name="session-evictor", daemon=True).start()
+
+
+class SessionContextMiddleware(Middleware):
+    """工具调用期间绑定当前 MCP 会话的上下文。"""
+
+    def __init__(self, pool: SessionContextPool) -> None:
+        self.pool = pool
+
+    async def on_call_tool(self, context, call_next):
+        session_id = session_key(context) or None
+        if session_id is None:
+            return await call_next(context)
+        token = _current_session.set(self.pool.get(session_id))
+        try:
+            return await call_next(context)
+        finally:
+            _current_session.reset(token)
+
+
+def session_key(context: Any) -> str:
+    """从中间件上下文或工具的 ``Context`` 中取出 MCP 会话 ID，无请求上下文时返回空字符串。"""
+    fastmcp_context = getattr(context, "fastmcp_context", context)
+    if fastmcp_context is None:
+        return ""
+    try:
+        return fastmcp_context.session_id or ""
+    except Exception:  # noqa: BLE001 - 无请求上下文（如进程内直接调用）
+        return ""
+
+
+__all__ = [
+    "SessionContext",
+    "SessionContextMiddleware",
+    "SessionContextPool",
+    "current_session",
+    "session_key",
+]
@@ -2,21 +2,86 @@
 
 from __future__ import annotations
 
+import json
 import os
-from dataclasses import dataclass
-from typing import Mapping, MutableMapping, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Mapping, MutableMapping, Optional
 
 
 def _get_env(env: Mapping[str, str], key: str, default: str) -> str:
     return env.get(key, default)
 
 
+def _get_int(env: Mapping[str, str], key: str, default: int) -> int:
+    try:
+        return int(env[key]) if env.get(key) else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _get_float(env: Mapping[str, str], key: str, default: float) -> float:
+    try:
+        return float(env[key]) if env.get(key) else default
+    except (TypeError, ValueError):
+        return default
+
+
 def _str_to_bool(value: Optional[str]) -> bool:
     if value is None:
         return False
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _parse_backends(raw: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """解析多后端配置：JSON 字符串或 JSON 文件路径，形如 ``{"order": {"base_url": "..."}}``。"""
+    if not raw or not raw.strip():
+        return {}
+    text = raw.strip()
+    if not text.startswith("{") and os.path.isfile(os.path.expanduser(text)):
+        with open(os.path.expanduser(text), encoding="utf-8") as handle:
+            text = handle.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {str(name): dict(config) for name, config in data.items() if isinstance(config, dict)}
+
+
+def _parse_upstream_limits(raw: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """解析上游调度限制：JSON 字符串，形如 ``{"bulk": {"concurrency": 2, "rate": 5}}``。"""
+    if not raw or not raw.strip():
+        return {}
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    limits: Dict[str, Dict[str, float]] = {}
+    for name, config in data.items():
+        if not isinstance(config, dict):
+            continue
+        values: Dict[str, float] = {}
+        for key in ("concurrency", "rate", "burst"):
+            try:
+                if key in config:
+                    values[key] = float(config[key])
+            except (TypeError, ValueError):
+                continue
+        limits[str(name)] = values
+    return limits
+
+
+def _derive_ws_url(base_url: str) -> str:
+    if base_url.startswith("https://"):
+        scheme, rest = "wss://", base_url[len("https://"):]
+    else:
+        scheme, rest = "ws://", base_url.split("://", 1)[-1]
+    return f"{scheme}{rest.rstrip('/')}/magic/web/console"
+
+
 DEFAULT_BASE_URL = "http://127.0.0.1:10712"
 DEFAULT_WS_URL = "ws://127.0.0.1:10712/magic/web/console"
 DEFAULT_TIMEOUT = 30.0
@@ -25,7 +90,24 @@ DEFAULT_TRANSPORT = "stdio"
 DEFAULT_WS_LOG_HISTORY_SIZE = 500
 DEFAULT_WS_LOG_CAPTURE_WINDOW = 2
 DEFAULT_WS_RECONNECT_INTERVAL = 5.0
+DEFAULT_WS_RECONNECT_INITIAL = 0.05
+DEFAULT_WS_OBSERVER_QUEUE = 1000
+DEFAULT_WS_OBSERVER_OVERFLOW = "drop_oldest"
 DEFAULT_DEBUG_TIMEOUT = 600.0
+DEFAULT_TREE_CACHE_TTL = 30.0
+DEFAULT_HTTP_MAX_RETRIES = 2
+DEFAULT_HTTP_RETRY_BACKOFF = 0.2
+DEFAULT_HTTP_BREAKER_THRESHOLD = 5
+DEFAULT_HTTP_BREAKER_RESET = 30.0
+DEFAULT_SESSION_IDLE_TTL = 900.0
+DEFAULT_MAX_SESSIONS = 64
+DEFAULT_BACKEND_NAME = "default"
+DEFAULT_FANOUT_TIMEOUT = 10.0
+DEFAULT_TRACE_BUFFER = 50
+DEFAULT_RESPONSE_MAX_BYTES = 65536
+DEFAULT_RESPONSE_CACHE_MAX = 256
+DEFAULT_UPSTREAM_MAX_CONCURRENCY = 16
+DEFAULT_WORKSPACE_TIMEOUT = 300.0
 
 # API响应相关默认配置
 DEFAULT_SUCCESS_CODE = 1
@@ -51,7 +133,48 @@ class MagicAPISettings:
     ws_auto_start: bool = True
     ws_log_history_size: int = DEFAULT_WS_LOG_HISTORY_SIZE
     ws_log_capture_window: float = DEFAULT_WS_LOG_CAPTURE_WINDOW
+    # 断线重连：从 ws_reconnect_initial 开始指数退避，最长等待 ws_reconnect_interval
     ws_reconnect_interval: float = DEFAULT_WS_RECONNECT_INTERVAL
+    ws_reconnect_initial: float = DEFAULT_WS_RECONNECT_INITIAL
+    # 观察者投递队列：容量与溢出策略（drop_oldest / coalesce_logs / block）
+    ws_observer_queue_size: int = DEFAULT_WS_OBSERVER_QUEUE
+    ws_observer_overflow: str = DEFAULT_WS_OBSERVER_OVERFLOW
+    tree_cache_ttl_seconds: float = DEFAULT_TREE_CACHE_TTL
+    http_single_flight: bool = True
+    http_max_retries: int = DEFAULT_HTTP_MAX_RETRIES
+    http_retry_backoff: float = DEFAULT_HTTP_RETRY_BACKOFF
+    http_breaker_threshold: int = DEFAULT_HTTP_BREAKER_THRESHOLD
+    http_breaker_reset_seconds: float = DEFAULT_HTTP_BREAKER_RESET
+    http_adaptive_timeout: bool = True
+    # 会话隔离：None 表示按传输协议自动决定（非 stdio 时启用）
+    session_isolation: bool | None = None
+    session_idle_ttl_seconds: float = DEFAULT_SESSION_IDLE_TTL
+    max_sessions: int = DEFAULT_MAX_SESSIONS
+    # sidecar 模式：stdio 前端转发给本地共享守护进程
+    sidecar: bool = False
+    sidecar_socket: str | None = None
+    # 多后端：名称 -> 连接配置（base_url/ws_url/username/password/token/auth_enabled/fanout_timeout）
+    backends: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    default_backend: str = DEFAULT_BACKEND_NAME
+    fanout_timeout_seconds: float = DEFAULT_FANOUT_TIMEOUT
+    # 运行时指标：工具调用、上游请求、WebSocket 帧与缓存命中
+    metrics_enabled: bool = True
+    # 调用链追踪：内存保留最近的 trace，可导出到 JSONL 文件或 OTLP 收集器
+    tracing_enabled: bool = True
+    trace_buffer_size: int = DEFAULT_TRACE_BUFFER
+    trace_export_file: str | None = None
+    otlp_endpoint: str | None = None
+    # 大结果工具（知识库、资源树）单页响应的默认字节预算，0 表示不限制
+    response_max_bytes: int = DEFAULT_RESPONSE_MAX_BYTES
+    # call_magic_api GET 响应缓存：默认有效期（秒，0 表示仅在调用时指定 cache_ttl 才缓存）与录制条数上限
+    response_cache_ttl_seconds: float = 0.0
+    response_cache_max_entries: int = DEFAULT_RESPONSE_CACHE_MAX
+    # 工作区批量导出/导入（zip）单次请求的超时：服务端处理整个工作区，耗时远长于普通请求
+    workspace_timeout_seconds: float = DEFAULT_WORKSPACE_TIMEOUT
+    # 上游调度：按优先级（interactive/read/bulk）限制并发与速率，覆盖项形如 {"bulk": {"concurrency": 2, "rate": 5}}
+    upstream_scheduler: bool = True
+    upstream_max_concurrency: int = DEFAULT_UPSTREAM_MAX_CONCURRENCY
+    upstream_limits: Dict[str, Dict[str, float]] = field(default_factory=dict)
 
     # API响应状态码配置（支持自定义状态码）
     api_success_code: int = DEFAULT_SUCCESS_CODE
@@ -76,6 +199,9 @@ class MagicAPISettings:
         ws_capture_window_raw = env.get("MAGIC_API_WS_CAPTURE_WINDOW")
         ws_reconnect_raw = env.get("MAGIC_API_WS_RECONNECT_INTERVAL")
         debug_timeout_raw = env.get("MAGIC_API_DEBUG_TIMEOUT_SECONDS")
+        tree_cache_ttl_raw = env.get("MAGIC_API_TREE_CACHE_TTL")
+        http_single_flight = _str_to_bool(env.get("MAGIC_API_HTTP_SINGLE_FLIGHT", "1"))
+        session_isolation_raw = env.get("MAGIC_API_SESSION_ISOLATION")
 
         # API响应状态码配置
         api_success_code_raw = env.get("MAGIC_API_SUCCESS_CODE")
@@ -109,6 +235,11 @@ class MagicAPISettings:
         except (TypeError, ValueError):
             debug_timeout_seconds = DEFAULT_DEBUG_TIMEOUT
 
+        try:
+            tree_cache_ttl_seconds = float(tree_cache_ttl_raw) if tree_cache_ttl_raw else DEFAULT_TREE_CACHE_TTL
+        except (TypeError, ValueError):
+            tree_cache_ttl_seconds = DEFAULT_TREE_CACHE_TTL
+
         # 解析API响应状态码
         try:
             api_success_code = int(api_success_code_raw) if api_success_code_raw else DEFAULT_SUCCESS_CODE
@@ -140,12 +271,79 @@ class MagicAPISettings:
             ws_log_history_size=ws_log_history_size,
             ws_log_capture_window=ws_log_capture_window,
             ws_reconnect_interval=ws_reconnect_interval,
+            ws_reconnect_initial=_get_float(env, "MAGIC_API_WS_RECONNECT_INITIAL", DEFAULT_WS_RECONNECT_INITIAL),
+            ws_observer_queue_size=_get_int(env, "MAGIC_API_WS_OBSERVER_QUEUE", DEFAULT_WS_OBSERVER_QUEUE),
+            ws_observer_overflow=(env.get("MAGIC_API_WS_OBSERVER_OVERFLOW") or DEFAULT_WS_OBSERVER_OVERFLOW).strip().lower(),
+            tree_cache_ttl_seconds=tree_cache_ttl_seconds,
+            http_single_flight=http_single_flight,
+            http_max_retries=_get_int(env, "MAGIC_API_HTTP_MAX_RETRIES", DEFAULT_HTTP_MAX_RETRIES),
+            http_retry_backoff=_get_float(env, "MAGIC_API_HTTP_RETRY_BACKOFF", DEFAULT_HTTP_RETRY_BACKOFF),
+            http_breaker_threshold=_get_int(env, "MAGIC_API_HTTP_BREAKER_THRESHOLD", DEFAULT_HTTP_BREAKER_THRESHOLD),
+            http_breaker_reset_seconds=_get_float(env, "MAGIC_API_HTTP_BREAKER_RESET_SECONDS", DEFAULT_HTTP_BREAKER_RESET),
+            http_adaptive_timeout=_str_to_bool(env.get("MAGIC_API_HTTP_ADAPTIVE_TIMEOUT", "1")),
+            session_isolation=_str_to_bool(session_isolation_raw) if session_isolation_raw else None,
+            session_idle_ttl_seconds=_get_float(env, "MAGIC_API_SESSION_IDLE_TTL", DEFAULT_SESSION_IDLE_TTL),
+            max_sessions=_get_int(env, "MAGIC_API_MAX_SESSIONS", DEFAULT_MAX_SESSIONS),
+            sidecar=_str_to_bool(env.get("MAGIC_API_SIDECAR")),
+            sidecar_socket=env.get("MAGIC_API_SIDECAR_SOCKET") or None,
+            backends=_parse_backends(env.get("MAGIC_API_BACKENDS")),
+            default_backend=env.get("MAGIC_API_DEFAULT_BACKEND") or DEFAULT_BACKEND_NAME,
+            fanout_timeout_seconds=_get_float(env, "MAGIC_API_FANOUT_TIMEOUT", DEFAULT_FANOUT_TIMEOUT),
+            metrics_enabled=_str_to_bool(env.get("MAGIC_API_METRICS_ENABLED", "1")),
+            tracing_enabled=_str_to_bool(env.get("MAGIC_API_TRACING_ENABLED", "1")),
+            trace_buffer_size=_get_int(env, "MAGIC_API_TRACE_BUFFER", DEFAULT_TRACE_BUFFER),
+            trace_export_file=env.get("MAGIC_API_TRACE_FILE") or None,
+            otlp_endpoint=env.get("MAGIC_API_OTLP_ENDPOINT") or None,
+            response_max_bytes=_get_int(env, "MAGIC_API_RESPONSE_MAX_BYTES", DEFAULT_RESPONSE_MAX_BYTES),
+            response_cache_ttl_seconds=_get_float(env, "MAGIC_API_RESPONSE_CACHE_TTL", 0.0),
+            response_cache_max_entries=_get_int(env, "MAGIC_API_RESPONSE_CACHE_MAX", DEFAULT_RESPONSE_CACHE_MAX),
+            workspace_timeout_seconds=_get_float(env, "MAGIC_API_WORKSPACE_TIMEOUT", DEFAULT_WORKSPACE_TIMEOUT),
+            upstream_scheduler=_str_to_bool(env.get("MAGIC_API_UPSTREAM_SCHEDULER", "1")),
+            upstream_max_concurrency=_get_int(env, "MAGIC_API_UPSTREAM_MAX_CONCURRENCY", DEFAULT_UPSTREAM_MAX_CONCURRENCY),
+            upstream_limits=_parse_upstream_limits(env.get("MAGIC_API_UPSTREAM_LIMITS")),
             api_success_code=api_success_code,
             api_success_message=api_success_message,
             api_invalid_code=api_invalid_code,
             api_exception_code=api_exception_code,
         )
 
+    @property
+    def session_isolation_enabled(self) -> bool:
+        """是否按 MCP 会话隔离调试状态。"""
+        if self.session_isolation is not None:
+            return self.session_isolation
+        return self.transport != "stdio"
+
+    @property
+    def backend_names(self) -> list[str]:
+        """所有后端名称，默认后端排在首位。"""
+        names = [self.default_backend]
+        names.extend(name for name in self.backends if name != self.default_backend)
+        return names
+
+    def for_backend(self, name: str) -> "MagicAPISettings":
+        """生成指定后端的配置；未覆盖的字段沿用当前配置。"""
+        if name == self.default_backend and name not in self.backends:
+            return self
+        if name not in self.backends:
+            raise KeyError(name)
+        config = self.backends[name]
+        base_url = str(config.get("base_url", self.base_url)).rstrip("/")
+        auth_raw = config.get("auth_enabled")
+        return replace(
+            self,
+            base_url=base_url,
+            ws_url=config.get("ws_url") or _derive_ws_url(base_url),
+            username=config.get("username"),
+            password=config.get("password"),
+            token=config.get("token") or "unauthorization",
+            auth_enabled=_str_to_bool(str(auth_raw)) if auth_raw is not None else bool(
+                config.get("username") and config.get("password")
+            ),
+            fanout_timeout_seconds=float(config.get("fanout_timeout", self.fanout_timeout_seconds)),
+            backends={},
+        )
+
     def inject_auth(self, headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
         """根据配置向请求头注入认证信息。"""
         if not self.auth_enabled:
@@ -0,0 +1,216 @@
+"""本地 sidecar 守护进程。
+
+每个 IDE 窗口都会启动一个 stdio 进程。没有 sidecar 时，每个进程都要自己登录 Magic-API、
+建立 ``/magic/web/console`` WebSocket、下载资源树并解析知识库。sidecar 模式下：
+
+- 守护进程在 Unix Socket 上以 streamable-http 提供完整的 MCP 服务，独占 HTTP 连接池、
+  WebSocket 连接、资源树缓存与知识库索引，并按 MCP 会话隔离调试状态；
+- stdio 前端是一个轻量代理，把工具调用、资源读取与订阅转发给守护进程；
+- 前端启动时若守护进程不存在则自动拉起，多个前端并发启动时由文件锁保证只有一个守护进程。
+
+仅支持提供 Unix Socket 与 ``fcntl`` 的平台。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Optional
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.logging_config import get_logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 不支持 sidecar 模式
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import httpx
+    from fastmcp import Client, FastMCP
+    from fastmcp.client.transports import StreamableHttpTransport
+except ImportError:  # pragma: no cover - 依赖缺失时在调用处报错
+    httpx = None  # type: ignore[assignment]
+    Client = FastMCP = StreamableHttpTransport = None  # type: ignore[assignment,misc]
+
+logger = get_logger('sidecar')
+
+# 经由 Unix Socket 访问时 URL 的主机部分不参与路由，仅用于构造合法请求
+SIDECAR_URL = "http://magic-api-sidecar/mcp"
+DAEMON_START_TIMEOUT = 20.0
+
+
+class SidecarError(RuntimeError):
+    """sidecar 守护进程不可用。"""
+
+
+def _ensure_supported() -> None:
+    if fcntl is None or not hasattr(socket, "AF_UNIX"):
+        raise SidecarError("当前平台不支持 sidecar 模式（需要 Unix Socket）")
+    if Client is None:
+        raise SidecarError("未检测到 fastmcp，请先运行 `uv add fastmcp` 安装依赖。")
+
+
+def default_socket_path(settings: MagicAPISettings, composition: str = "full") -> Path:
+    """按 Magic-API 地址与工具组合计算守护进程的 Socket 路径。
+
+    Socket 放在仅当前用户可访问的目录中（优先 ``$XDG_RUNTIME_DIR``），
+    同一后端、同一工具组合的前端共享一个守护进程。
+    """
+    if settings.sidecar_socket:
+        return Path(settings.sidecar_socket).expanduser()
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        base = Path(runtime_dir) / "magic-api-mcp"
+    else:
+        base = Path(tempfile.gettempdir()) / f"magic-api-mcp-{os.getuid()}"
+    base.mkdir(mode=0o700, parents=True, exist_ok=True)
+    digest = hashlib.sha1(
+        f"{settings.base_url}|{settings.ws_url}|{settings.username or ''}|{composition}".encode("utf-8")
+    ).hexdigest()[:12]
+    return base / f"sidecar-{digest}.sock"
+
+
+def is_daemon_alive(socket_path: Path | str) -> bool:
+    """Socket 可连接即认为守护进程存活。"""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(0.5)
+    try:
+        sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+# ----------------------------------------------------------------------
+# 守护进程
+# ----------------------------------------------------------------------
+async def serve_app(app: "FastMCP", socket_path: Path | str) -> None:
+    """在 Unix Socket 上以 streamable-http 提供 MCP 服务。"""
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+    await app.run_http_async(
+        show_banner=False,
+        transport="http",
+        uvicorn_config={"uds": str(socket_path)},
+    )
+
+
+def run_daemon(composition: str, settings: MagicAPISettings, socket_path: Optional[Path] = None) -> None:
+    """启动守护进程；已有守护进程持有锁时直接返回。"""
+    _ensure_supported()
+    from magicapi_mcp.tool_composer import create_app
+
+    socket_path = socket_path or default_socket_path(settings, composition)
+    lock_file = open(f"{socket_path}.lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        logger.info(f"sidecar 守护进程已在运行: {socket_path}")
+        lock_file.close()
+        return
+
+    try:
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        # 多个前端共享一个进程，调试状态按 MCP 会话隔离
+        daemon_settings = replace(settings, transport="sidecar", session_isolation=True)
+        app = create_app(composition, daemon_settings)
+        logger.info(f"sidecar 守护进程监听: {socket_path}")
+        asyncio.run(serve_app(app, socket_path))
+    finally:
+        if socket_path.exists():
+            socket_path.unlink()
+        lock_file.close()
+
+
+def ensure_daemon(composition: str, socket_path: Path, timeout: float = DAEMON_START_TIMEOUT) -> None:
+    """确保守护进程在运行，必要时在后台拉起并等待 Socket 就绪。"""
+    if is_daemon_alive(socket_path):
+        return
+    log_path = socket_path.with_suffix(".log")
+    command = [
+        sys.executable, "-m", "magicapi_mcp.magicapi_assistant",
+        "--sidecar-daemon",
+        "--composition", composition,
+        "--socket", str(socket_path),
+    ]
+    # 源码目录直接运行（未安装包）时也能找到本包
+    package_root = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    with open(log_path, "ab") as log_file:
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=log_file,
+            env=env,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_daemon_alive(socket_path):
+            return
+        time.sleep(0.1)
+    raise SidecarError(f"sidecar 守护进程启动超时，请查看日志: {log_path}")
+
+
+# ----------------------------------------------------------------------
+# 前端
+# ----------------------------------------------------------------------
+def create_client(socket_path: Path | str, timeout: float = 60.0) -> "Client":
+    """创建经由 Unix Socket 连接守护进程的 MCP 客户端。"""
+    _ensure_supported()
+    uds = str(socket_path)
+
+    def _httpx_factory(headers: Optional[dict] = None, timeout: Any = None, auth: Any = None) -> "httpx.AsyncClient":
+        return httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=uds),
+            headers=headers,
+            timeout=timeout,
+            auth=auth,
+            follow_redirects=True,
+        )
+
+    transport = StreamableHttpTransport(SIDECAR_URL, sse_read_timeout=timeout, httpx_client_factory=_httpx_factory)
+    return Client(transport, timeout=timeout)
+
+
+async def run_frontend(composition: str, settings: MagicAPISettings, socket_path: Optional[Path] = None) -> None:
+    """以 stdio 运行轻量前端，把所有请求转发给守护进程。"""
+    _ensure_supported()
+    socket_path = socket_path or default_socket_path(settings, composition)
+    await asyncio.to_thread(ensure_daemon, composition, socket_path)
+
+    # 调试调用可能长时间等待断点，超时需覆盖调试超时
+    client = create_client(socket_path, timeout=settings.debug_timeout_seconds + 30)
+    async with client:
+        # 使用已连接的客户端，所有请求复用同一个守护进程会话，保证断点等会话状态连续
+        proxy = FastMCP.as_proxy(client, name="Magic-API MCP Server")
+        await proxy.run_async(transport="stdio", show_banner=False)
+
+
+__all__ = [
+    "SidecarError",
+    "create_client",
+    "default_socket_path",
+    "ensure_daemon",
+    "is_daemon_alive",
+    "run_daemon",
+    "run_frontend",
+    "serve_app",
+]
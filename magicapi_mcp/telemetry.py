@@ -0,0 +1,110 @@
+"""工具调用指标、追踪中间件与 ``/metrics`` 端点。
+
+- ``ToolMetricsMiddleware`` 包裹每次工具调用：记录耗时、成功/失败、响应大小，
+  并通过 ``tool_scope`` 把期间发出的上游 HTTP 请求归属到该工具；
+- ``ToolTracingMiddleware`` 为每次工具调用开启一条 trace（根 span），
+  请求 ``_meta`` 中带有 W3C ``traceparent`` 时延续调用方的 trace；
+- ``register_metrics_endpoint`` 在 HTTP 传输下挂载 ``GET /metrics``，按 ``Accept`` 头
+  返回 Prometheus 文本格式或 OpenMetrics 格式。stdio 传输下通过 ``get_server_metrics`` 工具读取。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from magicapi_tools.utils.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsRegistry,
+)
+from magicapi_tools.utils.tracing import Tracer
+
+try:
+    from fastmcp.server.middleware import Middleware
+except ImportError:  # pragma: no cover - fastmcp 缺失时不注册
+    Middleware = object  # type: ignore[misc,assignment]
+
+METRICS_PATH = "/metrics"
+
+
+def _response_size(result: Any) -> int:
+    size = 0
+    for block in getattr(result, "content", None) or []:
+        text = getattr(block, "text", None)
+        if text:
+            size += len(text.encode("utf-8"))
+    return size
+
+
+def _is_error_result(result: Any) -> bool:
+    structured = getattr(result, "structured_content", None)
+    return isinstance(structured, dict) and "error" in structured and not structured.get("success")
+
+
+class ToolMetricsMiddleware(Middleware):
+    """记录每次工具调用的耗时、结果、上游请求数与响应大小。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.registry = registry
+
+    async def on_call_tool(self, context, call_next):
+        if not self.registry.enabled:
+            return await call_next(context)
+        with self.registry.tool_scope(context.message.name) as scope:
+            started = time.perf_counter()
+            try:
+                result = await call_next(context)
+            except Exception:
+                self.registry.record_tool_call(scope, time.perf_counter() - started, False, 0)
+                raise
+            self.registry.record_tool_call(
+                scope, time.perf_counter() - started, not _is_error_result(result), _response_size(result)
+            )
+        return result
+
+
+def _incoming_traceparent(context: Any) -> str | None:
+    try:
+        meta = context.fastmcp_context.request_context.meta
+    except Exception:  # noqa: BLE001 - 无请求上下文
+        return None
+    value = getattr(meta, "traceparent", None)
+    if value is None and meta is not None:
+        value = (getattr(meta, "model_extra", None) or {}).get("traceparent")
+    return value if isinstance(value, str) else None
+
+
+class ToolTracingMiddleware(Middleware):
+    """每次工具调用作为一条 trace 的根 span。"""
+
+    def __init__(self, tracer: Tracer) -> None:
+        self.tracer = tracer
+
+    async def on_call_tool(self, context, call_next):
+        if not self.tracer.enabled:
+            return await call_next(context)
+        name = context.message.name
+        with self.tracer.span(f"tool {name}", start_trace=True, traceparent=_incoming_traceparent(context),
+                              tool=name) as span:
+            result = await call_next(context)
+            if _is_error_result(result):
+                error = result.structured_content.get("error")
+                span.record_error(str(error.get("code") if isinstance(error, dict) else error))
+            return result
+
+
+def register_metrics_endpoint(mcp_app: Any, registry: MetricsRegistry) -> None:
+    """挂载 ``GET /metrics``（仅 HTTP 传输生效）。"""
+    from starlette.responses import Response
+
+    @mcp_app.custom_route(METRICS_PATH, methods=["GET"])
+    async def metrics_endpoint(request) -> Response:
+        openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+        return Response(
+            registry.render(openmetrics=openmetrics),
+            media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+        )
+
+
+__all__ = ["METRICS_PATH", "ToolMetricsMiddleware", "ToolTracingMiddleware", "register_metrics_endpoint"]
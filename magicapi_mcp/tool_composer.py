@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional
 
 from magicapi_mcp.settings import DEFAULT_SETTINGS, MagicAPISettings
 from magicapi_mcp.tool_registry import tool_registry
+from magicapi_tools.domain.models.base_model import dumps
 from magicapi_tools.tools import ApiTools
 from magicapi_tools.tools import BackupTools
 from magicapi_tools.tools import ClassMethodTools
@@ -13,7 +14,10 @@ from magicapi_tools.tools import ClassMethodTools
 # from magicapi_tools.tools import DebugTools  # 已合并到 DebugAPITools
 from magicapi_tools.tools import DocumentationTools
 from magicapi_tools.tools import QueryTools
+from magicapi_tools.tools import ResourceFeedTools
+from magicapi_tools.tools import BackendTools
 from magicapi_tools.tools import ResourceManagementTools
+from magicapi_tools.tools import ScriptSyncTools
 from magicapi_tools.tools import SearchTools
 from magicapi_tools.tools import SystemTools
 from magicapi_tools.tools.debug_api import DebugAPITools
@@ -39,6 +43,9 @@ class ToolComposer:
             "full": [  # 完整工具集 - 适用于完整开发环境
                 "documentation",
                 "resource_management",
+                "resource_feed",
+                "backends",
+                "script_sync",
                 "query",
                 "api",
                 "backup",
@@ -60,6 +67,9 @@ class ToolComposer:
             "development": [  # 开发工具集 - 专注于开发调试
                 "documentation",
                 "resource_management",
+                "resource_feed",
+                "backends",
+                "script_sync",
                 "query",
                 "api",
                 "backup",
@@ -72,6 +82,8 @@ class ToolComposer:
             "production": [  # 生产工具集 - 生产环境稳定运行
                 "query",
                 "resource_management",
+                "resource_feed",
+                "backends",
                 "api",
                 "backup",
                 "class_method",
@@ -145,6 +157,9 @@ class ToolComposer:
         self.tool_dependencies = {
             "documentation": [],  # 文档工具独立
             "resource_management": ["system"],  # 资源管理依赖系统工具
+            "resource_feed": ["resource_management"],  # 资源订阅依赖资源管理
+            "backends": ["system"],  # 多后端选择依赖系统工具
+            "script_sync": ["resource_management"],  # 脚本同步依赖资源管理
             "query": ["system"],  # 查询工具依赖系统工具
             "api": ["system"],  # API工具依赖系统工具
             "backup": ["resource_management"],  # 备份工具依赖资源管理
@@ -163,6 +178,9 @@ class ToolComposer:
             "api": 3,  # API工具重要
             "query": 4,  # 查询工具重要
             "resource_management": 5,  # 资源管理中等
+            "resource_feed": 5,  # 资源订阅与资源管理同级
+            "script_sync": 5,  # 脚本同步与资源管理同级
+            "backends": 2,  # 多后端选择影响所有工具的路由
             "debug": 6,  # 调试工具中等
             "debug_api": 6,  # 调试API工具中等
             "code_generation": 7,  # 代码生成工具一般
@@ -174,6 +192,9 @@ class ToolComposer:
         self.modules = {
             "documentation": DocumentationTools(),
             "resource_management": ResourceManagementTools(),
+            "resource_feed": ResourceFeedTools(),
+            "backends": BackendTools(),
+            "script_sync": ScriptSyncTools(),
             "query": QueryTools(),
             "api": ApiTools(),
             "backup": BackupTools(),
@@ -224,7 +245,8 @@ class ToolComposer:
                 tool_registry.add_module(custom_module)
 
         # 创建MCP应用
-        mcp_app = FastMCP("Magic-API MCP Server")
+        # 工具结果的文本内容使用 orjson（已安装时）编码
+        mcp_app = FastMCP("Magic-API MCP Server", tool_serializer=dumps)
 
         # 注册所有工具
         tool_registry.register_all_tools(mcp_app)
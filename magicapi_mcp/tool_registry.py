@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Optional, Protocol
+from typing import Any, Dict, List, Optional, Protocol
 
+from magicapi_mcp.backends import BackendHandle, BackendRegistry, BackendRoutingMiddleware, current_backend
+from magicapi_mcp.session_context import SessionContextMiddleware, SessionContextPool, current_session
 from magicapi_mcp.settings import MagicAPISettings
+from magicapi_mcp.telemetry import ToolMetricsMiddleware, ToolTracingMiddleware, register_metrics_endpoint
 from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.dependency_graph import DependencyGraph
 from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.metrics import MetricsRegistry, metrics
+from magicapi_tools.utils.tracing import Tracer, tracer
 from magicapi_tools.utils.resource_manager import MagicAPIResourceManager, MagicAPIResourceTools
+from magicapi_tools.utils.response_cache import ResponseCache
+from magicapi_tools.utils.script_sync import ScriptSyncEngine
+from magicapi_tools.utils.tree_cache import ResourceTreeCache
 from magicapi_tools.services import (
     ApiService,
     ResourceService,
@@ -18,23 +27,67 @@ from magicapi_tools.services import (
 )
 from magicapi_tools.ws.debug_service import WebSocketDebugService
 from magicapi_tools.ws.manager import WSManager
+from magicapi_tools.ws.observers import AuthRefreshObserver, ResourceChangeObserver
 
 
 class ToolContext:
-    """工具上下文，包含所有必要的客户端和服务。"""
+    """工具上下文，包含所有必要的客户端和服务。
+
+    HTTP 客户端、资源管理器、资源树缓存为进程级共享，配置多个后端时按当前绑定的后端解析；
+    启用会话隔离时，``ws_manager`` / ``ws_debug_service`` / ``debug_sessions`` 按当前 MCP 会话返回独立实例。
+    """
 
     def __init__(self, settings: MagicAPISettings):
-        self.settings = settings
-        self.http_client = MagicAPIHTTPClient(settings)
-        self.resource_manager = MagicAPIResourceManager(
-            settings.base_url,
-            settings.username if settings.auth_enabled else None,
-            settings.password if settings.auth_enabled else None,
-            http_client=self.http_client,
+        self._settings = settings
+        # 进程级运行时指标
+        self.metrics: MetricsRegistry = metrics
+        self.metrics.enabled = settings.metrics_enabled
+        # 进程级调用链追踪
+        self.tracer: Tracer = tracer
+        self.tracer.configure(
+            enabled=settings.tracing_enabled,
+            buffer_size=settings.trace_buffer_size,
+            export_file=settings.trace_export_file,
+            otlp_endpoint=settings.otlp_endpoint,
+        )
+        primary_settings = settings.for_backend(settings.default_backend)
+        http_client = MagicAPIHTTPClient(primary_settings)
+        resource_manager = MagicAPIResourceManager(
+            primary_settings.base_url,
+            primary_settings.username if primary_settings.auth_enabled else None,
+            primary_settings.password if primary_settings.auth_enabled else None,
+            http_client=http_client,
         )
-        self.resource_tools = MagicAPIResourceTools(self.resource_manager)
-        self.ws_manager = WSManager(settings, self.resource_manager)
-        self.ws_debug_service = WebSocketDebugService(self.ws_manager, self.http_client)
+        # 共享资源树缓存，WS 文件切换事件触发变更检测
+        tree_cache = ResourceTreeCache(http_client, settings.tree_cache_ttl_seconds)
+        # 后端注册表：默认后端复用上面的客户端，其余后端首次使用时创建独立连接池与缓存
+        self.backends = BackendRegistry(
+            settings,
+            BackendHandle(settings.default_backend, primary_settings, http_client, resource_manager, tree_cache),
+        )
+
+        # WebSocket 调试连接默认后端
+        self._ws_manager = WSManager(primary_settings, resource_manager)
+        self._ws_debug_service = WebSocketDebugService(self._ws_manager, http_client)
+        self._debug_sessions: Dict[str, Dict[str, Any]] = {}
+        # 运行中的脚本本地同步，按目录绝对路径索引
+        self.script_syncs: Dict[str, ScriptSyncEngine] = {}
+        self._ws_manager.add_observer(ResourceChangeObserver(tree_cache))
+
+        # HTTP 与 WebSocket 共享令牌：WS 下发 REFRESH_TOKEN 时刷新，令牌变化时同步给 WS 客户端
+        if http_client.auth.enabled:
+            self._ws_manager.update_token(http_client.auth.token)
+        http_client.auth.add_listener(self._ws_manager.update_token)
+        self._ws_manager.add_observer(AuthRefreshObserver(http_client.auth))
+
+        # 多会话（HTTP 传输）时按 MCP 会话隔离调试状态
+        self.sessions: Optional[SessionContextPool] = None
+        if settings.session_isolation_enabled:
+            self.sessions = SessionContextPool(
+                self,
+                idle_ttl=settings.session_idle_ttl_seconds,
+                max_sessions=settings.max_sessions,
+            )
 
         # 初始化业务服务层
         self.api_service = ApiService(self)
@@ -44,15 +97,82 @@ class ToolContext:
         self.debug_service = DebugService(self)
         self.class_method_service = ClassMethodService(self)
 
-        # 兼容旧属性命名
-        self.debug_tools = self.ws_debug_service
-
         # 启动 WebSocket 监听（如配置允许），确保工具可立即使用
         try:
-            self.ws_manager.ensure_running_sync()
+            self._ws_manager.ensure_running_sync()
         except Exception as exc:  # pragma: no cover - 启动失败仅记录
             get_logger('tool_registry').warning(f"WSManager 自动启动失败: {exc}")
 
+    # ------------------------------------------------------------------
+    # 后端相关属性：多后端时按当前绑定的后端解析
+    # ------------------------------------------------------------------
+    def _backend(self) -> BackendHandle:
+        return current_backend() or self.backends.primary
+
+    @property
+    def settings(self) -> MagicAPISettings:
+        return self._backend().settings
+
+    @property
+    def http_client(self) -> MagicAPIHTTPClient:
+        return self._backend().http_client
+
+    @property
+    def resource_manager(self) -> MagicAPIResourceManager:
+        return self._backend().resource_manager
+
+    @property
+    def resource_tools(self) -> MagicAPIResourceTools:
+        return self._backend().resource_tools
+
+    @property
+    def tree_cache(self) -> ResourceTreeCache:
+        return self._backend().tree_cache
+
+    @property
+    def dependency_graph(self) -> DependencyGraph:
+        return self._backend().dependency_graph
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        return self._backend().response_cache
+
+    # ------------------------------------------------------------------
+    # 会话相关属性
+    # ------------------------------------------------------------------
+    @property
+    def ws_manager(self) -> WSManager:
+        """当前会话的 WebSocket 管理器（未启用会话隔离时为进程级实例）。"""
+        session = current_session()
+        return session.ws_manager if session is not None else self._ws_manager
+
+    @property
+    def ws_debug_service(self) -> WebSocketDebugService:
+        """当前会话的断点调试服务。"""
+        session = current_session()
+        return session.ws_debug_service if session is not None else self._ws_debug_service
+
+    @property
+    def debug_tools(self) -> WebSocketDebugService:
+        """兼容旧属性命名。"""
+        return self.ws_debug_service
+
+    @property
+    def debug_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """当前会话的调试会话表。"""
+        session = current_session()
+        return session.debug_sessions if session is not None else self._debug_sessions
+
+    def close(self) -> None:
+        """关闭所有会话级连接、脚本同步与进程级 WebSocket 管理器。"""
+        for engine in list(self.script_syncs.values()):
+            engine.stop()
+        self.script_syncs.clear()
+        if self.sessions is not None:
+            self.sessions.close_all()
+        self._ws_manager.stop_sync()
+        self.tracer.shutdown()
+
 
 class ToolModule(Protocol):
     """工具模块协议。"""
@@ -87,6 +207,20 @@ class ToolRegistry:
         if not self.context:
             raise RuntimeError("工具上下文未初始化，请先调用 initialize_context()")
 
+        # 指标中间件最先注册，位于最外层，耗时包含其余中间件
+        if self.context.metrics.enabled:
+            mcp_app.add_middleware(ToolMetricsMiddleware(self.context.metrics))
+            register_metrics_endpoint(mcp_app, self.context.metrics)
+        if self.context.tracer.enabled:
+            mcp_app.add_middleware(ToolTracingMiddleware(self.context.tracer))
+
+        # 会话与后端绑定须在模块中间件之前注册（位于其外层），
+        # 变更后的资源刷新、响应缓存失效等才能作用于当前会话绑定的后端
+        if self.context.sessions is not None:
+            mcp_app.add_middleware(SessionContextMiddleware(self.context.sessions))
+        if self.context.backends.is_multi:
+            mcp_app.add_middleware(BackendRoutingMiddleware(self.context.backends))
+
         for module in self.modules:
             module.register_tools(mcp_app, self.context)
 
@@ -31,7 +31,7 @@ from .dtos.debug_dtos import (
     DebugExecutionRequest,
     DebugStatusResponse,
 )
-from .models.base_model import BaseModel
+from .models.base_model import BaseModel, dto, dumps
 
 __all__ = [
     # API DTOs
@@ -63,4 +63,6 @@ __all__ = [
 
     # Base models
     "BaseModel",
+    "dto",
+    "dumps",
 ]
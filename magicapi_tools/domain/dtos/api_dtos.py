@@ -5,14 +5,15 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
-from ..models.base_model import BaseModel
+from ..models.base_model import dto
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class WebSocketLogConfig:
     """WebSocket日志配置。"""
 
@@ -41,7 +42,8 @@ class WebSocketLogConfig:
         )
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ApiCallRequest:
     """API调用请求对象。"""
 
@@ -52,9 +54,11 @@ class ApiCallRequest:
     data: Optional[Any] = None
     headers: Optional[Dict[str, str]] = None
     ws_log_config: Optional[WebSocketLogConfig] = None
+    # GET 响应缓存有效期（秒），None 使用配置的默认值，0 表示不缓存
+    cache_ttl: Optional[float] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     def __post_init__(self):
         """初始化后的处理。"""
@@ -63,19 +67,6 @@ class ApiCallRequest:
         elif isinstance(self.ws_log_config, dict):
             self.ws_log_config = WebSocketLogConfig.from_dict(self.ws_log_config)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif hasattr(value, 'to_dict'):
-                    result[key] = value.to_dict()
-                else:
-                    result[key] = value
-        return result
-
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ApiCallRequest':
         """从字典创建请求对象。"""
@@ -94,7 +85,8 @@ class ApiCallRequest:
             params=data.get("params"),
             data=data.get("data"),
             headers=data.get("headers"),
-            ws_log_config=ws_config
+            ws_log_config=ws_config,
+            cache_ttl=data.get("cache_ttl"),
         )
 
     def validate(self) -> bool:
@@ -130,7 +122,8 @@ class ApiCallRequest:
         return errors
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ApiEndpointInfo:
     """API端点信息。"""
 
@@ -156,7 +149,8 @@ class ApiEndpointInfo:
         return f"{self.method} {self.path}" if self.method and self.path else self.path or ""
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ApiCallResponse:
     """API调用响应对象。"""
 
@@ -165,29 +159,20 @@ class ApiCallResponse:
     error: Optional[Dict[str, Any]] = None
     duration: Optional[float] = None
     ws_logs: Optional[List[Dict[str, Any]]] = None
+    # 捕获窗口内 WebSocket 断线或缓冲区溢出时的提示（日志可能不完整）
+    ws_logs_incomplete: Optional[Dict[str, Any]] = None
+    # 响应缓存信息：是否命中、缓存键（供 replay_api_call 使用）与条目年龄
+    cache: Optional[Dict[str, Any]] = None
     endpoint_info: Optional[ApiEndpointInfo] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     def __post_init__(self):
         """初始化后的处理。"""
         if self.endpoint_info and isinstance(self.endpoint_info, dict):
             self.endpoint_info = ApiEndpointInfo(**self.endpoint_info)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif hasattr(value, 'to_dict'):
-                    result[key] = value.to_dict()
-                else:
-                    result[key] = value
-        return result
-
     @property
     def has_error(self) -> bool:
         """检查是否有错误。"""
@@ -9,10 +9,11 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from ..models.base_model import BaseModel
+from ..models.base_model import dto
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class BackupOperationRequest:
     """备份操作请求对象。"""
 
@@ -66,7 +67,8 @@ class BackupOperationRequest:
         return errors
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class BackupHistoryRequest:
     """备份历史查询请求对象。"""
 
@@ -84,7 +86,8 @@ class BackupHistoryRequest:
         return []
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class BackupInfo:
     """备份信息对象。"""
 
@@ -119,7 +122,8 @@ class BackupInfo:
         )
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class BackupOperationResponse:
     """备份操作响应对象。"""
 
@@ -148,16 +152,3 @@ class BackupOperationResponse:
     def backup_count(self) -> int:
         """获取备份数量。"""
         return len(self.backups)
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif key == "backups":
-                    result[key] = [backup.to_dict() if hasattr(backup, 'to_dict') else backup for backup in value]
-                else:
-                    result[key] = value
-        return result
@@ -9,10 +9,11 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from ..models.base_model import BaseModel
+from ..models.base_model import dto
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ClassSearchRequest:
     """类搜索请求对象。"""
 
@@ -29,8 +30,8 @@ class ClassSearchRequest:
     page_size: int = 10
     limit: Optional[int] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     def validate(self) -> bool:
         """验证搜索请求。"""
@@ -96,19 +97,9 @@ class ClassSearchRequest:
 
         return errors
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                else:
-                    result[key] = value
-        return result
-
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class MethodInfo:
     """方法信息对象。"""
 
@@ -125,7 +116,8 @@ class MethodInfo:
         }
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class FieldInfo:
     """字段信息对象。"""
 
@@ -140,7 +132,8 @@ class FieldInfo:
         }
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ClassInfo:
     """类信息对象。"""
 
@@ -157,7 +150,8 @@ class ClassInfo:
         }
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ClassSearchResponse:
     """类搜索响应对象。"""
 
@@ -186,24 +180,8 @@ class ClassSearchResponse:
     # 摘要信息
     summary: Optional[Dict[str, Any]] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif isinstance(value, list):
-                    if key == "class_details":
-                        result[key] = [item.to_dict() for item in value]
-                    else:
-                        result[key] = value
-                else:
-                    result[key] = value
-        return result
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     @property
     def has_error(self) -> bool:
@@ -211,14 +189,15 @@ class ClassSearchResponse:
         return not self.success
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ClassDetailRequest:
     """类详情请求对象。"""
 
     class_name: str
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     def validate(self) -> bool:
         """验证详情请求。"""
@@ -230,19 +209,9 @@ class ClassDetailRequest:
             return ["类名不能为空"]
         return []
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                else:
-                    result[key] = value
-        return result
-
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ClassDetailResponse:
     """类详情响应对象。"""
 
@@ -251,24 +220,8 @@ class ClassDetailResponse:
     class_details: List[ClassInfo] = field(default_factory=list)
     summary: Optional[Dict[str, Any]] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif isinstance(value, list):
-                    if key == "class_details":
-                        result[key] = [item.to_dict() for item in value]
-                    else:
-                        result[key] = value
-                else:
-                    result[key] = value
-        return result
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     @property
     def has_error(self) -> bool:
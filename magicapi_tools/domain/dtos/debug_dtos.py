@@ -7,12 +7,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
-from datetime import datetime
 
-from ..models.base_model import BaseModel
+from ..models.base_model import dto
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class DebugSessionRequest:
     """调试会话请求对象。"""
 
@@ -30,7 +30,8 @@ class DebugSessionRequest:
         return []
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class DebugExecutionRequest:
     """调试执行请求对象。"""
 
@@ -64,7 +65,8 @@ class DebugExecutionRequest:
         return errors
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class BreakpointInfo:
     """断点信息对象。"""
 
@@ -78,7 +80,8 @@ class BreakpointInfo:
         return self.line_number > 0 and bool(self.script_id)
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class DebugStatusInfo:
     """调试状态信息对象。"""
 
@@ -111,7 +114,8 @@ class DebugStatusInfo:
         return len(self.breakpoints) > 0
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class DebugStatusResponse:
     """调试状态响应对象。"""
 
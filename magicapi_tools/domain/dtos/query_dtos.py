@@ -7,12 +7,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
-from datetime import datetime
 
-from ..models.base_model import BaseModel
+from ..models.base_model import dto
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class EndpointFilter:
     """端点过滤条件。"""
 
@@ -22,17 +22,6 @@ class EndpointFilter:
     query_filter: Optional[str] = None
     group_id: Optional[str] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式，只包含非空值。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None and not key.startswith('_') and key not in ['created_at', 'updated_at']:
-                result[key] = value
-        return result
-
     def is_empty(self) -> bool:
         """检查是否没有设置任何过滤条件。"""
         return not any([
@@ -59,7 +48,8 @@ class EndpointFilter:
         return result
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class QueryRequest:
     """查询请求对象。"""
 
@@ -106,7 +96,8 @@ class QueryRequest:
         return errors
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ApiEndpointSummary:
     """API端点摘要信息。"""
 
@@ -123,7 +114,8 @@ class ApiEndpointSummary:
         return f"{self.method} {self.path}" if self.method and self.path else self.path or ""
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class QueryResponse:
     """查询响应对象。"""
 
@@ -158,16 +150,3 @@ class QueryResponse:
     def has_error(self) -> bool:
         """检查是否有错误。"""
         return not self.success
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif hasattr(value, 'to_dict'):
-                    result[key] = value.to_dict()
-                else:
-                    result[key] = value
-        return result
@@ -5,15 +5,18 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from datetime import datetime
 
+from ..models.base_model import dto
+
 if TYPE_CHECKING:
     from .api_dtos import ApiEndpointInfo
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ResourceOperationRequest:
     """资源操作请求对象。"""
 
@@ -58,7 +61,8 @@ class ResourceOperationRequest:
         return errors
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ApiCreationRequest:
     """API创建/更新请求对象。"""
 
@@ -78,8 +82,8 @@ class ApiCreationRequest:
     response_body_definition: Optional[str] = None  # JSON字符串
     options: Optional[str] = None  # JSON字符串
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     def validate(self) -> bool:
         """验证API创建请求。"""
@@ -116,17 +120,6 @@ class ApiCreationRequest:
 
         return errors
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                else:
-                    result[key] = value
-        return result
-
     def to_api_endpoint_info(self) -> 'ApiEndpointInfo':
         """转换为API端点信息对象。"""
         # 动态导入以避免循环依赖
@@ -147,7 +140,8 @@ class ApiCreationRequest:
         )
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class GroupCreationRequest:
     """分组创建/更新请求对象。"""
 
@@ -185,7 +179,8 @@ class GroupCreationRequest:
         return errors
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class LockStatusRequest:
     """锁定状态操作请求对象。"""
 
@@ -215,7 +210,8 @@ class LockStatusRequest:
         return errors
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class LockStatusResponse:
     """锁定状态操作响应对象。"""
 
@@ -226,22 +222,12 @@ class LockStatusResponse:
     message: str = ""
     details: Optional[Dict[str, Any]] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                else:
-                    result[key] = value
-        return result
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dto
+@dataclass(slots=True)
 class ResourceOperationResponse:
     """资源操作响应对象。"""
 
@@ -254,19 +240,8 @@ class ResourceOperationResponse:
     affected_count: int = 0
     details: Optional[Dict[str, Any]] = None
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                else:
-                    result[key] = value
-        return result
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     @property
     def has_error(self) -> bool:
@@ -1,51 +1,169 @@
-"""基础模型类。
+"""基础模型类与 DTO 序列化。
 
-提供所有领域模型的通用功能和基础结构。
+提供所有领域模型的通用功能和基础结构：
+
+- ``dto``：类装饰器，配合 ``@dataclass(slots=True)`` 使用。首次序列化时按字段类型为该类生成
+  一个专用的 ``to_dict``（逐字段展开，无 ``__dict__`` 遍历与逐值类型探测），之后直接调用；
+- ``created_at`` / ``updated_at`` 默认为空，首次序列化时才取一次当前时间补齐，
+  未被序列化的请求对象与嵌套对象不再各自调用两次 ``datetime.now()``；
+- ``dumps``：把工具结果编码为 JSON 文本，安装 ``orjson`` 时使用它，否则使用 ``pydantic_core``。
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+import typing
+from dataclasses import dataclass, fields
 from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pydantic_core
+
+try:  # pragma: no cover - 可选加速
+    import orjson
+except ImportError:  # pragma: no cover - 未安装时使用 pydantic_core
+    orjson = None
+
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+# 字段序列化方式
+_PLAIN, _DATETIME, _NESTED, _NESTED_LIST, _ANY = range(5)
+
+
+def _json_default(value: Any) -> Any:
+    """orjson 无法直接编码的值（pydantic 模型、集合等）交给 pydantic_core 转换。"""
+    return pydantic_core.to_jsonable_python(value, fallback=str)
+
+
+def dumps(data: Any) -> str:
+    """编码为紧凑 JSON 文本（UTF-8 原样输出），可作为 FastMCP 的 ``tool_serializer``。"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return pydantic_core.to_json(data, fallback=str).decode()
+
+
+def _stamp(obj: Any) -> None:
+    now = datetime.now()
+    if obj.created_at is None:
+        obj.created_at = now
+    if obj.updated_at is None:
+        obj.updated_at = now
+
+
+def _plain(value: Any) -> Any:
+    """类型不确定的字段：与旧实现一致，带 ``to_dict`` 的对象展开，时间转 ISO 字符串。"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return value
+
 
+def _unwrap_optional(annotation: Any) -> Any:
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
 
-@dataclass
+
+def _field_kind(annotation: Any) -> Tuple[int, Optional[type]]:
+    annotation = _unwrap_optional(annotation)
+    if annotation is datetime:
+        return _DATETIME, None
+    if getattr(annotation, "__dto__", False):
+        return _NESTED, annotation
+    if typing.get_origin(annotation) is list:
+        args = typing.get_args(annotation)
+        if args and getattr(args[0], "__dto__", False):
+            return _NESTED_LIST, args[0]
+        return _PLAIN, None
+    if annotation is Any or isinstance(annotation, str):
+        # Any 或无法解析的前向引用
+        return _ANY, None
+    return _PLAIN, None
+
+
+def _build_to_dict(cls: type) -> Callable[[Any], Dict[str, Any]]:
+    """为 ``cls`` 生成专用的 ``to_dict``：跳过 None 值，嵌套 DTO 递归展开。"""
+    try:
+        hints = typing.get_type_hints(cls)
+    except (NameError, TypeError):
+        hints = {}
+    namespace: Dict[str, Any] = {"_stamp": _stamp, "_plain": _plain}
+    names = [item.name for item in fields(cls)]
+    lines = ["def to_dict(self):"]
+    if all(name in names for name in TIMESTAMP_FIELDS):
+        lines.append("    if self.created_at is None or self.updated_at is None: _stamp(self)")
+    lines.append("    result = {}")
+    for index, name in enumerate(names):
+        kind, nested = _field_kind(hints.get(name, Any))
+        if kind == _DATETIME:
+            expr = "value.isoformat()"
+        elif kind == _NESTED:
+            expr = "value.to_dict()"
+        elif kind == _NESTED_LIST:
+            namespace[f"_cls{index}"] = nested
+            expr = f"[item.to_dict() if item.__class__ is _cls{index} else item for item in value]"
+        elif kind == _ANY:
+            expr = "_plain(value)"
+        else:
+            expr = "value"
+        lines.append(f"    value = self.{name}")
+        lines.append("    if value is not None:")
+        lines.append(f"        result[{name!r}] = {expr}")
+    lines.append("    return result")
+    exec("\n".join(lines), namespace)  # noqa: S102 - 代码由字段名生成
+    function = namespace["to_dict"]
+    function.__qualname__ = f"{cls.__qualname__}.to_dict"
+    function.__doc__ = "转换为字典格式（按字段生成的序列化函数）。"
+    return function
+
+
+def _compile_to_dict(self: Any) -> Dict[str, Any]:
+    """首次调用时为实际类型生成序列化函数并替换自身。"""
+    cls = type(self)
+    function = _build_to_dict(cls)
+    cls.to_dict = function
+    return function(self)
+
+
+def _to_json(self: Any) -> str:
+    """序列化为 JSON 文本。"""
+    return dumps(self.to_dict())
+
+
+def dto(cls: type) -> type:
+    """DTO 类装饰器：放在 ``@dataclass(slots=True)`` 之上。
+
+    类中未显式定义 ``to_dict`` 时，首次调用时生成专用实现；同时补充 ``to_json``。
+    """
+    cls.__dto__ = True
+    if "to_dict" not in cls.__dict__:
+        cls.to_dict = _compile_to_dict
+    if "to_json" not in cls.__dict__:
+        cls.to_json = _to_json
+    return cls
+
+
+@dto
+@dataclass(slots=True)
 class BaseModel:
     """基础模型类，提供通用功能。"""
 
-    created_at: Optional[datetime] = field(default_factory=datetime.now)
-    updated_at: Optional[datetime] = field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     def __post_init__(self):
         """初始化后的处理。"""
         # 子类可以重写此方法进行额外初始化
         pass
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式。"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if value is not None:
-                if isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                elif isinstance(value, BaseModel):
-                    result[key] = value.to_dict()
-                elif isinstance(value, list):
-                    result[key] = [item.to_dict() if isinstance(item, BaseModel) else item for item in value]
-                else:
-                    result[key] = value
-        return result
-
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BaseModel':
         """从字典创建模型实例。"""
         # 基本实现，子类可以重写以提供更复杂的转换逻辑
-        kwargs = {}
-        for key, value in data.items():
-            if hasattr(cls, key):
-                kwargs[key] = value
-        return cls(**kwargs)
+        names = {item.name for item in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
 
     def validate(self) -> bool:
         """验证模型数据的有效性。
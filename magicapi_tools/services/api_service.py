@@ -5,7 +5,8 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
 
 from magicapi_tools.logging_config import get_logger
 from magicapi_tools.utils import (
@@ -13,6 +14,16 @@ from magicapi_tools.utils import (
     log_api_call_details,
     create_operation_error,
 )
+from magicapi_tools.utils.load_test import (
+    DEFAULT_REGRESSION_TOLERANCE,
+    LoadTestConfig,
+    compare_with_baseline,
+    load_baseline,
+    run_load_test,
+    save_baseline,
+)
+from magicapi_tools.utils.response_cache import CachedResponse, diff_values, request_key
+from magicapi_tools.utils.tracing import tracer
 from magicapi_tools.ws import normalize_breakpoints, resolve_script_id_by_path
 from magicapi_tools.domain.dtos.api_dtos import ApiCallRequest, ApiCallResponse
 
@@ -119,6 +130,15 @@ class ApiService(BaseService):
             actual_path = request.path
             log_api_call_details("调用API接口", None, None, actual_path, actual_method)
 
+        # 响应缓存：命中时跳过上游调用与 WebSocket 日志等待
+        cache_ttl = self._cache_ttl(request, actual_method)
+        cache_key = None
+        if cache_ttl > 0:
+            cache_key = request_key(actual_method, actual_path, request.params, request.headers)
+            cached = self.context.response_cache.get(cache_key)
+            if cached is not None:
+                return self._cached_response(cached)
+
         # 准备WebSocket环境
         self.context.ws_manager.ensure_running_sync()
 
@@ -149,10 +169,12 @@ class ApiService(BaseService):
 
         # 等待WebSocket日志
         if post_wait > 0:
-            time.sleep(post_wait)
+            with tracer.span("ws.log_wait", seconds=post_wait):
+                time.sleep(post_wait)
 
         # 获取WebSocket日志
         ws_logs = []
+        ws_logs_incomplete = None
         if ws_config.enabled:
             logs = self.context.ws_manager.capture_logs_between(
                 start_ts, execution_end, pre=pre_wait, post=post_wait
@@ -162,6 +184,9 @@ class ApiService(BaseService):
                 "type": msg.type.value,
                 "payload": msg.payload,
             } for msg in logs]
+            ws_logs_incomplete = self.context.ws_manager.log_gap_notice(
+                start_ts, execution_end, pre=pre_wait, post=post_wait
+            )
 
         duration = execution_end - start_ts
 
@@ -202,7 +227,8 @@ class ApiService(BaseService):
                 success=False,
                 error=error_info,
                 duration=duration,
-                ws_logs=ws_logs if ws_config.enabled else None
+                ws_logs=ws_logs if ws_config.enabled else None,
+                ws_logs_incomplete=ws_logs_incomplete,
             )
 
         # HTTP调用成功，但需要检查API业务逻辑响应码
@@ -216,7 +242,8 @@ class ApiService(BaseService):
                 success=False,
                 error=api_error["error"],
                 duration=duration,
-                ws_logs=ws_logs if ws_config.enabled else None
+                ws_logs=ws_logs if ws_config.enabled else None,
+                ws_logs_incomplete=ws_logs_incomplete,
             )
 
         # 真正成功的情况
@@ -226,13 +253,181 @@ class ApiService(BaseService):
         else:
             data = api_response_body
 
-        return ApiCallResponse(
+        response = ApiCallResponse(
             success=True,
             data=data,
             duration=duration,
-            ws_logs=ws_logs if ws_config.enabled else None
+            ws_logs=ws_logs if ws_config.enabled else None,
+            ws_logs_incomplete=ws_logs_incomplete,
+        )
+        if cache_key is not None:
+            self.context.response_cache.put(
+                cache_key, actual_method, actual_path, request.params, request.headers, script_id,
+                {"data": data, "duration": duration, "ws_logs": response.ws_logs}, cache_ttl,
+            )
+            response.cache = {"hit": False, "key": cache_key, "ttl": cache_ttl}
+        return response
+
+    def _cache_ttl(self, request: ApiCallRequest, method: str) -> float:
+        """本次调用的缓存有效期：只缓存未设置断点的 GET 请求。"""
+        ttl = request.cache_ttl if request.cache_ttl is not None else self.settings.response_cache_ttl_seconds
+        if not ttl or ttl <= 0 or method.upper() != "GET":
+            return 0.0
+        if isinstance(request.headers, dict) and request.headers.get("Magic-Request-Breakpoints"):
+            return 0.0
+        return float(ttl)
+
+    @staticmethod
+    def _cached_response(entry: CachedResponse) -> ApiCallResponse:
+        return ApiCallResponse(
+            success=True,
+            data=entry.response.get("data"),
+            duration=entry.response.get("duration"),
+            ws_logs=entry.response.get("ws_logs"),
+            cache={
+                "hit": True,
+                "key": entry.key,
+                "age": round(time.time() - entry.recorded_at, 3),
+                "hits": entry.hits,
+            },
         )
 
+    def replay_api_call(
+        self,
+        key: Optional[str] = None,
+        method: str = "GET",
+        path: Optional[str] = None,
+        api_id: Optional[str] = None,
+        params: Optional[Any] = None,
+        headers: Optional[Any] = None,
+        update_baseline: bool = True,
+        diff_limit: int = 50,
+    ) -> Dict[str, Any]:
+        """重新执行一次录制的请求，并与录制时的响应逐字段比较。
+
+        Args:
+            key: ``call_magic_api`` 返回的缓存键；未提供时按 method/path（或 api_id）/params/headers 计算
+            method: HTTP方法
+            path: API路径
+            api_id: 接口ID
+            params: 查询参数
+            headers: 请求头
+            update_baseline: 重放成功后是否以新响应作为下次比较的基准
+            diff_limit: 最多返回的差异条数
+
+        Returns:
+            比较结果；既没有 key 也没有 path/api_id 时列出全部录制
+        """
+        cache = self.context.response_cache
+        if not key and not path and not api_id:
+            return {"success": True, "recordings": cache.entries()}
+        if not key:
+            if api_id:
+                api_info = self._resolve_api_by_id(api_id)
+                if "error" in api_info:
+                    return api_info
+                method, path = api_info["method"], api_info["path"]
+            key = request_key(method, path, params, headers)
+
+        entry = cache.entry(key)
+        if entry is None:
+            return create_operation_error(
+                "重放API请求", "recording_not_found",
+                f"没有找到录制的请求: {key}，请先以 cache_ttl 调用 call_magic_api",
+            )
+
+        response = self.call_api_with_details(ApiCallRequest(
+            method=entry.method,
+            path=entry.path,
+            params=entry.params,
+            headers=entry.headers or None,
+            ws_log_config={"enabled": False},
+            cache_ttl=0,
+        ))
+        baseline = entry.response.get("data")
+        current = response.data if response.success else response.error
+        differences, truncated = diff_values(baseline, current, limit=diff_limit)
+
+        if update_baseline and response.success:
+            updated = cache.put(
+                key, entry.method, entry.path, entry.params, entry.headers, entry.script_id,
+                {"data": response.data, "duration": response.duration, "ws_logs": None},
+                entry.expires_at - entry.recorded_at,
+            )
+            updated.replays += 1
+
+        return {
+            "success": True,
+            "key": key,
+            "method": entry.method,
+            "path": entry.path,
+            "identical": response.success and not differences,
+            "differences": differences,
+            "differences_truncated": truncated,
+            "baseline": {
+                "recorded_at": entry.recorded_at,
+                "age": round(time.time() - entry.recorded_at, 3),
+                "stale": not entry.fresh(time.time()),
+                "duration": entry.response.get("duration"),
+            },
+            "current": {
+                "success": response.success,
+                "duration": response.duration,
+                "data": response.data,
+                "error": response.error,
+            },
+        }
+
+    def load_test(
+        self,
+        config: LoadTestConfig,
+        api_id: Optional[str] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        baseline_path: Optional[str] = None,
+        save_baseline_path: Optional[str] = None,
+        tolerance: float = DEFAULT_REGRESSION_TOLERANCE,
+    ) -> Dict[str, Any]:
+        """对接口执行压测，可选地与基线比较或保存为新基线。
+
+        Args:
+            config: 压测配置（提供 ``api_id`` 时 method/path 以接口详情为准）
+            api_id: 接口ID
+            progress: 进度回调
+            baseline_path: 对比的基线文件
+            save_baseline_path: 保存本次报告为基线的文件
+            tolerance: 判定回退的相对变化阈值
+
+        Returns:
+            压测报告字典
+        """
+        if api_id:
+            api_info = self._resolve_api_by_id(api_id)
+            if "error" in api_info:
+                return api_info
+            config.method, config.path = api_info["method"], api_info["path"]
+        errors = config.validate()
+        if errors:
+            return create_operation_error("接口压测", "validation_error", "; ".join(errors))
+
+        baseline = None
+        if baseline_path:
+            try:
+                baseline = load_baseline(baseline_path)
+            except (OSError, ValueError) as exc:
+                return create_operation_error("接口压测", "baseline_error", f"读取基线失败: {exc}")
+
+        try:
+            report = run_load_test(self.http_client, config, progress)
+        except Exception as e:
+            logger.error(f"接口压测失败: {e}")
+            return create_operation_error("接口压测", "load_test_error", f"接口压测失败: {e}")
+        result: Dict[str, Any] = {"success": True, **report}
+        if baseline is not None:
+            result["comparison"] = compare_with_baseline(report, baseline, tolerance)
+        if save_baseline_path:
+            result["baseline_saved"] = save_baseline(save_baseline_path, report)
+        return result
+
     def _resolve_api_by_id(self, api_id: str) -> Dict[str, Any]:
         """通过ID解析API信息。"""
         ok, payload = self.http_client.api_detail(api_id)
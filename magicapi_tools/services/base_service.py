@@ -14,6 +14,7 @@ from magicapi_tools.utils import (
     log_operation_start,
     log_operation_end,
 )
+from magicapi_tools.utils.tracing import tracer
 
 if TYPE_CHECKING:
     from magicapi_mcp.tool_registry import ToolContext
@@ -31,8 +32,15 @@ class BaseService:
             context: 工具上下文，包含HTTP客户端等依赖
         """
         self.context = context
-        self.http_client = context.http_client
-        self.settings = context.settings
+
+    @property
+    def http_client(self):
+        """当前后端的 HTTP 客户端（多后端时按调用绑定的后端解析）。"""
+        return self.context.http_client
+
+    @property
+    def settings(self):
+        return self.context.settings
 
     def execute_operation(self, operation_name: str, operation_func, *args, **kwargs) -> Dict[str, Any]:
         """执行操作的统一模板方法。
@@ -48,12 +56,14 @@ class BaseService:
         """
         log_operation_start(operation_name, kwargs)
 
-        try:
-            result = operation_func(*args, **kwargs)
-            log_operation_end(operation_name, "success" in result if isinstance(result, dict) else True)
-            return result
-        except Exception as e:
-            return handle_tool_exception(operation_name, e)
+        with tracer.span(f"service.{operation_name}") as span:
+            try:
+                result = operation_func(*args, **kwargs)
+                log_operation_end(operation_name, "success" in result if isinstance(result, dict) else True)
+                return result
+            except Exception as e:
+                span.record_error(f"{type(e).__name__}: {e}")
+                return handle_tool_exception(operation_name, e)
 
     def validate_response(self, ok: bool, payload: Any, operation: str) -> Optional[Dict[str, Any]]:
         """验证HTTP响应。
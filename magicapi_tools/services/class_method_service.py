@@ -109,10 +109,12 @@ class ClassMethodService(BaseService):
         try:
             logger.info(f"🔍 [ClassService] 发送HTTP请求: POST {classes_url}")
             logger.info(f"🔍 [ClassService] 请求头: {headers}")
-            response = self.http_client.session.post(
+            response = self.http_client.request(
+                "POST",
                 classes_url,
+                idempotent=True,
+                coalesce=True,
                 headers=headers,
-                timeout=self.settings.timeout_seconds
             )
             response.raise_for_status()
 
@@ -288,10 +290,12 @@ class ClassMethodService(BaseService):
         try:
             logger.info(f"🔍 [ClassService] 发送HTTP请求: POST {classes_url}")
             logger.info(f"🔍 [ClassService] 请求头: {headers}")
-            response = self.http_client.session.post(
+            response = self.http_client.request(
+                "POST",
                 classes_url,
+                idempotent=True,
+                coalesce=True,
                 headers=headers,
-                timeout=self.settings.timeout_seconds
             )
             response.raise_for_status()
 
@@ -491,10 +495,11 @@ class ClassMethodService(BaseService):
         try:
             logger.info(f"🔍 [ClassService] 发送HTTP请求: GET {classes_txt_url}")
             logger.info(f"🔍 [ClassService] 请求头: {headers}")
-            response = self.http_client.session.get(
+            response = self.http_client.request(
+                "GET",
                 classes_txt_url,
+                coalesce=True,
                 headers=headers,
-                timeout=self.settings.timeout_seconds
             )
             response.raise_for_status()
             classes_txt_data = response.text
@@ -656,11 +661,13 @@ class ClassMethodService(BaseService):
             logger.info(f"🔍 [ClassService] 发送HTTP请求: POST {class_url}")
             logger.info(f"🔍 [ClassService] 请求头: {headers}")
             logger.info(f"🔍 [ClassService] 请求数据: {{\"className\": \"{class_name}\"}}")
-            response = self.http_client.session.post(
+            response = self.http_client.request(
+                "POST",
                 class_url,
+                idempotent=True,
+                coalesce=True,
                 data={"className": class_name},
                 headers=headers,
-                timeout=self.settings.timeout_seconds
             )
             response.raise_for_status()
 
@@ -7,9 +7,12 @@
 ├── DocumentationTools - 文档查询和知识库工具
 ├── ApiTools - API调用和测试工具
 ├── ResourceManagementTools - 资源管理和操作工具
+├── ResourceFeedTools - MCP 资源与订阅变更通知
+├── BackendTools - 多 Magic-API 后端选择与查看
 ├── QueryTools - 资源查询和检索工具
 ├── DebugTools - 调试和断点管理工具
 ├── SearchTools - 内容搜索和定位工具
+├── ScriptSyncTools - 脚本与本地目录双向同步
 ├── BackupTools - 备份管理和恢复工具
 ├── ClassMethodTools - Java类和方法检索工具
 └── CodeGenerationTools - 代码生成工具（当前禁用）
@@ -22,6 +25,7 @@
 """
 
 from .api import ApiTools
+from .backend import BackendTools
 from .backup import BackupTools
 from .class_method import ClassMethodTools
 # from .code_generation import CodeGenerationTools
@@ -29,11 +33,14 @@ from .class_method import ClassMethodTools
 from .documentation import DocumentationTools
 from .query import QueryTools
 from .resource import ResourceManagementTools
+from .resource_feed import ResourceFeedTools
 from .search import SearchTools
+from .sync import ScriptSyncTools
 from .system import SystemTools
 
 __all__ = [
     "ApiTools",
+    "BackendTools",
     "BackupTools",
     "ClassMethodTools",
     # "CodeGenerationTools",
@@ -41,7 +48,9 @@ __all__ = [
     "DocumentationTools",
     "QueryTools",
     "MagicAPIResourceTools",
+    "ResourceFeedTools",
     "ResourceManagementTools",
+    "ScriptSyncTools",
     "SearchTools",
     "SystemTools",
 ]
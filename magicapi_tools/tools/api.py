@@ -5,6 +5,7 @@
 - 灵活的参数传递（查询参数、请求体、请求头）
 - 自动错误处理和响应格式化
 - 实时API测试和调试
+- 并发压测与性能基线对比
 
 重要提示：
 - 支持两种调用方式：
@@ -15,18 +16,31 @@
 
 主要工具：
 - call_magic_api: 调用Magic-API接口并返回请求结果，支持ID自动转换
+- load_test_api: 并发压测接口，报告吞吐量、错误率与延迟分位数
+- replay_api_call: 重新执行录制的 GET 请求并与上次响应逐字段比较
 """
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping, Sequence
-from typing import TYPE_CHECKING, Annotated, Any, Dict, Optional, Union
+from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Optional, Union
 
 from pydantic import Field
 
 from magicapi_tools.logging_config import get_logger
+from magicapi_tools.tools.common import error_response
+from magicapi_tools.tools.resource_feed import MUTATING_TOOLS
+from magicapi_tools.utils.load_test import LoadTestConfig
 from magicapi_tools.ws import normalize_breakpoints
 
+try:  # pragma: no cover - 运行环境缺失 fastmcp 时回退 Any
+    from fastmcp import Context
+    from fastmcp.server.middleware import Middleware
+except ImportError:  # pragma: no cover
+    Context = Any  # type: ignore[assignment]
+    Middleware = object  # type: ignore[misc,assignment]
+
 if TYPE_CHECKING:
     from fastmcp import FastMCP
     from magicapi_mcp.tool_registry import ToolContext
@@ -34,12 +48,35 @@ if TYPE_CHECKING:
 # 获取API工具的logger
 logger = get_logger('tools.api')
 
+# 只修改单个脚本的工具，按 ``id`` 参数失效该脚本及（依赖图已构建时）导入它的接口的响应缓存
+_SCRIPT_TOOLS = frozenset({"save_api_endpoint", "replace_api_script"})
+
+
+class _ResponseCacheInvalidationMiddleware(Middleware):
+    """变更类工具调用后使相关接口的响应缓存失效，无需等待资源树刷新。"""
+
+    def __init__(self, context: "ToolContext") -> None:
+        self.context = context
+
+    async def on_call_tool(self, context, call_next):
+        result = await call_next(context)
+        name = context.message.name
+        if name in MUTATING_TOOLS:
+            arguments = context.message.arguments or {}
+            target = arguments.get("id")
+            if name in _SCRIPT_TOOLS and target:
+                self.context.response_cache.invalidate([target])
+            else:
+                self.context.response_cache.invalidate_all()
+        return result
+
 
 class ApiTools:
     """API 执行工具模块。"""
 
     def register_tools(self, mcp_app: "FastMCP", context: "ToolContext") -> None:  # pragma: no cover - 装饰器环境
         """注册调用相关工具。"""
+        mcp_app.add_middleware(_ResponseCacheInvalidationMiddleware(context))
 
         @mcp_app.tool(
             name="call_magic_api",
@@ -75,6 +112,10 @@ class ApiTools:
                 Optional[Union[Dict[str, float], str]],
                 Field(description="WebSocket日志捕获配置。None表示不捕获，{}表示使用默认值(前0.1秒后0.1秒)，或指定{'pre': 1.0, 'post': 1.5}自定义前后等待时间")
             ] = {"pre": 0.1, "post": 1.5},
+            cache_ttl: Annotated[
+                Optional[float],
+                Field(description="GET 响应缓存有效期（秒）。相同请求在有效期内直接返回缓存并跳过日志等待，接口脚本被保存后自动失效；None 使用 MAGIC_API_RESPONSE_CACHE_TTL（默认不缓存）", ge=0)
+            ] = None,
         ) -> Dict[str, Any]:
             """调用 Magic-API 接口并返回请求结果。
 
@@ -92,6 +133,9 @@ class ApiTools:
             - include_ws_logs=None: 不捕获日志
             - include_ws_logs={}: 使用默认配置(前0.1秒，后1.5秒)
             - include_ws_logs={'pre': 0.5, 'post': 1.5}: 自定义等待时间
+
+            响应缓存说明：
+            - 仅缓存未设置断点的成功 GET 请求，返回的 cache.key 可用于 replay_api_call
             """
 
             # 使用业务服务层处理API调用
@@ -104,12 +148,172 @@ class ApiTools:
                 params=params,
                 data=data,
                 headers=headers,
-                ws_log_config=include_ws_logs
+                ws_log_config=include_ws_logs,
+                cache_ttl=cache_ttl,
             )
 
             response = context.api_service.call_api_with_details(request)
             return response.to_dict()
 
+        @mcp_app.tool(
+            name="replay_api_call",
+            description="重新执行 call_magic_api 录制的 GET 请求（需以 cache_ttl 调用过），与上次响应逐字段比较，返回差异路径与新旧值；不传参数时列出全部录制。",
+            tags={"api", "call", "cache", "diff"},
+        )
+        def replay(
+            key: Annotated[
+                Optional[str],
+                Field(description="call_magic_api 返回的 cache.key")
+            ] = None,
+            path: Annotated[
+                Optional[str],
+                Field(description="未提供 key 时按请求定位录制，如'GET /api/users'")
+            ] = None,
+            method: Annotated[
+                str,
+                Field(description="HTTP请求方法")
+            ] = "GET",
+            api_id: Annotated[
+                Optional[str],
+                Field(description="接口ID，替代 method/path")
+            ] = None,
+            params: Annotated[
+                Optional[Union[Any, str]],
+                Field(description="录制时的URL查询参数")
+            ] = None,
+            headers: Annotated[
+                Optional[Union[Any, str]],
+                Field(description="录制时的HTTP请求头")
+            ] = None,
+            update_baseline: Annotated[
+                bool,
+                Field(description="重放成功后是否以新响应作为下次比较的基准")
+            ] = True,
+            diff_limit: Annotated[
+                int,
+                Field(description="最多返回的差异条数", ge=1)
+            ] = 50,
+        ) -> Dict[str, Any]:
+            method, path = _normalize_method_path(method, path)
+            return context.api_service.replay_api_call(
+                key=key,
+                method=method,
+                path=path,
+                api_id=api_id,
+                params=params,
+                headers=headers,
+                update_baseline=update_baseline,
+                diff_limit=diff_limit,
+            )
+
+        @mcp_app.tool(
+            name="load_test_api",
+            description="以指定并发压测 Magic-API 接口，报告吞吐量、错误率、延迟分位数（p50/p90/p99/max）与响应大小分布，可与保存的基线比较以发现脚本修改后的性能回退。",
+            tags={"api", "performance", "load-test", "benchmark"},
+            meta={"version": "1.0", "category": "api"},
+        )
+        async def load_test(
+            path: Annotated[
+                Optional[str],
+                Field(description="API请求路径，如'/order/list'或'GET /order/list'")
+            ] = None,
+            method: Annotated[
+                str,
+                Field(description="HTTP请求方法，path 中已包含方法时忽略")
+            ] = "GET",
+            api_id: Annotated[
+                Optional[str],
+                Field(description="可选的接口ID，提供时自动解析 method 与 path")
+            ] = None,
+            concurrency: Annotated[
+                int,
+                Field(description="并发数（1-200）")
+            ] = 10,
+            duration_seconds: Annotated[
+                Optional[float],
+                Field(description="压测持续时间（秒），与 total_requests 同时指定时以先达到者为准；均不指定时默认 10 秒")
+            ] = None,
+            total_requests: Annotated[
+                Optional[int],
+                Field(description="总请求数")
+            ] = None,
+            ramp_up_seconds: Annotated[
+                float,
+                Field(description="并发爬坡时间（秒），工作线程在该时间内均匀启动")
+            ] = 0.0,
+            params: Annotated[
+                Optional[Union[Dict[str, Any], List[Dict[str, Any]]]],
+                Field(description="URL查询参数模板，支持 {{seq}}、{{worker}}、{{uuid}}、{{timestamp}}、{{random:1:100}}、{{choice:a|b}} 占位符；传入列表时按请求序号轮换")
+            ] = None,
+            data: Annotated[
+                Optional[Any],
+                Field(description="请求体模板，占位符同 params")
+            ] = None,
+            headers: Annotated[
+                Optional[Dict[str, str]],
+                Field(description="请求头模板，占位符同 params")
+            ] = None,
+            timeout_seconds: Annotated[
+                float,
+                Field(description="单次请求超时时间（秒）")
+            ] = 30.0,
+            baseline_path: Annotated[
+                Optional[str],
+                Field(description="对比的基线文件路径，报告中的 comparison 标记回退指标")
+            ] = None,
+            save_baseline_path: Annotated[
+                Optional[str],
+                Field(description="把本次报告保存为基线的文件路径")
+            ] = None,
+            regression_tolerance: Annotated[
+                float,
+                Field(description="判定回退的相对变化阈值，0.2 表示延迟上升或吞吐下降超过 20%")
+            ] = 0.2,
+            ctx: "Context" = None,
+        ) -> Dict[str, Any]:
+            http_method, http_path = _normalize_method_path(method, path)
+            if not api_id and not http_path:
+                return error_response("validation_error", "需要提供 path 或 api_id")
+
+            config = LoadTestConfig(
+                method=http_method,
+                path=http_path or "",
+                concurrency=concurrency,
+                duration_seconds=duration_seconds,
+                total_requests=total_requests,
+                ramp_up_seconds=ramp_up_seconds,
+                params=params,
+                data=data,
+                headers=_sanitize_headers(headers),
+                timeout_seconds=timeout_seconds,
+            )
+
+            progress = None
+            if ctx is not None:
+                loop = asyncio.get_running_loop()
+                planned = config.deadline_seconds if total_requests is None else None
+
+                def progress(snapshot: Dict[str, Any]) -> None:
+                    if planned is not None:
+                        done, total = min(snapshot["elapsed_seconds"], planned), planned
+                    else:
+                        done, total = snapshot["completed"], total_requests
+                    message = (f"{snapshot['completed']} 次请求, {snapshot['throughput_rps']} req/s, "
+                               f"错误 {snapshot['errors']}, p50 {snapshot['p50_ms']}ms")
+                    asyncio.run_coroutine_threadsafe(
+                        ctx.report_progress(progress=done, total=total, message=message), loop
+                    )
+
+            return await asyncio.to_thread(
+                context.api_service.load_test,
+                config,
+                api_id,
+                progress,
+                baseline_path,
+                save_baseline_path,
+                regression_tolerance,
+            )
+
 
 def _normalize_method_path(method: Optional[str], path: Optional[str]) -> tuple[str, Optional[str]]:
     """统一处理 method/path 组合，支持 `"GET /foo"` 输入。"""
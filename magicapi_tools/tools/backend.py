@@ -0,0 +1,71 @@
+"""Magic-API 多后端管理 MCP 工具。
+
+配置 ``MAGIC_API_BACKENDS`` 后，同一个 MCP 服务可管理多个 Magic-API 实例：
+
+- list_backends: 列出已配置的后端及当前会话选择的后端
+- use_backend: 选择当前会话的目标后端，之后的变更类工具（保存、移动、删除、回滚等）路由到该后端
+
+读类工具（search_api_endpoints、search_api_scripts、get_resource_tree、list_backups）
+通过 ``backend`` 参数指定后端，未指定时在所有后端上并发查询并合并结果。
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Annotated, Any, Dict
+
+from pydantic import Field
+
+from magicapi_mcp.backends import BackendNotFoundError
+from magicapi_mcp.session_context import session_key
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.tools.common import error_response
+
+try:  # pragma: no cover - 运行环境缺失 fastmcp 时回退 Any
+    from fastmcp import Context
+except ImportError:  # pragma: no cover
+    Context = Any  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from magicapi_mcp.tool_registry import ToolContext
+
+logger = get_logger('tools.backend')
+
+
+class BackendTools:
+    """多后端管理工具模块。"""
+
+    def register_tools(self, mcp_app: "FastMCP", context: "ToolContext") -> None:  # pragma: no cover - 装饰器环境
+        """注册多后端管理工具。"""
+
+        @mcp_app.tool(
+            name="list_backends",
+            description="列出已配置的 Magic-API 后端，以及当前会话选择的目标后端。",
+            tags={"backend", "system", "routing"},
+            meta={"version": "1.0", "category": "system"},
+        )
+        def list_backends(ctx: Context) -> Dict[str, Any]:
+            return {"success": True, **context.backends.snapshot(session_key(ctx))}
+
+        @mcp_app.tool(
+            name="use_backend",
+            description="选择当前会话的目标 Magic-API 后端，之后的保存、移动、删除、回滚等变更操作都发送到该后端。",
+            tags={"backend", "system", "routing"},
+            meta={"version": "1.0", "category": "system"},
+        )
+        def use_backend(
+            name: Annotated[
+                str,
+                Field(description="后端名称，可通过 list_backends 查看")
+            ],
+            ctx: Context,
+        ) -> Dict[str, Any]:
+            try:
+                handle = context.backends.set_active(name.strip(), session_key(ctx))
+            except BackendNotFoundError as exc:
+                return error_response("backend_not_found", str(exc))
+            logger.info(f"会话切换到后端 '{handle.name}'")
+            return {"success": True, "active": handle.name, "base_url": handle.settings.base_url}
+
+
+__all__ = ["BackendTools"]
@@ -21,6 +21,7 @@ from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Optional
 
 from pydantic import Field
 
+from magicapi_mcp.backends import fan_out_reads
 from magicapi_tools.tools.common import error_response
 
 if TYPE_CHECKING:
@@ -39,6 +40,7 @@ class BackupTools:
             description="查询备份列表，支持时间戳过滤和名称过滤。",
             tags={"backup", "list", "filter", "timestamp"},
         )
+        @fan_out_reads(context)
         def list_backups_tool(
             timestamp: Annotated[
                 Optional[int],
@@ -56,6 +58,10 @@ class BackupTools:
                 int,
                 Field(description="返回结果的最大数量，默认10条")
             ] = 10,
+            backend: Annotated[
+                Optional[str],
+                Field(description="目标后端名称；不指定时在所有已配置后端上并发查询并合并结果（'*' 表示全部后端）")
+            ] = None,
         ) -> Dict[str, Any]:
             """查询备份列表。"""
             # 使用服务层处理备份列表查询
@@ -11,13 +11,16 @@
 - find_api_ids_by_path_impl: 查找路径对应的API ID列表
 - find_api_details_by_path_impl: 查找路径对应的API详细信息
 - error_response: 统一的错误响应格式化
+- shape_options: 大结果工具共用的分页/裁剪参数（MaxBytesParam 等）
 
 此模块被其他工具模块导入使用，不直接提供MCP工具。
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Annotated, Any, Dict, List, Optional, Union
+
+from pydantic import Field
 
 from magicapi_tools.utils.extractor import (
     MagicAPIExtractorError,
@@ -28,6 +31,7 @@ from magicapi_tools.utils.extractor import (
 )
 from magicapi_tools.utils.http_client import MagicAPIHTTPClient
 from magicapi_tools.utils import error_response
+from magicapi_tools.utils.response_shaping import ShapeOptions
 
 
 def path_to_id_impl(http_client: MagicAPIHTTPClient, path: str, fuzzy: bool = True) -> Dict[str, Any]:
@@ -158,3 +162,32 @@ def find_api_details_by_path_impl(http_client: MagicAPIHTTPClient, path: str, fu
     except MagicAPIExtractorError as exc:
         return error_response("extraction_error", f"查找API详情失败: {exc}")
 
+
+
+# === 大结果工具的分页/裁剪参数 ===
+
+MaxBytesParam = Annotated[
+    Optional[int],
+    Field(description="单页响应的字节预算；不传使用服务端默认值（MAGIC_API_RESPONSE_MAX_BYTES），0 表示不限制", ge=0),
+]
+MaxItemsParam = Annotated[
+    Optional[int],
+    Field(description="单页最多返回的条目数；不传或 0 表示不限制", ge=0),
+]
+CursorParam = Annotated[
+    Optional[str],
+    Field(description="上一页响应中的 page.next_cursor，用于获取下一页"),
+]
+FieldsParam = Annotated[
+    Optional[Union[List[str], str]],
+    Field(description="只返回指定字段，如 [\"id\",\"path\"] 或 \"id,path\"，支持 node.path 形式的嵌套路径"),
+]
+
+
+def shape_options(settings: Any, max_bytes: Optional[int], max_items: Optional[int],
+                  cursor: Optional[str], fields: Optional[Union[List[str], str]]) -> ShapeOptions:
+    """根据工具参数与服务端默认预算构造裁剪参数。"""
+    return ShapeOptions.from_params(
+        max_bytes, max_items, cursor, fields,
+        default_max_bytes=getattr(settings, "response_max_bytes", None),
+    )
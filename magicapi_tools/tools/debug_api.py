@@ -21,6 +21,7 @@
 - remove_breakpoint: 移除指定断点
 - list_breakpoints: 列出所有断点
 - execute_debug_session: 执行完整的调试会话
+- profile_api_script: 自动单步驱动断点，统计脚本逐行耗时与热点行
 - get_debug_status: 获取当前调试状态
 - inspect_ws_environments: 检查WebSocket环境
 - get_websocket_status: 获取WebSocket连接状态
@@ -38,6 +39,7 @@ from pydantic import Field
 
 from magicapi_tools.logging_config import get_logger
 from magicapi_tools.utils import error_response
+from magicapi_tools.utils.tracing import tracer
 from magicapi_tools.ws import IDEEnvironment, MessageType, OpenFileContext
 from magicapi_tools.ws.debug_service import WebSocketDebugService
 from magicapi_tools.ws.observers import MCPObserver
@@ -60,10 +62,19 @@ class DebugAPITools:
 
     def __init__(self):
         self.timeout_duration = 10.0  # 默认10秒超时
-        self.debug_sessions = {}  # 存储调试会话信息
+        self._context: Optional["ToolContext"] = None
+        self._debug_sessions: Dict[str, Dict[str, Any]] = {}  # 未绑定上下文时的调试会话信息
+
+    @property
+    def debug_sessions(self) -> Dict[str, Dict[str, Any]]:
+        """调试会话信息，HTTP 传输下按 MCP 会话隔离。"""
+        if self._context is not None:
+            return self._context.debug_sessions
+        return self._debug_sessions
 
     def register_tools(self, mcp_app: "FastMCP", context: "ToolContext") -> None:  # pragma: no cover - 装饰器环境
         """注册断点调试相关工具。"""
+        self._context = context
 
         @mcp_app.tool(
             name="call_magic_api_with_debug",
@@ -459,6 +470,69 @@ class DebugAPITools:
             result = context.ws_debug_service.execute_debug_session_tool(script_id, breakpoints_list)
             return result if "success" in result else error_response(result["error"]["code"], result["error"]["message"])
 
+        @mcp_app.tool(
+            name="profile_api_script",
+            description="对一次接口调用做逐行耗时分析：在可执行行上设置断点并自动单步，返回每行耗时、执行次数与热点行排名。mode='io' 只在 db./http. 行停下，开销更低。",
+            tags={"debug", "performance", "profiling"},
+        )
+        async def profile_api_script(
+            path: Annotated[
+                str,
+                Field(description="API请求路径，如'/api/users'或'GET /api/users'")
+            ],
+            method: Annotated[
+                str,
+                Field(description="HTTP请求方法")
+            ] = "GET",
+            data: Annotated[
+                Optional[Union[Any, str]],
+                Field(description="请求体数据，适用于POST/PUT等方法")
+            ] = None,
+            params: Annotated[
+                Optional[Union[Any, str]],
+                Field(description="URL查询参数")
+            ] = None,
+            mode: Annotated[
+                str,
+                Field(description="分析模式：all 逐句单步；io 只在 db./http. 所在行停下")
+            ] = "all",
+            sample_every: Annotated[
+                int,
+                Field(description="每隔多少个候选行取一个断点，大于1时只在断点处停下，耗时计入到下一个断点为止", ge=1)
+            ] = 1,
+            lines: Annotated[
+                Optional[Union[List[int], str]],
+                Field(description="显式指定断点行号，如'[3,8]'，优先于 mode 与 sample_every")
+            ] = None,
+            max_steps: Annotated[
+                int,
+                Field(description="停下次数上限，超出后让脚本直接运行结束", ge=1)
+            ] = 5000,
+            top: Annotated[
+                int,
+                Field(description="返回的热点行数量", ge=1)
+            ] = 10,
+        ) -> Dict[str, Any]:
+            if isinstance(data, str) and data.strip() == "":
+                data = None
+            if isinstance(params, str) and params.strip() == "":
+                params = None
+            if isinstance(lines, str):
+                try:
+                    lines = json.loads(lines) if lines.strip() else None
+                except json.JSONDecodeError:
+                    return error_response("invalid_json", f"lines 格式错误: {lines}")
+
+            with tracer.span("debug.profile_api_script", mode=mode) as span:
+                result = await context.ws_debug_service.profile_api_tool(
+                    path=path, method=method, data=data, params=params, mode=mode,
+                    sample_every=sample_every, lines=lines, max_steps=max_steps, top=top,
+                )
+                span.set_attribute("steps", result.get("steps", 0))
+            if "success" not in result:
+                return error_response(result["error"]["code"], result["error"]["message"], result["error"].get("detail"))
+            return result
+
         @mcp_app.tool(
             name="get_debug_status",
             description="获取当前调试状态，包括断点信息和连接状态。",
@@ -492,6 +566,10 @@ class DebugAPITools:
                 "ws_url": context.settings.ws_url,
                 "base_url": context.settings.base_url,
                 "auth_enabled": context.settings.auth_enabled,
+                "connected": context.ws_manager.client.connected,
+                "reconnects": context.ws_manager.client.reconnects,
+                "recent_gaps": context.ws_manager.log_buffer.recent_gaps(),
+                "observers": context.ws_manager.observer_stats(),
                 "note": "WebSocket连接在需要时自动建立，可通过调试工具进行实时操作",
             }
 
@@ -558,11 +636,20 @@ class DebugAPITools:
         timeout: float
     ) -> Dict[str, Any]:
         """在指定超时时间内监听断点。"""
+        with tracer.span("debug.monitor_breakpoint", timeout=timeout) as span:
+            result = await self._poll_breakpoint(context, session_id, timeout, span)
+            span.set_attribute("outcome", result.get("status"))
+            return result
+
+    async def _poll_breakpoint(self, context, session_id: str, timeout: float, span) -> Dict[str, Any]:
         start_time = time.time()
         session = self.debug_sessions[session_id]
         
+        polls = 0
         try:
             while time.time() - start_time < timeout:
+                polls += 1
+                span.set_attribute("polls", polls)
                 # 检查断点状态
                 debug_service: WebSocketDebugService = context.ws_debug_service
                 status = debug_service.get_debug_status_tool()
@@ -83,12 +83,39 @@ def get_full_syntax_rules(locale: str = "zh-CN") -> Dict[str, Any]:
 
 from magicapi_tools.utils.kb_modules import MODULES_KNOWLEDGE
 from magicapi_tools.utils import error_response
+from magicapi_tools.utils.kb_cache import memoized_knowledge
+from magicapi_tools.utils.response_shaping import (
+    CursorError,
+    ShapeOptions,
+    paginate,
+    paginate_mapping,
+    request_scope,
+    shape_document,
+)
+from magicapi_tools.tools.common import (
+    CursorParam,
+    FieldsParam,
+    MaxBytesParam,
+    MaxItemsParam,
+    shape_options,
+)
 
 if TYPE_CHECKING:
     from fastmcp import FastMCP
     from magicapi_mcp.tool_registry import ToolContext
 
 
+def _shape_full_syntax(locale: str, options: ShapeOptions) -> Dict[str, Any]:
+    """完整语法规则按 sections 分页。"""
+    try:
+        return shape_document(
+            get_full_syntax_rules(locale), "sections", options,
+            request_scope("full_syntax", locale=locale),
+        )
+    except CursorError as exc:
+        return error_response("invalid_cursor", str(exc))
+
+
 class DocumentationTools:
     """文档相关工具模块。"""
 
@@ -106,6 +133,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_magic_script_syntax")
         def syntax(
             topic: Annotated[
                 str,
@@ -114,11 +142,17 @@ class DocumentationTools:
             locale: Annotated[
                 str,
                 Field(description="文档语言选择", default="zh-CN")
-            ] = "zh-CN"
+            ] = "zh-CN",
+            max_bytes: MaxBytesParam = None,
+            max_items: MaxItemsParam = None,
+            cursor: CursorParam = None,
+            fields: FieldsParam = None,
         ) -> Dict[str, Any]:
             # 强制返回全量语法规则的特殊处理
             if topic.lower() == "full":
-                return get_full_syntax_rules(locale)
+                return _shape_full_syntax(
+                    locale, shape_options(context.settings, max_bytes, max_items, cursor, fields)
+                )
 
             data = get_syntax(topic)
             if not data:
@@ -141,10 +175,21 @@ class DocumentationTools:
                 "description": "大模型编写任何Magic-Script代码前必须先调用此工具获取完整语法规则"
             }
         )
-        def get_full_syntax(locale: Annotated[
-            str,
-            Field(description="文档语言选择", default="zh-CN")
-        ] = "zh-CN") -> Dict[str, Any]:
+        @memoized_knowledge("get_full_magic_script_syntax")
+        def get_full_syntax(
+            locale: Annotated[
+                str,
+                Field(description="文档语言选择", default="zh-CN")
+            ] = "zh-CN",
+            max_bytes: MaxBytesParam = None,
+            max_items: MaxItemsParam = None,
+            cursor: CursorParam = None,
+            fields: FieldsParam = None,
+            known_version: Annotated[
+                Optional[str],
+                Field(description="客户端已缓存内容的 knowledge_version；与当前版本一致时只返回 not_modified")
+            ] = None,
+        ) -> Dict[str, Any]:
             """强制获取完整的Magic-Script语法规则。
 
             ⚠️ 重要：大模型在编写任何Magic-Script代码前必须调用此工具获取完整语法规则。
@@ -152,11 +197,14 @@ class DocumentationTools:
 
             Args:
                 locale: 语言设置，默认为zh-CN
+                max_bytes / max_items / cursor: 按 sections 分页，超出预算时通过 page.next_cursor 续取
+                fields: 只返回指定的 sections
+                known_version: 已缓存内容的 knowledge_version，未变化时只返回 not_modified
 
             Returns:
                 包含完整语法规则的字典
             """
-            return get_full_syntax_rules(locale)
+            return _shape_full_syntax(locale, shape_options(context.settings, max_bytes, max_items, cursor, fields))
 
         @mcp_app.tool(
             name="get_magic_script_examples",
@@ -169,6 +217,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_magic_script_examples")
         def examples(
             kind: Annotated[
                 str,
@@ -177,7 +226,11 @@ class DocumentationTools:
             keyword: Annotated[
                 Optional[str],
                 Field(description="关键词过滤，用于在示例中搜索特定内容", min_length=1)
-            ] = None
+            ] = None,
+            max_bytes: MaxBytesParam = None,
+            max_items: MaxItemsParam = None,
+            cursor: CursorParam = None,
+            fields: FieldsParam = None,
         ) -> Dict[str, Any]:
             sample_list = list_examples(kind)
             if keyword:
@@ -191,7 +244,15 @@ class DocumentationTools:
                 ]
             if not sample_list:
                 return error_response("not_found", f"未找到 {kind} 分类的示例")
-            return {"kind": kind, "examples": sample_list}
+            try:
+                page_items, page = paginate(
+                    sample_list,
+                    shape_options(context.settings, max_bytes, max_items, cursor, fields),
+                    request_scope("get_magic_script_examples", kind=kind, keyword=keyword),
+                )
+            except CursorError as exc:
+                return error_response("invalid_cursor", str(exc))
+            return {"kind": kind, "examples": page_items, "page": page}
 
         @mcp_app.tool(
             name="get_magic_api_docs",
@@ -204,13 +265,26 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_magic_api_docs")
         def docs(
             index_only: Annotated[
                 bool,
                 Field(description="是否只返回文档索引，true时只返回目录，false时返回完整内容", default=True)
-            ] = True
+            ] = True,
+            max_bytes: MaxBytesParam = None,
+            max_items: MaxItemsParam = None,
+            cursor: CursorParam = None,
+            fields: FieldsParam = None,
         ) -> Dict[str, Any]:
-            return get_docs(index_only)
+            try:
+                return shape_document(
+                    get_docs(index_only),
+                    "index" if index_only else "documentation",
+                    shape_options(context.settings, max_bytes, max_items, cursor, fields),
+                    request_scope("get_magic_api_docs", index_only=index_only),
+                )
+            except CursorError as exc:
+                return error_response("invalid_cursor", str(exc))
 
         @mcp_app.tool(
             name="get_best_practices",
@@ -223,6 +297,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_best_practices")
         def best_practices() -> List[Dict[str, Any]]:
             """获取最佳实践列表"""
             practices_list = get_best_practices()
@@ -249,6 +324,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_common_pitfalls")
         def pitfalls() -> List[Dict[str, Any]]:
             """获取常见坑点列表"""
             pitfalls_list = get_pitfalls()
@@ -275,6 +351,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_development_workflow")
         def workflow(
             task: Annotated[
                 str,
@@ -358,6 +435,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_documentation")
         def unified_docs(
             name_or_category: Annotated[
                 str,
@@ -366,7 +444,11 @@ class DocumentationTools:
             doc_type: Annotated[
                 str,
                 Field(description="文档类型，可选值: module(模块API), function(函数库), extension(类型扩展), config(配置), plugin(插件)。使用 module 获取内置模块API文档，如 db, http, request, response, log, env, cache, magic 等模块。使用 function 获取内置函数库文档，按分类查询如 aggregation, date, string, array, math, other, range。使用 extension 获取类型扩展功能文档，如 object, number, collection, string, date 等类型的扩展方法。使用 config 获取配置选项说明，如 spring_boot, database, cache, cluster, cors 等。使用 plugin 获取插件系统文档，如 redis, mongodb, elasticsearch, swagger 等插件。", default="module")
-            ]
+            ],
+            known_version: Annotated[
+                Optional[str],
+                Field(description="客户端已缓存内容的 knowledge_version；与当前版本一致时只返回 not_modified")
+            ] = None,
         ) -> Dict[str, Any]:
             """
             获取各种类型的文档
@@ -409,6 +491,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_examples")
         def examples(
             category: Annotated[
                 Optional[str],
@@ -417,7 +500,11 @@ class DocumentationTools:
             topic: Annotated[
                 Optional[str],
                 Field(description="具体主题，当指定category时可进一步筛选具体示例")
-            ] = None
+            ] = None,
+            max_bytes: MaxBytesParam = None,
+            max_items: MaxItemsParam = None,
+            cursor: CursorParam = None,
+            fields: FieldsParam = None,
         ) -> Dict[str, Any]:
             """获取各种类型的Magic-API使用示例"""
             if not category:
@@ -484,7 +571,16 @@ class DocumentationTools:
                     else:
                         return error_response("not_found", f"在 '{category}' 分类中未找到主题 '{topic}'")
 
-            return {"category": category, "examples": examples_data}
+            options = shape_options(context.settings, max_bytes, max_items, cursor, fields)
+            scope = request_scope("get_examples", category=category)
+            try:
+                if isinstance(examples_data, dict):
+                    page_items, page = paginate_mapping(examples_data, options, scope)
+                else:
+                    page_items, page = paginate(examples_data, options, scope)
+            except CursorError as exc:
+                return error_response("invalid_cursor", str(exc))
+            return {"category": category, "examples": page_items, "page": page}
 
         @mcp_app.tool(
             name="search_knowledge",
@@ -505,7 +601,15 @@ class DocumentationTools:
             category: Annotated[
                 Optional[str],
                 Field(description="限定搜索分类，可选值: syntax, modules, functions, extensions, config, plugins, practices, examples, web_docs")
-            ] = None
+            ] = None,
+            include_content: Annotated[
+                bool,
+                Field(description="是否返回文档全文(full_content)；默认只返回摘要，需要全文时再按结果单独获取")
+            ] = False,
+            max_bytes: MaxBytesParam = None,
+            max_items: MaxItemsParam = None,
+            cursor: CursorParam = None,
+            fields: FieldsParam = None,
         ) -> Dict[str, Any]:
             results = []
 
@@ -579,12 +683,30 @@ class DocumentationTools:
                 for result in web_docs_results:
                     results.append(result)
 
-            return {
+            omitted_fields: List[str] = []
+            if not include_content and any("full_content" in item for item in results):
+                results = [{k: v for k, v in item.items() if k != "full_content"} for item in results]
+                omitted_fields.append("full_content")
+
+            try:
+                page_items, page = paginate(
+                    results,
+                    shape_options(context.settings, max_bytes, max_items, cursor, fields),
+                    request_scope("search_knowledge", keyword=keyword, category=category,
+                                  include_content=include_content),
+                )
+            except CursorError as exc:
+                return error_response("invalid_cursor", str(exc))
+            response = {
                 "keyword": keyword,
                 "category": category,
-                "results": results,
-                "total": len(results)
+                "results": page_items,
+                "total": len(results),
+                "page": page,
             }
+            if omitted_fields:
+                response["omitted_fields"] = omitted_fields
+            return response
 
         @mcp_app.tool(
             name="get_knowledge_overview",
@@ -597,7 +719,13 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
-        def knowledge_overview() -> Dict[str, Any]:
+        @memoized_knowledge("get_knowledge_overview")
+        def knowledge_overview(
+            known_version: Annotated[
+                Optional[str],
+                Field(description="客户端已缓存内容的 knowledge_version；与当前版本一致时只返回 not_modified")
+            ] = None,
+        ) -> Dict[str, Any]:
             """获取知识库概览"""
             categories = get_available_categories()
 
@@ -627,6 +755,7 @@ class DocumentationTools:
                 "openWorldHint": False
             }
         )
+        @memoized_knowledge("get_practices_guide")
         def practices_guide(
             guide_type: Annotated[
                 str,
@@ -15,14 +15,17 @@
 - get_api_details_by_path: 根据API路径直接获取接口的详细信息，支持模糊匹配
 - get_api_details_by_id: 根据接口ID获取详细信息，包含full_path字段（推荐使用）
 - search_api_endpoints: 搜索和过滤Magic-API接口端点，返回包含ID的完整信息列表
+- analyze_script_performance: 静态检查接口脚本的性能问题（N+1 查询、未分页查询等），按代价排序
 """
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Literal, Optional
 
 from pydantic import Field
 
+from magicapi_mcp.backends import fan_out_reads
 from magicapi_tools.utils.extractor import extract_api_endpoints, load_resource_tree
 from magicapi_tools.utils.extractor import filter_endpoints, _clean_path
 from magicapi_tools.logging_config import get_logger
@@ -31,6 +34,8 @@ from magicapi_tools.tools.common import (
     path_to_id_impl,
 )
 from magicapi_tools.domain.dtos.query_dtos import QueryRequest, QueryResponse, EndpointFilter
+from magicapi_tools.utils.script_linter import SEVERITY_ORDER, lint_script, summarize_findings
+from magicapi_tools.utils.upstream_scheduler import with_priority
 
 # 获取查询工具的logger
 logger = get_logger('tools.query')
@@ -124,6 +129,30 @@ def _get_full_path_by_api_details(client, api_id: str, method: str, path: str, n
         return path
 
 
+def _group_file_nodes(tree: Dict[str, Any], group_id: str) -> Optional[List[Dict[str, Any]]]:
+    """收集接口分组（含子分组）下的全部接口节点；分组不存在时返回 ``None``。"""
+    root = tree.get("api") or {}
+    stack = [root]
+    group = None
+    while stack and group is None:
+        node = stack.pop()
+        if str((node.get("node") or {}).get("id")) == str(group_id):
+            group = node
+        stack.extend(node.get("children") or [])
+    if group is None:
+        return None
+
+    files: List[Dict[str, Any]] = []
+    stack = list(group.get("children") or [])
+    while stack:
+        node = stack.pop()
+        info = node.get("node") or {}
+        if "groupId" in info and info.get("id"):
+            files.append({"id": info["id"], "path": info.get("full_path") or info.get("path")})
+        stack.extend(node.get("children") or [])
+    return files
+
+
 class QueryTools:
     """查询工具模块。"""
 
@@ -207,6 +236,7 @@ class QueryTools:
             description="搜索和过滤 Magic-API 接口端点，支持按方法、路径、名称等条件过滤。返回包含ID、方法、路径、名称等完整信息的端点列表。",
             tags={"search", "filter", "api", "endpoints"},
         )
+        @fan_out_reads(context)
         def search_endpoints(
             method_filter: Annotated[
                 Optional[str],
@@ -224,6 +254,10 @@ class QueryTools:
                 Optional[str],
                 Field(description="路径/名称模糊匹配，支持正则表达式")
             ] = None,
+            backend: Annotated[
+                Optional[str],
+                Field(description="目标后端名称；不指定时在所有已配置后端上并发查询并合并结果（'*' 表示全部后端）")
+            ] = None,
         ) -> Dict[str, Any]:
             """搜索和过滤Magic-API接口端点。"""
             # 使用服务层处理查询逻辑
@@ -242,3 +276,89 @@ class QueryTools:
             response = context.query_service.search_api_endpoints(request)
             return response.to_dict()
 
+
+        @mcp_app.tool(
+            name="analyze_script_performance",
+            description="静态检查接口脚本的性能问题：循环/lambda 中的数据库查询（N+1）、未分页的 SELECT、重复查询、内存中处理大结果集、GET 接口未使用缓存。可检查单个接口或整个分组，结果按估算代价排序并给出行号。",
+            tags={"analysis", "performance", "lint", "api", "scripts"},
+        )
+        def analyze_script_performance(
+            file_id: Annotated[
+                Optional[str],
+                Field(description="检查单个接口或函数的文件ID")
+            ] = None,
+            group_id: Annotated[
+                Optional[str],
+                Field(description="检查分组（含子分组）下的全部接口；'0' 表示全部接口")
+            ] = None,
+            script: Annotated[
+                Optional[str],
+                Field(description="直接检查一段 Magic-Script 脚本（不请求服务端）")
+            ] = None,
+            method: Annotated[
+                Optional[str],
+                Field(description="配合 script 使用，接口的 HTTP 方法（GET 接口会检查缓存使用）")
+            ] = None,
+            min_severity: Annotated[
+                Literal["low", "medium", "high"],
+                Field(description="只返回不低于该严重程度的问题")
+            ] = "low",
+            limit: Annotated[
+                int,
+                Field(description="返回代价最高的接口数量，默认20个")
+            ] = 20,
+        ) -> Dict[str, Any]:
+            threshold = SEVERITY_ORDER[min_severity]
+
+            def analyze(meta: Dict[str, Any], text: str, http_method: Optional[str]) -> Dict[str, Any]:
+                findings = [item for item in lint_script(text, http_method) if SEVERITY_ORDER[item.severity] >= threshold]
+                return {**meta, **summarize_findings(findings), "findings": [item.to_dict() for item in findings]}
+
+            if script is not None:
+                return {"scanned": 1, "results": [analyze({"source": "script"}, script, method)]}
+
+            if file_id:
+                targets = [{"id": file_id}]
+            elif group_id:
+                ok, tree = context.tree_cache.get_tree()
+                if not ok:
+                    return error_response(tree.get("code"), tree.get("message", "无法获取资源树"), tree.get("detail"))
+                targets = _group_file_nodes(tree, group_id)
+                if targets is None:
+                    return error_response("not_found", f"未找到分组 {group_id}")
+            else:
+                return error_response("invalid_params", "需要提供 file_id、group_id 或 script 之一")
+
+            with ThreadPoolExecutor(max_workers=min(8, max(1, len(targets)))) as pool:
+                details = list(pool.map(
+                    with_priority("bulk", lambda target: context.http_client.api_detail(target["id"])), targets
+                ))
+
+            results: List[Dict[str, Any]] = []
+            failed: List[Dict[str, Any]] = []
+            for target, (ok, detail) in zip(targets, details):
+                if not ok or not isinstance(detail, dict):
+                    failed.append({"id": target["id"], "error": detail})
+                    continue
+                meta = {
+                    "id": target["id"],
+                    "name": detail.get("name"),
+                    "method": detail.get("method"),
+                    "path": target.get("path") or detail.get("path"),
+                }
+                results.append(analyze(meta, str(detail.get("script") or ""), detail.get("method")))
+
+            if file_id and failed:
+                error = failed[0]["error"] or {}
+                return error_response(error.get("code"), error.get("message", "无法获取接口详情"), error.get("detail"))
+            results.sort(key=lambda item: (-item["cost"], item["id"]))
+            flagged = [item for item in results if item["findings"]]
+            response: Dict[str, Any] = {
+                "scanned": len(results),
+                "flagged": len(flagged),
+                "total_cost": sum(item["cost"] for item in results),
+                "results": flagged[:max(1, limit)],
+            }
+            if failed:
+                response["failed"] = failed
+            return response
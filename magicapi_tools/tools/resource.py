@@ -18,6 +18,7 @@
 - read_set_lock_status: 读取或设置资源的锁定状态（支持读取、锁定、解锁）
 - list_resource_groups: 列出所有资源分组
 - export_resource_tree: 导出完整的资源树结构
+- export_workspace / import_workspace: 通过批量 zip 接口一次请求导出/导入工作区
 - get_resource_stats: 获取资源统计信息
 """
 
@@ -33,6 +34,7 @@ import re
 
 from pydantic import Field
 
+from magicapi_mcp.backends import fan_out_reads
 from magicapi_tools.logging_config import get_logger
 from magicapi_tools.utils.extractor import (
     MagicAPIExtractorError,
@@ -42,6 +44,20 @@ from magicapi_tools.utils.extractor import (
     _nodes_to_csv,
 )
 from magicapi_tools.utils.resource_manager import build_api_save_kwargs_from_detail
+from magicapi_tools.utils.response_shaping import (
+    CursorError,
+    paginate,
+    paginate_forest,
+    paginate_tree,
+    request_scope,
+)
+from magicapi_tools.tools.common import (
+    CursorParam,
+    FieldsParam,
+    MaxBytesParam,
+    MaxItemsParam,
+    shape_options,
+)
 from magicapi_tools.utils import (
     error_response,
     clean_string_param,
@@ -74,6 +90,7 @@ class ResourceManagementTools:
             tags={"resource", "tree", "api", "filtering"},
             meta={"version": "2.0", "category": "resource-management"}
         )
+        @fan_out_reads(context)
         def resource_tree(
             kind: Annotated[
                 str,
@@ -109,8 +126,21 @@ class ResourceManagementTools:
                 Optional[str],
                 Field(description="通用查询过滤器，支持复杂的搜索条件")
             ] = None,
+            backend: Annotated[
+                Optional[str],
+                Field(description="目标后端名称；不指定时在所有已配置后端上并发查询并合并结果（'*' 表示全部后端）")
+            ] = None,
+            max_bytes: MaxBytesParam = None,
+            max_items: MaxItemsParam = None,
+            cursor: CursorParam = None,
+            fields: FieldsParam = None,
         ) -> Dict[str, Any]:
-            """获取 Magic-API 资源树。"""
+            """获取 Magic-API 资源树。
+
+            结果按 ``max_bytes`` / ``max_items`` 分页：tree 格式按先序遍历切分并保留祖先节点，
+            json/csv 格式按节点列表切分；续取时传入 ``page.next_cursor`` 并保持其余参数不变。
+            多后端扇出时每个后端的游标各自独立，翻页请指定 ``backend``。
+            """
 
             try:
                 # 参数清理：将空字符串转换为 None
@@ -158,6 +188,12 @@ class ResourceManagementTools:
                 allowed = [
                     kind_normalized] if kind_normalized != "all" else ["all"]
 
+                options = shape_options(context.settings, max_bytes, max_items, cursor, fields)
+                scope = request_scope(
+                    "get_resource_tree", kind=kind_normalized, format=format, depth=depth, group_id=group_id_str,
+                    method=method_filter, path=path_filter, name=name_filter, query=query_filter,
+                )
+
                 # 根据format参数返回不同格式
                 if format == "tree":
                     # 返回树形结构
@@ -299,11 +335,17 @@ class ResourceManagementTools:
                                 if filtered:
                                     result_tree[tree_type] = filtered
 
+                    if kind_normalized != "all":
+                        result_tree, page = paginate_tree(result_tree, options, scope)
+                    else:
+                        result_tree, page = paginate_forest(result_tree, options, scope)
+
                     return {
                         "format": "tree",
                         "kind": kind_normalized,
                         "group_id": group_id_str,
                         "tree": result_tree,
+                        "page": page,
                         "filters_applied": {
                             "method": method_filter,
                             "path": path_filter,
@@ -373,14 +415,21 @@ class ResourceManagementTools:
                         # 使用原有搜索逻辑保持兼容性
                         nodes = _filter_nodes(nodes, query_filter)
 
+                    total = len(nodes)
+                    if format == "csv":
+                        # CSV 列固定，字段投影不适用
+                        options.fields = None
+                    nodes, page = paginate(nodes, options, scope, key=lambda node: node.get("id"))
+
                     if format == "json":
                         # 返回扁平化的JSON数组
                         return {
                             "format": "json",
                             "kind": kind_normalized,
                             "group_id": group_id_str,
-                            "count": len(nodes),
+                            "count": total,
                             "nodes": nodes,
+                            "page": page,
                             "filters_applied": {
                                 "method": method_filter,
                                 "path": path_filter,
@@ -396,8 +445,9 @@ class ResourceManagementTools:
                             "format": "csv",
                             "kind": kind_normalized,
                             "group_id": group_id_str,
-                            "count": len(nodes),
+                            "count": total,
                             "csv": _nodes_to_csv(nodes),
+                            "page": page,
                             "filters_applied": {
                                 "method": method_filter,
                                 "path": path_filter,
@@ -408,6 +458,8 @@ class ResourceManagementTools:
                             }
                         }
 
+            except CursorError as e:
+                return error_response("invalid_cursor", str(e))
             except MagicAPIExtractorError as e:
                 return error_response("extraction_error", f"资源树提取失败: {str(e)}")
             except Exception as e:
@@ -718,16 +770,46 @@ class ResourceManagementTools:
 
         @mcp_app.tool(
             name="export_resource_tree",
-            description="导出资源树结构，支持JSON和CSV格式。",
-            tags={"resource", "export", "tree"},
-            meta={"version": "1.0", "category": "resource-management"},
-            enabled=False
+            description="导出资源树结构。json/csv 内联返回；ndjson/csv/parquet 可流式写入本地文件或分块资源URI，并可并发拉取完整脚本。",
+            tags={"resource", "export", "tree", "streaming"},
+            meta={"version": "2.0", "category": "resource-management"}
         )
-        def export_resource_tree(kind: str = "api", format: str = "json") -> Dict[str, Any]:
+        def export_resource_tree(
+            kind: Annotated[
+                str,
+                Field(description="资源类型：api、function、task、datasource 或 all")
+            ] = "api",
+            format: Annotated[
+                str,
+                Field(description="导出格式：json（内联）、csv、ndjson、parquet（需要 pyarrow 且必须指定 output_path）")
+            ] = "json",
+            output_path: Annotated[
+                Optional[str],
+                Field(description="输出文件路径；ndjson 未指定时写入临时目录，并通过 magicapi://exports/{export_id}/{chunk} 分块读取")
+            ] = None,
+            include_script: Annotated[
+                bool,
+                Field(description="是否导出完整脚本内容（并发拉取，仅流式导出生效）")
+            ] = False,
+            max_workers: Annotated[
+                int,
+                Field(description="拉取脚本的并发数")
+            ] = 4,
+            chunk_bytes: Annotated[
+                Optional[int],
+                Field(description="分块导出时单个分块的最大字节数，默认 1MiB")
+            ] = None,
+        ) -> Dict[str, Any]:
             """导出资源树。"""
             try:
                 result = context.resource_tools.export_resource_tree_tool(
-                    kind=kind, format=format)
+                    kind=kind,
+                    format=format,
+                    output_path=clean_string_param(output_path),
+                    include_script=include_script,
+                    max_workers=max_workers,
+                    chunk_bytes=chunk_bytes,
+                )
                 if "success" in result:
                     return result
                 else:
@@ -738,9 +820,109 @@ class ResourceManagementTools:
                         result  # 包含完整的原始错误信息
                     )
             except Exception as e:
-                print(f"DEBUG MCP: export_resource_tree error: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error(f"导出资源树异常: {e}", exc_info=True)
+                return error_response("unexpected_error", f"意外错误: {str(e)}")
+
+        @mcp_app.resource(
+            "magicapi://exports/{export_id}/{chunk}",
+            name="resource_tree_export_chunk",
+            description="读取 export_resource_tree 分块导出的指定分块内容",
+            mime_type="text/plain",
+        )
+        def export_chunk(export_id: str, chunk: str) -> str:
+            """读取导出分块。"""
+            from magicapi_tools.utils.tree_exporter import ResourceTreeExporter
+
+            return ResourceTreeExporter(context.http_client).read_chunk(export_id, int(chunk))
+
+        @mcp_app.tool(
+            name="export_workspace",
+            description="通过 Magic-API 批量下载接口一次请求导出整个工作区（或指定分组）为 zip，可按分组/路径前缀流式解包到本地目录树，适合克隆或迁移大量接口。",
+            tags={"resource", "export", "workspace", "migration"},
+            meta={"version": "1.0", "category": "resource-management"}
+        )
+        def export_workspace(
+            output_path: Annotated[
+                Optional[str],
+                Field(description="zip 保存路径，默认写入临时目录")
+            ] = None,
+            group_id: Annotated[
+                Optional[str],
+                Field(description="只导出该分组（由 Magic-API 服务端打包）；为空时导出整个工作区")
+            ] = None,
+            unpack_dir: Annotated[
+                Optional[str],
+                Field(description="解包目录：按 Magic-API 存储结构写出 group.json 与 .ms 脚本文件")
+            ] = None,
+            groups: Annotated[
+                Optional[List[str]],
+                Field(description="解包时只保留这些分组（ID 或名称，含子分组）")
+            ] = None,
+            path_prefixes: Annotated[
+                Optional[List[str]],
+                Field(description="解包时只保留完整路径以这些前缀开头的接口，如 ['/order']")
+            ] = None,
+        ) -> Dict[str, Any]:
+            """导出工作区 zip。"""
+            try:
+                result = context.resource_tools.export_workspace_tool(
+                    output_path=clean_string_param(output_path),
+                    group_id=clean_string_param(group_id),
+                    unpack_dir=clean_string_param(unpack_dir),
+                    groups=groups,
+                    path_prefixes=path_prefixes,
+                )
+                if "success" in result:
+                    return result
+                error_info = result.get("error", {})
+                return error_response(error_info.get("code", "export_failed"), error_info.get("message", "导出工作区失败"))
+            except Exception as e:
+                logger.error(f"导出工作区异常: {e}", exc_info=True)
+                return error_response("unexpected_error", f"意外错误: {str(e)}")
+
+        @mcp_app.tool(
+            name="import_workspace",
+            description="把本地 zip 或 export_workspace 解包出的目录树一次上传导入 Magic-API，可按分组/路径前缀只导入部分条目；mode=full 会覆盖服务端全部资源，请谨慎使用。",
+            tags={"resource", "import", "workspace", "migration"},
+            meta={"version": "1.0", "category": "resource-management"}
+        )
+        def import_workspace(
+            source: Annotated[
+                str,
+                Field(description="本地 zip 文件或目录路径")
+            ],
+            mode: Annotated[
+                Literal["increment", "full"],
+                Field(description="导入模式：increment（增量合并，默认）或 full（全量覆盖）")
+            ] = "increment",
+            groups: Annotated[
+                Optional[List[str]],
+                Field(description="只导入这些分组（ID 或名称，含子分组）")
+            ] = None,
+            path_prefixes: Annotated[
+                Optional[List[str]],
+                Field(description="只导入完整路径以这些前缀开头的接口，如 ['/order']")
+            ] = None,
+            dry_run: Annotated[
+                bool,
+                Field(description="只统计将要导入的条目，不上传")
+            ] = False,
+        ) -> Dict[str, Any]:
+            """导入工作区 zip 或目录。"""
+            try:
+                result = context.resource_tools.import_workspace_tool(
+                    source,
+                    mode=mode,
+                    groups=groups,
+                    path_prefixes=path_prefixes,
+                    dry_run=dry_run,
+                )
+                if "success" in result:
+                    return result
+                error_info = result.get("error", {})
+                return error_response(error_info.get("code", "import_failed"), error_info.get("message", "导入工作区失败"))
+            except Exception as e:
+                logger.error(f"导入工作区异常: {e}", exc_info=True)
                 return error_response("unexpected_error", f"意外错误: {str(e)}")
 
         @mcp_app.tool(
@@ -0,0 +1,155 @@
+"""Magic-API MCP 资源与订阅通知模块。
+
+将资源树、单个接口详情和统计信息暴露为 MCP 资源，客户端可通过
+``resources/subscribe`` 订阅，在资源变化时收到 ``notifications/resources/updated``，
+只需重新读取发生变化的资源，无需反复轮询整棵资源树。
+
+资源：
+- magicapi://tree: 资源树（带版本号）
+- magicapi://stats: 资源统计信息
+- magicapi://api/{file_id}: 接口详情
+
+变化来源：
+- 资源树缓存刷新（TTL 过期后读取、订阅期间的周期轮询）
+- WebSocket ``SET_FILE_ID`` 事件（检查对应文件的 updateTime）
+- 本服务内的保存/复制/移动/删除等变更类工具调用
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.resource_subscriptions import (
+    API_URI_TEMPLATE,
+    STATS_URI,
+    TREE_URI,
+    ResourceSubscriptionHub,
+)
+
+try:
+    from fastmcp.exceptions import ResourceError
+    from fastmcp.server.middleware import Middleware
+except ImportError:  # pragma: no cover - fastmcp 缺失时不注册
+    ResourceError = RuntimeError  # type: ignore[misc,assignment]
+    Middleware = object  # type: ignore[misc,assignment]
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from magicapi_mcp.tool_registry import ToolContext
+
+logger = get_logger('tools.resource_feed')
+
+# 调用后可能修改资源树的工具
+MUTATING_TOOLS = frozenset({
+    "save_group",
+    "save_api_endpoint",
+    "copy_resource",
+    "move_resource",
+    "delete_resource",
+    "read_set_lock_status",
+    "replace_api_script",
+    "rollback_backup",
+    "import_workspace",
+})
+
+
+class _MutationRefreshMiddleware(Middleware):
+    """变更类工具调用完成后刷新资源树缓存，由缓存的变更检测触发通知。"""
+
+    def __init__(self, context: "ToolContext", hub: ResourceSubscriptionHub) -> None:
+        self.context = context
+        self.hub = hub
+
+    async def on_call_tool(self, context, call_next):
+        result = await call_next(context)
+        if context.message.name in MUTATING_TOOLS:
+            if self.hub.has_subscribers():
+                asyncio.get_running_loop().run_in_executor(None, self.context.tree_cache.refresh)
+            else:
+                self.context.tree_cache.invalidate()
+        return result
+
+
+def _enable_subscribe_capability(mcp_app: "FastMCP") -> None:
+    """底层 Server 默认声明 ``subscribe=False``，注册订阅处理器后需要显式开启。"""
+    server = mcp_app._mcp_server
+    original = server.get_capabilities
+
+    def get_capabilities(notification_options, experimental_capabilities):
+        capabilities = original(notification_options, experimental_capabilities)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+    server.get_capabilities = get_capabilities
+
+
+class ResourceFeedTools:
+    """MCP 资源与订阅通知模块。"""
+
+    def register_tools(self, mcp_app: "FastMCP", context: "ToolContext") -> None:
+        """注册资源、订阅处理器与变更刷新中间件。"""
+        cache = context.tree_cache
+        hub = ResourceSubscriptionHub(poll=cache.refresh, poll_interval=cache.ttl_seconds)
+        cache.add_listener(hub.on_tree_change)
+        context.resource_subscriptions = hub
+
+        @mcp_app.resource(
+            TREE_URI,
+            name="resource_tree",
+            description="Magic-API 资源树（带版本号），变化时推送 notifications/resources/updated",
+            mime_type="application/json",
+        )
+        def tree_resource() -> str:
+            ok, tree = cache.get_tree()
+            if not ok:
+                raise ResourceError(f"获取资源树失败: {tree.get('message', '未知错误')}")
+            return json.dumps({"version": cache.version, "tree": tree}, ensure_ascii=False)
+
+        @mcp_app.resource(
+            STATS_URI,
+            name="resource_stats",
+            description="Magic-API 资源统计信息",
+            mime_type="application/json",
+        )
+        def stats_resource() -> str:
+            ok, stats = cache.get_stats()
+            if not ok:
+                raise ResourceError(f"获取资源统计失败: {stats.get('message', '未知错误')}")
+            return json.dumps({"version": cache.version, "stats": stats}, ensure_ascii=False)
+
+        @mcp_app.resource(
+            API_URI_TEMPLATE,
+            name="api_detail",
+            description="Magic-API 接口详情（含脚本），接口变化时推送更新通知",
+            mime_type="application/json",
+        )
+        def api_resource(file_id: str) -> str:
+            ok, detail = context.http_client.api_detail(file_id)
+            if not ok:
+                raise ResourceError(f"获取接口详情失败: {detail.get('message', '未知错误')}")
+            return json.dumps(detail, ensure_ascii=False)
+
+        server = mcp_app._mcp_server
+
+        @server.subscribe_resource()
+        async def handle_subscribe(uri) -> None:
+            hub.subscribe(str(uri), server.request_context.session)
+            # 建立基线，后续刷新才能检测到变化
+            if cache.fetched_at is None:
+                asyncio.get_running_loop().run_in_executor(None, cache.get_tree)
+
+        @server.unsubscribe_resource()
+        async def handle_unsubscribe(uri) -> None:
+            hub.unsubscribe(str(uri), server.request_context.session)
+
+        _enable_subscribe_capability(mcp_app)
+        mcp_app.add_middleware(_MutationRefreshMiddleware(context, hub))
+
+        logger.debug("已注册 MCP 资源与订阅通知")
+
+
+__all__ = ["MUTATING_TOOLS", "ResourceFeedTools"]
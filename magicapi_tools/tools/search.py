@@ -9,18 +9,23 @@
 主要工具：
 - search_api_scripts: 在所有API脚本中搜索关键词
 - search_todo_comments: 搜索API脚本中的TODO注释
+- find_dependents: 查询直接依赖某个函数/接口/数据表的脚本
+- impact_of_change: 按层分析修改某个函数/接口/数据表的影响范围
 """
 
 from __future__ import annotations
 
 import json
+import time
 import requests
 from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Optional
 
 from pydantic import Field
 
 from magicapi_tools.logging_config import get_logger
+from magicapi_mcp.backends import fan_out_reads
 from magicapi_tools.tools.common import error_response
+from magicapi_tools.utils.dependency_graph import DEFAULT_MAX_DEPTH
 
 if TYPE_CHECKING:
     from fastmcp import FastMCP
@@ -41,6 +46,7 @@ class SearchTools:
             description="在所有API脚本中搜索关键词。",
             tags={"search", "keyword", "api", "scripts"},
         )
+        @fan_out_reads(context)
         def search_api_scripts_tool(
             keyword: Annotated[
                 str,
@@ -50,13 +56,17 @@ class SearchTools:
                 int,
                 Field(description="返回结果的最大数量，默认5条")
             ] = 5,
+            backend: Annotated[
+                Optional[str],
+                Field(description="目标后端名称；不指定时在所有已配置后端上并发查询并合并结果（'*' 表示全部后端）")
+            ] = None,
         ) -> Dict[str, Any]:
             """搜索API脚本中的关键词。"""
             try:
                 if not keyword.strip():
                     return error_response("invalid_param", "搜索关键词不能为空")
 
-                # 直接使用session发送表单数据（因为call_api会将dict转换为JSON）
+                # 通过 request 发送表单数据（call_api 会将 dict 转换为 JSON），仍受重试与熔断策略保护
                 search_data = {'keyword': keyword}
                 url = f"{context.settings.base_url}/magic/web/search"
 
@@ -69,11 +79,13 @@ class SearchTools:
                 context.settings.inject_auth(headers)
 
                 try:
-                    http_response = context.http_client.session.post(
+                    http_response = context.http_client.request(
+                        "POST",
                         url,
+                        idempotent=True,
+                        coalesce=True,
                         data=search_data,
                         headers=headers,
-                        timeout=context.settings.timeout_seconds
                     )
                     http_response.raise_for_status()
 
@@ -192,7 +204,7 @@ class SearchTools:
         ) -> Dict[str, Any]:
             """搜索TODO注释。"""
             try:
-                # 直接使用session发送GET请求
+                # 通过 request 发送 GET 请求，仍受重试与熔断策略保护
                 url = f"{context.settings.base_url}/magic/web/todo"
 
                 # 设置请求头
@@ -204,10 +216,11 @@ class SearchTools:
                 context.settings.inject_auth(headers)
 
                 try:
-                    http_response = context.http_client.session.get(
+                    http_response = context.http_client.request(
+                        "GET",
                         url,
+                        coalesce=True,
                         headers=headers,
-                        timeout=context.settings.timeout_seconds
                     )
                     http_response.raise_for_status()
 
@@ -268,3 +281,78 @@ class SearchTools:
                 return error_response("todo_search_error", f"搜索TODO注释失败: {exc}", str(exc))
 
 
+
+        @mcp_app.tool(
+            name="find_dependents",
+            description="查询直接依赖某个函数、接口或数据表的脚本（import 导入、别名调用、db.table/SQL 表引用）。首次调用时并发拉取全部脚本建立依赖图，之后随资源树变化增量更新。",
+            tags={"search", "dependency", "impact", "scripts"},
+        )
+        def find_dependents_tool(
+            target: Annotated[
+                str,
+                Field(description="依赖目标：文件ID、函数路径（@/common/fn 或 /common/fn）、接口（@get:/user/list 或 'GET /user/list'）、表名（t_user 或 table:t_user）")
+            ],
+            include_dependencies: Annotated[
+                bool,
+                Field(description="目标为脚本时，是否同时返回它自身引用的依赖")
+            ] = False,
+        ) -> Dict[str, Any]:
+            """查询直接依赖方。"""
+            graph = context.dependency_graph
+            try:
+                graph.ensure()
+            except Exception as exc:
+                return error_response("dependency_graph_error", f"构建依赖图失败: {exc}")
+            started = time.perf_counter()
+            key = graph.resolve(target)
+            if key is None:
+                return error_response("invalid_target", f"无法解析依赖目标: {target}")
+            dependents = graph.dependents(key)
+            result: Dict[str, Any] = {
+                "target": graph.describe(key),
+                "total_dependents": len(dependents),
+                "dependents": dependents,
+            }
+            target_id = result["target"].get("id")
+            if include_dependencies and target_id:
+                result["dependencies"] = graph.dependencies(target_id)
+            result["lookup_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            result["graph"] = graph.stats()
+            return result
+
+        @mcp_app.tool(
+            name="impact_of_change",
+            description="分析修改某个函数、接口或数据表会影响哪些脚本：沿依赖图逐层向上查找依赖方的依赖方，按层返回受影响的接口与函数。",
+            tags={"search", "dependency", "impact", "scripts"},
+        )
+        def impact_of_change_tool(
+            target: Annotated[
+                str,
+                Field(description="变更目标，格式同 find_dependents")
+            ],
+            max_depth: Annotated[
+                int,
+                Field(description="最多向上追溯的层数，默认5层")
+            ] = DEFAULT_MAX_DEPTH,
+        ) -> Dict[str, Any]:
+            """分析变更影响范围。"""
+            graph = context.dependency_graph
+            try:
+                graph.ensure()
+            except Exception as exc:
+                return error_response("dependency_graph_error", f"构建依赖图失败: {exc}")
+            started = time.perf_counter()
+            key = graph.resolve(target)
+            if key is None:
+                return error_response("invalid_target", f"无法解析依赖目标: {target}")
+            levels = graph.impact(key, max_depth=max(1, max_depth))
+            affected = [entry for level in levels for entry in level]
+            return {
+                "target": graph.describe(key),
+                "depth": len(levels),
+                "affected_apis": sum(1 for entry in affected if entry["kind"] == "api"),
+                "affected_functions": sum(1 for entry in affected if entry["kind"] == "function"),
+                "levels": levels,
+                "lookup_ms": round((time.perf_counter() - started) * 1000, 3),
+                "graph": graph.stats(),
+            }
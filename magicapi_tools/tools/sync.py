@@ -0,0 +1,167 @@
+"""Magic-API 脚本本地同步 MCP 工具。
+
+把接口/函数脚本镜像到本地目录，本地编辑自动推送、远端修改自动拉取：
+
+- start_script_sync: 拉取脚本到本地目录并开始监听双向变化
+- sync_scripts: 立即执行一次拉取/推送
+- get_sync_status: 查看同步目录、本地修改、冲突与等待推送的文件
+- stop_script_sync: 停止同步（先推送防抖窗口内尚未推送的编辑）
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Annotated, Any, Dict, List, Literal, Optional
+
+from pydantic import Field
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.tools.common import error_response
+from magicapi_tools.utils.script_sync import DEFAULT_DEBOUNCE, SYNC_KINDS, ScriptSyncEngine
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from magicapi_mcp.tool_registry import ToolContext
+
+logger = get_logger('tools.sync')
+
+
+def _resolve(context: "ToolContext", directory: Optional[str]) -> Optional[ScriptSyncEngine]:
+    """按目录查找运行中的同步；未指定目录且只有一个同步时返回该同步。"""
+    if directory:
+        return context.script_syncs.get(os.path.abspath(directory))
+    if len(context.script_syncs) == 1:
+        return next(iter(context.script_syncs.values()))
+    return None
+
+
+class ScriptSyncTools:
+    """脚本本地同步工具模块。"""
+
+    def register_tools(self, mcp_app: "FastMCP", context: "ToolContext") -> None:  # pragma: no cover - 装饰器环境
+        """注册脚本同步相关工具。"""
+
+        @mcp_app.tool(
+            name="start_script_sync",
+            description="把接口/函数脚本拉取到本地目录（<分组路径>/<接口路径>.ms），并开始双向同步：本地编辑防抖后批量推送，远端修改自动拉取，双方都修改时三方合并。",
+            tags={"resource", "sync", "filesystem"},
+            meta={"version": "1.0", "category": "resource"},
+        )
+        def start_script_sync(
+            directory: Annotated[
+                str,
+                Field(description="本地同步目录，不存在时自动创建")
+            ],
+            kinds: Annotated[
+                List[str],
+                Field(description="同步的资源类型，默认 api 与 function")
+            ] = list(SYNC_KINDS),
+            watch: Annotated[
+                bool,
+                Field(description="是否监听本地目录与远端变化；为 false 时只做首次拉取")
+            ] = True,
+            debounce_ms: Annotated[
+                int,
+                Field(description="本地编辑的防抖窗口（毫秒），窗口内的多次编辑合并为一批推送")
+            ] = int(DEFAULT_DEBOUNCE * 1000),
+            max_workers: Annotated[
+                int,
+                Field(description="并发获取详情与保存脚本的线程数")
+            ] = 4,
+        ) -> Dict[str, Any]:
+            root = os.path.abspath(directory)
+            if root in context.script_syncs:
+                return error_response("sync_exists", f"目录已在同步中: {root}")
+            engine = ScriptSyncEngine(
+                context.http_client,
+                root,
+                tree_cache=context.tree_cache,
+                kinds=kinds,
+                max_workers=max_workers,
+                debounce=max(0, debounce_ms) / 1000,
+            )
+            try:
+                initial = engine.start(watch=watch)
+            except Exception as exc:
+                engine.stop()
+                return error_response("sync_failed", f"首次拉取失败: {exc}")
+            if watch:
+                context.script_syncs[root] = engine
+            else:
+                engine.stop()
+            return {"success": True, "directory": root, "watching": engine.watcher if watch else None,
+                    "initial": initial}
+
+        @mcp_app.tool(
+            name="sync_scripts",
+            description="立即同步一次本地目录与远端脚本：pull 拉取远端修改，push 推送本地修改，both 先拉取再推送。",
+            tags={"resource", "sync", "filesystem"},
+            meta={"version": "1.0", "category": "resource"},
+        )
+        def sync_scripts(
+            directory: Annotated[
+                Optional[str],
+                Field(description="同步目录；只有一个运行中的同步时可省略，目录未在同步时执行一次性同步")
+            ] = None,
+            direction: Annotated[
+                Literal["both", "pull", "push"],
+                Field(description="同步方向")
+            ] = "both",
+        ) -> Dict[str, Any]:
+            engine = _resolve(context, directory)
+            transient = engine is None
+            if transient:
+                if not directory:
+                    return error_response("directory_required", "未指定目录，且没有唯一的运行中同步")
+                engine = ScriptSyncEngine(context.http_client, directory, tree_cache=context.tree_cache)
+            try:
+                if direction == "pull":
+                    result = {"pull": engine.pull()}
+                elif direction == "push":
+                    result = {"push": engine.push()}
+                else:
+                    result = engine.sync()
+            except Exception as exc:
+                return error_response("sync_failed", str(exc))
+            finally:
+                if transient:
+                    engine.stop()
+            return {"success": True, "directory": engine.root, **result}
+
+        @mcp_app.tool(
+            name="get_sync_status",
+            description="查看脚本同步状态：监听方式、本地已修改/冲突/缺失的文件、等待推送的文件以及最近一次拉取与推送的统计。",
+            tags={"resource", "sync", "filesystem"},
+            meta={"version": "1.0", "category": "resource"},
+        )
+        def get_sync_status(
+            directory: Annotated[
+                Optional[str],
+                Field(description="同步目录，省略时返回所有运行中的同步")
+            ] = None,
+        ) -> Dict[str, Any]:
+            if directory:
+                engine = _resolve(context, directory)
+                if engine is None:
+                    return error_response("sync_not_found", f"目录未在同步中: {directory}")
+                return {"success": True, "syncs": [engine.status()]}
+            return {"success": True, "syncs": [engine.status() for engine in context.script_syncs.values()]}
+
+        @mcp_app.tool(
+            name="stop_script_sync",
+            description="停止脚本同步，停止前推送防抖窗口内尚未推送的编辑。",
+            tags={"resource", "sync", "filesystem"},
+            meta={"version": "1.0", "category": "resource"},
+        )
+        def stop_script_sync(
+            directory: Annotated[
+                Optional[str],
+                Field(description="同步目录；只有一个运行中的同步时可省略")
+            ] = None,
+        ) -> Dict[str, Any]:
+            engine = _resolve(context, directory)
+            if engine is None:
+                return error_response("sync_not_found", f"目录未在同步中: {directory or '(未指定)'}")
+            context.script_syncs.pop(engine.root, None)
+            engine.stop()
+            return {"success": True, "directory": engine.root, "status": engine.status()}
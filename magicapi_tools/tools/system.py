@@ -8,13 +8,20 @@
 
 主要工具：
 - get_assistant_metadata: 获取Magic-API MCP Server的完整元信息
+- get_http_diagnostics: 获取 HTTP 客户端诊断信息（请求合并命中/未命中计数等）
+- get_server_metrics: 获取运行时指标（工具耗时、上游请求数、WebSocket 消息速率、缓存命中率）
+- get_last_traces: 获取最近工具调用的调用链追踪，按阶段拆解耗时
 """
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Annotated, Any, Dict, Optional
 
+from pydantic import Field
+
+from magicapi_tools.utils.kb_cache import knowledge_version
 from magicapi_tools.utils.knowledge_base import SYSTEM_PROMPT
+from magicapi_tools.utils.tracing import format_span_tree, stage_breakdown
 
 if TYPE_CHECKING:
     from fastmcp import FastMCP
@@ -37,18 +44,23 @@ class SystemTools:
             return {
                 "system_prompt": SYSTEM_PROMPT,
                 "version": "2.2.0",
+                "knowledge_version": knowledge_version(),
                 "features": [
                     "syntax", "examples", "docs", "best_practices", "pitfalls", "workflow",
                     "resource_tree", "path_to_id", "path_detail", "api_detail",
-                    "find_api_ids_by_path(limit=10)", "find_api_details_by_path(limit=10)", "call",
+                    "find_api_ids_by_path(limit=10)", "find_api_details_by_path(limit=10)", "call", "replay_api_call",
                     "create_group", "create_api", "copy_resource", "move_resource",
                     "delete_resource", "lock_resource", "unlock_resource",
                     "list_resource_groups(limit=50,search)", "export_resource_tree", "get_resource_stats",
+                    "export_workspace", "import_workspace",
+                    "start_script_sync", "sync_scripts", "get_sync_status", "stop_script_sync",
                     "list_backups(limit=10)", "get_backup_history", "get_backup_content", "rollback_backup", "create_full_backup",
-                    "search_api_scripts", "search_todo_comments",
+                    "search_api_scripts", "search_todo_comments", "find_dependents", "impact_of_change",
+                    "analyze_script_performance",
                     "set_breakpoint", "remove_breakpoint", "resume_breakpoint", "step_over",
-                    "list_breakpoints", "call_api_with_debug", "execute_debug_session",
+                    "list_breakpoints", "call_api_with_debug", "execute_debug_session", "profile_api_script",
                     "get_debug_status", "clear_all_breakpoints", "websocket_status",
+                    "get_http_diagnostics", "get_server_metrics", "get_last_traces",
                 ],
                 "environment": {
                     "base_url": context.settings.base_url,
@@ -68,3 +80,97 @@ class SystemTools:
                 },
             }
 
+        @mcp_app.tool(
+            name="get_http_diagnostics",
+            description="获取 HTTP 客户端诊断信息，包括并发相同读请求合并（single-flight）的命中/未命中计数、上游调度各优先级的并发与排队深度，以及 MCP 会话上下文池状态。",
+            tags={"diagnostics", "http", "system"},
+            meta={"version": "1.0", "category": "system"},
+        )
+        def http_diagnostics(
+            reset: Annotated[
+                bool,
+                Field(description="读取后是否清零计数器")
+            ] = False,
+        ) -> Dict[str, Any]:
+            diagnostics = context.http_client.diagnostics()
+            if reset and context.http_client.single_flight is not None:
+                context.http_client.single_flight.reset_stats()
+            result: Dict[str, Any] = {"success": True, "http_client": diagnostics}
+            if context.sessions is not None:
+                result["sessions"] = context.sessions.stats()
+            if context.backends.is_multi:
+                result["backends"] = context.backends.snapshot()
+            return result
+
+        @mcp_app.tool(
+            name="get_server_metrics",
+            description="获取服务运行时指标：各工具调用次数/失败数/耗时分位数/每次调用的上游请求数/响应大小，上游端点耗时，WebSocket 消息速率与缓存命中率。HTTP 传输下同样可通过 GET /metrics 以 Prometheus 格式抓取。",
+            tags={"diagnostics", "metrics", "system"},
+            meta={"version": "1.0", "category": "system"},
+        )
+        def server_metrics(
+            format: Annotated[
+                str,
+                Field(description="输出格式：json（摘要）或 prometheus（Prometheus 文本格式）")
+            ] = "json",
+            reset: Annotated[
+                bool,
+                Field(description="读取后是否清空已采集的指标")
+            ] = False,
+        ) -> Dict[str, Any]:
+            registry = context.metrics
+            if format == "prometheus":
+                result: Dict[str, Any] = {"success": True, "format": "prometheus", "text": registry.render()}
+            elif format == "json":
+                result = {"success": True, "metrics": registry.snapshot()}
+            else:
+                return {"error": {"code": "invalid_format", "message": f"不支持的格式: {format}，可选 json / prometheus"}}
+            if reset:
+                registry.reset()
+            return result
+
+        @mcp_app.tool(
+            name="get_last_traces",
+            description="获取最近工具调用的调用链追踪，按阶段（服务操作、HTTP 请求、脚本 ID 解析、WebSocket 日志等待、断点轮询等）拆解耗时，用于定位慢调用。",
+            tags={"diagnostics", "tracing", "system"},
+            meta={"version": "1.0", "category": "system"},
+        )
+        def last_traces(
+            limit: Annotated[
+                int,
+                Field(description="返回的 trace 数量（新的在前）")
+            ] = 5,
+            tool: Annotated[
+                Optional[str],
+                Field(description="只返回指定工具的 trace，如 call_magic_api_with_debug")
+            ] = None,
+            min_duration_ms: Annotated[
+                float,
+                Field(description="只返回总耗时不低于该值（毫秒）的 trace")
+            ] = 0.0,
+            include_spans: Annotated[
+                bool,
+                Field(description="是否附带完整 span 列表（属性、偏移、父子关系）")
+            ] = False,
+        ) -> Dict[str, Any]:
+            traces = context.tracer.last_traces(
+                limit=max(1, min(limit, 50)),
+                name=f"tool {tool}" if tool else None,
+                min_duration_ms=min_duration_ms,
+            )
+            items = []
+            for trace in traces:
+                item: Dict[str, Any] = {
+                    "trace_id": trace["trace_id"],
+                    "name": trace["name"],
+                    "start_time": trace["start_time"],
+                    "duration_ms": trace["duration_ms"],
+                    "status": trace["status"],
+                    "span_count": trace["span_count"],
+                    "breakdown": stage_breakdown(trace),
+                    "tree": format_span_tree(trace),
+                }
+                if include_spans:
+                    item["spans"] = trace["spans"]
+                items.append(item)
+            return {"success": True, "enabled": context.tracer.enabled, "count": len(items), "traces": items}
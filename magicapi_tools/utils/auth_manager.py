@@ -0,0 +1,190 @@
+"""Magic-API 认证管理。
+
+HTTP 客户端、资源管理器与 WebSocket 客户端共享同一份令牌状态：
+
+- 每个请求发送前注入当前令牌，不再使用进程启动时固化的令牌；
+- 检测到认证失败（HTTP 401/403 或响应体 ``code`` 为 401/403）时，跨线程串行化一次重新登录，
+  其余线程等待后直接使用新令牌重放请求；
+- 收到 WebSocket ``REFRESH_TOKEN`` 消息时采用服务端下发的新令牌，或主动重新登录；
+- 令牌变化时通知监听器（例如同步给 WebSocket 客户端）。
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, List, MutableMapping, Optional
+
+from magicapi_tools.logging_config import get_logger
+
+logger = get_logger('utils.auth_manager')
+
+AUTH_FAILURE_CODES = frozenset({401, 403})
+TOKEN_HEADER = "Magic-Token"
+ANONYMOUS_TOKEN = "unauthorization"
+# 登录失败后的冷却时间（秒），避免并发请求反复触发失败的登录
+RELOGIN_COOLDOWN = 5.0
+
+TokenListener = Callable[[str], None]
+
+
+class AuthManager:
+    """共享的认证状态与重新登录协调器。
+
+    Args:
+        settings: 应用配置
+        login: 执行登录的函数，成功返回新令牌（可为空字符串表示基于会话），失败返回 ``None``
+    """
+
+    def __init__(self, settings: Any, login: Optional[Callable[[], Optional[str]]] = None) -> None:
+        self.settings = settings
+        self._login = login
+        self.token: str = settings.token or ANONYMOUS_TOKEN
+        self.generation = 0
+        self.relogin_count = 0
+        self.last_login_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._last_failure_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._listeners: List[TokenListener] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.settings.auth_enabled and self.settings.username and self.settings.password)
+
+    def set_login(self, login: Callable[[], Optional[str]]) -> None:
+        self._login = login
+
+    def add_listener(self, listener: TokenListener) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # 请求头
+    # ------------------------------------------------------------------
+    def apply(self, headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+        """向请求头注入当前令牌，统一令牌头的大小写写法。"""
+        existing = None
+        for key in [key for key in headers if key.lower() == TOKEN_HEADER.lower()]:
+            existing = headers.pop(key)
+        if self.settings.auth_enabled or existing is None:
+            headers[TOKEN_HEADER] = self.token
+        else:
+            headers[TOKEN_HEADER] = existing
+        return headers
+
+    # ------------------------------------------------------------------
+    # 失败检测
+    # ------------------------------------------------------------------
+    @staticmethod
+    def is_auth_failure(response: Any, stream: bool = False) -> bool:
+        """判断响应是否为认证失败。
+
+        Args:
+            response: 上游响应
+            stream: 是否为流式请求；流式响应只看状态码，不读取响应体，避免提前下载整个文件
+        """
+        status = getattr(response, "status_code", None)
+        if status in AUTH_FAILURE_CODES:
+            return True
+        if status != 200 or stream:
+            return False
+        headers = getattr(response, "headers", None) or {}
+        if "json" not in headers.get("Content-Type", ""):
+            return False
+        # 认证失败的响应体很小，避免为大响应（如资源树）额外解析一次 JSON
+        length = headers.get("Content-Length")
+        if length is not None and str(length).isdigit():
+            size = int(length)
+        else:
+            size = len(getattr(response, "content", b"") or b"")
+        if size > 1024:
+            return False
+        try:
+            body = response.json()
+        except (ValueError, json.JSONDecodeError):
+            return False
+        return isinstance(body, dict) and body.get("code") in AUTH_FAILURE_CODES
+
+    # ------------------------------------------------------------------
+    # 登录
+    # ------------------------------------------------------------------
+    def login(self) -> bool:
+        """立即登录（初始化时调用）。"""
+        with self._lock:
+            return self._do_login()
+
+    def relogin(self, failed_generation: int) -> bool:
+        """在请求因认证失败后重新登录。
+
+        多个线程同时失败时只有一个线程真正登录；其余线程在锁上等待，
+        发现令牌代次已变化后直接返回，使用新令牌重放请求。
+
+        Args:
+            failed_generation: 失败请求发送时的令牌代次
+        """
+        if not self.enabled or self._login is None:
+            return False
+        with self._lock:
+            if self.generation != failed_generation:
+                return True
+            if self._last_failure_at is not None and time.monotonic() - self._last_failure_at < RELOGIN_COOLDOWN:
+                return False
+            logger.info("检测到认证失效，重新登录 Magic-API")
+            self.relogin_count += 1
+            return self._do_login()
+
+    def handle_refresh_token(self, payload: Any) -> bool:
+        """处理 WebSocket ``REFRESH_TOKEN`` 消息。"""
+        token = None
+        if isinstance(payload, dict):
+            token = payload.get("token") or payload.get("magicToken")
+        elif isinstance(payload, str) and payload.strip() and not payload.strip().startswith(("{", "[")):
+            token = payload.strip()
+
+        if token:
+            with self._lock:
+                self._update_token(str(token))
+            logger.info("已采用 WebSocket 下发的新令牌")
+            return True
+        return self.relogin(self.generation)
+
+    def _do_login(self) -> bool:
+        if self._login is None:
+            return False
+        try:
+            token = self._login()
+        except Exception as exc:  # noqa: BLE001 - 登录失败仅记录
+            token = None
+            self.last_error = str(exc)
+        if token is None:
+            self._last_failure_at = time.monotonic()
+            logger.warning(f"Magic-API 登录失败: {self.last_error or '未知错误'}")
+            return False
+        self.last_error = None
+        self._last_failure_at = None
+        self.last_login_at = time.time()
+        self._update_token(token or self.token)
+        return True
+
+    def _update_token(self, token: str) -> None:
+        self.token = token
+        self.generation += 1
+        for listener in list(self._listeners):
+            try:
+                listener(token)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"令牌监听器异常: {exc}")
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "generation": self.generation,
+            "relogin_count": self.relogin_count,
+            "last_login_at": self.last_login_at,
+            "last_error": self.last_error,
+        }
+
+
+__all__ = ["AuthManager", "TOKEN_HEADER"]
@@ -0,0 +1,364 @@
+"""Magic-Script 脚本依赖图与变更影响分析索引。
+
+一次并发获取全部接口/函数脚本后建立反向索引，回答“谁依赖 X”“改动 X 会影响哪些接口”：
+
+- 导入边：``import '@/common/fn' as fn`` 引用函数，``import '@get:/user/list' as list`` 引用其他接口；
+- 调用边：导入的别名在脚本中被调用（``fn(...)``）；
+- 表引用：``db.table('t_user')`` 以及 SQL 字符串中 ``from`` / ``join`` / ``into`` / ``update`` 后的表名。
+
+依赖目标按键索引（``function:/common/fn``、``api:GET:/user/list``、``table:t_user``），
+查询时再按当前资源树把键解析为文件，因此接口改名、移动分组后无需重建。
+资源树缓存检测到变化时只把变化的文件标记为待更新，下一次查询前并发补拉这些文件的脚本，
+查询本身只做字典查找。
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.tree_cache import TreeChange
+from magicapi_tools.utils.upstream_scheduler import with_priority
+
+logger = get_logger('utils.dependency_graph')
+
+GRAPH_KINDS = ("api", "function")
+DEFAULT_MAX_DEPTH = 5
+
+_IMPORT = re.compile(r"""\bimport\s+(['"])(?P<target>@[^'"]+)\1(?:\s+as\s+(?P<alias>[A-Za-z_$][\w$]*))?""")
+_API_TARGET = re.compile(r"^@(?P<method>[A-Za-z]+):(?P<path>.*)$")
+_DB_TABLE = re.compile(r"""\bdb(?:\.\w+)*\.table\(\s*(['"])`?(?P<table>[\w.]+)`?\1""")
+_STRING = re.compile(r'"""(.*?)"""|"((?:[^"\\\n]|\\.)*)"|\'((?:[^\'\\\n]|\\.)*)\'', re.S)
+_SQL_HINT = re.compile(r"\b(select|insert|update|delete)\b", re.I)
+_SQL_TABLE = re.compile(r"\b(?:from|join|into|update)\s+`?(?P<table>[A-Za-z_][\w.]*)`?", re.I)
+_SQL_KEYWORDS = frozenset({"select", "set", "where", "values", "dual"})
+
+
+def _normalize_path(path: str) -> str:
+    return "/" + "/".join(part for part in path.split("/") if part)
+
+
+def function_key(path: str) -> str:
+    return f"function:{_normalize_path(path)}"
+
+
+def api_key(method: str, path: str) -> str:
+    return f"api:{method.upper()}:{_normalize_path(path)}"
+
+
+def table_key(table: str) -> str:
+    return f"table:{table.lower()}"
+
+
+@dataclass(slots=True)
+class ScriptReferences:
+    """一个脚本引用的依赖：``edges`` 为 ``目标键 -> 边类型集合``。"""
+
+    edges: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def add(self, key: str, kind: str) -> None:
+        self.edges.setdefault(key, set()).add(kind)
+
+
+def import_target_key(target: str) -> str:
+    """把 ``import`` 目标转换为依赖键：``@/a/b`` 为函数，``@get:/a/b`` 为接口。"""
+    match = _API_TARGET.match(target)
+    if match:
+        return api_key(match.group("method"), match.group("path"))
+    return function_key(target[1:])
+
+
+def extract_references(script: str) -> ScriptReferences:
+    """从 Magic-Script 中提取导入、调用与表引用。"""
+    references = ScriptReferences()
+    for match in _IMPORT.finditer(script):
+        key = import_target_key(match.group("target"))
+        references.add(key, "import")
+        alias = match.group("alias")
+        if alias and re.search(rf"(?<![\w$.]){re.escape(alias)}\s*\(", script[match.end():]):
+            references.add(key, "call")
+
+    for match in _DB_TABLE.finditer(script):
+        references.add(table_key(match.group("table")), "table")
+    for match in _STRING.finditer(script):
+        literal = next(group for group in match.groups() if group is not None)
+        if not _SQL_HINT.search(literal):
+            continue
+        for table in _SQL_TABLE.finditer(literal):
+            name = table.group("table")
+            if name.lower() not in _SQL_KEYWORDS:
+                references.add(table_key(name), "table")
+    return references
+
+
+@dataclass(slots=True)
+class GraphNode:
+    """依赖图中的脚本文件。"""
+
+    id: str
+    kind: str
+    key: str
+    name: str
+    path: str
+    method: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"id": self.id, "kind": self.kind, "name": self.name, "path": self.path}
+        if self.method:
+            data["method"] = self.method
+        return data
+
+
+class DependencyGraph:
+    """脚本依赖图。
+
+    Args:
+        http_client: ``MagicAPIHTTPClient``
+        tree_cache: 共享资源树缓存；提供时监听其变更事件做增量更新
+        max_workers: 并发获取脚本的线程数
+    """
+
+    def __init__(self, http_client: Any, tree_cache: Any = None, max_workers: int = 8) -> None:
+        self.http_client = http_client
+        self.tree_cache = tree_cache
+        self.max_workers = max(1, max_workers)
+        self.built_at: Optional[float] = None
+        self.build_ms: Optional[float] = None
+
+        self._nodes: Dict[str, GraphNode] = {}
+        self._by_key: Dict[str, str] = {}
+        self._references: Dict[str, ScriptReferences] = {}
+        # 目标键 -> {依赖方文件 ID -> 边类型集合}
+        self._reverse: Dict[str, Dict[str, Set[str]]] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self._listening = False
+
+    # ------------------------------------------------------------------
+    # 构建与增量更新
+    # ------------------------------------------------------------------
+    def ensure(self) -> None:
+        """首次调用时全量构建，之后只补拉资源树变化过的文件。"""
+        with self._lock:
+            if self.tree_cache is not None and not self._listening:
+                # 全量构建前开始监听，构建期间的变化也会在下一次查询时补拉
+                self.tree_cache.add_listener(self._on_tree_change)
+                self._listening = True
+            tree = self._fetch_tree()
+            if self.built_at is None:
+                started = time.perf_counter()
+                self._dirty.clear()
+                self._index_nodes(tree)
+                self._load(list(self._nodes))
+                self.built_at = time.time()
+                self.build_ms = round((time.perf_counter() - started) * 1000, 2)
+                logger.info(f"依赖图构建完成: {len(self._nodes)} 个脚本, 耗时 {self.build_ms}ms")
+            elif self._dirty:
+                self._index_nodes(tree)
+                dirty, self._dirty = self._dirty, set()
+                for file_id in dirty:
+                    self._drop(file_id)
+                self._load([file_id for file_id in dirty if file_id in self._nodes])
+
+    def invalidate(self) -> None:
+        """丢弃索引，下一次查询时全量重建。"""
+        with self._lock:
+            self.built_at = None
+            self._references.clear()
+            self._reverse.clear()
+            self._dirty.clear()
+
+    def _on_tree_change(self, change: TreeChange) -> None:
+        if change.changed:
+            with self._lock:
+                self._dirty.update(change.changed_ids)
+
+    def _fetch_tree(self) -> Mapping[str, Any]:
+        if self.tree_cache is not None:
+            ok, tree = self.tree_cache.get_tree()
+        else:
+            ok, tree = self.http_client.resource_tree()
+        if not ok:
+            raise RuntimeError(f"获取资源树失败: {tree}")
+        return tree or {}
+
+    def _index_nodes(self, tree: Mapping[str, Any]) -> None:
+        nodes: Dict[str, GraphNode] = {}
+        for kind in GRAPH_KINDS:
+            section = tree.get(kind)
+            if not isinstance(section, Mapping):
+                continue
+            stack = list(section.get("children") or [])
+            while stack:
+                child = stack.pop()
+                info = child.get("node") or {}
+                stack.extend(child.get("children") or [])
+                if not info.get("id") or "groupId" not in info:
+                    continue
+                path = _normalize_path(str(info.get("full_path") or info.get("path") or ""))
+                method = str(info.get("method") or "").upper() or None
+                key = api_key(method or "GET", path) if kind == "api" else function_key(path)
+                nodes[str(info["id"])] = GraphNode(str(info["id"]), kind, key, str(info.get("name") or ""), path, method)
+        self._nodes = nodes
+        self._by_key = {node.key: node.id for node in nodes.values()}
+        for file_id in [file_id for file_id in self._references if file_id not in nodes]:
+            self._drop(file_id)
+
+    def _load(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ids))) as pool:
+            results = list(pool.map(with_priority("bulk", self.http_client.api_detail), ids))
+        for file_id, (ok, detail) in zip(ids, results):
+            if not ok or not isinstance(detail, Mapping):
+                logger.warning(f"获取脚本失败，依赖图跳过: {file_id}")
+                continue
+            references = extract_references(str(detail.get("script") or ""))
+            self._references[file_id] = references
+            for key, kinds in references.edges.items():
+                self._reverse.setdefault(key, {})[file_id] = set(kinds)
+
+    def _drop(self, file_id: str) -> None:
+        references = self._references.pop(file_id, None)
+        if references is None:
+            return
+        for key in references.edges:
+            dependents = self._reverse.get(key)
+            if dependents is not None:
+                dependents.pop(file_id, None)
+                if not dependents:
+                    del self._reverse[key]
+
+    # ------------------------------------------------------------------
+    # 查询（与增量更新共用锁：更新会原地修改索引，未加锁的遍历可能遇到字典大小变化）
+    # ------------------------------------------------------------------
+    def resolve(self, target: str) -> Optional[str]:
+        """把用户输入解析为依赖键。
+
+        支持文件 ID、``@/common/fn`` 或 ``/common/fn``（函数）、``@get:/user/list`` 或 ``GET /user/list``（接口）、
+        ``table:t_user`` 或裸表名。
+        """
+        target = target.strip()
+        with self._lock:
+            if target in self._nodes:
+                return self._nodes[target].key
+            if target.startswith(("function:", "api:", "table:")):
+                return target if not target.startswith("table:") else table_key(target[6:])
+            if target.startswith("@"):
+                return import_target_key(target)
+            method, _, path = target.partition(" ")
+            if path and method.isalpha():
+                return api_key(method, path.strip())
+            if target.startswith("/"):
+                key = function_key(target)
+                if key in self._by_key or key in self._reverse:
+                    return key
+                matches = [node.key for node in self._nodes.values() if node.kind == "api" and node.path == _normalize_path(target)]
+                return matches[0] if len(matches) == 1 else key
+            return table_key(target)
+
+    def describe(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            file_id = self._by_key.get(key)
+            if file_id is not None:
+                return {"key": key, **self._nodes[file_id].to_dict()}
+            return {"key": key, "kind": key.split(":", 1)[0], "exists": key.startswith("table:") and key in self._reverse}
+
+    def dependents(self, key: str) -> List[Dict[str, Any]]:
+        """直接依赖 ``key`` 的脚本。"""
+        with self._lock:
+            result = []
+            for file_id, kinds in sorted(self._reverse.get(key, {}).items()):
+                node = self._nodes.get(file_id)
+                if node is not None:
+                    result.append({**node.to_dict(), "edges": sorted(kinds)})
+            return result
+
+    def dependencies(self, file_id: str) -> List[Dict[str, Any]]:
+        """脚本 ``file_id`` 引用的依赖。"""
+        with self._lock:
+            references = self._references.get(file_id)
+            if references is None:
+                return []
+            return [{**self.describe(key), "edges": sorted(kinds)} for key, kinds in sorted(references.edges.items())]
+
+    def impact(self, key: str, max_depth: int = DEFAULT_MAX_DEPTH) -> List[List[Dict[str, Any]]]:
+        """按层返回改动 ``key`` 后受影响的脚本（依赖方的依赖方……），最多 ``max_depth`` 层。"""
+        with self._lock:
+            levels: List[List[Dict[str, Any]]] = []
+            seen: Set[str] = {self._by_key[key]} if key in self._by_key else set()
+            frontier = deque([key])
+            while frontier and len(levels) < max_depth:
+                level: List[Dict[str, Any]] = []
+                next_frontier: deque = deque()
+                for current in frontier:
+                    for entry in self.dependents(current):
+                        if entry["id"] in seen:
+                            continue
+                        seen.add(entry["id"])
+                        level.append({**entry, "via": current})
+                        next_frontier.append(self._nodes[entry["id"]].key)
+                if not level:
+                    break
+                levels.append(level)
+                frontier = next_frontier
+            return levels
+
+    def affected_ids(self, file_ids: Iterable[str]) -> Optional[Set[str]]:
+        """返回这些脚本及（逐层）依赖它们的全部脚本 ID。
+
+        依赖图尚未构建或正在构建时无法确定，返回 ``None``，由调用方按全部受影响处理。
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            if self.built_at is None:
+                return None
+            result = {str(file_id) for file_id in file_ids}
+            frontier = [self._nodes[file_id].key for file_id in result if file_id in self._nodes]
+            while frontier:
+                for dependent in self._reverse.get(frontier.pop(), {}):
+                    node = self._nodes.get(dependent)
+                    if dependent not in result:
+                        result.add(dependent)
+                        if node is not None:
+                            frontier.append(node.key)
+            return result
+        finally:
+            self._lock.release()
+
+    def tables(self) -> Dict[str, int]:
+        """已索引的表及引用它的脚本数。"""
+        with self._lock:
+            return {key[6:]: len(dependents) for key, dependents in sorted(self._reverse.items()) if key.startswith("table:")}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "scripts": len(self._nodes),
+                "indexed": len(self._references),
+                "edges": sum(len(dependents) for dependents in self._reverse.values()),
+                "targets": len(self._reverse),
+                "tables": sum(1 for key in self._reverse if key.startswith("table:")),
+                "pending": len(self._dirty),
+                "built_at": self.built_at,
+                "build_ms": self.build_ms,
+            }
+
+
+__all__ = [
+    "DependencyGraph",
+    "GraphNode",
+    "ScriptReferences",
+    "api_key",
+    "extract_references",
+    "function_key",
+    "import_target_key",
+    "table_key",
+]
@@ -3,13 +3,21 @@
 from __future__ import annotations
 
 import json
+import time
 import uuid
+from contextlib import nullcontext
 from typing import Any, Dict, Mapping, MutableMapping, Optional
 
 import requests
 
 from magicapi_mcp.settings import MagicAPISettings, DEFAULT_SETTINGS
 from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.auth_manager import AuthManager
+from magicapi_tools.utils.metrics import metrics, normalize_endpoint
+from magicapi_tools.utils.resilience import IDEMPOTENT_METHODS, ResiliencePolicy
+from magicapi_tools.utils.single_flight import SingleFlight, request_key
+from magicapi_tools.utils.tracing import tracer
+from magicapi_tools.utils.upstream_scheduler import UpstreamScheduler, current_priority
 
 # 获取HTTP客户端的logger
 logger = get_logger('utils.http_client')
@@ -23,6 +31,16 @@ def _default_headers() -> dict[str, str]:
     }
 
 
+def _response_size(response: Any, stream: bool) -> Optional[int]:
+    """响应体大小；流式响应只读取 ``Content-Length``，不触发下载。"""
+    if not stream:
+        content = getattr(response, "content", None)
+        if isinstance(content, (bytes, bytearray)):
+            return len(content)
+    length = (getattr(response, "headers", None) or {}).get("Content-Length")
+    return int(length) if length and str(length).isdigit() else None
+
+
 class MagicAPIHTTPClient:
     """简化 Magic-API 调用的 HTTP 客户端。"""
 
@@ -32,31 +50,180 @@ class MagicAPIHTTPClient:
         self.session = requests.Session()
         self.session.headers.update(_default_headers())
         self.settings.inject_auth(self.session.headers)
-
-
-        if self.settings.auth_enabled and self.settings.username and self.settings.password:
+        # 合并并发的相同幂等读请求
+        self.single_flight = SingleFlight() if self.settings.http_single_flight else None
+        # 重试、熔断与自适应超时策略
+        self.resilience = ResiliencePolicy.from_settings(self.settings)
+        # 按优先级分配上游并发槽位，避免批量任务挤占交互式调试请求
+        self.scheduler = UpstreamScheduler.from_settings(self.settings)
+        # 共享认证状态：令牌注入、认证失效后的串行化重新登录
+        self.auth = AuthManager(self.settings, login=self._login_request)
+
+        if self.auth.enabled:
             self._login()
 
     def _login(self) -> bool:
+        return self.auth.login()
+
+    def _login_request(self) -> Optional[str]:
+        """执行登录请求，成功返回令牌（基于会话时为空字符串），失败返回 ``None``。"""
         payload = {
             "username": self.settings.username,
             "password": self.settings.password,
         }
         try:
-            response = self.session.post(
+            response = self._send(
+                "POST",
                 f"{self.settings.base_url}/magic/web/login",
+                idempotent=False,
+                authenticate=False,
+                priority="interactive",
                 json=payload,
-                timeout=self.settings.timeout_seconds,
             )
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                except json.JSONDecodeError:
-                    return False
-                return data.get("code") == 1
-            return False
-        except requests.RequestException:
-            return False
+            if response.status_code != 200:
+                return None
+            try:
+                data = response.json()
+            except json.JSONDecodeError:
+                return None
+            if data.get("code") != 1:
+                return None
+            token = response.headers.get("magic-token")
+            if not token and isinstance(data.get("data"), str):
+                token = data["data"]
+            return token or ""
+        except requests.RequestException as exc:
+            logger.warning(f"登录请求异常: {exc}")
+            return None
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        coalesce: bool = False,
+        idempotent: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        authenticate: bool = True,
+        priority: Optional[str] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """在弹性策略与认证管理下发送请求。
+
+        ``coalesce=True`` 的幂等读请求会与并发的相同请求共享一次响应（含重试过程）；
+        ``timeout`` 为空时使用按端点族计算的自适应超时；
+        认证失效时串行化重新登录，幂等请求使用新令牌重放；
+        每次网络发送前按 ``priority``（默认取上下文优先级，带断点的调试请求为 interactive）排队占用上游槽位。
+        """
+        if idempotent is None and coalesce:
+            idempotent = True
+        replayable = idempotent if idempotent is not None else method.upper() in IDEMPOTENT_METHODS
+        base_headers = kwargs.pop("headers", None)
+        if priority is None:
+            priority = current_priority()
+        if priority is None:
+            debugging = bool((base_headers or {}).get("Magic-Request-Breakpoints"))
+            priority = "interactive" if debugging else "read"
+
+        def attempt() -> requests.Response:
+            # 每次发送都重新注入令牌，确保重放时使用最新令牌
+            headers = self.auth.apply(dict(base_headers or {}))
+            return self.resilience.execute(
+                method,
+                url,
+                lambda effective_timeout: self._scheduled_request(
+                    priority, method, url, timeout=effective_timeout, headers=headers, **kwargs
+                ),
+                idempotent=idempotent,
+                timeout=timeout,
+            )
+
+        def execute() -> requests.Response:
+            generation = self.auth.generation
+            response = attempt()
+            # 仅检测 Magic-API 管理端点；业务接口自身返回的 401 与编辑器令牌无关
+            if (authenticate and self.auth.enabled and "/magic/web/" in url
+                    and self.auth.is_auth_failure(response, bool(kwargs.get("stream")))):
+                if self.auth.relogin(generation) and replayable:
+                    logger.info(f"重新登录成功，重放请求: {method} {url}")
+                    response = attempt()
+            return response
+
+        if coalesce and self.single_flight is not None:
+            key = request_key(method, url, kwargs.get("params"), kwargs.get("json", kwargs.get("data")))
+            return self.single_flight.do(key, execute)
+        return execute()
+
+    def _scheduled_request(self, priority: str, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """占用上游槽位后发送（仅包住单次发送，重试退避期间不占用）。"""
+        slot = self.scheduler.slot(priority) if self.scheduler is not None else nullcontext()
+        with slot:
+            return self._timed_request(method, url, **kwargs)
+
+    def _timed_request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """发送单次网络请求并记录指标（每次重试单独计数）。"""
+        endpoint = normalize_endpoint(url)
+        with tracer.span(f"http {method} {endpoint}", **{"http.method": method, "http.url": url}) as span:
+            if span.traceparent:
+                # 向上游传播 W3C trace 上下文
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), "traceparent": span.traceparent}
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                metrics.record_http_request(method, url, "error", time.perf_counter() - started)
+                raise
+            size = _response_size(response, bool(kwargs.get("stream")))
+            metrics.record_http_request(method, url, str(response.status_code), time.perf_counter() - started, size)
+            span.set_attribute("http.status_code", response.status_code)
+            if size is not None:
+                span.set_attribute("http.response_bytes", size)
+            if response.status_code >= 500:
+                span.record_error(f"HTTP {response.status_code}")
+        return response
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        idempotent: Optional[bool] = None,
+        coalesce: bool = False,
+        timeout: Optional[float] = None,
+        priority: Optional[str] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """发送原始请求并返回 ``requests.Response``，供需要自行处理响应（表单、纯文本）的服务与工具使用。
+
+        Args:
+            method: HTTP 方法
+            path: 以 ``/`` 开头的路径或完整 URL
+            idempotent: 是否允许重试，默认 GET/HEAD/OPTIONS 允许
+            coalesce: 是否合并并发的相同请求
+            timeout: 显式超时，默认使用自适应超时
+            priority: 上游优先级类别（interactive/read/bulk），默认取上下文优先级
+
+        Raises:
+            requests.RequestException: 网络异常或熔断（``CircuitOpenError``）
+        """
+        url = path if path.startswith(("http://", "https://")) else f"{self.settings.base_url}{path}"
+        return self._send(
+            method.upper(), url, coalesce=coalesce, idempotent=idempotent, timeout=timeout, priority=priority, **kwargs
+        )
+
+    def diagnostics(self) -> Dict[str, Any]:
+        """返回 HTTP 客户端诊断信息。"""
+        single_flight: Dict[str, Any] = {"enabled": self.single_flight is not None}
+        if self.single_flight is not None:
+            single_flight.update(self.single_flight.stats())
+        return {
+            "client_id": self.client_id,
+            "base_url": self.settings.base_url,
+            "single_flight": single_flight,
+            "resilience": self.resilience.snapshot(),
+            "auth": self.auth.snapshot(),
+            "scheduler": self.scheduler.snapshot() if self.scheduler is not None else {"enabled": False},
+        }
 
     def _build_full_paths(self, tree_data: Dict[str, Any]) -> Dict[str, Any]:
         """为资源树中的每个节点构建完整路径"""
@@ -113,7 +280,7 @@ class MagicAPIHTTPClient:
         logger.debug(f"HTTP请求: POST {url}")
 
         try:
-            response = self.session.post(url, timeout=self.settings.timeout_seconds)
+            response = self._send("POST", url, coalesce=True)
             logger.debug(f"HTTP响应: {response.status_code}, 耗时: {response.elapsed.total_seconds()}s")
 
             if response.status_code != 200:
@@ -162,7 +329,7 @@ class MagicAPIHTTPClient:
         logger.debug(f"  文件ID: {file_id}")
 
         try:
-            response = self.session.get(url, timeout=self.settings.timeout_seconds)
+            response = self._send("GET", url, coalesce=True)
             logger.debug(f"HTTP响应: {response.status_code}, 耗时: {response.elapsed.total_seconds()}s")
 
             if response.status_code != 200:
@@ -269,8 +436,8 @@ class MagicAPIHTTPClient:
             if key not in request_headers:
                 request_headers[key] = value
 
+        # Magic-Token 由认证管理器在发送时注入当前令牌
         self.settings.inject_auth(request_headers)
-        request_headers.setdefault("Magic-Token", self.settings.token or "unauthorization")
         if "Magic-Request-Breakpoints" in request_headers:
             request_headers.setdefault("magic-request-breakpoints", request_headers["Magic-Request-Breakpoints"])
 
@@ -279,7 +446,10 @@ class MagicAPIHTTPClient:
         request_kwargs: dict[str, Any] = {
             "params": params,
             "headers": request_headers,
+            # 业务接口调用使用显式超时：不做自适应，且调试长等待超时不计入熔断
             "timeout": timeout or self.settings.timeout_seconds,
+            # 业务接口可能有副作用，且调试请求带断点头，均不自动重试
+            "idempotent": False,
         }
 
         if isinstance(data, (dict, list)):
@@ -290,7 +460,7 @@ class MagicAPIHTTPClient:
             request_kwargs["data"] = json.dumps(data)
 
         try:
-            response = self.session.request(method, url, **request_kwargs)
+            response = self._send(method, url, **request_kwargs)
             logger.debug(f"HTTP响应: {response.status_code}, 耗时: {response.elapsed.total_seconds()}s")
 
             content_type = response.headers.get("Content-Type", "")
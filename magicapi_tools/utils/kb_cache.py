@@ -0,0 +1,145 @@
+"""静态知识库响应的进程内缓存与内容版本。
+
+语法规则、最佳实践、文档等工具的结果完全由模块级知识常量决定，智能体在每个任务开始时都会调用，
+每次调用重新组装同样的字典没有意义：
+
+- ``knowledge_version()``：全部知识常量的内容哈希，进程内只计算一次；
+- ``knowledge_cache``：按「工具名 + 参数 + 知识版本」缓存组装好的响应（LRU，有上限）；
+- ``memoized_knowledge(name)``：工具装饰器。字典响应附带 ``knowledge_version`` 字段；
+  调用方传入 ``known_version`` 且与当前版本一致时只返回 ``not_modified``，无需重新传输内容。
+
+缓存的响应对象会被多次返回，调用方不得修改。
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.metrics import metrics
+
+logger = get_logger('utils.kb_cache')
+
+DEFAULT_KNOWLEDGE_CACHE_SIZE = 256
+
+_version_lock = threading.Lock()
+_version: Optional[str] = None
+
+
+def _knowledge_sources() -> Tuple[Any, ...]:
+    from magicapi_tools.utils.kb_config import CONFIG_KNOWLEDGE
+    from magicapi_tools.utils.kb_examples import EXAMPLES_KNOWLEDGE
+    from magicapi_tools.utils.kb_extensions import EXTENSIONS_KNOWLEDGE
+    from magicapi_tools.utils.kb_functions import FUNCTIONS_KNOWLEDGE
+    from magicapi_tools.utils.kb_modules import MODULES_KNOWLEDGE
+    from magicapi_tools.utils.kb_plugins import PLUGINS_KNOWLEDGE
+    from magicapi_tools.utils.kb_practices import PRACTICES_KNOWLEDGE
+    from magicapi_tools.utils.kb_syntax import SYNTAX_KNOWLEDGE
+    from magicapi_tools.utils.kb_web_docs import get_web_docs_knowledge
+
+    return (
+        SYNTAX_KNOWLEDGE, MODULES_KNOWLEDGE, FUNCTIONS_KNOWLEDGE, EXTENSIONS_KNOWLEDGE,
+        CONFIG_KNOWLEDGE, PLUGINS_KNOWLEDGE, PRACTICES_KNOWLEDGE, EXAMPLES_KNOWLEDGE,
+        get_web_docs_knowledge(),
+    )
+
+
+def knowledge_version() -> str:
+    """知识库内容哈希（16 位十六进制），知识常量在进程内不变，只计算一次。"""
+    global _version
+    if _version is None:
+        with _version_lock:
+            if _version is None:
+                payload = json.dumps(_knowledge_sources(), sort_keys=True, ensure_ascii=False, default=str)
+                _version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+                logger.debug(f"知识库版本: {_version}")
+    return _version
+
+
+class KnowledgeCache:
+    """线程安全的 LRU 响应缓存。"""
+
+    def __init__(self, maxsize: int = DEFAULT_KNOWLEDGE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any],
+                     cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                metrics.record_cache("knowledge", True)
+                return self._entries[key]
+        metrics.record_cache("knowledge", False)
+        value = builder()
+        if cacheable is not None and not cacheable(value):
+            return value
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+knowledge_cache = KnowledgeCache()
+
+
+def _freeze(value: Any) -> Hashable:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _is_cacheable(result: Any) -> bool:
+    return not (isinstance(result, dict) and "error" in result)
+
+
+def memoized_knowledge(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """静态知识工具装饰器：缓存响应并附带 ``knowledge_version``。
+
+    被装饰的工具可声明 ``known_version`` 参数（供 MCP 生成参数说明），函数体无需使用它。
+    错误响应不缓存。
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            known = kwargs.pop("known_version", None)
+            version = knowledge_version()
+            if known and known == version:
+                return {"knowledge_version": version, "not_modified": True}
+
+            def build() -> Any:
+                result = fn(*args, **kwargs)
+                if isinstance(result, dict) and _is_cacheable(result):
+                    result = {**result, "knowledge_version": version}
+                return result
+
+            key = (name, version, _freeze(args), _freeze(kwargs))
+            return knowledge_cache.get_or_build(key, build, cacheable=_is_cacheable)
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "DEFAULT_KNOWLEDGE_CACHE_SIZE",
+    "KnowledgeCache",
+    "knowledge_cache",
+    "knowledge_version",
+    "memoized_knowledge",
+]
@@ -0,0 +1,479 @@
+"""Magic-API 接口压测。
+
+以固定并发反复调用同一个接口，统计吞吐量、错误率、延迟分位数与响应体大小分布：
+
+- 并发工作线程按 ``ramp_up_seconds`` 均匀启动，可按持续时间或总请求数停止；
+- 参数、请求体与请求头支持模板占位符，每次请求单独渲染；
+- 压测使用独立的连接池（大小与并发数一致），不经过重试与熔断，测得的是接口本身的表现；
+- 启用上游调度时每次发送都按 ``bulk`` 类别排队，压测不会挤占交互调试请求；实际并发受 ``bulk``
+  并发上限约束，报告中的延迟包含排队时间（见 ``scheduler`` 字段）；
+- 报告可保存为基线，修改脚本后再次压测时与基线比较并标记性能回退。
+
+模板占位符::
+
+    {{seq}}             全局请求序号（从 0 开始）
+    {{worker}}          工作线程序号
+    {{uuid}}            随机 UUID
+    {{timestamp}}       毫秒时间戳
+    {{random:1:100}}    闭区间内的随机整数
+    {{choice:a|b|c}}    随机选取一项
+
+字符串恰好是单个数值占位符时渲染为整数，其余情况按字符串替换。
+``params`` / ``data`` 也可以是列表，每次请求按序号轮换使用。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from magicapi_tools.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+
+logger = get_logger('utils.load_test')
+
+# 压测请求在上游调度中的优先级类别
+LOAD_TEST_PRIORITY = "bulk"
+
+MAX_CONCURRENCY = 200
+MAX_DURATION_SECONDS = 600.0
+DEFAULT_DURATION_SECONDS = 10.0
+DEFAULT_REGRESSION_TOLERANCE = 0.2
+# 延迟直方图桶上界（毫秒）
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MAX_ERROR_SAMPLES = 5
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([a-z_]+)(?::([^}]*))?\s*\}\}")
+
+
+@dataclass(slots=True)
+class LoadTestConfig:
+    """压测配置。"""
+
+    method: str
+    path: str
+    concurrency: int = 10
+    duration_seconds: Optional[float] = None
+    total_requests: Optional[int] = None
+    ramp_up_seconds: float = 0.0
+    params: Any = None
+    data: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    timeout_seconds: float = 30.0
+
+    def validate(self) -> List[str]:
+        errors: List[str] = []
+        if not self.path:
+            errors.append("path 不能为空")
+        if not 1 <= self.concurrency <= MAX_CONCURRENCY:
+            errors.append(f"concurrency 取值范围为 1-{MAX_CONCURRENCY}")
+        if self.duration_seconds is not None and not 0 < self.duration_seconds <= MAX_DURATION_SECONDS:
+            errors.append(f"duration_seconds 取值范围为 (0, {MAX_DURATION_SECONDS:g}]")
+        if self.total_requests is not None and self.total_requests < 1:
+            errors.append("total_requests 必须大于 0")
+        if self.ramp_up_seconds < 0:
+            errors.append("ramp_up_seconds 不能为负数")
+        for name in ("params", "data", "headers"):
+            errors.extend(f"{name}: {error}" for error in template_errors(getattr(self, name)))
+        return errors
+
+    @property
+    def deadline_seconds(self) -> float:
+        """压测时长上限；只指定请求数时不限时长（仍受最大时长保护）。"""
+        if self.duration_seconds is not None:
+            return self.duration_seconds
+        if self.total_requests is not None:
+            return MAX_DURATION_SECONDS
+        return DEFAULT_DURATION_SECONDS
+
+
+# ----------------------------------------------------------------------
+# 模板渲染
+# ----------------------------------------------------------------------
+def render_template(value: Any, seq: int, worker: int, rng: Optional[random.Random] = None) -> Any:
+    """递归渲染参数模板。"""
+    rng = rng or random
+    if isinstance(value, str):
+        match = _PLACEHOLDER.fullmatch(value.strip())
+        if match and match.group(1) in {"seq", "worker", "random", "timestamp"}:
+            return _placeholder(match.group(1), match.group(2), seq, worker, rng)
+        return _PLACEHOLDER.sub(lambda m: str(_placeholder(m.group(1), m.group(2), seq, worker, rng)), value)
+    if isinstance(value, Mapping):
+        return {key: render_template(item, seq, worker, rng) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render_template(item, seq, worker, rng) for item in value]
+    return value
+
+
+def _placeholder_error(name: str, arg: Optional[str]) -> Optional[str]:
+    """检查单个占位符，返回错误说明，合法时返回 ``None``。"""
+    if name in {"seq", "worker", "uuid", "timestamp"}:
+        return None
+    if name == "random":
+        low, _, high = (arg or "0:100").partition(":")
+        try:
+            low_value, high_value = int(low), int(high or low)
+        except ValueError:
+            return f"{{{{random:{arg}}}}} 的上下限必须为整数"
+        if low_value > high_value:
+            return f"{{{{random:{arg}}}}} 的下限大于上限"
+        return None
+    if name == "choice":
+        return None if arg else "{{choice:...}} 至少需要一个选项"
+    return f"未知的模板占位符: {{{{{name}}}}}"
+
+
+def template_errors(value: Any) -> List[str]:
+    """递归检查模板中的占位符，返回全部错误说明。"""
+    errors: List[str] = []
+    if isinstance(value, str):
+        for match in _PLACEHOLDER.finditer(value):
+            error = _placeholder_error(match.group(1), match.group(2))
+            if error is not None and error not in errors:
+                errors.append(error)
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            errors.extend(error for error in template_errors(item) if error not in errors)
+    elif isinstance(value, list):
+        for item in value:
+            errors.extend(error for error in template_errors(item) if error not in errors)
+    return errors
+
+
+def _placeholder(name: str, arg: Optional[str], seq: int, worker: int, rng: Any) -> Any:
+    if name == "seq":
+        return seq
+    if name == "worker":
+        return worker
+    if name == "uuid":
+        return uuid.uuid4().hex
+    if name == "timestamp":
+        return int(time.time() * 1000)
+    if name == "random":
+        low, _, high = (arg or "0:100").partition(":")
+        return rng.randint(int(low), int(high or low))
+    if name == "choice":
+        return rng.choice((arg or "").split("|"))
+    raise ValueError(f"未知的模板占位符: {name}")
+
+
+def _pick(value: Any, seq: int) -> Any:
+    """列表形式的参数按请求序号轮换。"""
+    if isinstance(value, list) and value and all(isinstance(item, Mapping) for item in value):
+        return value[seq % len(value)]
+    return value
+
+
+# ----------------------------------------------------------------------
+# 统计
+# ----------------------------------------------------------------------
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法计算分位数，``sorted_values`` 需已排序。"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _distribution(values: List[float], digits: int = 2) -> Dict[str, Any]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "min": round(ordered[0], digits),
+        "mean": round(sum(ordered) / len(ordered), digits),
+        "p50": round(percentile(ordered, 50), digits),
+        "p90": round(percentile(ordered, 90), digits),
+        "p99": round(percentile(ordered, 99), digits),
+        "max": round(ordered[-1], digits),
+    }
+
+
+def latency_histogram(latencies_ms: List[float]) -> List[Dict[str, Any]]:
+    """按固定桶统计延迟分布，``le`` 为桶上界（毫秒），最后一个桶为 ``+Inf``。"""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for value in latencies_ms:
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [str(bound) for bound in LATENCY_BUCKETS_MS] + ["+Inf"]
+    return [{"le": label, "count": count} for label, count in zip(labels, counts) if count]
+
+
+class LoadTestStats:
+    """线程安全的压测结果收集器。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies_ms: List[float] = []
+        self.sizes: List[float] = []
+        self.status_codes: Dict[str, int] = {}
+        self.errors = 0
+        self.error_samples: List[Dict[str, Any]] = []
+
+    def record(self, latency_ms: float, status: Optional[int], size: int, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.latencies_ms.append(latency_ms)
+            self.sizes.append(size)
+            key = str(status) if status is not None else "network_error"
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+            if error is not None:
+                self.errors += 1
+                if len(self.error_samples) < MAX_ERROR_SAMPLES:
+                    self.error_samples.append({"status": status, "message": error[:200]})
+
+    @property
+    def completed(self) -> int:
+        return len(self.latencies_ms)
+
+    def progress(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            completed = len(self.latencies_ms)
+            errors = self.errors
+            recent = sorted(self.latencies_ms[-1000:])
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "completed": completed,
+            "errors": errors,
+            "throughput_rps": round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(percentile(recent, 50), 2),
+        }
+
+    def report(self, config: LoadTestConfig, elapsed: float,
+               scheduler: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self.latencies_ms)
+            sizes = list(self.sizes)
+            status_codes = dict(self.status_codes)
+            errors = self.errors
+            samples = list(self.error_samples)
+        completed = len(latencies)
+        latency = _distribution(latencies)
+        latency["histogram"] = latency_histogram(latencies)
+        return {
+            "target": f"{config.method} {config.path}",
+            "config": {
+                "concurrency": config.concurrency,
+                "duration_seconds": config.duration_seconds,
+                "total_requests": config.total_requests,
+                "ramp_up_seconds": config.ramp_up_seconds,
+            },
+            "requests": completed,
+            "errors": errors,
+            "error_rate": round(errors / completed, 4) if completed else 0.0,
+            "duration_seconds": round(elapsed, 3),
+            "throughput_rps": round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency_ms": latency,
+            "response_size_bytes": _distribution(sizes, digits=0),
+            "status_codes": status_codes,
+            "error_samples": samples,
+            "scheduler": scheduler or {"enabled": False},
+        }
+
+
+# ----------------------------------------------------------------------
+# 执行
+# ----------------------------------------------------------------------
+class LoadTestRunner:
+    """按配置执行压测。
+
+    Args:
+        http_client: 提供基础地址、默认请求头与认证令牌的 HTTP 客户端
+        config: 压测配置
+    """
+
+    def __init__(self, http_client: "MagicAPIHTTPClient", config: LoadTestConfig) -> None:
+        self.http_client = http_client
+        self.config = config
+        self.stats = LoadTestStats()
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """提前结束压测（已发出的请求仍会完成）。"""
+        self._stop.set()
+
+    def run(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+            progress_interval: float = 1.0) -> Dict[str, Any]:
+        """执行压测并返回报告，``progress`` 每隔 ``progress_interval`` 秒收到一次进度快照。"""
+        config = self.config
+        session = self._build_session()
+        url_base = self.http_client.settings.base_url
+        path = config.path if config.path.startswith("/") else f"/{config.path}"
+        started = time.monotonic()
+        deadline = started + config.deadline_seconds
+
+        def worker(index: int) -> None:
+            delay = config.ramp_up_seconds * index / config.concurrency
+            if delay and self._stop.wait(delay):
+                return
+            rng = random.Random()
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                seq = self._next_seq()
+                if seq is None:
+                    return
+                self._execute(session, f"{url_base}{path}", seq, index, rng)
+
+        logger.info(f"开始压测 {config.method} {path}: 并发 {config.concurrency}")
+        executor = ThreadPoolExecutor(max_workers=config.concurrency, thread_name_prefix="load-test")
+        futures = [executor.submit(worker, index) for index in range(config.concurrency)]
+        try:
+            while not all(future.done() for future in futures):
+                time.sleep(progress_interval if progress is not None else 0.05)
+                if progress is not None:
+                    progress(self.stats.progress(time.monotonic() - started))
+        finally:
+            self._stop.set()
+            executor.shutdown(wait=True)
+            session.close()
+        for future in futures:
+            future.result()
+
+        report = self.stats.report(config, time.monotonic() - started, self._scheduler_info())
+        logger.info(
+            f"压测完成 {report['target']}: {report['requests']} 次请求, "
+            f"{report['throughput_rps']} req/s, 错误率 {report['error_rate']:.2%}"
+        )
+        return report
+
+    def _scheduler_info(self) -> Dict[str, Any]:
+        scheduler = getattr(self.http_client, "scheduler", None)
+        if scheduler is None:
+            return {"enabled": False}
+        limit = scheduler.snapshot()["classes"][LOAD_TEST_PRIORITY]["concurrency"]
+        return {
+            "enabled": True,
+            "priority": LOAD_TEST_PRIORITY,
+            "effective_concurrency": min(self.config.concurrency, limit),
+            "latency_includes_queueing": True,
+        }
+
+    def _next_seq(self) -> Optional[int]:
+        with self._seq_lock:
+            if self.config.total_requests is not None and self._seq >= self.config.total_requests:
+                return None
+            seq = self._seq
+            self._seq += 1
+            return seq
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.config.concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.http_client.session.headers)
+        self.http_client.auth.apply(session.headers)
+        return session
+
+    def _execute(self, session: requests.Session, url: str, seq: int, worker: int, rng: random.Random) -> None:
+        config = self.config
+        params = render_template(_pick(config.params, seq), seq, worker, rng)
+        data = render_template(_pick(config.data, seq), seq, worker, rng)
+        headers = render_template(config.headers, seq, worker, rng) or None
+        kwargs: Dict[str, Any] = {"params": params, "headers": headers, "timeout": config.timeout_seconds}
+        if isinstance(data, (dict, list)):
+            kwargs["json"] = data
+        elif data is not None:
+            kwargs["data"] = data if isinstance(data, str) else json.dumps(data)
+
+        scheduler = getattr(self.http_client, "scheduler", None)
+        slot = scheduler.slot(LOAD_TEST_PRIORITY) if scheduler is not None else nullcontext()
+        begin = time.perf_counter()
+        try:
+            with slot:
+                response = session.request(config.method, url, **kwargs)
+        except requests.RequestException as exc:
+            self.stats.record((time.perf_counter() - begin) * 1000, None, 0, str(exc))
+            return
+        latency_ms = (time.perf_counter() - begin) * 1000
+        error = None if response.status_code < 400 else f"HTTP {response.status_code}: {response.text[:200]}"
+        self.stats.record(latency_ms, response.status_code, len(response.content), error)
+
+
+def run_load_test(http_client: "MagicAPIHTTPClient", config: LoadTestConfig,
+                  progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  progress_interval: float = 1.0) -> Dict[str, Any]:
+    """执行一次压测并返回报告。"""
+    return LoadTestRunner(http_client, config).run(progress, progress_interval)
+
+
+# ----------------------------------------------------------------------
+# 基线
+# ----------------------------------------------------------------------
+def save_baseline(path: str, report: Mapping[str, Any]) -> str:
+    """把压测报告保存为基线文件，返回绝对路径。"""
+    path = os.path.abspath(os.path.expanduser(path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"saved_at": time.time(), "report": dict(report)}, handle, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(os.path.abspath(os.path.expanduser(path)), encoding="utf-8") as handle:
+        data = json.load(handle)
+    return data.get("report", data)
+
+
+def compare_with_baseline(report: Mapping[str, Any], baseline: Mapping[str, Any],
+                          tolerance: float = DEFAULT_REGRESSION_TOLERANCE) -> Dict[str, Any]:
+    """与基线比较，延迟分位数上升或吞吐量下降超过 ``tolerance``、错误率上升超过 1 个百分点视为回退。"""
+    metrics: Dict[str, Dict[str, Any]] = {}
+    regressions: List[str] = []
+
+    def compare(name: str, current: float, previous: float, higher_is_worse: bool) -> None:
+        change = (current - previous) / previous if previous else 0.0
+        metrics[name] = {"baseline": previous, "current": current, "change_pct": round(change * 100, 2)}
+        worse = change > tolerance if higher_is_worse else change < -tolerance
+        if worse:
+            regressions.append(name)
+
+    for key in ("p50", "p90", "p99"):
+        compare(f"latency_{key}_ms", report["latency_ms"].get(key, 0.0),
+                baseline.get("latency_ms", {}).get(key, 0.0), higher_is_worse=True)
+    compare("throughput_rps", report["throughput_rps"], baseline.get("throughput_rps", 0.0), higher_is_worse=False)
+
+    error_delta = report["error_rate"] - baseline.get("error_rate", 0.0)
+    metrics["error_rate"] = {
+        "baseline": baseline.get("error_rate", 0.0),
+        "current": report["error_rate"],
+        "change_pct": round(error_delta * 100, 2),
+    }
+    if error_delta > 0.01:
+        regressions.append("error_rate")
+
+    return {"tolerance": tolerance, "regressed": bool(regressions), "regressions": regressions, "metrics": metrics}
+
+
+__all__ = [
+    "LoadTestConfig",
+    "LoadTestRunner",
+    "LoadTestStats",
+    "compare_with_baseline",
+    "latency_histogram",
+    "load_baseline",
+    "percentile",
+    "render_template",
+    "run_load_test",
+    "save_baseline",
+    "template_errors",
+]
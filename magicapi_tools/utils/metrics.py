@@ -0,0 +1,376 @@
+"""运行时指标采集。
+
+进程级指标注册表，记录：
+
+- 工具调用：次数（按成功/失败）、耗时直方图、每次调用发出的上游 HTTP 请求数、响应大小；
+- 上游 HTTP 请求：按方法/端点/状态码计数、耗时直方图、响应大小；
+- WebSocket：按消息类型统计的帧数与字节数；
+- 缓存：资源树缓存、请求合并等的命中/未命中计数。
+
+工具调用期间通过 ``tool_scope`` 绑定当前工具（``contextvars``，``asyncio.to_thread`` 中同样可见），
+HTTP 客户端据此把上游请求归属到对应工具。指标可渲染为 Prometheus 文本格式或 OpenMetrics 格式。
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS: Tuple[float, ...] = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 管理端点路径中保留的段（纯字母），其余段（ID、文件名等）归一为 {id}，避免标签基数膨胀
+_STATIC_SEGMENT = re.compile(r"^[A-Za-z][A-Za-z_\-.]*$")
+
+
+@dataclass(slots=True)
+class Histogram:
+    """累积直方图。"""
+
+    buckets: Tuple[float, ...]
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """返回 ``(le, 累积计数)`` 列表，最后一项为 ``+Inf``。"""
+        result: List[Tuple[str, int]] = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            result.append((_format_number(bound), running))
+        result.append(("+Inf", self.count))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶上界估算分位数（落在 +Inf 桶时返回观测到的最大值）。"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            if running >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self, scale: float = 1.0, digits: int = 2) -> Dict[str, Any]:
+        def scaled(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * scale, digits)
+
+        return {
+            "count": self.count,
+            "avg": scaled(self.total / self.count) if self.count else None,
+            "p50": scaled(self.quantile(0.5)),
+            "p90": scaled(self.quantile(0.9)),
+            "p99": scaled(self.quantile(0.99)),
+            "max": scaled(self.max) if self.count else None,
+        }
+
+
+@dataclass(slots=True)
+class ToolScope:
+    """一次工具调用的采集上下文。"""
+
+    tool: str
+    upstream_requests: int = 0
+
+
+_tool_scope: contextvars.ContextVar[Optional[ToolScope]] = contextvars.ContextVar(
+    "magicapi_tool_scope", default=None
+)
+
+
+def current_tool_scope() -> Optional[ToolScope]:
+    """返回当前绑定的工具调用上下文。"""
+    return _tool_scope.get()
+
+
+def normalize_endpoint(url: str) -> str:
+    """把请求 URL 归一为低基数的端点标签。
+
+    ``/magic/web/`` 下的管理端点保留静态段、ID 段替换为 ``{id}``；业务接口统一记为 ``business``。
+    """
+    path = urlsplit(url).path or "/"
+    marker = path.find("/magic/web/")
+    if marker < 0:
+        return "business"
+    segments = path[marker + len("/magic/web/"):].split("/")
+    normalized = [segment if _STATIC_SEGMENT.match(segment) else "{id}" for segment in segments if segment]
+    return "/magic/web/" + "/".join(normalized)
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+@dataclass(slots=True)
+class _Family:
+    name: str
+    kind: str
+    help: str
+    label_names: Tuple[str, ...]
+    buckets: Tuple[float, ...] = ()
+    series: Dict[Tuple[str, ...], Any] = field(default_factory=dict)
+
+
+class MetricsRegistry:
+    """线程安全的进程级指标注册表。"""
+
+    def __init__(self) -> None:
+        self.enabled = True
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+        self._define_defaults()
+
+    def _define_defaults(self) -> None:
+        self.define("magicapi_tool_calls_total", "counter", "MCP 工具调用次数", ("tool", "status"))
+        self.define("magicapi_tool_duration_seconds", "histogram", "MCP 工具调用耗时", ("tool",), LATENCY_BUCKETS)
+        self.define("magicapi_tool_upstream_requests", "histogram", "每次工具调用发出的上游 HTTP 请求数",
+                    ("tool",), COUNT_BUCKETS)
+        self.define("magicapi_tool_response_bytes", "histogram", "MCP 工具响应大小", ("tool",), SIZE_BUCKETS)
+        self.define("magicapi_http_requests_total", "counter", "上游 HTTP 请求次数",
+                    ("method", "endpoint", "status"))
+        self.define("magicapi_http_request_duration_seconds", "histogram", "上游 HTTP 请求耗时",
+                    ("endpoint",), LATENCY_BUCKETS)
+        self.define("magicapi_http_response_bytes", "histogram", "上游 HTTP 响应大小", ("endpoint",), SIZE_BUCKETS)
+        self.define("magicapi_ws_frames_total", "counter", "收到的 WebSocket 消息帧数", ("type",))
+        self.define("magicapi_ws_frame_bytes_total", "counter", "收到的 WebSocket 消息字节数", ("type",))
+        self.define("magicapi_cache_requests_total", "counter", "缓存查询次数", ("cache", "result"))
+        self.define("magicapi_ws_observer_events_total", "counter", "WebSocket 观察者队列事件（投递/丢弃/合并/失败）",
+                    ("observer", "result"))
+        self.define("magicapi_ws_observer_lag_seconds", "histogram", "WebSocket 消息在观察者队列中的等待时间",
+                    ("observer",), LATENCY_BUCKETS)
+
+    # ------------------------------------------------------------------
+    # 基础操作
+    # ------------------------------------------------------------------
+    def define(self, name: str, kind: str, help_text: str, label_names: Sequence[str] = (),
+               buckets: Sequence[float] = ()) -> None:
+        """注册指标族，重复注册时保持原定义。"""
+        with self._lock:
+            self._families.setdefault(name, _Family(name, kind, help_text, tuple(label_names), tuple(buckets)))
+
+    def inc(self, name: str, labels: Sequence[str] = (), amount: float = 1.0) -> None:
+        if not self.enabled:
+            return
+        key = tuple(str(value) for value in labels)
+        with self._lock:
+            family = self._families[name]
+            family.series[key] = family.series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, labels: Sequence[str] = ()) -> None:
+        if not self.enabled:
+            return
+        key = tuple(str(label) for label in labels)
+        with self._lock:
+            family = self._families[name]
+            histogram = family.series.get(key)
+            if histogram is None:
+                histogram = family.series[key] = Histogram(family.buckets)
+            histogram.observe(value)
+
+    def reset(self) -> None:
+        """清空所有已采集的数据（保留指标定义）。"""
+        with self._lock:
+            for family in self._families.values():
+                family.series.clear()
+            self.started_at = time.time()
+
+    # ------------------------------------------------------------------
+    # 领域记录接口
+    # ------------------------------------------------------------------
+    @contextmanager
+    def tool_scope(self, tool: str) -> Iterator[ToolScope]:
+        """绑定当前工具调用，期间的上游 HTTP 请求计入该工具。"""
+        scope = ToolScope(tool)
+        token = _tool_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _tool_scope.reset(token)
+
+    def record_tool_call(self, scope: ToolScope, duration: float, ok: bool, response_bytes: int) -> None:
+        self.inc("magicapi_tool_calls_total", (scope.tool, "ok" if ok else "error"))
+        self.observe("magicapi_tool_duration_seconds", duration, (scope.tool,))
+        self.observe("magicapi_tool_upstream_requests", scope.upstream_requests, (scope.tool,))
+        self.observe("magicapi_tool_response_bytes", response_bytes, (scope.tool,))
+
+    def record_http_request(self, method: str, url: str, status: str, duration: float,
+                            response_bytes: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        scope = _tool_scope.get()
+        if scope is not None:
+            scope.upstream_requests += 1
+        endpoint = normalize_endpoint(url)
+        self.inc("magicapi_http_requests_total", (method.upper(), endpoint, status))
+        self.observe("magicapi_http_request_duration_seconds", duration, (endpoint,))
+        if response_bytes is not None:
+            self.observe("magicapi_http_response_bytes", response_bytes, (endpoint,))
+
+    def record_ws_frame(self, message_type: str, size: int) -> None:
+        if not self.enabled:
+            return
+        self.inc("magicapi_ws_frames_total", (message_type,))
+        self.inc("magicapi_ws_frame_bytes_total", (message_type,), size)
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        self.inc("magicapi_cache_requests_total", (cache, "hit" if hit else "miss"))
+
+    def record_observer_event(self, observer: str, result: str, lag: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        self.inc("magicapi_ws_observer_events_total", (observer, result))
+        if lag is not None:
+            self.observe("magicapi_ws_observer_lag_seconds", lag, (observer,))
+
+    # ------------------------------------------------------------------
+    # 导出
+    # ------------------------------------------------------------------
+    def _copy(self) -> List[_Family]:
+        with self._lock:
+            copied: List[_Family] = []
+            for family in self._families.values():
+                series = {
+                    key: (Histogram(value.buckets, list(value.counts), value.count, value.total, value.max)
+                          if isinstance(value, Histogram) else value)
+                    for key, value in family.series.items()
+                }
+                copied.append(_Family(family.name, family.kind, family.help, family.label_names,
+                                      family.buckets, series))
+            return copied
+
+    def render(self, openmetrics: bool = False) -> str:
+        """渲染为 Prometheus 文本格式（``openmetrics=True`` 时为 OpenMetrics 格式）。"""
+        lines: List[str] = []
+        for family in self._copy():
+            base = family.name
+            if openmetrics and family.kind == "counter" and base.endswith("_total"):
+                base = base[: -len("_total")]
+            lines.append(f"# HELP {base} {family.help}")
+            lines.append(f"# TYPE {base} {family.kind}")
+            for key in sorted(family.series):
+                value = family.series[key]
+                if isinstance(value, Histogram):
+                    for le, count in value.cumulative():
+                        bucket_labels = _labels(family.label_names, key, 'le="' + le + '"')
+                        lines.append(f"{family.name}_bucket{bucket_labels} {count}")
+                    lines.append(f"{family.name}_sum{_labels(family.label_names, key)} {value.total!r}")
+                    lines.append(f"{family.name}_count{_labels(family.label_names, key)} {value.count}")
+                else:
+                    lines.append(f"{family.name}{_labels(family.label_names, key)} {_format_number(value)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回便于阅读的 JSON 摘要（供 ``get_server_metrics`` 工具使用）。"""
+        families = {family.name: family.series for family in self._copy()}
+
+        tools: Dict[str, Dict[str, Any]] = {}
+        for (tool, status), count in families["magicapi_tool_calls_total"].items():
+            entry = tools.setdefault(tool, {"calls": 0, "errors": 0})
+            entry["calls"] += int(count)
+            if status == "error":
+                entry["errors"] += int(count)
+        for (tool,), histogram in families["magicapi_tool_duration_seconds"].items():
+            tools.setdefault(tool, {"calls": 0, "errors": 0})["latency_ms"] = histogram.summary(scale=1000)
+        for (tool,), histogram in families["magicapi_tool_upstream_requests"].items():
+            tools.setdefault(tool, {"calls": 0, "errors": 0})["upstream_requests_per_call"] = (
+                round(histogram.total / histogram.count, 2) if histogram.count else 0.0
+            )
+        for (tool,), histogram in families["magicapi_tool_response_bytes"].items():
+            tools.setdefault(tool, {"calls": 0, "errors": 0})["response_bytes"] = histogram.summary(digits=0)
+
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        for (method, endpoint, status), count in families["magicapi_http_requests_total"].items():
+            entry = endpoints.setdefault(endpoint, {"requests": 0, "by_status": {}})
+            entry["requests"] += int(count)
+            entry["by_status"][status] = entry["by_status"].get(status, 0) + int(count)
+        for (endpoint,), histogram in families["magicapi_http_request_duration_seconds"].items():
+            endpoints.setdefault(endpoint, {"requests": 0, "by_status": {}})["latency_ms"] = histogram.summary(scale=1000)
+        for (endpoint,), histogram in families["magicapi_http_response_bytes"].items():
+            endpoints.setdefault(endpoint, {"requests": 0, "by_status": {}})["response_bytes"] = histogram.summary(digits=0)
+
+        uptime = max(time.time() - self.started_at, 1e-9)
+        websocket: Dict[str, Dict[str, Any]] = {}
+        for (message_type,), count in families["magicapi_ws_frames_total"].items():
+            websocket[message_type] = {"frames": int(count), "rate_per_second": round(count / uptime, 4)}
+        for (message_type,), size in families["magicapi_ws_frame_bytes_total"].items():
+            websocket.setdefault(message_type, {"frames": 0, "rate_per_second": 0.0})["bytes"] = int(size)
+
+        observers: Dict[str, Dict[str, Any]] = {}
+        for (observer, result), count in families["magicapi_ws_observer_events_total"].items():
+            observers.setdefault(observer, {})[result] = int(count)
+        for (observer,), histogram in families["magicapi_ws_observer_lag_seconds"].items():
+            observers.setdefault(observer, {})["lag_ms"] = histogram.summary(scale=1000)
+
+        caches: Dict[str, Dict[str, Any]] = {}
+        for (cache, result), count in families["magicapi_cache_requests_total"].items():
+            caches.setdefault(cache, {"hit": 0, "miss": 0})[result] = int(count)
+        for entry in caches.values():
+            total = entry["hit"] + entry["miss"]
+            entry["hit_ratio"] = round(entry["hit"] / total, 4) if total else 0.0
+
+        return {
+            "enabled": self.enabled,
+            "uptime_seconds": round(uptime, 1),
+            "tools": dict(sorted(tools.items())),
+            "upstream": dict(sorted(endpoints.items())),
+            "websocket": websocket,
+            "ws_observers": observers,
+            "caches": caches,
+        }
+
+
+# 进程级指标注册表
+metrics = MetricsRegistry()
+
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "OPENMETRICS_CONTENT_TYPE",
+    "PROMETHEUS_CONTENT_TYPE",
+    "Histogram",
+    "MetricsRegistry",
+    "ToolScope",
+    "current_tool_scope",
+    "metrics",
+    "normalize_endpoint",
+]
@@ -0,0 +1,351 @@
+"""HTTP 弹性策略：带抖动退避的重试、按端点族划分的熔断器与基于延迟分位数的自适应超时。
+
+Magic-API 所在 JVM 发生长 GC 停顿时，单次固定 30s 超时的请求会让工具调用长时间挂起。
+本模块为 ``MagicAPIHTTPClient`` 提供统一策略：
+
+- 幂等读请求在网络异常或 502/503/504 时按 full-jitter 指数退避重试；
+- 每个端点族（resource/classes/search/backup/web）独立熔断，连续失败达到阈值后快速失败，
+  冷却期后放行一个探测请求；业务接口（api）按路径各自熔断，单个故障接口不影响其他接口；
+- 按端点族记录最近的成功延迟，幂等请求未显式指定超时时使用 ``p99 × 倍数`` 作为超时（限定在上下限之间）；
+  非幂等写入（保存、删除、导入）的耗时与同族的快速读取无关，始终使用默认超时。
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+RETRYABLE_STATUS = frozenset({502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# 按路径熔断的业务接口数量上限，超出时淘汰最久未使用的
+MAX_PATH_BREAKERS = 256
+
+# 端点族前缀，按顺序匹配
+ENDPOINT_FAMILIES = (
+    ("/magic/web/resource", "resource"),
+    ("/magic/web/classes", "classes"),
+    ("/magic/web/class", "classes"),
+    ("/magic/web/search", "search"),
+    ("/magic/web/todo", "search"),
+    ("/magic/web/backup", "backup"),
+    ("/magic/web", "web"),
+)
+
+
+def _send_seconds(response: Any, started: float) -> float:
+    """单次网络发送的耗时：优先取 ``response.elapsed``（发送到收到响应头），不含上游调度的排队时间。"""
+    elapsed = getattr(response, "elapsed", None)
+    if elapsed is not None and hasattr(elapsed, "total_seconds"):
+        return elapsed.total_seconds()
+    return time.monotonic() - started
+
+
+class CircuitOpenError(requests.RequestException):
+    """熔断器打开时快速失败。继承 ``RequestException`` 以复用现有的网络异常处理分支。"""
+
+    def __init__(self, family: str, retry_after: float) -> None:
+        super().__init__(f"端点族 '{family}' 熔断中，约 {retry_after:.1f}s 后重试")
+        self.family = family
+        self.retry_after = retry_after
+
+
+def endpoint_family(url: str) -> str:
+    """根据 URL 路径识别端点族，未匹配的视为业务接口调用（api）。"""
+    path = urlsplit(url).path or url
+    for prefix, family in ENDPOINT_FAMILIES:
+        if path.startswith(prefix):
+            return family
+    return "api"
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """重试策略。"""
+
+    max_retries: int = 2
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+
+    def backoff(self, attempt: int) -> float:
+        """第 ``attempt`` 次重试前的等待时间（full jitter）。"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """简单的三态熔断器（closed / open / half_open）。"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """结束一次不计入熔断统计的请求：半开状态下释放探测名额，允许下一个请求继续探测。"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+
+
+class LatencyTracker:
+    """记录最近的成功请求延迟并计算分位数。"""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class _FamilyState:
+    __slots__ = ("breaker", "latency", "retries", "requests", "failures", "path_breakers")
+
+    def __init__(self, breaker: CircuitBreaker, latency: LatencyTracker) -> None:
+        self.breaker = breaker
+        self.latency = latency
+        self.retries = 0
+        self.requests = 0
+        self.failures = 0
+        self.path_breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+
+
+class ResiliencePolicy:
+    """按端点族管理熔断、重试与自适应超时。"""
+
+    def __init__(
+        self,
+        default_timeout: float,
+        retry: Optional[RetryPolicy] = None,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        adaptive_timeout: bool = True,
+        min_timeout: float = 2.0,
+        timeout_multiplier: float = 3.0,
+        min_samples: int = 20,
+    ) -> None:
+        self.default_timeout = default_timeout
+        self.retry = retry or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.adaptive_timeout = adaptive_timeout
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self._families: Dict[str, _FamilyState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ResiliencePolicy":
+        return cls(
+            default_timeout=settings.timeout_seconds,
+            retry=RetryPolicy(max_retries=settings.http_max_retries, base_delay=settings.http_retry_backoff),
+            breaker_threshold=settings.http_breaker_threshold,
+            breaker_reset=settings.http_breaker_reset_seconds,
+            adaptive_timeout=settings.http_adaptive_timeout,
+        )
+
+    def family(self, name: str) -> _FamilyState:
+        with self._lock:
+            state = self._families.get(name)
+            if state is None:
+                state = _FamilyState(
+                    CircuitBreaker(self.breaker_threshold, self.breaker_reset),
+                    LatencyTracker(),
+                )
+                self._families[name] = state
+            return state
+
+    def breaker_for(self, name: str, url: str) -> tuple[str, CircuitBreaker]:
+        """返回请求对应的熔断器及其标签：业务接口按路径区分，其余按端点族共享。"""
+        state = self.family(name)
+        if name != "api":
+            return name, state.breaker
+        path = urlsplit(url).path or url
+        with self._lock:
+            breaker = state.path_breakers.get(path)
+            if breaker is None:
+                breaker = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+                state.path_breakers[path] = breaker
+                if len(state.path_breakers) > MAX_PATH_BREAKERS:
+                    state.path_breakers.popitem(last=False)
+            else:
+                state.path_breakers.move_to_end(path)
+        return f"api {path}", breaker
+
+    def timeout_for(self, name: str) -> float:
+        """计算端点族的超时：样本足够时取 ``p99 × 倍数``，并限定在 [min_timeout, default_timeout]。"""
+        if not self.adaptive_timeout or name == "api":
+            return self.default_timeout
+        state = self.family(name)
+        if len(state.latency) < self.min_samples:
+            return self.default_timeout
+        p99 = state.latency.percentile(99) or self.default_timeout
+        return max(self.min_timeout, min(self.default_timeout, p99 * self.timeout_multiplier))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            names = sorted(self._families)
+        families: Dict[str, Any] = {}
+        for name in names:
+            state = self.family(name)
+            p50 = state.latency.percentile(50)
+            p99 = state.latency.percentile(99)
+            if name == "api":
+                with self._lock:
+                    path_breakers = list(state.path_breakers.items())
+                open_paths = sorted(path for path, item in path_breakers if item.state != "closed")
+                # 按路径熔断：族状态只表示是否存在未关闭的接口
+                breaker_info = {
+                    "state": "open" if open_paths else "closed",
+                    "open_paths": open_paths,
+                    "trips": sum(item.trips for _, item in path_breakers),
+                }
+            else:
+                breaker_info = state.breaker.snapshot()
+            families[name] = {
+                **breaker_info,
+                "requests": state.requests,
+                "failures": state.failures,
+                "retries": state.retries,
+                "latency_p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+                "latency_p99_ms": round(p99 * 1000, 2) if p99 is not None else None,
+                "timeout_seconds": round(self.timeout_for(name), 3),
+            }
+        return {
+            "max_retries": self.retry.max_retries,
+            "breaker_threshold": self.breaker_threshold,
+            "breaker_reset_seconds": self.breaker_reset,
+            "adaptive_timeout": self.adaptive_timeout,
+            "families": families,
+        }
+
+    def execute(self, method: str, url: str, send, *, idempotent: Optional[bool] = None,
+                timeout: Optional[float] = None) -> requests.Response:
+        """在策略保护下执行 ``send(timeout)``。
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL，用于识别端点族
+            send: 接收超时参数并返回 ``requests.Response`` 的可调用对象
+            idempotent: 是否允许重试，默认按 HTTP 方法判断
+            timeout: 显式超时，为空时幂等请求使用自适应超时，非幂等请求使用默认超时
+        """
+        name = endpoint_family(url)
+        state = self.family(name)
+        label, breaker = self.breaker_for(name, url)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = 1 + (self.retry.max_retries if idempotent else 0)
+        if timeout is not None:
+            effective_timeout = timeout
+        else:
+            # 写入在服务端可能已生效，按读请求的延迟提前超时会误报失败
+            effective_timeout = self.timeout_for(name) if idempotent else self.default_timeout
+
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(label, breaker.retry_after())
+            state.requests += 1
+            started = time.monotonic()
+            counted = False
+            try:
+                try:
+                    response = send(effective_timeout)
+                except (requests.ConnectionError, requests.Timeout) as exc:
+                    state.failures += 1
+                    # 调用方显式指定的超时（如断点调试长等待）不计入熔断
+                    if timeout is None or isinstance(exc, requests.ConnectionError):
+                        breaker.record_failure()
+                        counted = True
+                    if attempt + 1 >= attempts:
+                        raise
+                else:
+                    if response.status_code in RETRYABLE_STATUS:
+                        state.failures += 1
+                        breaker.record_failure()
+                        counted = True
+                        if attempt + 1 >= attempts:
+                            return response
+                    else:
+                        breaker.record_success()
+                        counted = True
+                        state.latency.record(_send_seconds(response, started))
+                        return response
+            finally:
+                # 未计入熔断的结果（显式超时、其他异常）也要释放半开探测名额，否则熔断器永远停在半开
+                if not counted:
+                    breaker.release()
+            state.retries += 1
+            time.sleep(self.retry.backoff(attempt))
+        raise AssertionError("unreachable")  # pragma: no cover
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LatencyTracker",
+    "MAX_PATH_BREAKERS",
+    "ResiliencePolicy",
+    "RetryPolicy",
+    "endpoint_family",
+]
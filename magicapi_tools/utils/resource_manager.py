@@ -8,9 +8,11 @@ from typing import Any, Dict, List, Optional
 
 import requests
 
+
 from .http_client import MagicAPIHTTPClient
 from magicapi_mcp.settings import MagicAPISettings
 from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.upstream_scheduler import upstream_priority
 
 # 获取资源管理器的logger
 logger = get_logger('utils.resource_manager')
@@ -654,22 +656,97 @@ class MagicAPIResourceTools:
         except Exception as e:
             return {"error": {"code": "unexpected_error", "message": f"意外错误: {str(e)}"}}
 
-    def export_resource_tree_tool(self, kind: str = "api", format: str = "json") -> Dict[str, Any]:
-        """导出资源树。"""
-        print(f"DEBUG: export_resource_tree_tool called with kind={kind}, format={format}")
-        result = self.get_resource_tree_tool(kind=kind)
-        print(f"DEBUG: get_resource_tree_tool result type: {type(result)}")
+    def export_resource_tree_tool(self, kind: str = "api", format: str = "json",
+                                  output_path: Optional[str] = None, include_script: bool = False,
+                                  max_workers: int = 4, chunk_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """导出资源树。
+
+        json/csv 且未指定 output_path 时保持原有的内联返回；
+        ndjson/parquet 或指定 output_path 时使用流式导出器写入磁盘，仅返回摘要与字节数。
+        """
+        from magicapi_tools.utils.tree_exporter import (
+            DEFAULT_CHUNK_BYTES,
+            ResourceTreeExporter,
+            TreeExportError,
+        )
+
+        format_normalized = (format or "json").lower()
+        if output_path or format_normalized in {"ndjson", "parquet"}:
+            try:
+                exporter = ResourceTreeExporter(self.manager.http_client)
+                return exporter.export(
+                    kind=kind,
+                    format="ndjson" if format_normalized == "json" else format_normalized,
+                    output_path=output_path,
+                    include_script=include_script,
+                    max_workers=max_workers,
+                    chunk_bytes=chunk_bytes or DEFAULT_CHUNK_BYTES,
+                )
+            except TreeExportError as e:
+                return {"error": {"code": "export_failed", "message": str(e)}}
+            except OSError as e:
+                return {"error": {"code": "export_io_error", "message": f"写入导出文件失败: {str(e)}"}}
+
+        result = self.get_resource_tree_tool(kind=kind, csv=format_normalized == "csv")
         if "error" in result:
-            print(f"DEBUG: get_resource_tree_tool returned error: {result}")
             return result
 
-        if format.lower() == "csv":
-            csv_data = result.get("csv", "")
-            print(f"DEBUG: returning CSV format, csv length: {len(csv_data)}")
-            return {"success": True, "format": "csv", "data": csv_data}
-        else:
-            print(f"DEBUG: returning JSON format, result keys: {list(result.keys())}")
-            return {"success": True, "format": "json", "data": result}
+        if format_normalized == "csv":
+            return {"success": True, "format": "csv", "data": result.get("csv", "")}
+        return {"success": True, "format": "json", "data": result}
+
+    def export_workspace_tool(self, output_path: Optional[str] = None, group_id: Optional[str] = None,
+                              unpack_dir: Optional[str] = None, groups: Optional[List[str]] = None,
+                              path_prefixes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """通过批量下载接口导出工作区 zip，可选解包到本地目录。"""
+        import zipfile
+
+        from magicapi_tools.utils.workspace_archive import (
+            ArchiveSelection,
+            WorkspaceArchiveError,
+            WorkspaceTransfer,
+        )
+
+        try:
+            with upstream_priority("bulk"):
+                return WorkspaceTransfer(self.manager.http_client).export(
+                    output_path=output_path,
+                    group_id=group_id,
+                    unpack_dir=unpack_dir,
+                    selection=ArchiveSelection.from_params(groups, path_prefixes),
+                )
+        except (WorkspaceArchiveError, zipfile.BadZipFile) as e:
+            return {"error": {"code": "export_failed", "message": str(e)}}
+        except requests.RequestException as e:
+            return {"error": {"code": "network_error", "message": f"下载工作区失败: {str(e)}"}}
+        except OSError as e:
+            return {"error": {"code": "export_io_error", "message": f"写入工作区归档失败: {str(e)}"}}
+
+    def import_workspace_tool(self, source: str, mode: str = "increment", groups: Optional[List[str]] = None,
+                              path_prefixes: Optional[List[str]] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """把本地 zip 或目录树（可按分组/路径筛选）一次上传导入。"""
+        import zipfile
+
+        from magicapi_tools.utils.workspace_archive import (
+            ArchiveSelection,
+            WorkspaceArchiveError,
+            WorkspaceTransfer,
+        )
+
+        try:
+            with upstream_priority("bulk"):
+                return WorkspaceTransfer(self.manager.http_client).import_(
+                    source,
+                    mode=mode,
+                    selection=ArchiveSelection.from_params(groups, path_prefixes),
+                    dry_run=dry_run,
+                )
+        except (WorkspaceArchiveError, zipfile.BadZipFile) as e:
+            return {"error": {"code": "import_failed", "message": str(e)}}
+        except requests.RequestException as e:
+            return {"error": {"code": "network_error", "message": f"上传工作区失败: {str(e)}"}}
+        except OSError as e:
+            return {"error": {"code": "import_io_error", "message": f"读取导入源失败: {str(e)}"}}
 
     def get_resource_stats_tool(self) -> Dict[str, Any]:
         """获取资源统计信息。"""
@@ -748,7 +825,6 @@ class MagicAPIResourceManager:
             http_client: MagicAPIHTTPClient 实例，如果不提供则创建新的实例
         """
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
         self.username = username
         self.password = password
 
@@ -756,35 +832,26 @@ class MagicAPIResourceManager:
         if http_client is not None:
             self.http_client = http_client
         else:
-            # 创建默认的 HTTP 客户端
+            # 创建默认的 HTTP 客户端（提供认证信息时由客户端负责登录）
             settings = MagicAPISettings(
                 base_url=base_url,
                 username=username,
-                password=password
+                password=password,
+                auth_enabled=bool(username and password),
             )
             self.http_client = MagicAPIHTTPClient(settings=settings)
 
-        # 设置默认请求头
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        })
-
-        # 如果提供了认证信息，进行登录
-        if username and password:
-            self.login()
-
-    def login(self):
-        """登录认证"""
-        login_data = {
-            'username': self.username,
-            'password': self.password
-        }
-        response = self.session.post(f"{self.base_url}/magic/web/login", json=login_data)
-        if response.status_code == 200:
+        # 与 HTTP 客户端共享会话、认证状态与弹性策略
+        self.session = self.http_client.session
+
+    def login(self) -> bool:
+        """登录认证，委托给 HTTP 客户端共享的认证管理器。"""
+        success = self.http_client.auth.login()
+        if success:
             print("✅ 登录成功")
         else:
-            print(f"❌ 登录失败: {response.text}")
+            print(f"❌ 登录失败: {self.http_client.auth.last_error or '用户名或密码错误'}")
+        return success
 
     def save_group(self, name: Optional[str] = None, id: Optional[str] = None,
                    parent_id: str = "0", type: str = "api",
@@ -833,7 +900,8 @@ class MagicAPIResourceManager:
 
         try:
             print(f"📝 {operation}分组请求数据: {group_data}")
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 f"{self.base_url}/magic/web/resource/folder/save",
                 json=group_data
             )
@@ -902,11 +970,11 @@ class MagicAPIResourceManager:
             # 使用与移动API相同的headers格式
             copy_headers = {
                 'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'application/json, text/plain, */*',
-                'magic-token': 'unauthorization'
+                'Accept': 'application/json, text/plain, */*'
             }
 
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 f"{self.base_url}/magic/web/resource/folder/copy",
                 data={
                     'src': src_group_id,
@@ -953,31 +1021,24 @@ class MagicAPIResourceManager:
             original_name = file_detail.get('name', 'Unknown')
             new_name = f"{original_name}_副本"
 
-            # 准备API数据
-            api_data = {
-                'name': new_name,
-                'method': file_detail.get('method', 'GET'),
-                'path': file_detail.get('path', ''),
-                'script': file_detail.get('script', ''),
-                'groupId': target_group_id,
-                'parameters': file_detail.get('parameters', []),
-                'headers': file_detail.get('headers', []),
-                'paths': file_detail.get('paths', []),
-                'requestBody': file_detail.get('requestBody', ''),
-                'responseBody': file_detail.get('responseBody', ''),
-                'options': file_detail.get('options', [])
-            }
-
-            # 如果有请求体定义，也复制
-            if 'requestBodyDefinition' in file_detail:
-                api_data['requestBodyDefinition'] = file_detail['requestBodyDefinition']
-            if 'responseBodyDefinition' in file_detail:
-                api_data['responseBodyDefinition'] = file_detail['responseBodyDefinition']
-            if 'description' in file_detail:
-                api_data['description'] = file_detail['description']
-
-            # 保存新文件
-            new_file_id = self.save_api_file(target_group_id, api_data)
+            # 保存新文件（save_api_file 使用关键字参数，创建成功返回 {"id", "full_path"}）
+            saved = self.save_api_file(
+                group_id=target_group_id,
+                name=new_name,
+                method=file_detail.get('method', 'GET'),
+                path=file_detail.get('path', ''),
+                script=file_detail.get('script', ''),
+                description=file_detail.get('description'),
+                parameters=file_detail.get('parameters', []),
+                headers=file_detail.get('headers', []),
+                paths=file_detail.get('paths', []),
+                request_body=file_detail.get('requestBody', ''),
+                request_body_definition=file_detail.get('requestBodyDefinition'),
+                response_body=file_detail.get('responseBody', ''),
+                response_body_definition=file_detail.get('responseBodyDefinition'),
+                options=file_detail.get('options', []),
+            )
+            new_file_id = saved.get('id') if isinstance(saved, dict) else saved
             if new_file_id:
                 print(f"✅ 复制文件成功: {src_file_id} -> {new_file_id} ({new_name})")
                 return new_file_id
@@ -1003,11 +1064,11 @@ class MagicAPIResourceManager:
         try:
             delete_headers = {
                 'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'application/json, text/plain, */*',
-                'magic-token': 'unauthorization'
+                'Accept': 'application/json, text/plain, */*'
             }
 
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 f"{self.base_url}/magic/web/resource/delete",
                 data={'id': resource_id},
                 headers=delete_headers
@@ -1052,11 +1113,11 @@ class MagicAPIResourceManager:
             # 尝试移动资源（使用form-urlencoded格式，与curl命令一致）
             move_headers = {
                 'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'application/json, text/plain, */*',
-                'magic-token': 'unauthorization'
+                'Accept': 'application/json, text/plain, */*'
             }
 
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 f"{self.base_url}/magic/web/resource/move",
                 data={
                     'src': src_id,
@@ -1101,7 +1162,7 @@ class MagicAPIResourceManager:
         """
         try:
             print(f"📋 获取资源树...")
-            response = self.session.post(f"{self.base_url}/magic/web/resource")
+            response = self.http_client.request("POST", f"{self.base_url}/magic/web/resource", idempotent=True)
 
             print(f"📊 响应状态: {response.status_code}")
 
@@ -1137,7 +1198,7 @@ class MagicAPIResourceManager:
             文件详情数据，失败返回None
         """
         try:
-            response = self.session.get(f"{self.base_url}/magic/web/resource/file/{file_id}")
+            response = self.http_client.request("GET", f"{self.base_url}/magic/web/resource/file/{file_id}")
 
             if response.status_code == 200:
                 result = response.json()
@@ -1177,11 +1238,11 @@ class MagicAPIResourceManager:
         try:
             lock_headers = {
                 'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'application/json, text/plain, */*',
-                'magic-token': 'unauthorization'
+                'Accept': 'application/json, text/plain, */*'
             }
 
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 f"{self.base_url}/magic/web/resource/lock",
                 data={'id': resource_id},
                 headers=lock_headers
@@ -1215,11 +1276,11 @@ class MagicAPIResourceManager:
         try:
             unlock_headers = {
                 'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'application/json, text/plain, */*',
-                'magic-token': 'unauthorization'
+                'Accept': 'application/json, text/plain, */*'
             }
 
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 f"{self.base_url}/magic/web/resource/unlock",
                 data={'id': resource_id},
                 headers=unlock_headers
@@ -1376,7 +1437,8 @@ class MagicAPIResourceManager:
             url = f"{self.base_url}/magic/web/resource/file/api/save"
  
             # 使用application/json类型发送完整的API对象
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 url,
                 json=full_api_data,
                 params=params
@@ -1611,7 +1673,8 @@ class MagicAPIResourceManager:
 
 
             # 使用application/json类型发送完整的API对象
-            response = self.session.post(
+            response = self.http_client.request(
+                "POST",
                 url,
                 json=full_api_data,
                 params=params
@@ -0,0 +1,147 @@
+"""MCP 资源订阅管理。
+
+记录 ``resources/subscribe`` 的订阅会话，并在资源树变化时推送
+``notifications/resources/updated``。变化可能来自工具线程、WS 管理器线程或服务器事件循环，
+因此所有推送都会被调度回订阅时记录的服务器事件循环执行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.tree_cache import TreeChange
+
+logger = get_logger('utils.resource_subscriptions')
+
+TREE_URI = "magicapi://tree"
+STATS_URI = "magicapi://stats"
+API_URI_TEMPLATE = "magicapi://api/{file_id}"
+
+
+def api_uri(file_id: str) -> str:
+    return API_URI_TEMPLATE.format(file_id=file_id)
+
+
+def uris_for_change(change: TreeChange) -> List[str]:
+    """计算一次资源树变化需要通知的资源 URI。"""
+    if not change.changed:
+        return []
+    uris = [TREE_URI, STATS_URI]
+    uris.extend(api_uri(file_id) for file_id in change.modified + change.removed)
+    return uris
+
+
+class ResourceSubscriptionHub:
+    """资源订阅中心。
+
+    Args:
+        poll: 有订阅者时周期执行的同步刷新函数（在线程池中执行）
+        poll_interval: 轮询间隔（秒）
+    """
+
+    def __init__(self, poll: Optional[Callable[[], Any]] = None, poll_interval: float = 30.0) -> None:
+        self.poll = poll
+        self.poll_interval = poll_interval
+        self.notifications_sent = 0
+
+        self._subscriptions: Dict[str, Set[Any]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poll_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # 订阅管理（在服务器事件循环中调用）
+    # ------------------------------------------------------------------
+    def subscribe(self, uri: str, session: Any) -> None:
+        with self._lock:
+            self._subscriptions.setdefault(str(uri), set()).add(session)
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        self._ensure_polling()
+        logger.debug(f"资源订阅: {uri}")
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        with self._lock:
+            sessions = self._subscriptions.get(str(uri))
+            if sessions is not None:
+                sessions.discard(session)
+                if not sessions:
+                    del self._subscriptions[str(uri)]
+        logger.debug(f"取消资源订阅: {uri}")
+
+    def has_subscribers(self) -> bool:
+        with self._lock:
+            return bool(self._subscriptions)
+
+    def subscribed_uris(self) -> List[str]:
+        with self._lock:
+            return sorted(self._subscriptions)
+
+    # ------------------------------------------------------------------
+    # 通知
+    # ------------------------------------------------------------------
+    def on_tree_change(self, change: TreeChange) -> None:
+        """`ResourceTreeCache` 监听器入口，可在任意线程调用。"""
+        self.publish(uris_for_change(change))
+
+    def publish(self, uris: Iterable[str]) -> None:
+        """线程安全地调度资源更新通知。"""
+        uris = [uri for uri in uris if uri in self._subscriptions]
+        loop = self._loop
+        if not uris or loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(self._send(uris))
+        else:
+            asyncio.run_coroutine_threadsafe(self._send(uris), loop)
+
+    async def _send(self, uris: List[str]) -> None:
+        for uri in uris:
+            with self._lock:
+                sessions = list(self._subscriptions.get(uri, ()))
+            for session in sessions:
+                try:
+                    await session.send_resource_updated(uri)
+                    self.notifications_sent += 1
+                except Exception as exc:  # noqa: BLE001 - 会话已断开时移除订阅
+                    logger.debug(f"推送资源更新失败，移除订阅 {uri}: {exc}")
+                    self.unsubscribe(uri, session)
+
+    # ------------------------------------------------------------------
+    # 轮询刷新
+    # ------------------------------------------------------------------
+    def _ensure_polling(self) -> None:
+        if self.poll is None or self._loop is None:
+            return
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = self._loop.create_task(self._poll_loop())
+
+    async def _poll_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.has_subscribers():
+            await asyncio.sleep(self.poll_interval)
+            if not self.has_subscribers():
+                break
+            try:
+                await loop.run_in_executor(None, self.poll)
+            except Exception as exc:  # noqa: BLE001 - 单次刷新失败等待下一轮
+                logger.warning(f"订阅轮询刷新资源树失败: {exc}")
+
+
+__all__ = [
+    "API_URI_TEMPLATE",
+    "STATS_URI",
+    "TREE_URI",
+    "ResourceSubscriptionHub",
+    "api_uri",
+    "uris_for_change",
+]
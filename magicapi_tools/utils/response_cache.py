@@ -0,0 +1,243 @@
+"""接口响应缓存与请求录制。
+
+``call_magic_api`` 对幂等的 GET 请求按需缓存响应（键为方法、路径、查询参数与业务相关的请求头），
+命中时直接返回，省去上游调用与 WebSocket 日志等待。条目在以下情况下不再命中：
+
+- 超过调用时指定的 TTL；
+- 资源树检测到对应接口被修改或删除（含本服务内保存脚本、脚本同步推送）；
+- 本服务内的变更类工具调用（无法确定具体接口时使全部条目失效）；
+- 被修改脚本（函数或接口）的依赖方：通过 ``expand`` 按依赖图扩展失效范围，
+  依赖图尚未构建时无法确定哪些接口导入了它，使全部条目失效。
+
+失效的条目仍作为录制保留（按 LRU 淘汰），供 ``replay_api_call`` 重新执行并与上次响应对比。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from magicapi_tools.utils.metrics import metrics
+from magicapi_tools.utils.tree_cache import TreeChange
+
+# 调试与认证相关的请求头不影响接口结果，不参与缓存键
+_INTERNAL_HEADER_PREFIXES = ("magic-request-", "magic-token", "accept")
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """一次录制的请求与响应。"""
+
+    key: str
+    method: str
+    path: str
+    params: Any
+    headers: Dict[str, str]
+    script_id: Optional[str]
+    response: Dict[str, Any]
+    recorded_at: float
+    expires_at: float
+    stale: bool = False
+    hits: int = 0
+    replays: int = 0
+
+    def fresh(self, now: float) -> bool:
+        return not self.stale and now < self.expires_at
+
+    def describe(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        return {
+            "key": self.key,
+            "method": self.method,
+            "path": self.path,
+            "params": self.params,
+            "script_id": self.script_id,
+            "age": round(now - self.recorded_at, 3),
+            "fresh": self.fresh(now),
+            "hits": self.hits,
+            "replays": self.replays,
+        }
+
+
+def _canonical(value: Any) -> Any:
+    """把 JSON 字符串形式的参数解析为对象，保证相同参数得到相同的键。"""
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
+    return value
+
+
+def relevant_headers(headers: Optional[Any]) -> Dict[str, str]:
+    """保留影响接口结果的请求头（名称小写）。"""
+    if not isinstance(headers, dict):
+        return {}
+    return {
+        str(name).lower(): str(value)
+        for name, value in headers.items()
+        if value is not None and not str(name).lower().startswith(_INTERNAL_HEADER_PREFIXES)
+    }
+
+
+def request_key(method: str, path: str, params: Any = None, headers: Optional[Any] = None) -> str:
+    """计算请求的缓存键。"""
+    payload = json.dumps(
+        [method.upper(), path, _canonical(params), relevant_headers(headers)],
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def diff_values(old: Any, new: Any, limit: int = 50) -> Tuple[List[Dict[str, Any]], bool]:
+    """逐字段比较两个 JSON 值，返回 (差异列表, 是否因超过 ``limit`` 被截断)。
+
+    差异路径形如 ``$.list[0].name``，``change`` 为 ``changed`` / ``added`` / ``removed``。
+    """
+    differences: List[Dict[str, Any]] = []
+    truncated = False
+
+    def add(item: Dict[str, Any]) -> None:
+        nonlocal truncated
+        if len(differences) >= limit:
+            truncated = True
+        else:
+            differences.append(item)
+
+    def walk(left: Any, right: Any, path: str) -> None:
+        if isinstance(left, dict) and isinstance(right, dict):
+            for name in list(left) + [name for name in right if name not in left]:
+                if truncated:
+                    return
+                child = f"{path}.{name}"
+                if name not in right:
+                    add({"path": child, "change": "removed", "old": left[name]})
+                elif name not in left:
+                    add({"path": child, "change": "added", "new": right[name]})
+                else:
+                    walk(left[name], right[name], child)
+        elif isinstance(left, list) and isinstance(right, list):
+            for index in range(max(len(left), len(right))):
+                if truncated:
+                    return
+                child = f"{path}[{index}]"
+                if index >= len(right):
+                    add({"path": child, "change": "removed", "old": left[index]})
+                elif index >= len(left):
+                    add({"path": child, "change": "added", "new": right[index]})
+                else:
+                    walk(left[index], right[index], child)
+        elif left != right or type(left) is not type(right):
+            add({"path": path, "change": "changed", "old": left, "new": right})
+
+    walk(old, new, "$")
+    return differences, truncated
+
+
+class ResponseCache:
+    """按请求键缓存接口响应的 LRU 表，线程安全。
+
+    Args:
+        max_entries: 保留的录制条数上限（含已失效条目）
+        expand: 把被修改的脚本 ID 扩展为受影响的脚本 ID（含导入它们的接口），
+            无法确定时返回 ``None``，此时使全部条目失效
+    """
+
+    def __init__(self, max_entries: int = 256,
+                 expand: Optional[Callable[[Set[str]], Optional[Iterable[str]]]] = None) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.expand = expand
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """返回仍然有效的条目，过期或已失效时返回 ``None``。"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.fresh(now):
+                metrics.record_cache("api_response", False)
+                return None
+            entry.hits += 1
+            self._entries.move_to_end(key)
+        metrics.record_cache("api_response", True)
+        return entry
+
+    def entry(self, key: str) -> Optional[CachedResponse]:
+        """返回录制条目（无论是否仍有效）。"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, method: str, path: str, params: Any, headers: Optional[Any],
+            script_id: Optional[str], response: Dict[str, Any], ttl: float) -> CachedResponse:
+        now = time.time()
+        entry = CachedResponse(
+            key=key,
+            method=method.upper(),
+            path=path,
+            params=_canonical(params),
+            headers=relevant_headers(headers),
+            script_id=script_id,
+            response=response,
+            recorded_at=now,
+            expires_at=now + max(0.0, ttl),
+        )
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                entry.replays = previous.replays
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, script_ids: Iterable[str]) -> int:
+        """使指定脚本及依赖它们的接口的条目失效（保留录制），返回受影响的条目数。"""
+        wanted = {str(item) for item in script_ids if item}
+        if wanted and self.expand is not None:
+            affected = self.expand(wanted)
+            if affected is None:
+                return self.invalidate_all()
+            wanted |= {str(item) for item in affected}
+        count = 0
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.script_id in wanted and not entry.stale:
+                    entry.stale = True
+                    count += 1
+        return count
+
+    def invalidate_all(self) -> int:
+        count = 0
+        with self._lock:
+            for entry in self._entries.values():
+                if not entry.stale:
+                    entry.stale = True
+                    count += 1
+        return count
+
+    def on_tree_change(self, change: TreeChange) -> None:
+        """资源树监听器：接口被修改或删除时使其缓存失效。"""
+        if change.modified or change.removed:
+            self.invalidate(change.modified + change.removed)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """按最近使用顺序（新在前）列出录制条目。"""
+        now = time.time()
+        with self._lock:
+            return [entry.describe(now) for entry in reversed(self._entries.values())]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+__all__ = ["CachedResponse", "ResponseCache", "diff_values", "relevant_headers", "request_key"]
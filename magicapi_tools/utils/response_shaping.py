@@ -0,0 +1,346 @@
+"""响应裁剪：字节/条目预算、稳定游标与字段投影。
+
+知识库与资源树等工具的完整结果可达数百 KB，MCP 客户端需要序列化、模型需要全部读入。
+本模块为这些工具提供统一的裁剪层：
+
+- ``max_bytes`` / ``max_items``：单页的序列化字节数与条目数上限（至少返回一条）；
+- 游标：编码了偏移量、请求范围与数据指纹，数据或参数不变时同一游标总是得到同一页；
+  数据已变化时游标失效（``CursorError``），调用方应去掉游标重新获取；
+- ``fields``：只返回指定字段，支持 ``node.path`` 形式的嵌套路径。
+
+列表用 ``paginate``，字典按键分页用 ``paginate_mapping`` / ``shape_document``，
+资源树按先序遍历分页用 ``paginate_tree``（保留所选节点的祖先作为上下文）。每个函数返回 ``(内容, page)``，``page`` 描述本页位置与续取游标。
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+DEFAULT_MAX_BYTES = 65536
+# 单个节点/条目在 JSON 中的额外开销估计（逗号、括号、children 键等）
+_ITEM_OVERHEAD = 16
+
+
+class CursorError(ValueError):
+    """游标无效或与当前数据不一致。"""
+
+
+@dataclass(slots=True)
+class ShapeOptions:
+    """单次调用的裁剪参数。"""
+
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES
+    max_items: Optional[int] = None
+    cursor: Optional[str] = None
+    fields: Optional[List[str]] = None
+
+    @classmethod
+    def from_params(
+        cls,
+        max_bytes: Optional[int] = None,
+        max_items: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Union[Sequence[str], str]] = None,
+        default_max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        default_max_items: Optional[int] = None,
+    ) -> "ShapeOptions":
+        """从工具参数构造；``max_bytes`` / ``max_items`` 为 0 表示不限制，为空时使用默认值。"""
+        if max_bytes is None:
+            max_bytes = default_max_bytes
+        if max_items is None:
+            max_items = default_max_items
+        return cls(
+            max_bytes=max_bytes if max_bytes and max_bytes > 0 else None,
+            max_items=max_items if max_items and max_items > 0 else None,
+            cursor=(cursor or "").strip() or None,
+            fields=parse_fields(fields),
+        )
+
+
+def parse_fields(fields: Optional[Union[Sequence[str], str]]) -> Optional[List[str]]:
+    """解析字段列表，支持 ``["id","path"]``、``"id,path"`` 与 JSON 数组字符串。"""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        text = fields.strip()
+        if not text:
+            return None
+        if text.startswith("["):
+            try:
+                fields = json.loads(text)
+            except json.JSONDecodeError:
+                fields = text.strip("[]").split(",")
+        else:
+            fields = text.split(",")
+    parsed = [str(item).strip().strip('"') for item in fields if str(item).strip()]
+    return parsed or None
+
+
+def json_size(value: Any) -> int:
+    """紧凑 JSON 序列化后的 UTF-8 字节数。"""
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+_MISSING = object()
+
+
+def _get_path(item: Mapping[str, Any], path: str) -> Any:
+    current: Any = item
+    for part in path.split("."):
+        if not isinstance(current, Mapping) or part not in current:
+            return _MISSING
+        current = current[part]
+    return current
+
+
+def project(item: Any, fields: Optional[Sequence[str]]) -> Any:
+    """按字段投影；嵌套路径保留原有层级，缺失字段忽略，非字典原样返回。"""
+    if not fields or not isinstance(item, Mapping):
+        return item
+    result: Dict[str, Any] = {}
+    for path in fields:
+        value = _get_path(item, path)
+        if value is _MISSING:
+            continue
+        target = result
+        parts = path.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return result
+
+
+# ----------------------------------------------------------------------
+# 游标
+# ----------------------------------------------------------------------
+def fingerprint(keys: Sequence[Any]) -> str:
+    """根据条目键计算数据指纹。"""
+    digest = hashlib.sha1(str(len(keys)).encode("utf-8"))
+    for key in keys:
+        digest.update(b"\x00")
+        digest.update(str(key).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def _scope_hash(scope: str) -> str:
+    return hashlib.sha1(scope.encode("utf-8")).hexdigest()[:8]
+
+
+def encode_cursor(scope: str, data_fingerprint: str, offset: int) -> str:
+    raw = json.dumps({"s": _scope_hash(scope), "f": data_fingerprint, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], scope: str, data_fingerprint: str) -> int:
+    """解析游标得到偏移量；游标与当前请求或数据不一致时抛出 ``CursorError``。"""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(payload["o"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise CursorError(f"无法解析游标: {cursor}") from exc
+    if payload.get("s") != _scope_hash(scope):
+        raise CursorError("游标与当前请求参数不一致，请使用相同的过滤条件或去掉 cursor 重新获取")
+    if payload.get("f") != data_fingerprint:
+        raise CursorError("数据已变化，游标失效，请去掉 cursor 重新获取")
+    if offset < 0:
+        raise CursorError(f"无效的游标偏移: {offset}")
+    return offset
+
+
+# ----------------------------------------------------------------------
+# 分页
+# ----------------------------------------------------------------------
+def _select(sizes: Callable[[int], int], total: int, offset: int,
+            options: ShapeOptions) -> Tuple[int, int, Optional[str]]:
+    """从 ``offset`` 起按预算选取条目，返回 ``(结束位置, 字节数, 截断原因)``。"""
+    used = 0
+    index = offset
+    while index < total:
+        if options.max_items is not None and index - offset >= options.max_items:
+            return index, used, "max_items"
+        size = sizes(index)
+        if options.max_bytes is not None and index > offset and used + size > options.max_bytes:
+            return index, used, "max_bytes"
+        used += size
+        index += 1
+    return index, used, None
+
+
+def _page_info(scope: str, data_fingerprint: str, total: int, offset: int, end: int,
+               used: int, reason: Optional[str]) -> Dict[str, Any]:
+    has_more = end < total
+    return {
+        "total": total,
+        "offset": offset,
+        "returned": end - offset,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(scope, data_fingerprint, end) if has_more else None,
+        "bytes": used,
+        "limited_by": reason if has_more else None,
+    }
+
+
+def paginate(items: Sequence[Any], options: ShapeOptions, scope: str,
+             key: Optional[Callable[[Any], Any]] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """对列表分页并投影字段。
+
+    Args:
+        items: 完整结果列表（顺序需稳定）
+        options: 裁剪参数
+        scope: 请求范围（工具名 + 影响结果的参数），用于校验游标
+        key: 条目的稳定键，用于计算数据指纹；默认使用条目本身的 JSON
+    """
+    keys = [key(item) if key else json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+            for item in items]
+    data_fingerprint = fingerprint(keys)
+    offset = decode_cursor(options.cursor, scope, data_fingerprint)
+    projected: Dict[int, Any] = {}
+
+    def size(index: int) -> int:
+        projected[index] = project(items[index], options.fields)
+        return json_size(projected[index]) + 1
+
+    end, used, reason = _select(size, len(items), offset, options)
+    page = [projected[index] for index in range(offset, end)]
+    return page, _page_info(scope, data_fingerprint, len(items), offset, end, used, reason)
+
+
+def paginate_mapping(mapping: Mapping[str, Any], options: ShapeOptions,
+                     scope: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """对字典按键分页（保持键顺序）；``fields`` 在此表示要返回的键。"""
+    keys = [name for name in mapping if not options.fields or name in options.fields]
+    data_fingerprint = fingerprint(keys)
+    offset = decode_cursor(options.cursor, scope, data_fingerprint)
+    end, used, reason = _select(
+        lambda index: json_size({keys[index]: mapping[keys[index]]}),
+        len(keys), offset, options,
+    )
+    page = {name: mapping[name] for name in keys[offset:end]}
+    info = _page_info(scope, data_fingerprint, len(keys), offset, end, used, reason)
+    if info["has_more"] or offset:
+        info["keys"] = keys
+    return page, info
+
+
+def _tree_page(roots: Sequence[Mapping[str, Any]], options: ShapeOptions,
+               scope: str) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[str, Any]]:
+    """对若干棵子树按先序遍历分页，返回 ``[(顶层位置, 裁剪后的子树)]`` 与分页信息。"""
+    # order[i] = (原节点, 父节点在 order 中的位置, 顶层位置)
+    order: List[Tuple[Mapping[str, Any], int, int]] = []
+    stack: List[Tuple[Mapping[str, Any], int, int]] = [
+        (entry, -1, position) for position, entry in reversed(list(enumerate(roots)))
+    ]
+    while stack:
+        entry, parent, position = stack.pop()
+        order.append((entry, parent, position))
+        index = len(order) - 1
+        stack.extend((child, index, position) for child in reversed(entry.get("children") or []))
+
+    data_fingerprint = fingerprint([(entry.get("node") or {}).get("id") for entry, _, _ in order])
+    offset = decode_cursor(options.cursor, scope, data_fingerprint)
+    projected: Dict[int, Any] = {}
+
+    def node_of(index: int) -> Any:
+        if index not in projected:
+            projected[index] = project(order[index][0].get("node") or {}, options.fields)
+        return projected[index]
+
+    end, used, reason = _select(
+        lambda index: json_size(node_of(index)) + _ITEM_OVERHEAD, len(order), offset, options
+    )
+
+    # 本页节点及其祖先（祖先作为上下文，不计入本页条目）
+    included: Dict[int, Dict[str, Any]] = {}
+    for index in range(offset, end):
+        current = index
+        while current >= 0 and current not in included:
+            included[current] = {"node": node_of(current), "children": []}
+            current = order[current][1]
+
+    tops: List[Tuple[int, Dict[str, Any]]] = []
+    for index in sorted(included):
+        entry, parent, position = order[index]
+        if parent >= 0:
+            included[parent]["children"].append(included[index])
+        else:
+            tops.append((position, included[index]))
+    for index, item in included.items():
+        children = order[index][0].get("children") or []
+        if not offset <= index < end or len(item["children"]) < len(children):
+            item["truncated"] = True
+
+    return tops, _page_info(scope, data_fingerprint, len(order), offset, end, used, reason)
+
+
+def paginate_tree(root: Mapping[str, Any], options: ShapeOptions,
+                  scope: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """按先序遍历对资源树分页。
+
+    每页返回先序序列中的一段节点，并附带其祖先节点作为上下文；子节点未全部包含在本页的
+    节点标记 ``"truncated": true``。根节点总是返回且不计入条目数，``fields`` 作用于每个节点的
+    ``node`` 信息。
+    """
+    children = root.get("children") or []
+    tops, page = _tree_page(children, options, scope)
+    page_root: Dict[str, Any] = {
+        "node": project(root.get("node") or {}, options.fields),
+        "children": [item for _, item in tops],
+    }
+    if len(tops) < len(children):
+        page_root["truncated"] = True
+    return page_root, page
+
+
+def paginate_forest(trees: Mapping[str, Mapping[str, Any]], options: ShapeOptions,
+                    scope: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """对按名称组织的多棵资源树（如 api/function/task）整体分页，本页不涉及的树不返回。"""
+    names = list(trees)
+    tops, page = _tree_page([trees[name] for name in names], options, scope)
+    return {names[position]: item for position, item in tops}, page
+
+
+def shape_document(doc: Mapping[str, Any], section_key: str, options: ShapeOptions,
+                   scope: str) -> Dict[str, Any]:
+    """对文档中的某个大字典字段按键分页，其余字段原样保留并计入字节预算。"""
+    sections = doc.get(section_key)
+    if not isinstance(sections, Mapping):
+        return dict(doc)
+    rest = {key: value for key, value in doc.items() if key != section_key}
+    if options.max_bytes is not None:
+        options = replace(options, max_bytes=max(options.max_bytes - json_size(rest), 1))
+    page_sections, page = paginate_mapping(sections, options, scope)
+    shaped = dict(doc)
+    shaped[section_key] = page_sections
+    shaped["page"] = page
+    return shaped
+
+
+def request_scope(tool: str, **params: Any) -> str:
+    """构造游标范围：工具名 + 影响结果的参数（不含分页参数本身）。"""
+    return tool + json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+
+
+__all__ = [
+    "DEFAULT_MAX_BYTES",
+    "CursorError",
+    "ShapeOptions",
+    "decode_cursor",
+    "encode_cursor",
+    "fingerprint",
+    "json_size",
+    "paginate",
+    "paginate_forest",
+    "paginate_mapping",
+    "paginate_tree",
+    "parse_fields",
+    "project",
+    "request_scope",
+    "shape_document",
+]
@@ -0,0 +1,341 @@
+"""Magic-Script 静态性能检查。
+
+把 ``kb_practices`` 中的性能建议落到具体脚本上，按估算代价排序输出带行号的问题：
+
+- ``query_in_loop``：``for`` / ``while`` 循环体或 ``map`` / ``each`` 等 lambda 中执行数据库操作（N+1 查询）；
+- ``unbounded_select``：``db.select`` 的 SQL 没有 ``LIMIT``，或 ``db.table(...)`` 链以 ``select()`` 结束且未分页；
+- ``repeated_query``：同一脚本中重复执行完全相同的查询；
+- ``in_memory_processing``：对未限制行数的查询结果在内存中过滤、排序、分组或计数；
+- ``missing_cache``：GET 接口读取数据库但没有使用缓存。
+
+检查基于词法扫描（跳过字符串与注释、跟踪括号嵌套），不执行脚本，结果为启发式提示。
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from magicapi_tools.utils.kb_practices import get_performance_tips
+
+SEVERITY_ORDER = {"high": 3, "medium": 2, "low": 1}
+
+_DB_CALL = re.compile(
+    r"\bdb(?:\.\w+)*?\.(?P<op>select|selectOne|selectInt|selectValue|page|count|insert|update|batchUpdate|table)\s*\("
+)
+_LAMBDA_CALL = re.compile(r"\.\s*(?:map|each|filter|forEach|flatMap|group|every|some|reduce|find)\s*$")
+_CHAIN_LINK = re.compile(r"\s*\.\s*(\w+)\s*\(")
+_LOOP_HEADER = re.compile(r"\b(?:for|while)\s*$")
+_ASSIGNMENT = re.compile(r"(?:\b(?:var|let|const)\s+)?(?P<name>[A-Za-z_$][\w$]*)\s*=\s*$")
+_BOUNDED_SQL = re.compile(r"\b(?:limit|rownum|top\s+\d+|fetch\s+first)\b", re.I)
+_WHERE = re.compile(r"\bwhere\b", re.I)
+_CACHE = re.compile(r"\bcache\b")
+_READ_OPS = frozenset({"select", "selectOne", "selectInt", "selectValue", "page", "count", "table"})
+_WRITE_OPS = frozenset({"insert", "update", "batchUpdate"})
+_IN_MEMORY_OPS = ("filter", "sort", "group", "distinct", "size")
+_NON_STATEMENT = re.compile(r"^[\s{}()\[\];,]*(?:else\b[\s{}]*)?$|^\s*import\b")
+_IO_CALL = re.compile(r"\b(?:db|http)\s*\.")
+
+# 规则 -> (基础代价, 对应的性能建议分类, 建议关键词)
+_RULES: Dict[str, Tuple[int, str, str]] = {
+    "query_in_loop": (10, "database", "批量"),
+    "unbounded_select": (6, "memory", "大集合"),
+    "in_memory_processing": (5, "database", "索引"),
+    "repeated_query": (4, "cache", "热点"),
+    "missing_cache": (2, "cache", "热点"),
+}
+
+
+@dataclass(slots=True)
+class PerformanceFinding:
+    """一条性能问题。"""
+
+    rule: str
+    severity: str
+    line: int
+    cost: int
+    message: str
+    suggestion: str
+    snippet: str = ""
+    tip: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        if data["tip"] is None:
+            data.pop("tip")
+        return data
+
+
+@dataclass(slots=True)
+class _Literal:
+    start: int
+    end: int
+    text: str
+
+
+@dataclass(slots=True)
+class _Query:
+    op: str
+    start: int
+    end: int
+    loop_depth: int
+    sql: Optional[str]
+    chain: List[str]
+    target: Optional[str]
+
+
+def _mask(script: str) -> Tuple[str, Dict[int, _Literal]]:
+    """把字符串与注释替换为空格（保留换行与偏移），同时记录字符串字面量。"""
+    chars = list(script)
+    literals: Dict[int, _Literal] = {}
+    length = len(script)
+    index = 0
+
+    def blank(start: int, end: int) -> None:
+        for position in range(start, end):
+            if chars[position] != "\n":
+                chars[position] = " "
+
+    while index < length:
+        char = script[index]
+        if script.startswith("//", index):
+            end = script.find("\n", index)
+            end = length if end < 0 else end
+            blank(index, end)
+        elif script.startswith("/*", index):
+            end = script.find("*/", index + 2)
+            end = length if end < 0 else end + 2
+            blank(index, end)
+        elif script.startswith('"""', index):
+            end = script.find('"""', index + 3)
+            end = length if end < 0 else end + 3
+            literals[index] = _Literal(index, end, script[index + 3:end - 3])
+            blank(index, end)
+        elif char in "\"'":
+            end = index + 1
+            while end < length and script[end] not in (char, "\n"):
+                end += 2 if script[end] == "\\" else 1
+            end = min(end + 1, length)
+            literals[index] = _Literal(index, end, script[index + 1:end - 1])
+            blank(index, end)
+        else:
+            index += 1
+            continue
+        index = end
+    return "".join(chars), literals
+
+
+def _match_paren(masked: str, open_index: int) -> int:
+    depth = 0
+    for position in range(open_index, len(masked)):
+        if masked[position] == "(":
+            depth += 1
+        elif masked[position] == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return len(masked) - 1
+
+
+def _first_literal(script: str, literals: Dict[int, _Literal], open_index: int) -> Optional[_Literal]:
+    position = open_index + 1
+    while position < len(script) and script[position].isspace():
+        position += 1
+    return literals.get(position)
+
+
+def _loop_depths(masked: str, positions: List[int]) -> Dict[int, int]:
+    """计算每个位置所处的循环 / lambda 嵌套层数。"""
+    wanted = set(positions)
+    depths: Dict[int, int] = {}
+    stack: List[str] = []
+    pending_loop = False
+    single_until = -1
+    for index, char in enumerate(masked):
+        if pending_loop and not char.isspace():
+            pending_loop = False
+            if char == "{":
+                stack.append("loop")
+                continue
+            # 不带花括号的单语句循环体，作用到本行或语句结束
+            ends = [end for end in (masked.find("\n", index), masked.find(";", index)) if end >= 0]
+            single_until = min(ends) if ends else len(masked)
+        if index in wanted:
+            depths[index] = sum(1 for kind in stack if kind in ("loop", "lambda")) + (1 if index < single_until else 0)
+        if char == "(":
+            prefix = masked[max(0, index - 24):index]
+            if _LAMBDA_CALL.search(prefix):
+                stack.append("lambda")
+            elif _LOOP_HEADER.search(prefix):
+                stack.append("header")
+            else:
+                stack.append("plain")
+        elif char == ")":
+            if stack and stack.pop() == "header":
+                pending_loop = True
+        elif char == "{":
+            stack.append("plain")
+        elif char == "}" and stack:
+            stack.pop()
+    return depths
+
+
+def _collect_queries(script: str, masked: str, literals: Dict[int, _Literal]) -> List[_Query]:
+    matches = list(_DB_CALL.finditer(masked))
+    depths = _loop_depths(masked, [match.start() for match in matches])
+    queries: List[_Query] = []
+    for match in matches:
+        open_index = match.end() - 1
+        end = _match_paren(masked, open_index)
+        literal = _first_literal(script, literals, open_index)
+        chain: List[str] = []
+        if match.group("op") == "table":
+            # 跟随 db.table(...).where()...select() 调用链
+            position = end + 1
+            while True:
+                link = _CHAIN_LINK.match(masked, position)
+                if not link:
+                    break
+                chain.append(link.group(1))
+                end = _match_paren(masked, link.end() - 1)
+                position = end + 1
+        assignment = _ASSIGNMENT.search(masked[max(0, masked.rfind("\n", 0, match.start()) + 1):match.start()])
+        queries.append(_Query(
+            op=match.group("op"),
+            start=match.start(),
+            end=end + 1,
+            loop_depth=depths.get(match.start(), 0),
+            sql=literal.text if literal is not None and match.group("op") != "table" else None,
+            chain=chain,
+            target=assignment.group("name") if assignment else None,
+        ))
+    return queries
+
+
+def _is_unbounded(query: _Query) -> Optional[bool]:
+    """查询是否未限制返回行数；``None`` 表示无法判断（SQL 为变量拼接）。"""
+    if query.op == "select":
+        if query.sql is None:
+            return None
+        return not _BOUNDED_SQL.search(query.sql)
+    if query.op == "table":
+        return "select" in query.chain and not {"page", "limit"} & set(query.chain)
+    return False
+
+
+def _tip(rule: str) -> Optional[str]:
+    _, category, keyword = _RULES[rule]
+    tips = get_performance_tips(category)
+    if isinstance(tips, list):
+        for tip in tips:
+            if keyword in tip:
+                return tip
+    return None
+
+
+def lint_script(script: str, method: Optional[str] = None) -> List[PerformanceFinding]:
+    """检查单个脚本，返回按代价从高到低排序的问题列表。
+
+    Args:
+        script: Magic-Script 脚本
+        method: 接口的 HTTP 方法（用于判断是否为读接口），函数脚本传 ``None``
+    """
+    masked, literals = _mask(script)
+    line_starts = [0] + [index + 1 for index, char in enumerate(script) if char == "\n"]
+    lines = script.splitlines()
+
+    def line_of(position: int) -> int:
+        return bisect.bisect_right(line_starts, position)
+
+    def finding(rule: str, severity: str, position: int, message: str, suggestion: str, extra: int = 0) -> PerformanceFinding:
+        line = line_of(position)
+        snippet = lines[line - 1].strip()[:160] if line <= len(lines) else ""
+        return PerformanceFinding(rule, severity, line, _RULES[rule][0] + extra, message, suggestion, snippet, _tip(rule))
+
+    findings: List[PerformanceFinding] = []
+    queries = _collect_queries(script, masked, literals)
+    seen: Dict[str, _Query] = {}
+    for query in queries:
+        call = f"db.{query.op}" + "".join(f"(...).{name}" for name in query.chain) + ("()" if query.chain else "")
+        if query.loop_depth:
+            write = query.op in _WRITE_OPS or bool({"insert", "update", "save", "saveOrUpdate", "delete"} & set(query.chain))
+            findings.append(finding(
+                "query_in_loop", "high", query.start,
+                f"{call} 位于循环或 lambda 中（嵌套 {query.loop_depth} 层），每个元素执行一次数据库操作（N+1）",
+                "循环外一次性批量写入（batchUpdate / 批量 insert）" if write
+                else "改为一次 IN 查询或 JOIN 取回全部数据，再在内存中按键组装",
+                extra=5 * (query.loop_depth - 1),
+            ))
+
+        unbounded = _is_unbounded(query)
+        if unbounded:
+            no_where = not (_WHERE.search(query.sql) if query.sql is not None else "where" in query.chain)
+            findings.append(finding(
+                "unbounded_select", "high" if no_where else "medium", query.start,
+                f"{call} 未限制返回行数" + ("且没有 WHERE 条件，会读取整张表" if no_where else ""),
+                "使用 db.page() / .page() 分页，或在 SQL 中加 LIMIT",
+                extra=3 if no_where else 0,
+            ))
+            if query.target:
+                usage = re.compile(rf"(?<![\w$.]){re.escape(query.target)}\s*\.\s*({'|'.join(_IN_MEMORY_OPS)})\s*\(")
+                for match in usage.finditer(masked, query.end):
+                    operation = match.group(1)
+                    findings.append(finding(
+                        "in_memory_processing", "medium", match.start(),
+                        f"对未限制行数的查询结果 {query.target} 在内存中执行 {operation}()",
+                        "用 SQL 的 COUNT(*) 计数" if operation == "size"
+                        else "把过滤/排序/分组下推到 SQL（WHERE / ORDER BY / GROUP BY），利用索引并减少传输",
+                    ))
+
+        if query.op in _READ_OPS:
+            key = re.sub(r"\s+", " ", script[query.start:query.end]).strip().lower()
+            if key in seen and not query.loop_depth:
+                findings.append(finding(
+                    "repeated_query", "medium", query.start,
+                    f"与第 {line_of(seen[key].start)} 行的查询完全相同，重复访问数据库",
+                    "复用第一次查询的结果变量",
+                ))
+            seen.setdefault(key, query)
+
+    reads = [query for query in queries if query.op in _READ_OPS]
+    if (method or "").upper() == "GET" and reads and not _CACHE.search(masked):
+        findings.append(finding(
+            "missing_cache", "low", reads[0].start,
+            f"GET 接口执行 {len(reads)} 次数据库读取但未使用缓存",
+            "热点读接口对查询结果使用 cache（如 db.cache('key', ttl).select(...)）并设置合理的过期时间",
+        ))
+
+    findings.sort(key=lambda item: (-item.cost, -SEVERITY_ORDER[item.severity], item.line))
+    return findings
+
+
+def executable_lines(script: str, io_only: bool = False) -> List[int]:
+    """返回脚本中可执行语句所在的行号（从 1 开始）。
+
+    跳过空行、注释、多行字符串的续行、只有括号的行与 ``import``；``io_only`` 时只保留
+    调用 ``db.`` / ``http.`` 的行。
+    """
+    masked, _ = _mask(script)
+    pattern = _IO_CALL if io_only else None
+    result = []
+    for number, text in enumerate(masked.split("\n"), 1):
+        if _NON_STATEMENT.match(text):
+            continue
+        if pattern is None or pattern.search(text):
+            result.append(number)
+    return result
+
+
+def summarize_findings(findings: List[PerformanceFinding]) -> Dict[str, Any]:
+    """汇总问题：总代价、按规则与严重程度计数。"""
+    by_rule: Dict[str, int] = {}
+    by_severity: Dict[str, int] = {}
+    for item in findings:
+        by_rule[item.rule] = by_rule.get(item.rule, 0) + 1
+        by_severity[item.severity] = by_severity.get(item.severity, 0) + 1
+    return {"cost": sum(item.cost for item in findings), "by_rule": by_rule, "by_severity": by_severity}
+
+
+__all__ = ["PerformanceFinding", "SEVERITY_ORDER", "executable_lines", "lint_script", "summarize_findings"]
@@ -0,0 +1,642 @@
+"""Magic-API 脚本与本地目录的双向同步。
+
+把资源树中的接口/函数脚本镜像到本地目录，方便使用任意编辑器与版本管理工具维护脚本：
+
+- 目录结构 ``<root>/<kind>/<分组路径>/<接口路径>.ms``，脚本旁的 ``.meta.json`` 记录 ID、名称、方法等元数据；
+- ``.magicapi-sync/`` 保存同步状态（每个文件对应的远端 ``updateTime`` 与同步时的脚本哈希）
+  以及最近一次同步的完整详情，作为推送时的请求体与三方合并的共同祖先；
+- 拉取只请求 ``updateTime`` 变化的文件详情；推送只保存内容相对基准有变化的文件，
+  多个文件并发保存，保存前若远端已变化则先做三方合并，存在冲突的文件不推送；
+- 监听本地目录（安装 ``watchdog`` 时使用 inotify 等系统通知，否则轮询修改时间），
+  编辑在防抖窗口内合并为一批推送；监听资源树缓存的变更事件，远端修改自动拉取。
+
+所有同步操作在单个工作线程中串行执行，避免拉取与推送交错写同一个文件。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+import requests
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.three_way_merge import has_conflict_markers, merge3
+from magicapi_tools.utils.tree_cache import TreeChange, build_node_index
+from magicapi_tools.utils.upstream_scheduler import upstream_priority, with_priority
+
+try:  # pragma: no cover - watchdog 为可选依赖
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None  # type: ignore[assignment]
+
+logger = get_logger('utils.script_sync')
+
+SYNC_KINDS = ("api", "function")
+SCRIPT_SUFFIX = ".ms"
+META_SUFFIX = ".meta.json"
+STATE_DIR = ".magicapi-sync"
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 0.5
+# 持续编辑时最多推迟推送的倍数，避免一直有写入时永远不推送
+MAX_DEBOUNCE_FACTOR = 10
+META_FIELDS = ("id", "name", "method", "path", "groupId", "updateTime")
+
+_UNSAFE_CHARS = re.compile(r'[<>:"\\|?*\x00-\x1f]')
+
+
+def script_hash(script: str) -> str:
+    return hashlib.sha1(script.encode("utf-8")).hexdigest()
+
+
+def _segments(value: str) -> List[str]:
+    return [_UNSAFE_CHARS.sub("_", part) for part in value.split("/") if part not in ("", ".", "..")]
+
+
+@dataclass(slots=True)
+class SyncEntry:
+    """资源树中一个脚本文件在本地的映射。"""
+
+    id: str
+    kind: str
+    path: str
+    node: Mapping[str, Any]
+
+    @property
+    def update_time(self) -> Any:
+        return self.node.get("updateTime")
+
+
+class _Debouncer:
+    """收集变化的文件路径，静默 ``delay`` 秒后一次性交给 ``flush``。"""
+
+    def __init__(self, delay: float, flush: Callable[[List[str]], None]) -> None:
+        self.delay = delay
+        self.flush = flush
+        self._pending: Set[str] = set()
+        self._first: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def add(self, path: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._pending.add(path)
+            if self._first is None:
+                self._first = now
+            if self._timer is not None:
+                self._timer.cancel()
+            remaining = self._first + self.delay * MAX_DEBOUNCE_FACTOR - now
+            self._timer = threading.Timer(max(0.0, min(self.delay, remaining)), self.fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return sorted(self._pending)
+
+    def fire(self) -> None:
+        with self._lock:
+            batch = sorted(self._pending)
+            self._pending.clear()
+            self._first = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            self.flush(batch)
+
+
+class _PollingWatcher:
+    """未安装 watchdog 时的回退方案：定期扫描脚本文件的修改时间。"""
+
+    name = "polling"
+
+    def __init__(self, root: str, callback: Callable[[str], None], interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.root = root
+        self.callback = callback
+        self.interval = interval
+        self._stop = threading.Event()
+        self._mtimes = self._scan()
+        self._thread = threading.Thread(target=self._run, name="magicapi-sync-poll", daemon=True)
+
+    def _scan(self) -> Dict[str, Tuple[float, int]]:
+        mtimes: Dict[str, Tuple[float, int]] = {}
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = [name for name in dirs if name != STATE_DIR]
+            for name in files:
+                if name.endswith(SCRIPT_SUFFIX):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    mtimes[path] = (stat.st_mtime, stat.st_size)
+        return mtimes
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            current = self._scan()
+            for path, signature in current.items():
+                if self._mtimes.get(path) != signature:
+                    self.callback(path)
+            for path in self._mtimes.keys() - current.keys():
+                self.callback(path)
+            self._mtimes = current
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.interval * 2)
+
+
+class _WatchdogHandler(FileSystemEventHandler):  # type: ignore[misc,valid-type]
+    def __init__(self, callback: Callable[[str], None]) -> None:
+        super().__init__()
+        self.callback = callback
+
+    def on_any_event(self, event: Any) -> None:
+        if event.is_directory:
+            return
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path and str(path).endswith(SCRIPT_SUFFIX) and f"{os.sep}{STATE_DIR}{os.sep}" not in str(path):
+                self.callback(str(path))
+
+
+class _WatchdogWatcher:
+    name = "watchdog"
+
+    def __init__(self, root: str, callback: Callable[[str], None]) -> None:
+        self._observer = Observer()
+        self._observer.schedule(_WatchdogHandler(callback), root, recursive=True)
+
+    def start(self) -> None:
+        self._observer.start()
+
+    def stop(self) -> None:
+        self._observer.stop()
+        self._observer.join(timeout=2)
+
+
+class ScriptSyncEngine:
+    """脚本双向同步引擎。
+
+    Args:
+        http_client: ``MagicAPIHTTPClient``
+        root: 本地同步目录
+        tree_cache: 共享资源树缓存；提供时推送后更新缓存，并在远端变化时自动拉取
+        kinds: 同步的资源类型
+        max_workers: 并发获取详情与保存的线程数
+        debounce: 本地编辑的防抖窗口（秒）
+    """
+
+    def __init__(
+        self,
+        http_client: Any,
+        root: str,
+        tree_cache: Any = None,
+        kinds: Sequence[str] = SYNC_KINDS,
+        max_workers: int = 4,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ) -> None:
+        self.http_client = http_client
+        self.root = os.path.abspath(root)
+        self.tree_cache = tree_cache
+        self.kinds = tuple(kinds)
+        self.max_workers = max(1, max_workers)
+        self.debounce = debounce
+
+        self._state_dir = os.path.join(self.root, STATE_DIR)
+        self._state_file = os.path.join(self._state_dir, "state.json")
+        self._state: Dict[str, Dict[str, Any]] = self._load_state()
+        # 所有同步操作在同一个工作线程中串行执行
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="magicapi-sync")
+        self._local = threading.local()
+        self._watcher: Any = None
+        self._debouncer = _Debouncer(debounce, self._schedule_push)
+        self._listening = False
+        self._stopped = False
+        self.last_pull: Optional[Dict[str, Any]] = None
+        self.last_push: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    def start(self, watch: bool = True) -> Dict[str, Any]:
+        """首次拉取后开始监听本地目录与资源树变更。"""
+        result = self.pull()
+        if self.tree_cache is not None and not self._listening:
+            self.tree_cache.add_listener(self._on_tree_change)
+            self._listening = True
+        if watch and self._watcher is None:
+            self._watcher = (_WatchdogWatcher(self.root, self._on_local_change) if Observer is not None
+                             else _PollingWatcher(self.root, self._on_local_change))
+            self._watcher.start()
+        return result
+
+    def stop(self) -> None:
+        """停止监听，推送防抖窗口内尚未推送的编辑后关闭工作线程。"""
+        if self._stopped:
+            return
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self._listening:
+            self.tree_cache.remove_listener(self._on_tree_change)
+            self._listening = False
+        self._debouncer.fire()
+        self._stopped = True
+        self._worker.shutdown(wait=True)
+
+    @property
+    def watcher(self) -> Optional[str]:
+        return self._watcher.name if self._watcher is not None else None
+
+    # ------------------------------------------------------------------
+    # 公共操作（在工作线程中执行）
+    # ------------------------------------------------------------------
+    def pull(self, ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """拉取远端变化；``ids`` 为空时检查全部文件。"""
+        return self._submit(self._pull, set(ids) if ids is not None else None, True).result()
+
+    def push(self, paths: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """推送本地修改；``paths`` 为空时检查全部已跟踪文件。"""
+        return self._submit(self._push, self._normalize(paths)).result()
+
+    def sync(self) -> Dict[str, Any]:
+        """先拉取再推送。"""
+        return {"pull": self.pull(), "push": self.push()}
+
+    def status(self) -> Dict[str, Any]:
+        """返回同步状态：本地已修改、存在冲突与等待推送的文件。"""
+        modified: List[str] = []
+        conflicts: List[str] = []
+        missing: List[str] = []
+        for record in list(self._state.values()):
+            text = self._read_script(record["path"])
+            if text is None:
+                missing.append(record["path"])
+            elif has_conflict_markers(text):
+                conflicts.append(record["path"])
+            elif script_hash(text) != record["base_hash"]:
+                modified.append(record["path"])
+        return {
+            "directory": self.root,
+            "kinds": list(self.kinds),
+            "tracked": len(self._state),
+            "watching": self.watcher,
+            "listening": self._listening,
+            "debounce_ms": int(self.debounce * 1000),
+            "pending": [self._relative(path) for path in self._debouncer.pending()],
+            "modified": sorted(modified),
+            "conflicts": sorted(conflicts),
+            "missing": sorted(missing),
+            "last_pull": self.last_pull,
+            "last_push": self.last_push,
+            "last_error": self.last_error,
+        }
+
+    def _submit(self, fn: Callable[..., Dict[str, Any]], *args: Any) -> "Future[Dict[str, Any]]":
+        return self._worker.submit(self._run, fn, *args)
+
+    def _run(self, fn: Callable[..., Dict[str, Any]], *args: Any) -> Dict[str, Any]:
+        self._local.active = True
+        try:
+            with upstream_priority("bulk"):
+                return fn(*args)
+        except Exception as exc:
+            self.last_error = str(exc)
+            logger.error(f"脚本同步失败: {exc}")
+            raise
+        finally:
+            self._local.active = False
+
+    # ------------------------------------------------------------------
+    # 事件
+    # ------------------------------------------------------------------
+    def _on_local_change(self, path: str) -> None:
+        if not self._stopped:
+            self._debouncer.add(path)
+
+    def _schedule_push(self, paths: List[str]) -> None:
+        if not self._stopped:
+            self._submit(self._push, self._normalize(paths)).add_done_callback(self._log_failure)
+
+    def _on_tree_change(self, change: TreeChange) -> None:
+        # 同步操作自身刷新资源树时也会触发，此时无需再排队拉取
+        if self._stopped or getattr(self._local, "active", False) or not change.changed:
+            return
+        self._submit(self._pull, set(change.changed_ids), False).add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future: "Future[Dict[str, Any]]") -> None:
+        if future.exception() is not None:
+            logger.warning(f"后台同步失败: {future.exception()}")
+
+    # ------------------------------------------------------------------
+    # 拉取
+    # ------------------------------------------------------------------
+    def _pull(self, ids: Optional[Set[str]], refresh: bool) -> Dict[str, Any]:
+        tree = self._fetch_tree(refresh)
+        entries = self._entries(tree)
+        result: Dict[str, Any] = {"pulled": [], "merged": [], "conflicts": [], "deleted": [],
+                                  "orphaned": [], "moved": [], "unchanged": 0}
+
+        changed: List[SyncEntry] = []
+        for entry in entries.values():
+            if ids is not None and entry.id not in ids:
+                continue
+            record = self._state.get(entry.id)
+            if record is not None and record["path"] != entry.path:
+                self._move(record["path"], entry.path)
+                result["moved"].append(entry.path)
+                record["path"] = entry.path
+            if record is not None and record["update_time"] == entry.update_time \
+                    and self._read_script(entry.path) is not None:
+                result["unchanged"] += 1
+                continue
+            changed.append(entry)
+
+        for entry, (ok, detail) in zip(changed, self._map(lambda e: self.http_client.api_detail(e.id), changed)):
+            if not ok or not isinstance(detail, Mapping):
+                logger.warning(f"获取脚本详情失败: {entry.id} {detail}")
+                continue
+            self._apply_remote(entry, dict(detail), result)
+
+        for file_id in [file_id for file_id in self._state if file_id not in entries]:
+            if ids is not None and file_id not in ids:
+                continue
+            record = self._state.pop(file_id)
+            text = self._read_script(record["path"])
+            if text is not None and script_hash(text) != record["base_hash"]:
+                # 远端已删除但本地有未推送的修改，保留文件交给用户处理
+                result["orphaned"].append(record["path"])
+            else:
+                self._remove_files(record["path"])
+                result["deleted"].append(record["path"])
+            self._remove_base(file_id)
+
+        self._save_state()
+        self.last_pull = {key: (value if isinstance(value, int) else len(value)) for key, value in result.items()}
+        return result
+
+    def _apply_remote(self, entry: SyncEntry, detail: Dict[str, Any], result: Dict[str, Any]) -> None:
+        remote = str(detail.get("script") or "")
+        record = self._state.get(entry.id)
+        local = self._read_script(entry.path)
+        if local is None or record is None or script_hash(local) == record["base_hash"]:
+            self._write_script(entry.path, remote)
+            result["pulled"].append(entry.path)
+        else:
+            base = self._load_base(entry.id)
+            merged = merge3(str(base.get("script") or "") if base else "", local, remote)
+            self._write_script(entry.path, merged.text)
+            result["conflicts" if merged.conflicts else "merged"].append(entry.path)
+        self._record(entry, detail, remote)
+
+    # ------------------------------------------------------------------
+    # 推送
+    # ------------------------------------------------------------------
+    def _push(self, paths: Optional[Set[str]]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"pushed": [], "merged": [], "conflicts": [], "failed": [],
+                                  "remote_deleted": [], "missing": [], "untracked": []}
+        by_path = {record["path"]: file_id for file_id, record in self._state.items()}
+        if paths is not None:
+            result["untracked"] = sorted(path for path in paths if path not in by_path)
+        candidates: List[Tuple[str, str]] = []
+        for path, file_id in by_path.items():
+            if paths is not None and path not in paths:
+                continue
+            text = self._read_script(path)
+            if text is None:
+                result["missing"].append(path)
+            elif has_conflict_markers(text):
+                result["conflicts"].append(path)
+            elif script_hash(text) != self._state[file_id]["base_hash"]:
+                candidates.append((file_id, text))
+        if not candidates:
+            self.last_push = {key: len(value) for key, value in result.items()}
+            return result
+
+        # 保存前确认远端未变化，已变化的先与本地修改合并
+        index = build_node_index(self._fetch_tree(True))
+        pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        for file_id, text in candidates:
+            record = self._state[file_id]
+            node = index.get(file_id)
+            if node is None:
+                result["remote_deleted"].append(record["path"])
+                continue
+            base = self._load_base(file_id)
+            if node[1].get("updateTime") != record["update_time"] or base is None:
+                ok, detail = self.http_client.api_detail(file_id)
+                if not ok or not isinstance(detail, Mapping):
+                    result["failed"].append({"path": record["path"], "error": str(detail)})
+                    continue
+                remote = str(detail.get("script") or "")
+                merged = merge3(str(base.get("script") or "") if base else "", text, remote)
+                self._write_script(record["path"], merged.text)
+                entry = SyncEntry(file_id, record["kind"], record["path"], node[1])
+                self._record(entry, dict(detail), remote)
+                if merged.conflicts:
+                    result["conflicts"].append(record["path"])
+                    continue
+                result["merged"].append(record["path"])
+                text, base = merged.text, dict(detail)
+                if text == remote:
+                    continue
+            pending.append((file_id, text, base))
+
+        saved: List[Tuple[str, str, Dict[str, Any]]] = []
+        for item, error in zip(pending, self._map(self._save, pending)):
+            if error is None:
+                saved.append(item)
+            else:
+                result["failed"].append({"path": self._state[item[0]]["path"], "error": error})
+        if saved:
+            # 保存会更新 updateTime，刷新一次资源树记录新的版本
+            index = build_node_index(self._fetch_tree(True))
+            for file_id, text, payload in saved:
+                record = self._state[file_id]
+                node = index.get(file_id)
+                node_info = node[1] if node else payload
+                payload["updateTime"] = node_info.get("updateTime")
+                self._record(SyncEntry(file_id, record["kind"], record["path"], node_info), payload, text)
+                result["pushed"].append(record["path"])
+        self._save_state()
+        self.last_push = {key: len(value) for key, value in result.items()}
+        return result
+
+    def _save(self, item: Tuple[str, str, Dict[str, Any]]) -> Optional[str]:
+        # 以最近同步的完整详情作为请求体，只替换脚本，无需再请求一次详情
+        file_id, text, payload = item
+        payload["script"] = text
+        kind = self._state[file_id]["kind"]
+        try:
+            response = self.http_client.request(
+                "POST",
+                f"/magic/web/resource/file/{kind}/save",
+                params={"groupId": payload.get("groupId"), "auto": "0"},
+                json=payload,
+            )
+            body = response.json()
+        except (requests.RequestException, ValueError) as exc:
+            return str(exc)
+        if response.status_code != 200 or body.get("code") != 1:
+            return str(body.get("message") or f"HTTP {response.status_code}")
+        return None
+
+    # ------------------------------------------------------------------
+    # 资源树
+    # ------------------------------------------------------------------
+    def _fetch_tree(self, refresh: bool) -> Mapping[str, Any]:
+        if self.tree_cache is not None:
+            ok, tree = self.tree_cache.refresh() if refresh else self.tree_cache.get_tree()
+        else:
+            ok, tree = self.http_client.resource_tree()
+        if not ok:
+            raise RuntimeError(f"获取资源树失败: {tree}")
+        return tree or {}
+
+    def _entries(self, tree: Mapping[str, Any]) -> Dict[str, SyncEntry]:
+        entries: Dict[str, SyncEntry] = {}
+        taken: Set[str] = set()
+        for kind in self.kinds:
+            section = tree.get(kind)
+            if not isinstance(section, Mapping):
+                continue
+            for node, chain in self._walk(section.get("children") or [], [kind]):
+                stem = "/".join(chain + (_segments(str(node.get("path") or "")) or _segments(str(node.get("name") or node["id"]))))
+                path = stem + SCRIPT_SUFFIX
+                if path in taken:
+                    # 同一路径不同方法的接口共用一个文件名时追加方法或 ID 区分
+                    path = f"{stem}.{node.get('method') or node['id']}{SCRIPT_SUFFIX}"
+                    if path in taken:
+                        path = f"{stem}.{node['id']}{SCRIPT_SUFFIX}"
+                taken.add(path)
+                entries[str(node["id"])] = SyncEntry(str(node["id"]), kind, path, node)
+        return entries
+
+    def _walk(self, children: Sequence[Mapping[str, Any]], chain: List[str]) -> Iterator[Tuple[Mapping[str, Any], List[str]]]:
+        for child in children:
+            node = child.get("node") or {}
+            if not node.get("id"):
+                continue
+            if "groupId" in node:
+                yield node, chain
+            else:
+                segment = _segments(str(node.get("path") or "")) or _segments(str(node.get("name") or node["id"]))
+                yield from self._walk(child.get("children") or [], chain + segment)
+
+    # ------------------------------------------------------------------
+    # 本地文件与状态
+    # ------------------------------------------------------------------
+    def _absolute(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/"))
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def _normalize(self, paths: Optional[Iterable[str]]) -> Optional[Set[str]]:
+        if paths is None:
+            return None
+        return {self._relative(path if os.path.isabs(path) else self._absolute(path)) for path in paths}
+
+    def _read_script(self, path: str) -> Optional[str]:
+        try:
+            with open(self._absolute(path), encoding="utf-8", newline="") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_script(self, path: str, text: str) -> None:
+        target = self._absolute(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp = f"{target}.tmp"
+        with open(temp, "w", encoding="utf-8", newline="") as handle:
+            handle.write(text)
+        os.replace(temp, target)
+
+    def _write_meta(self, path: str, node: Mapping[str, Any], kind: str) -> None:
+        meta = {field: node.get(field) for field in META_FIELDS if node.get(field) is not None}
+        meta["kind"] = kind
+        with open(self._absolute(path[: -len(SCRIPT_SUFFIX)] + META_SUFFIX), "w", encoding="utf-8") as handle:
+            json.dump(meta, handle, ensure_ascii=False, indent=2)
+
+    def _move(self, old: str, new: str) -> None:
+        for source, target in ((old, new), (old[: -len(SCRIPT_SUFFIX)] + META_SUFFIX, new[: -len(SCRIPT_SUFFIX)] + META_SUFFIX)):
+            if os.path.exists(self._absolute(source)):
+                os.makedirs(os.path.dirname(self._absolute(target)), exist_ok=True)
+                os.replace(self._absolute(source), self._absolute(target))
+
+    def _remove_files(self, path: str) -> None:
+        for target in (path, path[: -len(SCRIPT_SUFFIX)] + META_SUFFIX):
+            try:
+                os.remove(self._absolute(target))
+            except FileNotFoundError:
+                pass
+
+    def _record(self, entry: SyncEntry, detail: Dict[str, Any], script: str) -> None:
+        self._state[entry.id] = {
+            "path": entry.path,
+            "kind": entry.kind,
+            "update_time": entry.update_time,
+            "base_hash": script_hash(script),
+        }
+        self._write_meta(entry.path, entry.node, entry.kind)
+        detail["script"] = script
+        self._store_base(entry.id, detail)
+
+    def _base_path(self, file_id: str) -> str:
+        return os.path.join(self._state_dir, "base", f"{file_id}.json")
+
+    def _store_base(self, file_id: str, detail: Mapping[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self._base_path(file_id)), exist_ok=True)
+        with open(self._base_path(file_id), "w", encoding="utf-8") as handle:
+            json.dump(detail, handle, ensure_ascii=False)
+
+    def _load_base(self, file_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._base_path(file_id), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _remove_base(self, file_id: str) -> None:
+        try:
+            os.remove(self._base_path(file_id))
+        except FileNotFoundError:
+            pass
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._state_file, encoding="utf-8") as handle:
+                return dict(json.load(handle).get("files") or {})
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        os.makedirs(self._state_dir, exist_ok=True)
+        with open(self._state_file, "w", encoding="utf-8") as handle:
+            json.dump({"version": 1, "kinds": list(self.kinds), "files": self._state}, handle, ensure_ascii=False)
+
+    def _map(self, fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(with_priority("bulk", fn), items))
+
+
+__all__ = ["SYNC_KINDS", "ScriptSyncEngine", "SyncEntry", "script_hash"]
@@ -0,0 +1,106 @@
+"""请求合并（single-flight）。
+
+并发发起的相同幂等读请求只真正执行一次，其余调用方等待并共享同一结果（或同一异常）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple, TypeVar
+
+from magicapi_tools.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+def request_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None,
+                body: Any = None) -> Tuple[str, str, str]:
+    """构造 ``(method, url, body_hash)`` 合并键，查询参数计入摘要。"""
+    digest = hashlib.sha1()
+    if params:
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\x00")
+    if body is not None:
+        if isinstance(body, bytes):
+            digest.update(body)
+        elif isinstance(body, str):
+            digest.update(body.encode("utf-8"))
+        else:
+            digest.update(json.dumps(body, sort_keys=True, default=str).encode("utf-8"))
+    return method.upper(), url, digest.hexdigest()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """线程安全的请求合并器。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """执行 ``fn``；若相同 ``key`` 已在执行中，则等待并复用其结果。"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.hits += 1
+                call.waiters += 1
+                leader = False
+            else:
+                self.misses += 1
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+        metrics.record_cache("single_flight", not leader)
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "in_flight": len(self._calls),
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+__all__ = ["SingleFlight", "request_key"]
@@ -0,0 +1,136 @@
+"""按行的三方合并（diff3 语义）。
+
+以共同祖先 ``base`` 为基准，分别计算 ``local`` 与 ``remote`` 的修改块：
+
+- 只有一方修改的区域直接采用该方的内容；
+- 双方修改结果相同的区域只保留一份；
+- 双方修改重叠且内容不同时输出冲突标记::
+
+    <<<<<<< local
+    本地内容
+    =======
+    远端内容
+    >>>>>>> remote
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import List, Sequence, Tuple
+
+CONFLICT_START = "<<<<<<< local"
+CONFLICT_SEPARATOR = "======="
+CONFLICT_END = ">>>>>>> remote"
+
+# 修改块：(基准起始行, 基准结束行, 替换后的行)
+_Hunk = Tuple[int, int, List[str]]
+
+
+@dataclass(slots=True)
+class MergeResult:
+    """合并结果。"""
+
+    text: str
+    conflicts: int = 0
+
+    @property
+    def clean(self) -> bool:
+        return self.conflicts == 0
+
+
+def has_conflict_markers(text: str) -> bool:
+    """文本中是否残留未解决的冲突标记。"""
+    lines = text.splitlines()
+    return any(line.startswith(CONFLICT_START) for line in lines) and CONFLICT_END in lines
+
+
+def _hunks(base: Sequence[str], other: Sequence[str]) -> List[_Hunk]:
+    matcher = SequenceMatcher(None, base, other, autojunk=False)
+    return [
+        (i1, i2, list(other[j1:j2]))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _apply(base: Sequence[str], hunks: Sequence[_Hunk], start: int, end: int) -> List[str]:
+    """把落在 [start, end) 内的修改块应用到基准片段上。"""
+    result: List[str] = []
+    position = start
+    for hunk_start, hunk_end, lines in hunks:
+        result.extend(base[position:hunk_start])
+        result.extend(lines)
+        position = hunk_end
+    result.extend(base[position:end])
+    return result
+
+
+def _terminated(lines: List[str]) -> List[str]:
+    if lines and not lines[-1].endswith("\n"):
+        return lines[:-1] + [lines[-1] + "\n"]
+    return lines
+
+
+def merge3(base: str, local: str, remote: str) -> MergeResult:
+    """三方合并 ``local`` 与 ``remote``。"""
+    if local == remote:
+        return MergeResult(local)
+    if local == base:
+        return MergeResult(remote)
+    if remote == base:
+        return MergeResult(local)
+
+    base_lines = base.splitlines(keepends=True)
+    pending = sorted(
+        [(start, end, lines, 0) for start, end, lines in _hunks(base_lines, local.splitlines(keepends=True))]
+        + [(start, end, lines, 1) for start, end, lines in _hunks(base_lines, remote.splitlines(keepends=True))],
+        key=lambda hunk: (hunk[0], hunk[1]),
+    )
+
+    output: List[str] = []
+    conflicts = 0
+    position = 0
+    index = 0
+    while index < len(pending):
+        start, end = pending[index][0], pending[index][1]
+        group = [pending[index]]
+        index += 1
+        # 吸收与当前区域重叠的修改块（同一位置的两个插入也视为重叠）
+        while index < len(pending):
+            next_start, next_end = pending[index][0], pending[index][1]
+            overlaps = (
+                next_start < end
+                or next_start == start
+                or (next_start == end and (next_start == next_end or start == end))
+            )
+            if not overlaps:
+                break
+            end = max(end, next_end)
+            group.append(pending[index])
+            index += 1
+
+        output.extend(base_lines[position:start])
+        sides = {side for *_, side in group}
+        local_part = _apply(base_lines, [h[:3] for h in group if h[3] == 0], start, end)
+        remote_part = _apply(base_lines, [h[:3] for h in group if h[3] == 1], start, end)
+        if sides == {0}:
+            output.extend(local_part)
+        elif sides == {1}:
+            output.extend(remote_part)
+        elif local_part == remote_part:
+            output.extend(local_part)
+        else:
+            conflicts += 1
+            output.append(CONFLICT_START + "\n")
+            output.extend(_terminated(local_part))
+            output.append(CONFLICT_SEPARATOR + "\n")
+            output.extend(_terminated(remote_part))
+            output.append(CONFLICT_END + "\n")
+        position = end
+
+    output.extend(base_lines[position:])
+    return MergeResult("".join(output), conflicts)
+
+
+__all__ = ["CONFLICT_END", "CONFLICT_SEPARATOR", "CONFLICT_START", "MergeResult", "has_conflict_markers", "merge3"]
@@ -0,0 +1,457 @@
+"""轻量级调用链追踪。
+
+按 OpenTelemetry 的模型记录 span：每次工具调用是一条 trace 的根 span，服务层操作、
+HTTP 请求、WebSocket 命令与日志等待等阶段作为子 span 挂在其下，用于拆解慢调用的耗时。
+
+- 当前 span 保存在 ``contextvars`` 中，``asyncio`` 任务与 ``asyncio.to_thread`` 自动继承；
+- 上游 HTTP 请求携带 W3C ``traceparent`` 请求头，工具调用可从 MCP 请求 ``_meta.traceparent`` 延续外部 trace；
+- 完成的 trace 保存在内存环形缓冲区（``get_last_traces`` 工具读取），并可导出到本地 JSONL 文件
+  或 OTLP/HTTP（JSON 编码）收集器。
+
+不依赖 ``opentelemetry`` 包；导出格式与 OTLP ``/v1/traces`` 兼容，可直接发送给 OpenTelemetry Collector。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Protocol, Tuple
+
+from magicapi_tools.logging_config import get_logger
+
+logger = get_logger('utils.tracing')
+
+DEFAULT_TRACE_BUFFER = 50
+# 单条 trace 最多保留的 span 数，避免长轮询或批量操作占用过多内存
+MAX_SPANS_PER_TRACE = 1000
+SERVICE_NAME = "magic-api-mcp-server"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass(slots=True)
+class Span:
+    """一个计时区间。"""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = field(default_factory=time.time)
+    start_ns: int = field(default_factory=time.perf_counter_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "ok"
+    error: Optional[str] = None
+    # 所属 trace 根 span 的 ID（同一外部 trace 可能同时延续出多个根）
+    root_id: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time": time.time(), "attributes": attributes})
+
+    def record_error(self, message: str) -> None:
+        self.status = "error"
+        self.error = message
+
+
+class _NoopSpan:
+    """未启用追踪或不在 trace 内时返回的空 span。"""
+
+    __slots__ = ()
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, message: str) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class TraceExporter(Protocol):
+    """trace 导出器协议。"""
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class JsonlTraceExporter:
+    """每条 trace 追加为 JSONL 文件中的一行。"""
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(os.path.expanduser(path))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        line = json.dumps(trace, ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    def close(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """把 trace 转换为 OTLP/JSON ``ExportTraceServiceRequest``。"""
+    base_ns = int(trace["start_time"] * 1e9)
+    spans = []
+    for span in trace["spans"]:
+        start = base_ns + int(span["offset_ms"] * 1e6)
+        otlp_span: Dict[str, Any] = {
+            "traceId": trace["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int(span["duration_ms"] * 1e6)),
+            "attributes": _otlp_attributes(span.get("attributes") or {}),
+            "status": {"code": 2, "message": span.get("error") or ""} if span["status"] == "error" else {"code": 1},
+        }
+        if span.get("parent_id"):
+            otlp_span["parentSpanId"] = span["parent_id"]
+        if span.get("events"):
+            otlp_span["events"] = [
+                {"name": event["name"], "timeUnixNano": str(int(event["time"] * 1e9)),
+                 "attributes": _otlp_attributes(event.get("attributes") or {})}
+                for event in span["events"]
+            ]
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "magicapi_tools.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class OtlpHttpTraceExporter:
+    """以 OTLP/HTTP（JSON 编码）把 trace 发送到收集器，后台线程发送，不阻塞工具调用。"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0, max_queue: int = 256) -> None:
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        try:
+            self._queue.put(None, timeout=self.timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout=self.timeout)
+
+    def _run(self) -> None:
+        import requests
+
+        session = requests.Session()
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                break
+            try:
+                session.post(self.url, json=to_otlp(trace), timeout=self.timeout)
+            except requests.RequestException as exc:
+                logger.debug(f"OTLP 导出失败: {exc}")
+
+
+class Tracer:
+    """进程级追踪器。"""
+
+    def __init__(self, buffer_size: int = DEFAULT_TRACE_BUFFER) -> None:
+        self.enabled = True
+        self.exporters: List[TraceExporter] = []
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+            "magicapi_current_span", default=None
+        )
+        self._lock = threading.Lock()
+        self._active: Dict[str, List[Span]] = {}
+        self._finished: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+
+    # ------------------------------------------------------------------
+    # 配置
+    # ------------------------------------------------------------------
+    def configure(self, enabled: bool = True, buffer_size: int = DEFAULT_TRACE_BUFFER,
+                  export_file: Optional[str] = None, otlp_endpoint: Optional[str] = None) -> None:
+        """按配置重置缓冲区与导出器。"""
+        self.shutdown()
+        self.enabled = enabled
+        with self._lock:
+            self._finished = deque(self._finished, maxlen=max(buffer_size, 1))
+        if export_file:
+            self.exporters.append(JsonlTraceExporter(export_file))
+        if otlp_endpoint:
+            self.exporters.append(OtlpHttpTraceExporter(otlp_endpoint))
+
+    def shutdown(self) -> None:
+        """关闭并移除所有导出器。"""
+        exporters, self.exporters = self.exporters, []
+        for exporter in exporters:
+            try:
+                exporter.close()
+            except Exception as exc:  # noqa: BLE001 - 关闭失败仅记录
+                logger.debug(f"关闭 trace 导出器失败: {exc}")
+
+    # ------------------------------------------------------------------
+    # span
+    # ------------------------------------------------------------------
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def current_traceparent(self) -> Optional[str]:
+        span = self._current.get()
+        return span.traceparent if span is not None else None
+
+    @contextmanager
+    def span(self, name: str, *, start_trace: bool = False, traceparent: Optional[str] = None,
+             **attributes: Any) -> Iterator[Any]:
+        """开启一个 span。
+
+        Args:
+            name: span 名称（阶段名）
+            start_trace: 当前不在 trace 内时是否开启新 trace；为 ``False`` 时返回空 span
+            traceparent: 外部传入的 W3C ``traceparent``，开启新 trace 时延续其 trace ID
+            **attributes: span 属性
+        """
+        parent = self._current.get()
+        if not self.enabled or (parent is None and not start_trace):
+            yield NOOP_SPAN
+            return
+
+        if parent is not None:
+            span = Span(name, parent.trace_id, _new_id(8), parent.span_id, attributes=attributes,
+                        root_id=parent.root_id)
+        else:
+            match = _TRACEPARENT.match(traceparent or "")
+            trace_id, remote_parent = match.groups() if match else (_new_id(16), None)
+            span = Span(name, trace_id, _new_id(8), remote_parent, attributes=attributes)
+            span.root_id = span.span_id
+            with self._lock:
+                self._active[span.span_id] = []
+        is_root = parent is None
+
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_error(f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_ns = time.perf_counter_ns()
+            self._finish(span, is_root)
+
+    def _finish(self, span: Span, is_root: bool) -> None:
+        with self._lock:
+            spans = self._active.get(span.root_id)
+            if spans is None:
+                # 根 span 已结束（例如未等待的后台任务），丢弃
+                return
+            if len(spans) < MAX_SPANS_PER_TRACE or is_root:
+                spans.append(span)
+            if not is_root:
+                return
+            del self._active[span.root_id]
+        trace = _build_trace(span, spans)
+        with self._lock:
+            self._finished.append(trace)
+        for exporter in list(self.exporters):
+            try:
+                exporter.export(trace)
+            except Exception as exc:  # noqa: BLE001 - 导出失败不影响工具调用
+                logger.warning(f"trace 导出失败: {exc}")
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def last_traces(self, limit: int = 10, name: Optional[str] = None,
+                    min_duration_ms: float = 0.0) -> List[Dict[str, Any]]:
+        """返回最近完成的 trace（新的在前）。"""
+        with self._lock:
+            traces = list(self._finished)
+        selected: List[Dict[str, Any]] = []
+        for trace in reversed(traces):
+            if name and name not in trace["name"]:
+                continue
+            if trace["duration_ms"] < min_duration_ms:
+                continue
+            selected.append(trace)
+            if len(selected) >= limit:
+                break
+        return selected
+
+    def clear(self) -> None:
+        with self._lock:
+            self._finished.clear()
+
+
+def _build_trace(root: Span, spans: List[Span]) -> Dict[str, Any]:
+    ordered = sorted(spans, key=lambda item: item.start_ns)
+    return {
+        "trace_id": root.trace_id,
+        "name": root.name,
+        "start_time": root.start_time,
+        "duration_ms": round(root.duration_ms, 3),
+        "status": "error" if any(item.status == "error" for item in spans) else "ok",
+        "span_count": len(spans),
+        "spans": [
+            {
+                "span_id": item.span_id,
+                "parent_id": item.parent_id,
+                "name": item.name,
+                "offset_ms": round((item.start_ns - root.start_ns) / 1e6, 3),
+                "duration_ms": round(item.duration_ms, 3),
+                "status": item.status,
+                "error": item.error,
+                "attributes": item.attributes,
+                "events": item.events,
+            }
+            for item in ordered
+        ],
+    }
+
+
+def stage_breakdown(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """按阶段（span 名称）汇总自身耗时（扣除子 span），按耗时降序。"""
+    children_ms: Dict[str, float] = {}
+    for span in trace["spans"]:
+        if span.get("parent_id"):
+            children_ms[span["parent_id"]] = children_ms.get(span["parent_id"], 0.0) + span["duration_ms"]
+    stages: Dict[str, Tuple[int, float]] = {}
+    for span in trace["spans"]:
+        self_ms = max(span["duration_ms"] - children_ms.get(span["span_id"], 0.0), 0.0)
+        count, total = stages.get(span["name"], (0, 0.0))
+        stages[span["name"]] = (count + 1, total + self_ms)
+    total_ms = trace["duration_ms"] or 1.0
+    return sorted(
+        (
+            {"stage": name, "count": count, "self_ms": round(total, 3), "percent": round(total * 100 / total_ms, 1)}
+            for name, (count, total) in stages.items()
+        ),
+        key=lambda item: item["self_ms"],
+        reverse=True,
+    )
+
+
+def format_span_tree(trace: Dict[str, Any]) -> List[str]:
+    """把 trace 渲染为缩进文本行，便于在对话中阅读。"""
+    by_parent: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {span["span_id"] for span in trace["spans"]}
+    for span in trace["spans"]:
+        parent = span.get("parent_id") if span.get("parent_id") in ids else None
+        by_parent.setdefault(parent, []).append(span)
+
+    lines: List[str] = []
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in by_parent.get(parent, []):
+            flag = " ❌" if span["status"] == "error" else ""
+            lines.append(f"{'  ' * depth}{span['name']}  +{span['offset_ms']:.1f}ms  {span['duration_ms']:.1f}ms{flag}")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return lines
+
+
+# 进程级追踪器
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """装饰器：在已有 trace 内为函数调用记录子 span（支持同步与异步函数）。"""
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.span(span_name, **attributes):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(span_name, **attributes):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "DEFAULT_TRACE_BUFFER",
+    "JsonlTraceExporter",
+    "NOOP_SPAN",
+    "OtlpHttpTraceExporter",
+    "Span",
+    "TraceExporter",
+    "Tracer",
+    "format_span_tree",
+    "stage_breakdown",
+    "to_otlp",
+    "traced",
+    "tracer",
+]
@@ -0,0 +1,260 @@
+"""Magic-API 资源树缓存。
+
+在多个工具与 MCP 资源之间共享一份资源树：
+
+- 在 TTL 内复用缓存，过期后由第一个调用方刷新，其余调用方等待同一次刷新结果；
+- 每次刷新按节点签名（包含 ``updateTime`` 等元数据）与上一版本对比，得出新增/删除/修改的节点；
+- 检测到变化时通知监听器（例如推送 ``notifications/resources/updated``）。
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.metrics import metrics
+
+logger = get_logger('utils.tree_cache')
+
+DEFAULT_TREE_CACHE_TTL = 30.0
+# 同一文件的 WS 事件检查最小间隔（秒），避免 IDE 频繁切换文件时重复请求
+FILE_CHECK_MIN_INTERVAL = 1.0
+
+
+@dataclass(slots=True)
+class TreeChange:
+    """一次刷新检测到的资源树变化。"""
+
+    version: int
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    @property
+    def changed_ids(self) -> List[str]:
+        return self.added + self.removed + self.modified
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "added": self.added,
+            "removed": self.removed,
+            "modified": self.modified,
+        }
+
+
+TreeListener = Callable[[TreeChange], None]
+
+
+def _node_signature(node_info: Mapping[str, Any]) -> str:
+    """计算节点签名，任何元数据变化（含 updateTime）都会改变签名。"""
+    return json.dumps(node_info, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def build_node_index(tree_data: Mapping[str, Any]) -> Dict[str, Tuple[str, Mapping[str, Any]]]:
+    """为资源树中的所有节点建立 ``id -> (签名, 节点信息)`` 索引。"""
+    index: Dict[str, Tuple[str, Mapping[str, Any]]] = {}
+    for section in tree_data.values():
+        if not isinstance(section, Mapping):
+            continue
+        stack = list(section.get("children") or [])
+        while stack:
+            child = stack.pop()
+            node_info = child.get("node") or {}
+            node_id = node_info.get("id")
+            if node_id:
+                index[str(node_id)] = (_node_signature(node_info), node_info)
+            stack.extend(child.get("children") or [])
+    return index
+
+
+def compute_tree_stats(tree_data: Mapping[str, Any]) -> Dict[str, Any]:
+    """统计资源树，口径与 ``get_resource_statistics`` 保持一致。"""
+    total_resources = 0
+    api_endpoints = 0
+    by_method: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+
+    for resource_type, type_data in tree_data.items():
+        if not isinstance(type_data, Mapping) or "children" not in type_data:
+            continue
+        stack = list(type_data["children"] or [])
+        while stack:
+            node = stack.pop()
+            node_info = node.get("node", {})
+            total_resources += 1
+            node_resource_type = node_info.get("type", resource_type)
+            by_type[node_resource_type] = by_type.get(node_resource_type, 0) + 1
+            method = node_info.get("method")
+            if method:
+                api_endpoints += 1
+                by_method[method.upper()] = by_method.get(method.upper(), 0) + 1
+            stack.extend(node.get("children") or [])
+
+    return {
+        "total_resources": total_resources,
+        "api_endpoints": api_endpoints,
+        "other_resources": total_resources - api_endpoints,
+        "by_method": by_method,
+        "by_type": by_type,
+        "resource_types": list(tree_data.keys()),
+    }
+
+
+class ResourceTreeCache:
+    """带 TTL 与变更检测的资源树缓存。"""
+
+    def __init__(self, http_client: Any, ttl_seconds: float = DEFAULT_TREE_CACHE_TTL) -> None:
+        self.http_client = http_client
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.fetched_at: Optional[float] = None
+
+        self._tree: Optional[Dict[str, Any]] = None
+        self._index: Dict[str, Tuple[str, Mapping[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._listeners: List[TreeListener] = []
+        self._file_checks: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # 监听器
+    # ------------------------------------------------------------------
+    def add_listener(self, listener: TreeListener) -> None:
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: TreeListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def is_fresh(self) -> bool:
+        return self.fetched_at is not None and (time.monotonic() - self.fetched_at) < self.ttl_seconds
+
+    def get_tree(self, force_refresh: bool = False) -> Tuple[bool, Any]:
+        """获取资源树，缓存有效时直接返回缓存。"""
+        if not force_refresh and self.is_fresh():
+            metrics.record_cache("resource_tree", True)
+            return True, self._tree
+        metrics.record_cache("resource_tree", False)
+        return self.refresh(only_if_stale=not force_refresh)
+
+    def get_node(self, file_id: str) -> Optional[Mapping[str, Any]]:
+        """获取缓存中的节点元数据（不触发刷新）。"""
+        entry = self._index.get(str(file_id))
+        return entry[1] if entry else None
+
+    def get_stats(self, force_refresh: bool = False) -> Tuple[bool, Any]:
+        ok, tree = self.get_tree(force_refresh=force_refresh)
+        if not ok:
+            return False, tree
+        return True, compute_tree_stats(tree or {})
+
+    def invalidate(self) -> None:
+        """使缓存失效，下一次读取将重新获取。"""
+        self.fetched_at = None
+
+    # ------------------------------------------------------------------
+    # 刷新与变更检测
+    # ------------------------------------------------------------------
+    def refresh(self, only_if_stale: bool = False) -> Tuple[bool, Any]:
+        """刷新资源树并检测变化。
+
+        并发调用时只有一个线程真正发起请求，其余线程等待后复用其结果。
+        """
+        with self._refresh_lock:
+            if only_if_stale and self.is_fresh():
+                return True, self._tree
+
+            ok, data = self.http_client.resource_tree()
+            if not ok:
+                return False, data
+            change = self._apply(data or {})
+
+        if change.changed:
+            logger.info(
+                f"资源树变化: 新增 {len(change.added)}, 删除 {len(change.removed)}, 修改 {len(change.modified)}"
+            )
+            self._emit(change)
+        return True, data
+
+    def update(self, tree_data: Mapping[str, Any]) -> TreeChange:
+        """使用外部已获取的资源树更新缓存（例如工具已拉取过完整树）。"""
+        with self._refresh_lock:
+            change = self._apply(dict(tree_data))
+        if change.changed:
+            self._emit(change)
+        return change
+
+    def check_file(self, file_id: str) -> bool:
+        """检查单个文件是否变化（用于 WS ``SET_FILE_ID`` 事件），变化时刷新整棵树。"""
+        if not file_id or self._tree is None:
+            return False
+        now = time.monotonic()
+        last = self._file_checks.get(file_id)
+        if last is not None and now - last < FILE_CHECK_MIN_INTERVAL:
+            return False
+        self._file_checks[file_id] = now
+
+        ok, detail = self.http_client.api_detail(file_id)
+        if not ok or not isinstance(detail, Mapping):
+            return False
+        cached = self.get_node(file_id)
+        if cached is not None and str(cached.get("updateTime")) == str(detail.get("updateTime")):
+            return False
+
+        logger.debug(f"文件 {file_id} 已变化，刷新资源树")
+        ok, _ = self.refresh()
+        return ok
+
+    def _apply(self, tree_data: Dict[str, Any]) -> TreeChange:
+        new_index = build_node_index(tree_data)
+        with self._lock:
+            old_index = self._index
+            first_load = self._tree is None
+            added = [node_id for node_id in new_index if node_id not in old_index]
+            removed = [node_id for node_id in old_index if node_id not in new_index]
+            modified = [
+                node_id for node_id, (signature, _) in new_index.items()
+                if node_id in old_index and old_index[node_id][0] != signature
+            ]
+            self._tree = tree_data
+            self._index = new_index
+            self.fetched_at = time.monotonic()
+            if first_load or added or removed or modified:
+                self.version += 1
+            change = TreeChange(version=self.version)
+            if not first_load:
+                change.added, change.removed, change.modified = added, removed, modified
+        return change
+
+    def _emit(self, change: TreeChange) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(change)
+            except Exception as exc:  # noqa: BLE001 - 监听器异常不影响缓存
+                logger.warning(f"资源树变更监听器异常: {exc}")
+
+
+__all__ = [
+    "DEFAULT_TREE_CACHE_TTL",
+    "ResourceTreeCache",
+    "TreeChange",
+    "build_node_index",
+    "compute_tree_stats",
+]
@@ -0,0 +1,452 @@
+"""Magic-API 资源树流式导出器。
+
+边遍历资源树边写出 NDJSON / CSV / Parquet 记录，避免在内存中拼接完整的节点列表或 CSV 字符串：
+
+- 输出到本地文件路径，或按固定字节数切分成多个分块，通过 ``magicapi://exports/{export_id}/{chunk}`` 读取；
+  每次新建分块导出前清理超过保留时长或超出保留个数的旧分块目录；
+- 可选拉取完整脚本内容，使用有界线程池并发请求，任意时刻仅保留一个窗口的脚本在内存中；
+- 返回写出的字节数、记录数以及分块信息。
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.upstream_scheduler import with_priority
+
+try:  # Parquet 为可选依赖
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 依赖缺失时降级
+    pa = None
+    pq = None
+
+logger = get_logger('utils.tree_exporter')
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+EXPORT_URI_PREFIX = "magicapi://exports"
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+DEFAULT_MAX_WORKERS = 4
+PARQUET_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+# 分块导出目录的保留策略
+EXPORT_RETENTION_SECONDS = 24 * 3600
+MAX_RETAINED_EXPORTS = 20
+
+RECORD_FIELDS = ["id", "name", "type", "method", "path", "full_path", "group_id", "depth"]
+SCRIPT_FIELD = "script"
+
+_EXPORT_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class TreeExportError(RuntimeError):
+    """资源树导出异常。"""
+
+
+@dataclass(slots=True)
+class ExportChunk:
+    """导出分块信息。"""
+
+    index: int
+    path: str
+    uri: Optional[str] = None
+    bytes: int = 0
+    records: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"index": self.index, "uri": self.uri, "path": self.path, "bytes": self.bytes, "records": self.records}
+
+
+@dataclass(slots=True)
+class ExportStats:
+    """导出统计。"""
+
+    records: int = 0
+    groups: int = 0
+    files: int = 0
+    scripts_fetched: int = 0
+    script_errors: List[Dict[str, Any]] = field(default_factory=list)
+    script_error_count: int = 0
+
+    def record_script_error(self, file_id: Any, message: str) -> None:
+        self.script_error_count += 1
+        if len(self.script_errors) < MAX_REPORTED_ERRORS:
+            self.script_errors.append({"id": file_id, "message": message})
+
+
+def iter_tree_records(tree_data: Mapping[str, Any], kind: str = "api") -> Iterator[Dict[str, Any]]:
+    """按深度优先顺序惰性产出资源树节点记录。
+
+    Args:
+        tree_data: ``MagicAPIHTTPClient.resource_tree`` 返回的资源树数据
+        kind: 资源类型（api/function/task/datasource/all）
+    """
+    if kind == "all":
+        sections = [key for key, value in tree_data.items() if isinstance(value, Mapping)]
+    else:
+        sections = [kind] if isinstance(tree_data.get(kind), Mapping) else []
+
+    for section in sections:
+        root = tree_data[section]
+        # 使用显式栈代替递归，避免深层分组导致递归过深
+        stack: List[Tuple[Mapping[str, Any], int]] = [
+            (child, 1) for child in reversed(root.get("children") or [])
+        ]
+        while stack:
+            child, depth = stack.pop()
+            node_info = child.get("node") or {}
+            children = child.get("children") or []
+            is_group = bool(children) or ("parentId" in node_info and "groupId" not in node_info)
+
+            if is_group:
+                node_type = f"{section}-group"
+            else:
+                node_type = node_info.get("type") or ("api" if node_info.get("method") else section)
+
+            yield {
+                "id": node_info.get("id"),
+                "name": node_info.get("name"),
+                "type": node_type,
+                "method": node_info.get("method"),
+                "path": node_info.get("path"),
+                "full_path": node_info.get("full_path", node_info.get("path")),
+                "group_id": node_info.get("groupId") or node_info.get("parentId"),
+                "depth": depth,
+                "_is_group": is_group,
+            }
+
+            stack.extend((grandchild, depth + 1) for grandchild in reversed(children))
+
+
+def _encode_ndjson(record: Mapping[str, Any], columns: List[str]) -> bytes:
+    return (json.dumps({key: record.get(key) for key in columns}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _encode_csv(record: Mapping[str, Any], columns: List[str]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(
+        ["" if record.get(key) is None else record.get(key) for key in columns]
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_csv_header(columns: List[str]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(columns)
+    return buffer.getvalue().encode("utf-8")
+
+
+class _ChunkWriter:
+    """按记录边界写出字节流，可选按大小切分为多个分块文件。"""
+
+    def __init__(self, base_path: str, chunk_bytes: Optional[int], header: bytes = b"",
+                 uri_prefix: Optional[str] = None, suffix: str = "") -> None:
+        self.base_path = base_path
+        self.chunk_bytes = chunk_bytes
+        self.header = header
+        self.uri_prefix = uri_prefix
+        self.suffix = suffix
+        self.chunks: List[ExportChunk] = []
+        self._handle = None
+        self._current: Optional[ExportChunk] = None
+
+    @property
+    def bytes_written(self) -> int:
+        return sum(chunk.bytes for chunk in self.chunks)
+
+    def _open_next(self) -> None:
+        self._close_current()
+        index = len(self.chunks)
+        if self.chunk_bytes:
+            path = os.path.join(self.base_path, f"part-{index:05d}{self.suffix}")
+        else:
+            path = self.base_path
+        uri = f"{self.uri_prefix}/{index}" if self.uri_prefix else None
+        self._current = ExportChunk(index=index, path=path, uri=uri)
+        self.chunks.append(self._current)
+        self._handle = open(path, "wb")
+        if self.header and index == 0:
+            self._write(self.header, count_record=False)
+
+    def _write(self, data: bytes, count_record: bool = True) -> None:
+        self._handle.write(data)
+        self._current.bytes += len(data)
+        if count_record:
+            self._current.records += 1
+
+    def write_record(self, data: bytes) -> None:
+        if self._handle is None:
+            self._open_next()
+        elif self.chunk_bytes and self._current.records and self._current.bytes + len(data) > self.chunk_bytes:
+            self._open_next()
+        self._write(data)
+
+    def _close_current(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def close(self) -> None:
+        if self._handle is None and not self.chunks:
+            # 没有任何记录时也要生成一个（仅含表头的）文件，便于调用方统一处理
+            self._open_next()
+        self._close_current()
+
+
+class ResourceTreeExporter:
+    """资源树流式导出器。"""
+
+    def __init__(self, http_client: Any, export_root: Optional[str] = None,
+                 max_exports: int = MAX_RETAINED_EXPORTS,
+                 retention_seconds: float = EXPORT_RETENTION_SECONDS) -> None:
+        self.http_client = http_client
+        self.export_root = export_root or os.path.join(tempfile.gettempdir(), "magicapi-exports")
+        self.max_exports = max(1, int(max_exports))
+        self.retention_seconds = retention_seconds
+
+    # ------------------------------------------------------------------
+    # 分块资源访问
+    # ------------------------------------------------------------------
+
+    def export_dir(self, export_id: str) -> str:
+        """返回分块导出目录，校验 export_id 防止路径穿越。"""
+        if not _EXPORT_ID_PATTERN.match(export_id or ""):
+            raise TreeExportError(f"无效的导出ID: {export_id}")
+        return os.path.join(self.export_root, export_id)
+
+    def read_chunk(self, export_id: str, chunk: int) -> str:
+        """读取分块导出的指定分块内容。"""
+        directory = self.export_dir(export_id)
+        if not os.path.isdir(directory):
+            raise TreeExportError(f"导出不存在或已清理: {export_id}")
+        for name in os.listdir(directory):
+            if name.startswith(f"part-{int(chunk):05d}"):
+                with open(os.path.join(directory, name), "r", encoding="utf-8") as handle:
+                    return handle.read()
+        raise TreeExportError(f"分块不存在: {export_id}/{chunk}")
+
+    def cleanup(self, reserve: int = 0) -> int:
+        """删除超过保留时长的分块导出目录，并只保留最新的 ``max_exports - reserve`` 个，返回删除数量。"""
+        try:
+            names = [name for name in os.listdir(self.export_root) if _EXPORT_ID_PATTERN.match(name)]
+        except FileNotFoundError:
+            return 0
+        entries = []
+        for name in names:
+            path = os.path.join(self.export_root, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.retention_seconds
+        keep = max(0, self.max_exports - reserve)
+        removed = 0
+        for index, (mtime, path) in enumerate(entries):
+            if index >= keep or mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        if removed:
+            logger.debug(f"已清理 {removed} 个旧的分块导出")
+        return removed
+
+    # ------------------------------------------------------------------
+    # 导出
+    # ------------------------------------------------------------------
+
+    def export(
+        self,
+        kind: str = "api",
+        format: str = "ndjson",
+        output_path: Optional[str] = None,
+        include_script: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        tree_data: Optional[Mapping[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """导出资源树。
+
+        Args:
+            kind: 资源类型（api/function/task/datasource/all）
+            format: 输出格式（ndjson/csv/parquet）
+            output_path: 输出文件路径；为空时写入临时目录并按分块返回资源URI
+            include_script: 是否拉取并导出完整脚本内容
+            max_workers: 拉取脚本的并发数
+            chunk_bytes: 分块模式下单个分块的最大字节数
+            tree_data: 已获取的资源树数据（为空时通过 HTTP 客户端获取）
+
+        Returns:
+            导出结果摘要，包括字节数、记录数和分块信息
+        """
+        format = (format or "ndjson").lower()
+        if format not in EXPORT_FORMATS:
+            raise TreeExportError(f"不支持的导出格式: {format}，可选: {', '.join(EXPORT_FORMATS)}")
+        if format == "parquet":
+            if pa is None:
+                raise TreeExportError("导出 Parquet 需要安装 pyarrow")
+            if not output_path:
+                raise TreeExportError("Parquet 格式需要指定 output_path")
+
+        started = time.perf_counter()
+        if tree_data is None:
+            ok, tree_data = self.http_client.resource_tree()
+            if not ok:
+                raise TreeExportError(f"获取资源树失败: {tree_data.get('message', '未知错误')}")
+
+        columns = RECORD_FIELDS + ([SCRIPT_FIELD] if include_script else [])
+        stats = ExportStats()
+        records = self._iter_with_scripts(iter_tree_records(tree_data or {}, kind), include_script,
+                                          max(1, int(max_workers)), stats)
+
+        export_id: Optional[str] = None
+        if output_path:
+            output_path = os.path.abspath(os.path.expanduser(output_path))
+            parent = os.path.dirname(output_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+        else:
+            self.cleanup(reserve=1)
+            export_id = uuid.uuid4().hex
+            os.makedirs(self.export_dir(export_id), exist_ok=True)
+
+        if format == "parquet":
+            chunks = [self._write_parquet(records, columns, output_path, stats)]
+        else:
+            encoder = _encode_ndjson if format == "ndjson" else _encode_csv
+            writer = _ChunkWriter(
+                base_path=output_path or self.export_dir(export_id),
+                chunk_bytes=None if output_path else max(1, int(chunk_bytes)),
+                header=_encode_csv_header(columns) if format == "csv" else b"",
+                uri_prefix=None if output_path else f"{EXPORT_URI_PREFIX}/{export_id}",
+                suffix=f".{format}",
+            )
+            try:
+                for record in records:
+                    writer.write_record(encoder(record, columns))
+                    stats.records += 1
+            finally:
+                writer.close()
+            chunks = writer.chunks
+
+        bytes_written = sum(chunk.bytes for chunk in chunks)
+        logger.info(f"资源树导出完成: {stats.records} 条记录, {bytes_written} 字节, 格式 {format}")
+
+        result: Dict[str, Any] = {
+            "success": True,
+            "kind": kind,
+            "format": format,
+            "records": stats.records,
+            "groups": stats.groups,
+            "files": stats.files,
+            "bytes_written": bytes_written,
+            "include_script": include_script,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        if output_path:
+            result["output_path"] = output_path
+        else:
+            result["export_id"] = export_id
+            result["chunks"] = [chunk.to_dict() for chunk in chunks]
+        if include_script:
+            result["scripts_fetched"] = stats.scripts_fetched
+            result["script_error_count"] = stats.script_error_count
+            if stats.script_errors:
+                result["script_errors"] = stats.script_errors
+        return result
+
+    def _iter_with_scripts(self, records: Iterable[Dict[str, Any]], include_script: bool,
+                           max_workers: int, stats: ExportStats) -> Iterator[Dict[str, Any]]:
+        """按原始顺序产出记录；需要脚本时用有界窗口并发拉取。"""
+        if not include_script:
+            for record in records:
+                self._count(record, stats)
+                yield record
+            return
+
+        window = max_workers * 2
+        fetch = with_priority("bulk", self.http_client.api_detail)
+        pending: Deque[Tuple[Dict[str, Any], Optional[Future]]] = deque()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tree-export") as executor:
+            for record in records:
+                self._count(record, stats)
+                future = None
+                if not record["_is_group"] and record.get("id"):
+                    future = executor.submit(fetch, record["id"])
+                pending.append((record, future))
+                if len(pending) >= window:
+                    yield self._resolve(*pending.popleft(), stats)
+            while pending:
+                yield self._resolve(*pending.popleft(), stats)
+
+    @staticmethod
+    def _count(record: Mapping[str, Any], stats: ExportStats) -> None:
+        if record["_is_group"]:
+            stats.groups += 1
+        else:
+            stats.files += 1
+
+    @staticmethod
+    def _resolve(record: Dict[str, Any], future: Optional[Future], stats: ExportStats) -> Dict[str, Any]:
+        if future is None:
+            return record
+        try:
+            ok, payload = future.result()
+        except Exception as exc:  # noqa: BLE001 - 单个脚本失败不影响整体导出
+            stats.record_script_error(record.get("id"), str(exc))
+            return record
+        if ok and isinstance(payload, Mapping):
+            record[SCRIPT_FIELD] = payload.get("script")
+            stats.scripts_fetched += 1
+        else:
+            message = payload.get("message", "获取脚本失败") if isinstance(payload, Mapping) else "获取脚本失败"
+            stats.record_script_error(record.get("id"), message)
+        return record
+
+    @staticmethod
+    def _write_parquet(records: Iterable[Dict[str, Any]], columns: List[str], output_path: str,
+                       stats: ExportStats) -> ExportChunk:
+        schema = pa.schema([
+            (name, pa.int64() if name == "depth" else pa.string()) for name in columns
+        ])
+        writer = pq.ParquetWriter(output_path, schema)
+        batch: Dict[str, List[Any]] = {name: [] for name in columns}
+        pending = 0
+        try:
+            for record in records:
+                for name in columns:
+                    value = record.get(name)
+                    batch[name].append(value if value is None or name == "depth" else str(value))
+                pending += 1
+                stats.records += 1
+                if pending >= PARQUET_BATCH_SIZE:
+                    writer.write_table(pa.table(batch, schema=schema))
+                    batch = {name: [] for name in columns}
+                    pending = 0
+            if pending:
+                writer.write_table(pa.table(batch, schema=schema))
+        finally:
+            writer.close()
+        return ExportChunk(index=0, path=output_path, bytes=os.path.getsize(output_path), records=stats.records)
+
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "EXPORT_URI_PREFIX",
+    "ExportChunk",
+    "ResourceTreeExporter",
+    "TreeExportError",
+    "iter_tree_records",
+]
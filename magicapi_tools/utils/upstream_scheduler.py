@@ -0,0 +1,242 @@
+"""上游请求调度：按优先级分类的并发上限、令牌桶限速与公平排队。
+
+同一个 Magic-API JVM 的工作线程有限，批量操作（导出、依赖图构建、脚本同步、批量检查）
+并发拉取脚本时会占满线程池，交互式调试请求只能排在后面。本模块在 HTTP 客户端发送前
+按优先级分配上游槽位：
+
+- ``interactive``：带断点的调试请求与登录；
+- ``read``：普通的单次读写请求（默认）；
+- ``bulk``：批量任务发出的请求，由调用方通过 ``upstream_priority("bulk")`` 标记。
+
+每个类别有独立的并发上限与令牌桶（``rate`` 为每秒请求数，0 表示不限速），所有类别共享
+总并发上限。槽位空出时高优先级的等待者先被放行，低优先级请求只在更高优先级没有可放行的
+等待者时才能开始。排队只包住单次网络发送，重试退避期间不占用槽位。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, TypeVar
+
+from magicapi_tools.logging_config import get_logger
+
+logger = get_logger('utils.upstream_scheduler')
+
+# 按优先级从高到低排列
+PRIORITIES = ("interactive", "read", "bulk")
+
+DEFAULT_LIMITS: Dict[str, Dict[str, float]] = {
+    "interactive": {"concurrency": 8, "rate": 0, "burst": 0},
+    "read": {"concurrency": 8, "rate": 0, "burst": 0},
+    "bulk": {"concurrency": 4, "rate": 0, "burst": 0},
+}
+DEFAULT_MAX_CONCURRENCY = 16
+
+T = TypeVar("T")
+
+_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "magicapi_upstream_priority", default=None
+)
+
+
+def _check_priority(priority: str) -> str:
+    if priority not in PRIORITIES:
+        raise ValueError(f"未知的上游优先级: {priority}，可选 {', '.join(PRIORITIES)}")
+    return priority
+
+
+@contextmanager
+def upstream_priority(priority: str) -> Iterator[None]:
+    """在当前上下文内为上游请求指定优先级类别。"""
+    token = _priority.set(_check_priority(priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Optional[str]:
+    """当前上下文指定的优先级，未指定时返回 ``None``。"""
+    return _priority.get()
+
+
+def with_priority(priority: str, fn: Callable[..., T]) -> Callable[..., T]:
+    """包装函数使其在指定优先级下执行，用于提交到线程池的任务（线程池不继承调用方上下文）。"""
+    _check_priority(priority)
+
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        with upstream_priority(priority):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@dataclass(slots=True)
+class ClassLimit:
+    """单个优先级类别的限制。"""
+
+    concurrency: int = 8
+    rate: float = 0.0
+    burst: float = 0.0
+
+    @classmethod
+    def from_mapping(cls, config: Mapping[str, Any]) -> "ClassLimit":
+        return cls(
+            concurrency=max(1, int(config.get("concurrency", 8))),
+            rate=max(0.0, float(config.get("rate", 0) or 0)),
+            burst=max(0.0, float(config.get("burst", 0) or 0)),
+        )
+
+
+class _TokenBucket:
+    """令牌桶：以 ``rate`` 个/秒补充，容量为 ``burst``（未配置时取 ``max(1, rate)``）。"""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.capacity = burst if burst >= 1 else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """距下一个可用令牌的秒数，不限速或已有令牌时为 0。"""
+        if self.rate <= 0:
+            return 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        if self.rate > 0:
+            self.tokens -= 1
+
+
+class _ClassState:
+    def __init__(self, limit: ClassLimit) -> None:
+        self.limit = limit
+        self.bucket = _TokenBucket(limit.rate, limit.burst)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.limit.concurrency,
+            "rate": self.limit.rate,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "wait_avg_ms": round(self.wait_total / self.admitted * 1000, 3) if self.admitted else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+class UpstreamScheduler:
+    """按优先级分配上游并发槽位，线程安全。
+
+    Args:
+        limits: 类别名 -> ``ClassLimit``，缺省的类别使用 ``DEFAULT_LIMITS``
+        max_concurrency: 所有类别合计的并发上限
+    """
+
+    def __init__(self, limits: Optional[Mapping[str, ClassLimit]] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        limits = dict(limits or {})
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._classes: Dict[str, _ClassState] = {
+            name: _ClassState(limits.get(name) or ClassLimit.from_mapping(DEFAULT_LIMITS[name]))
+            for name in PRIORITIES
+        }
+        self._active = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> Optional["UpstreamScheduler"]:
+        """根据配置创建调度器，未启用时返回 ``None``。"""
+        if not getattr(settings, "upstream_scheduler", False):
+            return None
+        overrides = getattr(settings, "upstream_limits", None) or {}
+        limits: Dict[str, ClassLimit] = {}
+        for name in PRIORITIES:
+            config = dict(DEFAULT_LIMITS[name])
+            config.update(overrides.get(name) or {})
+            limits[name] = ClassLimit.from_mapping(config)
+        for name in overrides:
+            if name not in PRIORITIES:
+                logger.warning(f"忽略未知的上游优先级类别配置: {name}")
+        return cls(limits, getattr(settings, "upstream_max_concurrency", DEFAULT_MAX_CONCURRENCY))
+
+    def _admission_delay(self, priority: str, now: float) -> float:
+        """返回该类别还需等待的秒数：0 表示可立即开始，``inf`` 表示需等待槽位释放。"""
+        state = self._classes[priority]
+        if state.active >= state.limit.concurrency or self._active >= self.max_concurrency:
+            return math.inf
+        for name in PRIORITIES:
+            if name == priority:
+                break
+            higher = self._classes[name]
+            # 更高优先级有可立即放行的等待者时让行
+            if higher.waiting and higher.active < higher.limit.concurrency and higher.bucket.delay(now) == 0:
+                return math.inf
+        return state.bucket.delay(now)
+
+    @contextmanager
+    def slot(self, priority: str) -> Iterator[None]:
+        """占用一个上游槽位，直到 ``with`` 块结束。"""
+        state = self._classes[_check_priority(priority)]
+        enqueued = time.monotonic()
+        with self._cond:
+            state.waiting += 1
+            try:
+                while True:
+                    delay = self._admission_delay(priority, time.monotonic())
+                    if delay == 0:
+                        break
+                    self._cond.wait(None if delay == math.inf else delay)
+            finally:
+                state.waiting -= 1
+            state.bucket.take()
+            state.active += 1
+            self._active += 1
+            waited = time.monotonic() - enqueued
+            state.admitted += 1
+            state.wait_total += waited
+            state.wait_max = max(state.wait_max, waited)
+            # 等待者减少可能使低优先级的请求满足放行条件
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                state.active -= 1
+                self._active -= 1
+                self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回各类别的并发、排队深度与等待耗时统计。"""
+        with self._cond:
+            classes = {name: state.snapshot() for name, state in self._classes.items()}
+            return {
+                "enabled": True,
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "queue_depth": sum(item["waiting"] for item in classes.values()),
+                "classes": classes,
+            }
+
+
+__all__ = [
+    "ClassLimit",
+    "DEFAULT_LIMITS",
+    "PRIORITIES",
+    "UpstreamScheduler",
+    "current_priority",
+    "upstream_priority",
+    "with_priority",
+]
@@ -0,0 +1,450 @@
+"""Magic-API 工作区批量导出/导入。
+
+使用 Magic-API 编辑器的批量接口，一次请求迁移整个工作区或部分分组，而不是逐个文件读取、保存：
+
+- ``POST /magic/web/download``：打包下载 zip，可按 ``groupId`` 限定分组，未指定时为整个工作区；
+- ``POST /magic/web/upload``：上传 zip，``mode=increment`` 增量合并，``mode=full`` 全量覆盖。
+
+zip 内即 Magic-API 文件存储的目录结构：每个分组一个目录（含 ``group.json``），每个接口/函数一个
+``.ms`` 文件（JSON 元数据 + 分隔行 + 脚本）。下载直接写入磁盘，解包、筛选、打包都逐条目流式处理，
+内存占用与工作区大小无关。按分组（ID 或名称，含子分组）或接口路径前缀筛选时，自动带上所选条目的
+祖先 ``group.json``，保证导入后分组结构完整。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+from magicapi_tools.logging_config import get_logger
+
+logger = get_logger('utils.workspace_archive')
+
+DOWNLOAD_PATH = "/magic/web/download"
+UPLOAD_PATH = "/magic/web/upload"
+IMPORT_MODES = ("increment", "full")
+GROUP_FILE = "group.json"
+SCRIPT_SUFFIX = ".ms"
+SCRIPT_SEPARATOR = "================================"
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+_SEPARATOR_PATTERN = re.compile(r"\r?\n={32}\r?\n")
+
+ArchiveSource = Union[str, os.PathLike, BinaryIO]
+
+
+class WorkspaceArchiveError(RuntimeError):
+    """工作区导出/导入异常。"""
+
+
+# ----------------------------------------------------------------------
+# 脚本文件格式
+# ----------------------------------------------------------------------
+
+def parse_script_file(text: str) -> Tuple[Dict[str, Any], str]:
+    """拆分 ``.ms`` 文件为（元数据, 脚本）；没有分隔行时整个文件视为元数据。"""
+    match = _SEPARATOR_PATTERN.search(text)
+    header, script = (text[:match.start()], text[match.end():]) if match else (text, "")
+    try:
+        meta = json.loads(header) if header.strip() else {}
+    except ValueError as exc:
+        raise WorkspaceArchiveError(f"脚本元数据不是合法的 JSON: {exc}") from exc
+    return (meta if isinstance(meta, dict) else {}), script
+
+
+def format_script_file(meta: Dict[str, Any], script: str) -> str:
+    """按 Magic-API 文件存储格式生成 ``.ms`` 文件内容。"""
+    header = json.dumps({k: v for k, v in meta.items() if k != "script"}, ensure_ascii=False, indent=2)
+    return f"{header}\r\n{SCRIPT_SEPARATOR}\r\n{script or ''}"
+
+
+# ----------------------------------------------------------------------
+# 归档结构与筛选
+# ----------------------------------------------------------------------
+
+@dataclass(slots=True)
+class ArchiveGroup:
+    """归档中的一个分组目录。"""
+
+    directory: str
+    id: Optional[str] = None
+    name: Optional[str] = None
+    path: str = ""
+
+
+def _directory(name: str) -> str:
+    return name.rsplit("/", 1)[0] if "/" in name else ""
+
+
+def _ancestors(directory: str) -> Iterable[str]:
+    while directory:
+        yield directory
+        directory = _directory(directory)
+
+
+def read_groups(archive: zipfile.ZipFile) -> Dict[str, ArchiveGroup]:
+    """读取所有 ``group.json``（体积很小），按目录索引。"""
+    groups: Dict[str, ArchiveGroup] = {}
+    for info in archive.infolist():
+        if info.is_dir() or info.filename.rsplit("/", 1)[-1] != GROUP_FILE:
+            continue
+        directory = _directory(info.filename)
+        try:
+            meta = json.loads(archive.read(info).decode("utf-8") or "{}")
+        except ValueError:
+            meta = {}
+        groups[directory] = ArchiveGroup(
+            directory=directory,
+            id=meta.get("id"),
+            name=meta.get("name"),
+            path=str(meta.get("path") or ""),
+        )
+    return groups
+
+
+def _join_path(*parts: str) -> str:
+    joined = "/".join(part.strip("/") for part in parts if part and part.strip("/"))
+    return f"/{joined}"
+
+
+def group_path(groups: Dict[str, ArchiveGroup], directory: str) -> str:
+    """分组目录对应的接口路径前缀（逐级拼接祖先分组的 path）。"""
+    chain = [groups[d].path for d in reversed(list(_ancestors(directory))) if d in groups]
+    return _join_path(*chain)
+
+
+@dataclass(slots=True)
+class ArchiveSelection:
+    """归档条目筛选条件；同时指定分组与路径前缀时两者都需满足。
+
+    Attributes:
+        groups: 分组 ID 或名称，包含其全部子分组
+        path_prefixes: 接口路径前缀（如 ``/order``），按分组 path 与文件 path 拼接后的完整路径匹配
+    """
+
+    groups: FrozenSet[str] = frozenset()
+    path_prefixes: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_params(cls, groups: Optional[Sequence[str]] = None,
+                    path_prefixes: Optional[Sequence[str]] = None) -> "ArchiveSelection":
+        return cls(
+            groups=frozenset(str(g).strip() for g in groups or () if str(g).strip()),
+            path_prefixes=tuple(_join_path(str(p)) for p in path_prefixes or () if str(p).strip()),
+        )
+
+    @property
+    def empty(self) -> bool:
+        return not self.groups and not self.path_prefixes
+
+    def select(self, archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+        """返回选中的条目（含祖先分组的 ``group.json``），顺序与归档一致。"""
+        infos = [info for info in archive.infolist() if not info.is_dir()]
+        if self.empty:
+            return infos
+        groups = read_groups(archive)
+        chosen_dirs = {d for d, g in groups.items() if g.id in self.groups or g.name in self.groups}
+
+        def in_chosen_group(directory: str) -> bool:
+            return any(d in chosen_dirs for d in _ancestors(directory))
+
+        selected_files: List[zipfile.ZipInfo] = []
+        needed_dirs = set()
+        for info in infos:
+            name = info.filename
+            directory = _directory(name)
+            if name.rsplit("/", 1)[-1] == GROUP_FILE:
+                if self.groups and not self.path_prefixes and in_chosen_group(directory):
+                    needed_dirs.update(_ancestors(directory))
+                continue
+            if self.groups and not in_chosen_group(directory):
+                continue
+            if self.path_prefixes:
+                full_path = _entry_path(archive, info, groups)
+                if not any(full_path == p or full_path.startswith(p.rstrip("/") + "/") for p in self.path_prefixes):
+                    continue
+            selected_files.append(info)
+            needed_dirs.update(_ancestors(directory))
+
+        selected_names = {info.filename for info in selected_files}
+        return [
+            info for info in infos
+            if info.filename in selected_names
+            or (info.filename.rsplit("/", 1)[-1] == GROUP_FILE and _directory(info.filename) in needed_dirs)
+        ]
+
+
+def _entry_path(archive: zipfile.ZipFile, info: zipfile.ZipInfo, groups: Dict[str, ArchiveGroup]) -> str:
+    """条目的完整接口路径；只有需要按路径筛选时才读取条目元数据。"""
+    base = group_path(groups, _directory(info.filename))
+    if not info.filename.endswith(SCRIPT_SUFFIX):
+        return base
+    with archive.open(info) as handle:
+        meta, _ = parse_script_file(handle.read().decode("utf-8", errors="replace"))
+    return _join_path(base, str(meta.get("path") or ""))
+
+
+@dataclass(slots=True)
+class ArchiveSummary:
+    """归档条目统计（按顶层资源类型）。"""
+
+    entries: int = 0
+    groups: int = 0
+    scripts: int = 0
+    bytes: int = 0
+    by_kind: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, info: zipfile.ZipInfo) -> None:
+        self.entries += 1
+        self.bytes += info.file_size
+        if info.filename.rsplit("/", 1)[-1] == GROUP_FILE:
+            self.groups += 1
+            return
+        self.scripts += 1
+        kind = info.filename.split("/", 1)[0] if "/" in info.filename else "root"
+        self.by_kind[kind] = self.by_kind.get(kind, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "entries": self.entries,
+            "groups": self.groups,
+            "scripts": self.scripts,
+            "uncompressed_bytes": self.bytes,
+            "by_kind": dict(sorted(self.by_kind.items())),
+        }
+
+
+def summarize(infos: Iterable[zipfile.ZipInfo]) -> ArchiveSummary:
+    summary = ArchiveSummary()
+    for info in infos:
+        summary.add(info)
+    return summary
+
+
+# ----------------------------------------------------------------------
+# 流式解包 / 筛选 / 打包
+# ----------------------------------------------------------------------
+
+def _safe_target(root: str, name: str) -> str:
+    """防止 zip 条目路径穿越到目标目录之外。"""
+    target = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([target, root]) != root:
+        raise WorkspaceArchiveError(f"非法的归档条目路径: {name}")
+    return target
+
+
+def unpack_archive(source: ArchiveSource, target_dir: str,
+                   selection: Optional[ArchiveSelection] = None) -> Dict[str, Any]:
+    """把归档（或其中选中的条目）逐条写入目录树，保持 Magic-API 的目录结构。"""
+    root = os.path.realpath(target_dir)
+    os.makedirs(root, exist_ok=True)
+    with zipfile.ZipFile(source) as archive:
+        infos = (selection or ArchiveSelection()).select(archive)
+        for info in infos:
+            target = _safe_target(root, info.filename)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with archive.open(info) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+    return {"directory": root, **summarize(infos).to_dict()}
+
+
+def filter_archive(source: ArchiveSource, destination: str, selection: ArchiveSelection) -> ArchiveSummary:
+    """把选中的条目逐条复制到新的 zip。"""
+    with zipfile.ZipFile(source) as archive:
+        infos = selection.select(archive)
+        with zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) as out:
+            for info in infos:
+                with archive.open(info) as src, out.open(info.filename, "w") as dst:
+                    shutil.copyfileobj(src, dst)
+    return summarize(infos)
+
+
+def pack_directory(directory: str, destination: str) -> ArchiveSummary:
+    """把本地目录树（如 ``unpack_archive`` 的输出）打包为可上传的 zip。"""
+    root = os.path.realpath(directory)
+    if not os.path.isdir(root):
+        raise WorkspaceArchiveError(f"目录不存在: {directory}")
+    with zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) as out:
+        for current, dirs, files in os.walk(root):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(current, name)
+                out.write(path, os.path.relpath(path, root).replace(os.sep, "/"))
+    with zipfile.ZipFile(destination) as archive:
+        return summarize(archive.infolist())
+
+
+# ----------------------------------------------------------------------
+# 与 Magic-API 交互
+# ----------------------------------------------------------------------
+
+def _default_archive_path() -> str:
+    directory = os.path.join(tempfile.gettempdir(), "magicapi-workspaces")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"workspace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.zip")
+
+
+class WorkspaceTransfer:
+    """通过批量 zip 接口导出/导入工作区。"""
+
+    def __init__(self, http_client: Any) -> None:
+        self.http_client = http_client
+
+    @property
+    def timeout(self) -> float:
+        """批量接口的超时：整个工作区在一次请求内处理，不能使用按普通请求统计的自适应超时。"""
+        settings = self.http_client.settings
+        return max(settings.timeout_seconds, settings.workspace_timeout_seconds)
+
+    def download(self, output_path: str, group_id: Optional[str] = None) -> int:
+        """下载归档到文件，返回写入的字节数。"""
+        params = {"groupId": group_id} if group_id else None
+        response = self.http_client.request("POST", DOWNLOAD_PATH, params=params, stream=True, idempotent=True,
+                                            headers={"Accept": "*/*"}, timeout=self.timeout)
+        try:
+            if response.status_code != 200:
+                raise WorkspaceArchiveError(f"下载工作区失败: HTTP {response.status_code}")
+            if "json" in (response.headers.get("Content-Type") or "").lower():
+                # 权限不足等错误以 JsonBean 返回
+                body = response.json()
+                raise WorkspaceArchiveError(f"下载工作区失败: {body.get('message', body)}")
+            written = 0
+            with open(output_path, "wb") as handle:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                    handle.write(chunk)
+                    written += len(chunk)
+        finally:
+            response.close()
+        if not zipfile.is_zipfile(output_path):
+            raise WorkspaceArchiveError("下载内容不是有效的 zip 归档")
+        return written
+
+    def upload(self, archive_path: str, mode: str = "increment") -> Any:
+        """上传归档，一次请求完成导入。"""
+        with open(archive_path, "rb") as handle:
+            response = self.http_client.request(
+                "POST",
+                UPLOAD_PATH,
+                files={"file": (os.path.basename(archive_path), handle, "application/zip")},
+                data={"mode": mode},
+                # 去掉会话默认的 JSON Content-Type，由 requests 生成 multipart 边界
+                headers={"Content-Type": None},
+                idempotent=False,
+                timeout=self.timeout,
+            )
+        if response.status_code != 200:
+            raise WorkspaceArchiveError(f"上传工作区失败: HTTP {response.status_code} - {response.text[:200]}")
+        body = response.json()
+        if body.get("code") != 1:
+            raise WorkspaceArchiveError(f"上传工作区失败: {body.get('message', '未知错误')}")
+        return body.get("data")
+
+    def export(
+        self,
+        output_path: Optional[str] = None,
+        group_id: Optional[str] = None,
+        unpack_dir: Optional[str] = None,
+        selection: Optional[ArchiveSelection] = None,
+    ) -> Dict[str, Any]:
+        """下载工作区归档，可选地按筛选条件解包到本地目录。"""
+        started = time.perf_counter()
+        archive_path = output_path or _default_archive_path()
+        directory = os.path.dirname(os.path.abspath(archive_path))
+        os.makedirs(directory, exist_ok=True)
+        size = self.download(archive_path, group_id)
+        with zipfile.ZipFile(archive_path) as archive:
+            summary = summarize(info for info in archive.infolist() if not info.is_dir())
+        result: Dict[str, Any] = {
+            "success": True,
+            "archive": os.path.abspath(archive_path),
+            "bytes": size,
+            "group_id": group_id,
+            "summary": summary.to_dict(),
+        }
+        if unpack_dir:
+            result["unpacked"] = unpack_archive(archive_path, unpack_dir, selection)
+        result["duration"] = round(time.perf_counter() - started, 3)
+        logger.info(f"导出工作区完成: {summary.scripts} 个脚本, {size} 字节")
+        return result
+
+    def import_(
+        self,
+        source: str,
+        mode: str = "increment",
+        selection: Optional[ArchiveSelection] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """导入本地 zip 或目录树；按筛选条件生成临时归档后一次上传。"""
+        if mode not in IMPORT_MODES:
+            raise WorkspaceArchiveError(f"不支持的导入模式: {mode}，可选 {', '.join(IMPORT_MODES)}")
+        if not os.path.exists(source):
+            raise WorkspaceArchiveError(f"导入源不存在: {source}")
+        selection = selection or ArchiveSelection()
+        started = time.perf_counter()
+        temporary: List[str] = []
+
+        def scratch() -> str:
+            handle, path = tempfile.mkstemp(prefix="magicapi-import-", suffix=".zip")
+            os.close(handle)
+            temporary.append(path)
+            return path
+
+        try:
+            archive_path = source
+            if os.path.isdir(source):
+                archive_path = scratch()
+                summary = pack_directory(source, archive_path)
+            if not selection.empty:
+                filtered = scratch()
+                summary = filter_archive(archive_path, filtered, selection)
+                archive_path = filtered
+            elif not os.path.isdir(source):
+                with zipfile.ZipFile(archive_path) as archive:
+                    summary = summarize(info for info in archive.infolist() if not info.is_dir())
+            if summary.entries == 0:
+                raise WorkspaceArchiveError("筛选后没有可导入的条目")
+
+            result: Dict[str, Any] = {
+                "success": True,
+                "source": os.path.abspath(source),
+                "mode": mode,
+                "dry_run": dry_run,
+                "summary": summary.to_dict(),
+                "upload_bytes": os.path.getsize(archive_path),
+            }
+            if not dry_run:
+                result["response"] = self.upload(archive_path, mode)
+                logger.info(f"导入工作区完成: {summary.scripts} 个脚本 (mode={mode})")
+            result["duration"] = round(time.perf_counter() - started, 3)
+            return result
+        finally:
+            for path in temporary:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+__all__ = [
+    "ArchiveGroup",
+    "ArchiveSelection",
+    "ArchiveSummary",
+    "IMPORT_MODES",
+    "WorkspaceArchiveError",
+    "WorkspaceTransfer",
+    "filter_archive",
+    "format_script_file",
+    "group_path",
+    "pack_directory",
+    "parse_script_file",
+    "read_groups",
+    "summarize",
+    "unpack_archive",
+]
@@ -8,6 +8,7 @@ from .client import WSClient  # noqa: F401
 from .state import EnvironmentState, IDEEnvironment, OpenFileContext, LogBuffer  # noqa: F401
 from .debug_service import WebSocketDebugService  # noqa: F401
 from .manager import WSManager  # noqa: F401
+from .profiler import ScriptProfiler  # noqa: F401
 from .utils import normalize_breakpoints, resolve_script_id_by_path  # noqa: F401
 
 __all__ = [
@@ -21,6 +22,7 @@ __all__ = [
     "LogBuffer",
     "WSManager",
     "WebSocketDebugService",
+    "ScriptProfiler",
     "normalize_breakpoints",
     "resolve_script_id_by_path",
 ]
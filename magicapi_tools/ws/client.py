@@ -4,18 +4,35 @@ from __future__ import annotations
 
 import asyncio
 import json
+import random
 import secrets
-from typing import Any, AsyncIterator, Dict, Optional
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 
 import websockets
 
 from magicapi_tools.logging_config import get_logger
 
-from .messages import MessageType, WSMessage, parse_ws_message
+from .messages import MessageType, WSMessage, classify_ws_frame, is_heartbeat
+
+DEFAULT_RECONNECT_INITIAL = 0.05
+# 连接保持这么久之后断开才重置退避；建立后立即被关闭（如令牌被拒）的连接继续按退避等待
+STABLE_CONNECTION_SECONDS = 10.0
+
+# 重连后需要重放的会话指令（按类型只保留最后一次）
+_SESSION_COMMANDS = frozenset({MessageType.SET_FILE_ID})
 
 
 class WSClient:
-    """封装 Magic-API WebSocket 连接的异步客户端。"""
+    """封装 Magic-API WebSocket 连接的异步客户端。
+
+    断线后按指数退避重连：首次等待 ``reconnect_initial`` 秒，每次翻倍并加入抖动，上限为
+    ``reconnect_interval``；连接保持 ``stable_after`` 秒以上后断开才重新从 ``reconnect_initial`` 开始。``client_id`` 在重连之间保持不变（服务端据此路由断点事件），
+    重连成功后自动重新登录并重放 ``SET_FILE_ID`` 等会话指令。
+
+    ``on_connection_lost(ts)`` / ``on_connection_restored(ts)`` 在断线与恢复时回调，
+    供管理器标记可能丢失消息的区间。
+    """
 
     def __init__(
         self,
@@ -25,15 +42,24 @@ class WSClient:
         token: Optional[str] = None,
         reconnect_interval: float = 5.0,
         headers: Optional[Dict[str, str]] = None,
+        reconnect_initial: float = DEFAULT_RECONNECT_INITIAL,
+        stable_after: float = STABLE_CONNECTION_SECONDS,
     ) -> None:
         self.ws_url = ws_url
         self.username = username
         self.password = password
         self.token = token or "unauthorization"
         self.reconnect_interval = reconnect_interval
+        self.reconnect_initial = min(reconnect_initial, reconnect_interval)
+        self.stable_after = stable_after
         self.extra_headers = headers or {}
 
         self.client_id = self._generate_client_id()
+        self.reconnects = 0
+        self.on_connection_lost: Optional[Callable[[float], None]] = None
+        self.on_connection_restored: Optional[Callable[[float], None]] = None
+        self._session_commands: Dict[MessageType, str] = {}
+        self._lost_at: Optional[float] = None
 
         self._websocket: Optional[any] = None
         self._connected = asyncio.Event()
@@ -46,7 +72,10 @@ class WSClient:
     # ------------------------------------------------------------------
     async def iter_messages(self) -> AsyncIterator[WSMessage]:
         """持续迭代 WebSocket 消息，自动处理重连。"""
+        attempt = 0
         while not self._stop.is_set():
+            connected = False
+            connected_at = 0.0
             try:
                 async with websockets.connect(
                     self.ws_url,
@@ -58,26 +87,36 @@ class WSClient:
                 ) as websocket:
                     self._websocket = websocket
                     self._connected.set()
+                    connected = True
+                    connected_at = time.monotonic()
                     self._logger.info(f"🔌 已连接 WebSocket: {self.ws_url}")
                     await self._send_login()
+                    await self._replay_session()
+                    self._mark_restored()
 
                     async for raw_message in websocket:
-                        message = parse_ws_message(raw_message)
-                        if message.type == MessageType.PING:
-                            await self.send_text("pong")
+                        # 先识别类型：心跳帧不创建消息对象，其余消息内容延迟解码
+                        message_type, offset = classify_ws_frame(raw_message)
+                        if is_heartbeat(message_type):
+                            if message_type == MessageType.PING:
+                                await self.send_text("pong")
                             continue
-                        yield message
+                        yield WSMessage.lazy(message_type, raw_message, offset, time.time())
             except asyncio.CancelledError:
                 raise
             except Exception as exc:  # pragma: no cover - 网络异常路径
                 self._logger.warning(f"WebSocket 连接异常: {exc}")
-                self._connected.clear()
-                if self._stop.is_set():
-                    break
-                await asyncio.sleep(self.reconnect_interval)
             finally:
                 self._websocket = None
                 self._connected.clear()
+            if self._stop.is_set():
+                break
+            if connected:
+                self._mark_lost()
+                if time.monotonic() - connected_at >= self.stable_after:
+                    attempt = 0
+            await asyncio.sleep(self.backoff_delay(attempt))
+            attempt += 1
 
         self._logger.debug("WSClient iter_messages 停止")
 
@@ -91,7 +130,7 @@ class WSClient:
             self._logger.debug(f"➡️ 发送: {message}")
 
     async def send_command(self, message_type: MessageType, *values: Any) -> None:
-        """构建并发送命令消息。"""
+        """构建并发送命令消息；会话指令同时记录下来，重连后自动重放。"""
         parts = [message_type.value.lower()]
         for value in values:
             if isinstance(value, (str, int, float)):  # 简单类型
@@ -99,8 +138,24 @@ class WSClient:
             else:
                 parts.append(json.dumps(value, ensure_ascii=False))
         payload = ",".join(parts)
+        if message_type in _SESSION_COMMANDS:
+            self._session_commands[message_type] = payload
         await self.send_text(payload)
 
+    @property
+    def connected(self) -> bool:
+        """当前是否已建立连接。"""
+        return self._websocket is not None and self._connected.is_set()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """第 ``attempt`` 次重连前的等待时间：指数增长、以 ``reconnect_interval`` 为上限，带 50% 抖动。"""
+        ceiling = min(self.reconnect_interval, self.reconnect_initial * (2 ** min(attempt, 32)))
+        return ceiling / 2 + random.random() * ceiling / 2
+
+    async def send_login(self) -> None:
+        """使用当前令牌重新发送登录消息（令牌刷新后调用）。"""
+        await self._send_login()
+
     async def close(self) -> None:
         """关闭连接并停止监听循环。"""
         self._stop.set()
@@ -130,6 +185,27 @@ class WSClient:
         await self.send_text(login_message)
         self._logger.debug(f"📤 登录消息: {login_message}")
 
+    async def _replay_session(self) -> None:
+        for payload in list(self._session_commands.values()):
+            await self.send_text(payload)
+            self._logger.debug(f"🔁 重放会话指令: {payload}")
+
+    def _mark_lost(self) -> None:
+        self._lost_at = time.time()
+        self._logger.warning("WebSocket 连接已断开，准备重连")
+        if self.on_connection_lost is not None:
+            self.on_connection_lost(self._lost_at)
+
+    def _mark_restored(self) -> None:
+        if self._lost_at is None:
+            return
+        now = time.time()
+        self.reconnects += 1
+        self._logger.info(f"WebSocket 已重连，中断 {now - self._lost_at:.3f}s")
+        self._lost_at = None
+        if self.on_connection_restored is not None:
+            self.on_connection_restored(now)
+
     def _build_headers(self) -> Dict[str, str]:
         headers = dict(self.extra_headers)
         if self.token:
@@ -145,4 +221,4 @@ class WSClient:
         return secrets.token_hex(8)
 
 
-__all__ = ["WSClient"]
+__all__ = ["DEFAULT_RECONNECT_INITIAL", "STABLE_CONNECTION_SECONDS", "WSClient"]
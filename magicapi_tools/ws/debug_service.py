@@ -8,9 +8,11 @@ from dataclasses import asdict, dataclass
 from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.tracing import traced, tracer
 
 from .manager import WSManager
 from .messages import WSMessage
+from .profiler import ScriptProfiler
 from .utils import normalize_breakpoints, resolve_script_id_by_path
 
 
@@ -126,30 +128,48 @@ class WebSocketDebugService:
         )
         end_ts = time.time()
 
-        logs = self._serialize_messages(
-            self.manager.capture_logs_between(
-                start_ts,
-                end_ts,
-                pre=self.manager.settings.ws_log_capture_window,
-                post=self.manager.settings.ws_log_capture_window,
+        with tracer.span("ws.capture_logs") as span:
+            logs = self._serialize_messages(
+                self.manager.capture_logs_between(
+                    start_ts,
+                    end_ts,
+                    pre=self.manager.settings.ws_log_capture_window,
+                    post=self.manager.settings.ws_log_capture_window,
+                )
             )
-        )
+            span.set_attribute("ws.log_count", len(logs))
+            notice = self.manager.log_gap_notice(start_ts, end_ts)
+            span.set_attribute("ws.logs_incomplete", notice is not None)
 
         if ok:
-            return {
+            result = {
                 "success": True,
                 "response": payload,
                 "ws_logs": logs,
                 "duration": end_ts - start_ts,
             }
-        return {
-            "error": {
-                "code": payload.get("code", "api_error") if isinstance(payload, dict) else "api_error",
-                "message": payload.get("message", "调用接口失败") if isinstance(payload, dict) else "调用接口失败",
-                "detail": payload,
-            },
-            "ws_logs": logs,
-        }
+        else:
+            result = {
+                "error": {
+                    "code": payload.get("code", "api_error") if isinstance(payload, dict) else "api_error",
+                    "message": payload.get("message", "调用接口失败") if isinstance(payload, dict) else "调用接口失败",
+                    "detail": payload,
+                },
+                "ws_logs": logs,
+            }
+        if notice:
+            result["ws_logs_incomplete"] = notice
+        return result
+
+    async def profile_api_tool(self, path: str, method: str = "GET", data: Optional[Dict] = None,
+                               params: Optional[Dict] = None, mode: str = "all", sample_every: int = 1,
+                               lines: Optional[Sequence[int]] = None, max_steps: int = 5000, top: int = 10) -> Dict:
+        actual_method, actual_path = self._normalize_method_path(method, path)
+        profiler = ScriptProfiler(self.manager, self.http_client)
+        return await profiler.profile(
+            actual_method, actual_path, params=params, data=data, mode=mode,
+            sample_every=sample_every, lines=lines, max_steps=max_steps, top=top,
+        )
 
     def execute_debug_session_tool(self, script_id: str, breakpoints: Optional[Sequence[int]] = None) -> Dict:
         if breakpoints:
@@ -195,6 +215,7 @@ class WebSocketDebugService:
     # ------------------------------------------------------------------
     # 内部辅助
     # ------------------------------------------------------------------
+    @traced("ws.step_command")
     async def _send_step_command(self, step_type: int) -> Dict:
         await self.manager.ensure_running()
         script_id = self._current_script_id()
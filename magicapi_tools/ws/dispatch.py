@@ -0,0 +1,220 @@
+"""观察者消息分发：每个观察者一个有界队列与独立消费任务。
+
+监听循环只负责把消息放入各观察者的队列（不等待观察者处理），慢观察者（例如经 MCP 传输
+推送日志的 ``MCPObserver``）只会让自己的队列积压，不会阻塞 WebSocket 读取。
+
+队列满时按观察者的溢出策略处理：
+
+- ``drop_oldest``：丢弃最旧的消息（默认）；
+- ``coalesce_logs``：把新的日志消息合并进队尾的日志消息，非日志消息退化为丢弃最旧；
+- ``block``：监听循环等待队列腾出空间（仅用于不能丢消息且处理很快的观察者）。
+
+错误与断开通知不会被丢弃。每个队列记录投递、丢弃、合并次数与排队延迟，写入进程级指标。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.metrics import metrics
+
+from .messages import MessageType, WSMessage
+from .observers import BaseObserver
+from .state import IDEEnvironment
+
+DEFAULT_OBSERVER_QUEUE_SIZE = 1000
+
+_LOG_TYPES = frozenset({MessageType.LOG, MessageType.LOGS})
+
+# 队列项：(种类, 入队时间, 消息或异常, 环境)
+_Item = Tuple[str, float, Any, Optional[IDEEnvironment]]
+
+
+class OverflowPolicy(str, Enum):
+    """观察者队列满时的处理策略。"""
+
+    DROP_OLDEST = "drop_oldest"
+    COALESCE_LOGS = "coalesce_logs"
+    BLOCK = "block"
+
+    @classmethod
+    def from_raw(cls, value: Any, default: "OverflowPolicy" = None) -> "OverflowPolicy":
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(str(value).strip().lower())
+        except ValueError:
+            return default or cls.DROP_OLDEST
+
+
+def _merge_logs(first: WSMessage, second: WSMessage) -> WSMessage:
+    """把两条日志消息合并为一条 LOGS 消息。"""
+    logs = list(first.data.get("logs") or []) + list(second.data.get("logs") or [])
+    return WSMessage(
+        type=MessageType.LOGS,
+        raw=first.raw,
+        payload=logs,
+        text="\n".join(str(item) for item in logs),
+        timestamp=first.timestamp,
+        data={"logs": logs, "coalesced": int(first.data.get("coalesced", 1)) + int(second.data.get("coalesced", 1))},
+    )
+
+
+class ObserverChannel:
+    """单个观察者的有界队列与消费任务（运行在 WSManager 的事件循环中）。"""
+
+    def __init__(self, observer: BaseObserver, maxsize: int = DEFAULT_OBSERVER_QUEUE_SIZE,
+                 policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> None:
+        self.observer = observer
+        self.name = type(observer).__name__
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._queue: Deque[_Item] = deque()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+        self._task: Optional[asyncio.Task[None]] = None
+        self._logger = get_logger("ws.dispatch")
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.last_lag = 0.0
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._consume(), name=f"ws-observer-{self.name}")
+
+    def close(self) -> None:
+        """停止接收新消息；已入队的消息投递完后消费任务退出。"""
+        self._closed = True
+        self._ready.set()
+        self._space.set()
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._task is not None:
+            await self._task
+
+    async def join(self) -> None:
+        """等待队列中的消息全部处理完毕。"""
+        await self._idle.wait()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    # ------------------------------------------------------------------
+    # 入队（监听循环调用）
+    # ------------------------------------------------------------------
+    def offer(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> bool:
+        """非阻塞入队；返回 False 表示 ``block`` 策略下队列已满，调用方需 ``await put``。"""
+        if self._closed:
+            return True
+        if len(self._queue) >= self.maxsize:
+            if self.policy == OverflowPolicy.BLOCK:
+                return False
+            if self.policy == OverflowPolicy.COALESCE_LOGS and self._coalesce(message):
+                return True
+            self._drop_oldest()
+        self._append(("message", time.monotonic(), message, environment))
+        return True
+
+    async def put(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> None:
+        while True:
+            self._space.clear()
+            if self.offer(message, environment):
+                return
+            await self._space.wait()
+
+    def notify(self, kind: str, value: Any = None) -> None:
+        """错误/断开通知，不受容量限制。"""
+        if not self._closed:
+            self._append((kind, time.monotonic(), value, None))
+
+    def _append(self, item: _Item) -> None:
+        self._queue.append(item)
+        if len(self._queue) > self.max_depth:
+            self.max_depth = len(self._queue)
+        self._idle.clear()
+        self._ready.set()
+
+    def _coalesce(self, message: WSMessage) -> bool:
+        if message.type not in _LOG_TYPES or not self._queue:
+            return False
+        kind, enqueued, tail, environment = self._queue[-1]
+        if kind != "message" or tail.type not in _LOG_TYPES:
+            return False
+        self._queue[-1] = (kind, enqueued, _merge_logs(tail, message), environment)
+        self.coalesced += 1
+        metrics.record_observer_event(self.name, "coalesced")
+        return True
+
+    def _drop_oldest(self) -> None:
+        for index, item in enumerate(self._queue):
+            if item[0] == "message":
+                del self._queue[index]
+                self.dropped += 1
+                metrics.record_observer_event(self.name, "dropped")
+                return
+
+    # ------------------------------------------------------------------
+    # 消费
+    # ------------------------------------------------------------------
+    async def _consume(self) -> None:
+        while True:
+            if not self._queue:
+                self._idle.set()
+                if self._closed:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            kind, enqueued, value, environment = self._queue.popleft()
+            self._space.set()
+            self.last_lag = time.monotonic() - enqueued
+            try:
+                if kind == "message":
+                    await self.observer.on_message(value, environment)
+                elif kind == "error":
+                    await self.observer.on_error(value)
+                else:
+                    await self.observer.on_disconnect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - 观察者异常不影响其它消息
+                self.errors += 1
+                metrics.record_observer_event(self.name, "error")
+                self._logger.debug(f"观察者 {self.name} 处理消息失败: {exc}")
+                continue
+            self.delivered += 1
+            metrics.record_observer_event(self.name, "delivered", self.last_lag)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "observer": self.name,
+            "policy": self.policy.value,
+            "capacity": self.maxsize,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+        }
+
+
+__all__ = ["DEFAULT_OBSERVER_QUEUE_SIZE", "ObserverChannel", "OverflowPolicy"]
@@ -4,14 +4,17 @@ from __future__ import annotations
 
 import asyncio
 import threading
-from typing import List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.metrics import metrics
+from magicapi_tools.utils.tracing import traced
 from magicapi_tools.utils.resource_manager import MagicAPIResourceManager
 
 from magicapi_mcp.settings import MagicAPISettings
 
 from .client import WSClient
+from .dispatch import ObserverChannel, OverflowPolicy
 from .messages import MessageType, WSMessage
 from .observers import BaseObserver
 from .state import EnvironmentState, IDEEnvironment, LogBuffer, ResourceResolver
@@ -57,11 +60,18 @@ class WSManager:
             password=settings.password if settings.auth_enabled else None,
             token=settings.token,
             reconnect_interval=settings.ws_reconnect_interval,
+            reconnect_initial=settings.ws_reconnect_initial,
         )
+        self.client.on_connection_lost = self.log_buffer.open_gap
+        self.client.on_connection_restored = self.log_buffer.close_gap
         self.state.set_primary_client(self.client.client_id)
 
         self._logger = get_logger("ws.manager")
-        self._observers: set[BaseObserver] = set()
+        # 观察者 -> 投递通道；监听循环读取写时复制的元组，无需加锁
+        self._observers: Dict[BaseObserver, ObserverChannel] = {}
+        self._channels: Tuple[ObserverChannel, ...] = ()
+        self._observers_lock = threading.Lock()
+        self._overflow_policy = OverflowPolicy.from_raw(settings.ws_observer_overflow)
         self._listen_task: Optional[asyncio.Task[None]] = None
         self._stop_event = asyncio.Event()
         self._lock: Optional[asyncio.Lock] = None
@@ -87,6 +97,7 @@ class WSManager:
         loop = asyncio.get_running_loop()
         await asyncio.wrap_future(self._submit(self._start_internal()), loop=loop)
 
+    @traced("ws.ensure_running")
     async def ensure_running(self) -> None:
         if self.auto_start:
             await self.start()
@@ -98,6 +109,7 @@ class WSManager:
     def start_sync(self) -> None:
         self._submit(self._start_internal()).result()
 
+    @traced("ws.ensure_running")
     def ensure_running_sync(self) -> None:
         if self.auto_start:
             try:
@@ -108,6 +120,19 @@ class WSManager:
     def stop_sync(self) -> None:
         self._submit(self._stop_internal()).result()
 
+    def shutdown_sync(self, timeout: float = 5.0) -> None:
+        """停止监听并结束事件循环线程（会话级管理器回收时调用）。"""
+        try:
+            self._submit(self._stop_internal()).result(timeout)
+        except Exception as exc:  # pragma: no cover - 关闭失败仅记录
+            self._logger.warning(f"停止 WebSocket 监听失败: {exc}")
+        try:
+            self._submit(self._cancel_pending()).result(timeout)
+        except Exception as exc:  # pragma: no cover - 关闭失败仅记录
+            self._logger.warning(f"结束观察者任务失败: {exc}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout)
+
     async def _start_internal(self) -> None:
         assert self._lock is not None
         async with self._lock:
@@ -127,16 +152,52 @@ class WSManager:
                 pass
             self._listen_task = None
         await self.client.close()
+        await self._drain_observers()
         self._logger.info("WSManager 已停止")
 
+    async def _cancel_pending(self) -> None:
+        """取消事件循环中残留的任务（观察者消费任务等），避免循环停止后任务被直接销毁。"""
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
     # ------------------------------------------------------------------
     # 观察者管理
     # ------------------------------------------------------------------
     def add_observer(self, observer: BaseObserver) -> None:
-        self._observers.add(observer)
+        with self._observers_lock:
+            if observer in self._observers:
+                return
+            channel = ObserverChannel(
+                observer,
+                maxsize=observer.queue_size or self.settings.ws_observer_queue_size,
+                policy=OverflowPolicy.from_raw(observer.overflow_policy, self._overflow_policy),
+            )
+            self._observers[observer] = channel
+            self._channels = tuple(self._observers.values())
+        self._loop.call_soon_threadsafe(channel.start)
 
     def remove_observer(self, observer: BaseObserver) -> None:
-        self._observers.discard(observer)
+        with self._observers_lock:
+            channel = self._observers.pop(observer, None)
+            self._channels = tuple(self._observers.values())
+        if channel is not None:
+            self._loop.call_soon_threadsafe(channel.close)
+
+    def observer_stats(self) -> List[Dict[str, Any]]:
+        """各观察者队列的深度、投递/丢弃/合并次数与最近排队延迟。"""
+        return [channel.stats() for channel in self._channels]
+
+    async def _drain_observers(self, timeout: float = 1.0) -> None:
+        """停止监听时等待已入队的消息（含断开通知）投递完毕，通道保留以便重新启动。"""
+        waiters = [asyncio.ensure_future(channel.join()) for channel in self._channels]
+        if waiters:
+            _, pending = await asyncio.wait(waiters, timeout=timeout)
+            for waiter in pending:
+                waiter.cancel()
 
     # ------------------------------------------------------------------
     # 查询接口
@@ -167,6 +228,25 @@ class WSManager:
         post = self.settings.ws_log_capture_window if post is None else post
         return self.log_buffer.between(start_ts - pre, end_ts + post)
 
+    def log_gap_notice(
+        self,
+        start_ts: float,
+        end_ts: float,
+        *,
+        pre: float | None = None,
+        post: float | None = None,
+    ) -> Optional[Dict[str, Any]]:
+        """时间窗口内存在断线或缓冲区溢出时返回提示（日志可能不完整），否则返回 None。"""
+        pre = self.settings.ws_log_capture_window if pre is None else pre
+        post = self.settings.ws_log_capture_window if post is None else post
+        gaps = self.log_buffer.gaps_between(start_ts - pre, end_ts + post)
+        if not gaps:
+            return None
+        return {
+            "message": "日志可能不完整：捕获窗口内 WebSocket 连接中断或日志缓冲区溢出",
+            "gaps": gaps,
+        }
+
     # ------------------------------------------------------------------
     # 调试指令封装
     # ------------------------------------------------------------------
@@ -193,6 +273,7 @@ class WSManager:
             async for message in self.client.iter_messages():
                 if self._logger.isEnabledFor(10):
                     self._logger.debug("收到消息: %s", message.type.value)
+                metrics.record_ws_frame(message.type.value, len(message.raw))
                 self.log_buffer.append(message)
                 environment = self.state.handle_message(message, default_client_id=self.client.client_id)
                 await self._notify_observers(message, environment)
@@ -207,25 +288,39 @@ class WSManager:
             await self._notify_disconnect()
 
     async def _notify_observers(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> None:
+        """把消息放入各观察者队列；除 ``block`` 策略队列已满外不等待观察者处理。"""
+        channels = self._channels
+        if not channels:
+            return
         effective_env = environment or self.state.get_environment_by_client(self.client.client_id)
-        tasks = [observer.on_message(message, effective_env) for observer in self._observers]
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        for channel in channels:
+            wanted = channel.observer.message_types
+            if wanted is not None and message.type not in wanted:
+                continue
+            if not channel.offer(message, effective_env):
+                await channel.put(message, effective_env)
 
     async def _notify_error(self, exc: Exception) -> None:
-        tasks = [observer.on_error(exc) for observer in self._observers]
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        for channel in self._channels:
+            channel.notify("error", exc)
 
     async def _notify_disconnect(self) -> None:
-        tasks = [observer.on_disconnect() for observer in self._observers]
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        for channel in self._channels:
+            channel.notify("disconnect")
 
     async def _send_step_command(self, script_id: str, step_type: int, breakpoints: Optional[Sequence[int]]) -> None:
         breakpoint_str = "|".join(str(b) for b in breakpoints) if breakpoints else ""
         await self.client.send_command(MessageType.RESUME_BREAKPOINT, script_id, step_type, breakpoint_str)
 
+    # ------------------------------------------------------------------
+    # 认证同步
+    # ------------------------------------------------------------------
+    def update_token(self, token: str) -> None:
+        """同步 HTTP 客户端刷新后的令牌，已连接时重新发送登录消息。"""
+        self.client.token = token or "unauthorization"
+        if self.client.connected and self._loop.is_running():
+            self._submit(self.client.send_login())
+
     # ------------------------------------------------------------------
     # HTTP Header 辅助
     # ------------------------------------------------------------------
@@ -4,12 +4,19 @@ from __future__ import annotations
 
 import json
 import time
-from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, Optional, Tuple
 
 from magicapi_tools.logging_config import get_logger
 
+try:  # pragma: no cover - 可选加速
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - 未安装时使用标准库
+    orjson = None
+    _json_loads = json.loads
+
 
 _logger = get_logger("ws.messages")
 
@@ -43,33 +50,151 @@ class MessageType(str, Enum):
         return cls.__members__.get(normalized, cls.UNKNOWN)
 
 
-@dataclass(slots=True)
 class WSMessage:
-    """结构化的 WebSocket 消息。"""
+    """结构化的 WebSocket 消息。
+
+    由 ``parse_ws_message`` 创建的消息只识别了类型，``payload`` / ``text`` / ``data``
+    在首次访问时才解码：控制台日志帧数量巨大，而多数帧只会进入日志缓冲区，从不被读取。
+    直接构造时（传入任一字段）与普通数据对象一致。
+    """
+
+    __slots__ = ("type", "raw", "timestamp", "_offset", "_payload", "_text", "_data")
+
+    def __init__(
+        self,
+        type: MessageType,
+        raw: str,
+        payload: Any = None,
+        text: str = "",
+        timestamp: Optional[float] = None,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.type = type
+        self.raw = raw
+        self.timestamp = time.time() if timestamp is None else timestamp
+        # 未解码时为内容在 ``raw`` 中的起始位置
+        self._offset: Optional[int] = None
+        self._payload = payload
+        # 确保 `text` 有默认值
+        self._text = text if text or not isinstance(payload, str) else payload
+        self._data = {} if data is None else data
+
+    @classmethod
+    def lazy(cls, message_type: MessageType, raw: str, offset: int, timestamp: float) -> "WSMessage":
+        """创建延迟解码的消息，``offset`` 为类型前缀之后内容的起始位置。"""
+        message = cls.__new__(cls)
+        message.type = message_type
+        message.raw = raw
+        message.timestamp = timestamp
+        message._offset = offset
+        return message
+
+    @property
+    def decoded(self) -> bool:
+        """消息内容是否已解码。"""
+        return self._offset is None
+
+    def _decode(self) -> None:
+        offset = self._offset
+        if offset is None:
+            return
+        remainder = self.raw[offset:].rstrip() if offset < len(self.raw) else ""
+        self._payload, self._text, self._data = _decode_payload(self.type, remainder)
+        self._offset = None
+
+    @property
+    def payload(self) -> Any:
+        self._decode()
+        return self._payload
+
+    @payload.setter
+    def payload(self, value: Any) -> None:
+        self._decode()
+        self._payload = value
+
+    @property
+    def text(self) -> str:
+        self._decode()
+        return self._text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._decode()
+        self._text = value
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        self._decode()
+        return self._data
+
+    @data.setter
+    def data(self, value: Dict[str, Any]) -> None:
+        self._decode()
+        self._data = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, WSMessage):
+            return NotImplemented
+        return (self.type, self.raw, self.payload, self.text, self.timestamp, self.data) == (
+            other.type, other.raw, other.payload, other.text, other.timestamp, other.data
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        if not self.decoded:
+            return f"WSMessage(type={self.type!r}, raw={self.raw[:80]!r}, decoded=False)"
+        return (f"WSMessage(type={self.type!r}, raw={self.raw[:80]!r}, payload={self._payload!r}, "
+                f"text={self._text!r}, timestamp={self.timestamp!r}, data={self._data!r})")
+
+
+# 类型前缀（服务端发送小写，客户端命令也可能为大写）到消息类型的映射
+_TYPE_BY_PREFIX: Dict[str, MessageType] = {}
+for _member in MessageType:
+    _TYPE_BY_PREFIX[_member.value] = _member
+    _TYPE_BY_PREFIX[_member.value.lower()] = _member
+del _member
+
+_HEARTBEAT_TYPES = frozenset({MessageType.PING, MessageType.PONG})
+# 类型前缀的最大长度（含余量），逗号一般出现在此范围内
+_PREFIX_WINDOW = 24
+
+
+def classify_ws_frame(raw: str) -> Tuple[MessageType, int]:
+    """只按前缀识别消息类型，返回 ``(类型, 内容起始位置)``，不复制、不解析内容。"""
+    start = 0
+    if raw[:1].isspace():
+        start = len(raw) - len(raw.lstrip())
+    index = raw.find(",", start, start + _PREFIX_WINDOW)
+    if index < 0 and len(raw) - start > _PREFIX_WINDOW:
+        index = raw.find(",", start)
+    if index < 0:
+        head, offset = raw[start:].rstrip(), len(raw)
+    else:
+        head, offset = raw[start:index], index + 1
+    message_type = _TYPE_BY_PREFIX.get(head)
+    if message_type is None:
+        message_type = MessageType.from_raw(head) if head else MessageType.UNKNOWN
+    return message_type, offset
 
-    type: MessageType
-    raw: str
-    payload: Any = None
-    text: str = ""
-    timestamp: float = field(default_factory=lambda: time.time())
-    data: Dict[str, Any] = field(default_factory=dict)
 
-    def __post_init__(self) -> None:
-        """确保 `timestamp` 与 `text` 有默认值。"""
-        if not self.text and isinstance(self.payload, str):
-            self.text = self.payload
+def is_heartbeat(message_type: MessageType) -> bool:
+    """PING / PONG 心跳帧。"""
+    return message_type in _HEARTBEAT_TYPES
 
 
 def parse_ws_message(raw: str) -> WSMessage:
-    """解析原始 WebSocket 文本消息为 `WSMessage`。"""
+    """解析原始 WebSocket 文本消息为 `WSMessage`（内容延迟解码）。"""
 
     ts = time.time()
-    stripped = raw.strip()
-    if not stripped:
+    if not raw or raw.isspace():
         return WSMessage(type=MessageType.UNKNOWN, raw=raw, text="", timestamp=ts)
+    message_type, offset = classify_ws_frame(raw)
+    return WSMessage.lazy(message_type, raw, offset, ts)
+
 
-    msg_type, remainder = _split_once(stripped)
-    message_type = MessageType.from_raw(msg_type)
+def _decode_payload(message_type: MessageType, remainder: str) -> Tuple[Any, str, Dict[str, Any]]:
+    """按消息类型解码内容，返回 ``(payload, text, data)``。"""
 
     payload: Any = None
     text = remainder
@@ -194,14 +319,9 @@ def parse_ws_message(raw: str) -> WSMessage:
         payload = remainder or None
         text = remainder
 
-    return WSMessage(
-        type=message_type,
-        raw=raw,
-        payload=payload,
-        text=text,
-        timestamp=ts,
-        data=data,
-    )
+    if not text and isinstance(payload, str):
+        text = payload
+    return payload, text, data
 
 
 def _split_once(value: str) -> Tuple[str, str]:
@@ -222,8 +342,8 @@ def _parse_json_safely(raw: str, fallback: Any = None) -> Any:
     if not text:
         return fallback
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return _json_loads(text)
+    except ValueError:
         return fallback
 
 
@@ -287,4 +407,4 @@ def _parse_object_like(value: Any) -> Optional[Dict[str, Any]]:
     return None
 
 
-__all__ = ["MessageType", "WSMessage", "parse_ws_message"]
+__all__ = ["MessageType", "WSMessage", "classify_ws_frame", "is_heartbeat", "parse_ws_message"]
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional
+from typing import FrozenSet, Optional
 
 from magicapi_tools.logging_config import get_logger
 
@@ -17,7 +17,18 @@ except ImportError:  # pragma: no cover
 
 
 class BaseObserver:
-    """观察者基类，定义可重写的钩子。"""
+    """观察者基类，定义可重写的钩子。
+
+    WSManager 为每个观察者分配独立的有界队列与消费任务，以下类属性控制投递方式：
+
+    - ``message_types``：只接收这些类型的消息（``None`` 表示全部），在入队前过滤；
+    - ``overflow_policy``：队列满时的策略（``drop_oldest`` / ``coalesce_logs`` / ``block``），``None`` 使用全局配置；
+    - ``queue_size``：队列容量，``None`` 使用全局配置。
+    """
+
+    message_types: Optional[FrozenSet[MessageType]] = None
+    overflow_policy: Optional[str] = None
+    queue_size: Optional[int] = None
 
     async def on_message(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> None:
         return None
@@ -51,46 +62,98 @@ class CLIObserver(BaseObserver):
 
 
 class MCPObserver(BaseObserver):
-    """集成 FastMCP `Context` 的观察者。"""
+    """集成 FastMCP `Context` 的观察者。
+
+    推送经过 MCP 传输，可能较慢；队列满时把积压的日志合并为一条。消息由独立的消费任务
+    按顺序投递，无需额外加锁。
+    """
+
+    overflow_policy = "coalesce_logs"
 
     def __init__(self, ctx: "Context") -> None:
         if Context is None:
             raise RuntimeError("未安装 fastmcp，无法使用 MCPObserver")
         self.ctx = ctx
-        self._lock = asyncio.Lock()
 
     async def on_message(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> None:
-        async with self._lock:
-            extra = {
-                "message_type": message.type.value,
-                "ide_key": getattr(environment, "ide_key", None),
-                "client_ids": list(getattr(environment, "client_ids", []) or []),
-                "timestamp": message.timestamp,
-            }
-            if environment and environment.opened_files:
-                extra["opened_files"] = {
-                    cid: {
-                        "file_id": ctx.file_id,
-                        "method": ctx.method,
-                        "path": ctx.path,
-                        "name": ctx.name,
-                        "group_chain": ctx.group_chain,
-                        "last_breakpoint_range": ctx.last_breakpoint_range,
-                    }
-                    for cid, ctx in environment.opened_files.items()
+        extra = {
+            "message_type": message.type.value,
+            "ide_key": getattr(environment, "ide_key", None),
+            "client_ids": list(getattr(environment, "client_ids", []) or []),
+            "timestamp": message.timestamp,
+        }
+        if environment and environment.opened_files:
+            extra["opened_files"] = {
+                cid: {
+                    "file_id": ctx.file_id,
+                    "method": ctx.method,
+                    "path": ctx.path,
+                    "name": ctx.name,
+                    "group_chain": ctx.group_chain,
+                    "last_breakpoint_range": ctx.last_breakpoint_range,
                 }
-            if message.type in {MessageType.LOG, MessageType.LOGS}:
-                await self.ctx.debug(message.text, extra=extra)
-            elif message.type == MessageType.BREAKPOINT:
-                await self.ctx.warning(message.text, extra=extra)
-            elif message.type == MessageType.EXCEPTION:
-                await self.ctx.error(message.text, extra=extra)
-            else:
-                await self.ctx.info(message.text, extra=extra)
+                for cid, ctx in environment.opened_files.items()
+            }
+        if message.type in {MessageType.LOG, MessageType.LOGS}:
+            await self.ctx.debug(message.text, extra=extra)
+        elif message.type == MessageType.BREAKPOINT:
+            await self.ctx.warning(message.text, extra=extra)
+        elif message.type == MessageType.EXCEPTION:
+            await self.ctx.error(message.text, extra=extra)
+        else:
+            await self.ctx.info(message.text, extra=extra)
 
     async def on_error(self, exc: Exception) -> None:
-        async with self._lock:
-            await self.ctx.error(f"WebSocket 监听异常: {exc}")
+        await self.ctx.error(f"WebSocket 监听异常: {exc}")
+
+
+class ResourceChangeObserver(BaseObserver):
+    """监听 `SET_FILE_ID` 事件，检查对应文件是否变化并刷新资源树缓存。"""
+
+    message_types = frozenset({MessageType.SET_FILE_ID})
+
+    def __init__(self, tree_cache) -> None:
+        self.tree_cache = tree_cache
+        self._logger = get_logger("ws.resource_change_observer")
+
+    async def on_message(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> None:
+        if message.type != MessageType.SET_FILE_ID:
+            return
+        file_id = message.data.get("file_id")
+        if not file_id:
+            return
+        # 在线程池中执行 HTTP 检查，避免阻塞 WebSocket 监听循环
+        future = asyncio.get_running_loop().run_in_executor(None, self.tree_cache.check_file, file_id)
+        future.add_done_callback(self._log_failure)
+
+    def _log_failure(self, future: "asyncio.Future") -> None:
+        exc = future.exception()
+        if exc is not None:
+            self._logger.warning(f"检查文件变化失败: {exc}")
+
+
+class AuthRefreshObserver(BaseObserver):
+    """监听 `REFRESH_TOKEN` 事件，更新共享的认证令牌。"""
+
+    message_types = frozenset({MessageType.REFRESH_TOKEN})
+
+    def __init__(self, auth) -> None:
+        self.auth = auth
+        self._logger = get_logger("ws.auth_refresh_observer")
+
+    async def on_message(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> None:
+        if message.type != MessageType.REFRESH_TOKEN:
+            return
+        # 重新登录为同步 HTTP 请求，在线程池中执行
+        future = asyncio.get_running_loop().run_in_executor(
+            None, self.auth.handle_refresh_token, message.data.get("payload")
+        )
+        future.add_done_callback(self._log_failure)
+
+    def _log_failure(self, future: "asyncio.Future") -> None:
+        exc = future.exception()
+        if exc is not None:
+            self._logger.warning(f"刷新令牌失败: {exc}")
 
 
-__all__ = ["BaseObserver", "CLIObserver", "MCPObserver"]
+__all__ = ["AuthRefreshObserver", "BaseObserver", "CLIObserver", "MCPObserver", "ResourceChangeObserver"]
@@ -0,0 +1,220 @@
+"""基于断点单步协议的逐行执行耗时分析。
+
+在脚本的每个可执行行（或按 ``io`` / 抽样模式选出的行）上设置断点后调用接口，
+每收到一帧 ``BREAKPOINT`` 就记录时间并立即发送 ``RESUME_BREAKPOINT`` 继续执行：
+
+- ``all`` 模式逐句单步（step over），得到每条语句的耗时与执行次数；
+- ``io`` 模式只在 ``db.`` / ``http.`` 所在行停下并直接恢复，每次暂停只多一次 WebSocket 往返；
+- ``sample_every`` 每隔若干行取一个断点，耗时计入从该行到下一次停下之间的全部语句。
+
+一行的耗时为“发送恢复指令”到“下一帧断点到达”之间的墙钟时间，最后一次停下的行计到接口返回为止；
+等待恢复的停顿不计入。每一步都包含一次 WebSocket 往返，报告中以最短一步估算该开销并给出扣除后的耗时。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from magicapi_tools.logging_config import get_logger
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.script_linter import executable_lines
+
+from .manager import WSManager
+from .messages import MessageType, WSMessage
+from .observers import BaseObserver
+from .state import IDEEnvironment
+from .utils import normalize_breakpoints, resolve_script_id_by_path
+
+logger = get_logger("ws.profiler")
+
+PROFILE_MODES = ("all", "io")
+
+
+@dataclass(slots=True)
+class LineProfile:
+    """单行的耗时统计（毫秒）。"""
+
+    line: int
+    hits: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    self_ms: float = 0.0
+    percent: float = 0.0
+    snippet: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_ms"] = round(self.total_ms / self.hits, 3) if self.hits else 0.0
+        for key in ("total_ms", "max_ms", "self_ms"):
+            data[key] = round(data[key], 3)
+        return data
+
+
+class _StepDriver(BaseObserver):
+    """收到目标脚本的断点帧后记录到达时间，并立即发送恢复指令。"""
+
+    message_types = frozenset({MessageType.BREAKPOINT})
+    overflow_policy = "block"
+
+    def __init__(self, manager: WSManager, script_id: str, breakpoints: Sequence[int], step: bool, max_steps: int):
+        self.manager = manager
+        self.script_id = script_id
+        self.breakpoints = list(breakpoints)
+        self.step = step
+        self.max_steps = max_steps
+        self.stops: List[Tuple[int, float]] = []
+        self.resumed: List[float] = []
+        self.truncated = False
+
+    async def on_message(self, message: WSMessage, environment: Optional[IDEEnvironment]) -> None:
+        data = message.data or {}
+        if str(data.get("script_id")) != self.script_id:
+            return
+        line_range = data.get("range") or [0]
+        self.stops.append((int(line_range[0]), message.timestamp))
+        if self.truncated or len(self.stops) >= self.max_steps:
+            # 超出步数上限：清空断点让脚本直接运行到结束
+            self.truncated = True
+            await self.manager.send_resume(self.script_id, None)
+        elif self.step:
+            await self.manager.send_step_over(self.script_id, self.breakpoints)
+        else:
+            await self.manager.send_resume(self.script_id, self.breakpoints)
+        self.resumed.append(time.time())
+
+
+class ScriptProfiler:
+    """驱动断点协议对一次接口调用做逐行计时。"""
+
+    def __init__(self, manager: WSManager, http_client: MagicAPIHTTPClient):
+        self.manager = manager
+        self.http_client = http_client
+
+    async def profile(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Any] = None,
+        mode: str = "all",
+        sample_every: int = 1,
+        lines: Optional[Sequence[int]] = None,
+        max_steps: int = 5000,
+        top: int = 10,
+    ) -> Dict[str, Any]:
+        """调用接口并返回逐行耗时与热点行排名。
+
+        Args:
+            method: HTTP 方法
+            path: 接口路径
+            params: 查询参数
+            data: 请求体
+            mode: ``all`` 逐句单步；``io`` 只在 ``db.`` / ``http.`` 所在行停下
+            sample_every: 每隔多少个候选行取一个断点（大于 1 时不再单步，只在断点处停下）
+            lines: 显式指定断点行，优先于 ``mode`` 与 ``sample_every``
+            max_steps: 停下次数上限，超出后清空断点让脚本运行结束，结果标记 ``truncated``
+            top: 热点行数量
+        """
+        if mode not in PROFILE_MODES:
+            return {"error": {"code": "invalid_mode", "message": f"mode 仅支持 {', '.join(PROFILE_MODES)}"}}
+
+        await self.manager.ensure_running()
+        if not self.manager.client.connected:
+            return {"error": {"code": "ws_not_connected", "message": "WebSocket 未连接，无法接收断点帧"}}
+
+        script_id = await asyncio.to_thread(resolve_script_id_by_path, self.http_client, path)
+        if not script_id:
+            return {"error": {"code": "script_id_not_found", "message": f"无法根据路径定位接口脚本: {path}"}}
+        ok, detail = await asyncio.to_thread(self.http_client.api_detail, script_id)
+        if not ok or not isinstance(detail, dict):
+            return {"error": {"code": "detail_error", "message": "获取接口脚本失败", "detail": detail}}
+        script = detail.get("script") or ""
+
+        if lines:
+            breakpoints = sorted({int(line) for line in lines})
+        else:
+            breakpoints = executable_lines(script, io_only=mode == "io")[::max(1, sample_every)]
+        if not breakpoints:
+            return {"error": {"code": "no_lines", "message": "脚本中没有可设置断点的行"}}
+
+        # 逐句模式用 step over 跟随循环；抽样/IO 模式只在断点处停下
+        step = mode == "all" and sample_every <= 1 and not lines
+        driver = _StepDriver(self.manager, script_id, breakpoints, step, max_steps)
+        headers = self.manager.build_request_headers({
+            "Magic-Request-Script-Id": script_id,
+            "Magic-Request-Breakpoints": normalize_breakpoints(breakpoints),
+            "Accept": "application/json, text/plain, */*",
+        })
+
+        self.manager.add_observer(driver)
+        try:
+            start_ts = time.time()
+            ok, payload = await asyncio.to_thread(
+                self.http_client.call_api,
+                method,
+                path,
+                params,
+                data,
+                headers,
+                timeout=self.manager.settings.debug_timeout_seconds,
+            )
+            end_ts = time.time()
+        finally:
+            self.manager.remove_observer(driver)
+
+        result = self._report(script, driver, start_ts, end_ts, top)
+        result.update({
+            "script_id": script_id,
+            "method": method,
+            "path": path,
+            "mode": "lines" if lines else mode,
+            "breakpoints": len(breakpoints),
+            "response_ok": ok,
+        })
+        if not ok:
+            result["response"] = payload
+        return result
+
+    @staticmethod
+    def _report(script: str, driver: _StepDriver, start_ts: float, end_ts: float, top: int) -> Dict[str, Any]:
+        source = script.splitlines()
+        stats: Dict[int, LineProfile] = {}
+        segments: List[Tuple[int, float]] = []
+        for index, (line, _) in enumerate(driver.stops):
+            if index >= len(driver.resumed):
+                break
+            until = driver.stops[index + 1][1] if index + 1 < len(driver.stops) else end_ts
+            segments.append((line, max(0.0, until - driver.resumed[index]) * 1000))
+
+        overhead = min((elapsed for _, elapsed in segments), default=0.0)
+        for line, elapsed in segments:
+            entry = stats.get(line)
+            if entry is None:
+                snippet = source[line - 1].strip()[:160] if 0 < line <= len(source) else ""
+                entry = stats[line] = LineProfile(line, snippet=snippet)
+            entry.hits += 1
+            entry.total_ms += elapsed
+            entry.max_ms = max(entry.max_ms, elapsed)
+            entry.self_ms += max(0.0, elapsed - overhead)
+
+        profiled = sum(entry.total_ms for entry in stats.values())
+        for entry in stats.values():
+            entry.percent = round(entry.total_ms / profiled * 100, 1) if profiled else 0.0
+        hot = sorted(stats.values(), key=lambda item: (-item.total_ms, item.line))[:max(0, top)]
+
+        return {
+            "success": True,
+            "steps": len(driver.stops),
+            "truncated": driver.truncated,
+            "wall_ms": round((end_ts - start_ts) * 1000, 3),
+            "profiled_ms": round(profiled, 3),
+            "step_overhead_ms": round(overhead, 3),
+            "lines": [stats[line].to_dict() for line in sorted(stats)],
+            "hot_lines": [entry.to_dict() for entry in hot],
+        }
+
+
+__all__ = ["LineProfile", "PROFILE_MODES", "ScriptProfiler"]
@@ -12,6 +12,11 @@ from magicapi_tools.logging_config import get_logger
 
 from .messages import MessageType, WSMessage
 
+_LOG_TYPES = frozenset({MessageType.LOG, MessageType.LOGS})
+
+# 保留的断线区间数量
+_MAX_GAPS = 100
+
 
 class ResourceResolver(Protocol):
     """资源解析协议，按需加载接口/脚本元数据。"""
@@ -64,16 +69,49 @@ class IDEEnvironment:
 
 
 class LogBuffer:
-    """保存最近的 WebSocket 消息。"""
+    """保存最近的 WebSocket 消息，并记录可能丢失消息的区间（断线、缓冲区溢出）。"""
 
     def __init__(self, maxlen: int = 500):
         self._buffer: Deque[Tuple[float, WSMessage]] = deque(maxlen=maxlen)
         self._lock = threading.Lock()
+        # 断线区间 [start, end]，end 为 None 表示仍未恢复
+        self._gaps: Deque[List[Optional[float]]] = deque(maxlen=_MAX_GAPS)
+        # 已被挤出缓冲区的最新消息时间
+        self._evicted_until: Optional[float] = None
 
     def append(self, message: WSMessage) -> None:
         with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._evicted_until = self._buffer[0][0]
             self._buffer.append((message.timestamp, message))
 
+    def open_gap(self, timestamp: float) -> None:
+        """连接断开：此后直到 ``close_gap`` 之间的消息可能丢失。"""
+        with self._lock:
+            if not self._gaps or self._gaps[-1][1] is not None:
+                self._gaps.append([timestamp, None])
+
+    def close_gap(self, timestamp: float) -> None:
+        with self._lock:
+            if self._gaps and self._gaps[-1][1] is None:
+                self._gaps[-1][1] = timestamp
+
+    def gaps_between(self, start_ts: float, end_ts: float) -> List[Dict[str, Any]]:
+        """返回与时间窗口重叠的缺口：``disconnected``（断线）或 ``buffer_overflow``（已被挤出缓冲区）。"""
+        gaps: List[Dict[str, Any]] = []
+        with self._lock:
+            for gap_start, gap_end in self._gaps:
+                if gap_start <= end_ts and (gap_end is None or gap_end >= start_ts):
+                    gaps.append({"reason": "disconnected", "start": gap_start, "end": gap_end})
+            if self._evicted_until is not None and self._evicted_until >= start_ts:
+                gaps.append({"reason": "buffer_overflow", "start": start_ts, "end": min(self._evicted_until, end_ts)})
+        return gaps
+
+    def recent_gaps(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._gaps)[-limit:]
+        return [{"reason": "disconnected", "start": start, "end": end} for start, end in items]
+
     def __len__(self) -> int:  # pragma: no cover - 简单代理
         with self._lock:
             return len(self._buffer)
@@ -148,8 +186,12 @@ class EnvironmentState:
         if handler:
             return handler(message, default_client_id)
 
-        # 非关键信息也需要刷新活跃时间
-        key = self._client_to_env.get(self._infer_client_id(message, default_client_id))
+        # 非关键信息也需要刷新活跃时间；日志帧不含客户端信息，无需解码内容
+        if message.type in _LOG_TYPES:
+            client_id = default_client_id or self._primary_client_id
+        else:
+            client_id = self._infer_client_id(message, default_client_id)
+        key = self._client_to_env.get(client_id)
         if key and key in self._environments:
             self._environments[key].touch()
             return self._clone_environment(self._environments[key])
@@ -6,8 +6,10 @@ from typing import Optional
 
 from magicapi_tools.utils.extractor import find_api_detail_by_path
 from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.tracing import traced
 
 
+@traced("resolve_script_id_by_path")
 def resolve_script_id_by_path(http_client: MagicAPIHTTPClient, path: str) -> Optional[str]:
     """根据接口路径解析脚本 ID。"""
     try:
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""测试共享认证管理：令牌注入、认证失效后的单次重新登录与 REFRESH_TOKEN 处理（离线）。"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.auth_manager import AuthManager
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+
+
+class _Response:
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload if payload is not None else {"code": 1, "data": {}}
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.content = b"{}"
+        self.text = ""
+        self.elapsed = type("elapsed", (), {"total_seconds": staticmethod(lambda: 0.01)})()
+
+    def json(self):
+        return self._payload
+
+
+class _ExpiringSession:
+    """令牌过期的 Session：只接受最新签发的令牌，登录时签发新令牌。"""
+
+    def __init__(self, valid_token="t1"):
+        self.valid_token = valid_token
+        self.logins = 0
+        self.calls = []
+        self.lock = threading.Lock()
+        self.headers = {}
+
+    def request(self, method, url, headers=None, **kwargs):
+        with self.lock:
+            self.calls.append((method, url, dict(headers or {})))
+        if url.endswith("/magic/web/login"):
+            time.sleep(0.05)
+            with self.lock:
+                self.logins += 1
+                self.valid_token = f"t{self.logins + 1}"
+            return _Response(headers={"magic-token": self.valid_token})
+        time.sleep(0.02)
+        if (headers or {}).get("Magic-Token") != self.valid_token:
+            return _Response(payload={"code": 401, "message": "token expired"})
+        return _Response(payload={"code": 1, "data": {"id": url.rsplit("/", 1)[-1], "script": ""}})
+
+
+def _client(session, auth_enabled=True):
+    settings = MagicAPISettings(
+        username="admin",
+        password="secret",
+        auth_enabled=auth_enabled,
+        http_single_flight=False,
+        http_retry_backoff=0.0,
+    )
+    client = MagicAPIHTTPClient(settings)  # 连接不到服务器，初始登录失败
+    client.session = session
+    client.auth._last_failure_at = None
+    return client
+
+
+def test_apply_normalizes_token_header():
+    """测试令牌头注入与大小写归一。"""
+    print("🧪 测试令牌头注入...")
+    auth = AuthManager(MagicAPISettings(auth_enabled=False))
+    assert auth.apply({}) == {"Magic-Token": "unauthorization"}
+    assert auth.apply({"magic-token": "custom"}) == {"Magic-Token": "custom"}
+
+    auth = AuthManager(MagicAPISettings(auth_enabled=True, username="u", password="p"))
+    auth.token = "fresh"
+    assert auth.apply({"magic-token": "stale", "X": "1"}) == {"X": "1", "Magic-Token": "fresh"}
+    print("✅ 令牌头注入正确")
+
+
+def test_concurrent_auth_failures_trigger_single_relogin():
+    """测试并发认证失效只触发一次重新登录，所有请求使用新令牌重放成功。"""
+    print("🧪 测试并发重新登录...")
+    session = _ExpiringSession(valid_token="server-only")
+    client = _client(session)
+    tokens = []
+    client.auth.add_listener(tokens.append)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: client.api_detail(f"id{i}"), range(8)))
+
+    assert all(ok for ok, _ in results), results
+    assert session.logins == 1
+    assert client.auth.token == "t2" and tokens == ["t2"]
+    assert client.diagnostics()["auth"]["relogin_count"] == 1
+    print("✅ 并发认证失效只重新登录一次")
+
+
+def test_non_idempotent_request_is_not_replayed():
+    """测试非幂等请求认证失效后只重新登录、不重放。"""
+    session = _ExpiringSession(valid_token="server-only")
+    client = _client(session)
+    response = client.request("POST", "/magic/web/resource/file/api/save", json={"name": "x"})
+    assert response.json()["code"] == 401
+    assert session.logins == 1
+    saves = [call for call in session.calls if call[1].endswith("/save")]
+    assert len(saves) == 1
+
+
+def test_auth_disabled_does_not_relogin():
+    """测试未启用认证时不尝试登录。"""
+    session = _ExpiringSession(valid_token="server-only")
+    client = _client(session, auth_enabled=False)
+    ok, _ = client.api_detail("x")
+    assert ok is False
+    assert session.logins == 0
+
+
+def test_handle_refresh_token():
+    """测试 REFRESH_TOKEN 消息处理。"""
+    print("🧪 测试 REFRESH_TOKEN...")
+    logins = []
+    auth = AuthManager(
+        MagicAPISettings(auth_enabled=True, username="u", password="p"),
+        login=lambda: logins.append(1) or "relogged",
+    )
+    assert auth.handle_refresh_token({"token": "pushed"})
+    assert auth.token == "pushed" and not logins
+
+    assert auth.handle_refresh_token("bare-token")
+    assert auth.token == "bare-token"
+
+    # 未携带令牌时主动重新登录
+    assert auth.handle_refresh_token({"clientId": "abc"})
+    assert auth.token == "relogged" and len(logins) == 1
+    print("✅ REFRESH_TOKEN 处理正确")
+
+
+def test_relogin_cooldown_after_failure():
+    """测试登录失败后的冷却期内不重复登录。"""
+    attempts = []
+    auth = AuthManager(
+        MagicAPISettings(auth_enabled=True, username="u", password="p"),
+        login=lambda: attempts.append(1),
+    )
+    assert auth.relogin(auth.generation) is False
+    assert auth.relogin(auth.generation) is False
+    assert len(attempts) == 1
+
+
+class _StreamedResponse(_Response):
+    """流式响应：访问 ``content`` 即视为提前下载。"""
+
+    @property
+    def content(self):
+        raise AssertionError("流式响应不应读取 content")
+
+    @content.setter
+    def content(self, value):
+        pass
+
+
+def test_auth_failure_check_skips_large_and_streamed_bodies():
+    """测试认证失败检测不读取流式响应体，并按 Content-Length 跳过大响应。"""
+    expired = {"code": 401, "message": "token expired"}
+    assert AuthManager.is_auth_failure(_Response(payload=expired))
+    assert not AuthManager.is_auth_failure(_Response(payload=expired, headers={"Content-Length": "4096"}))
+    assert not AuthManager.is_auth_failure(_Response(payload=expired, headers={"Content-Type": "application/zip"}))
+    assert not AuthManager.is_auth_failure(_StreamedResponse(payload=expired), stream=True)
+    assert AuthManager.is_auth_failure(_StreamedResponse(status_code=401), stream=True)
+
+    session = _ExpiringSession()
+    session.request = lambda method, url, headers=None, **kwargs: _StreamedResponse(
+        headers={"Content-Type": "application/json"}
+    )
+    client = _client(session)
+    response = client.request("GET", "/magic/web/download", stream=True)
+    assert response.status_code == 200
+
+
+if __name__ == "__main__":
+    test_apply_normalizes_token_header()
+    test_concurrent_auth_failures_trigger_single_relogin()
+    test_non_idempotent_request_is_not_replayed()
+    test_auth_disabled_does_not_relogin()
+    test_handle_refresh_token()
+    test_relogin_cooldown_after_failure()
+    test_auth_failure_check_skips_large_and_streamed_bodies()
+    print("🎉 所有测试通过")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""测试多后端路由：配置解析、扇出合并、超时隔离与会话选择（离线）。"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client
+
+from magicapi_mcp.backends import BackendNotFoundError, merge_backend_results
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_mcp.tool_composer import create_app
+from magicapi_mcp.tool_registry import ToolContext
+
+BACKENDS = {
+    "order": {"base_url": "http://order:10712", "username": "admin", "password": "secret"},
+    "user": {"base_url": "http://user:10712", "fanout_timeout": 0.3},
+}
+
+
+def _settings(**overrides):
+    params = dict(backends=BACKENDS, default_backend="order", ws_auto_start=False)
+    params.update(overrides)
+    return MagicAPISettings(**params)
+
+
+def test_settings_parse_backends():
+    """测试从环境变量解析后端，并为单个后端生成独立配置。"""
+    print("🧪 测试后端配置解析...")
+    os.environ["MAGIC_API_BACKENDS"] = json.dumps(BACKENDS)
+    os.environ["MAGIC_API_DEFAULT_BACKEND"] = "order"
+    try:
+        settings = MagicAPISettings.from_env()
+    finally:
+        os.environ.pop("MAGIC_API_BACKENDS")
+        os.environ.pop("MAGIC_API_DEFAULT_BACKEND")
+
+    assert settings.backend_names == ["order", "user"]
+    order = settings.for_backend("order")
+    assert order.base_url == "http://order:10712"
+    assert order.ws_url == "ws://order:10712/magic/web/console"
+    assert order.auth_enabled and order.password == "secret"
+    user = settings.for_backend("user")
+    assert not user.auth_enabled and user.fanout_timeout_seconds == 0.3
+    assert MagicAPISettings().backend_names == ["default"]
+    try:
+        settings.for_backend("missing")
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("未配置的后端应抛出 KeyError")
+    print("✅ 后端配置解析正确")
+
+
+def test_merge_tags_items_with_backend():
+    """测试合并结果：列表项标注来源后端，错误后端单独记录。"""
+    merged = merge_backend_results({
+        "order": {"success": True, "results": [{"id": 1}], "total": 1},
+        "user": {"error": {"code": "http_error", "message": "boom"}},
+    })
+    assert merged["results"] == [{"id": 1, "backend": "order"}]
+    assert merged["by_backend"] == {"order": {"total": 1}}
+    assert merged["_failed"] == {"user": "boom"}
+
+
+def test_fan_out_isolates_slow_backend():
+    """测试单个后端超时不拖住整个扇出查询。"""
+    print("🧪 测试扇出超时隔离...")
+    context = ToolContext(_settings())
+
+    def query():
+        if context.settings.base_url.startswith("http://user"):
+            time.sleep(2)
+        return {"results": [context.settings.base_url]}
+
+    started = time.monotonic()
+    result = context.backends.fan_out(query)
+    assert time.monotonic() - started < 1.5
+    assert result["results"] == [{"backend": "order", "value": "http://order:10712"}]
+    assert result["fan_out"]["succeeded"] == ["order"]
+    assert result["fan_out"]["timed_out"] == ["user"]
+    print("✅ 扇出超时隔离正确")
+
+
+def test_fan_out_keeps_caller_context():
+    """测试扇出线程继承调用方的上下文（上游优先级等）。"""
+    from magicapi_tools.utils.upstream_scheduler import current_priority, upstream_priority
+
+    context = ToolContext(_settings())
+    with upstream_priority("bulk"):
+        result = context.backends.fan_out(lambda: {"results": [current_priority()]})
+    assert [item["value"] for item in result["results"]] == ["bulk", "bulk"]
+    assert current_priority() is None
+
+
+def test_dispatch_and_per_backend_clients():
+    """测试指定后端时单独执行，且每个后端拥有独立的 HTTP 客户端。"""
+    context = ToolContext(_settings())
+    result = context.backends.dispatch("user", lambda: {"base_url": context.settings.base_url})
+    assert result == {"base_url": "http://user:10712", "backend": "user"}
+
+    with context.backends.bind("user"):
+        user_client = context.http_client
+    assert user_client is not context.http_client
+    assert context.http_client is context.backends.primary.http_client
+
+    try:
+        context.backends.dispatch("missing", lambda: {})
+    except BackendNotFoundError as exc:
+        assert "order" in str(exc)
+    else:
+        raise AssertionError("未配置的后端应抛出 BackendNotFoundError")
+
+
+def test_unbound_settings_follow_primary_backend():
+    """测试未绑定后端时 settings 解析为默认后端的配置，而非顶层配置。"""
+    context = ToolContext(MagicAPISettings(
+        backends={"order": {"base_url": "http://order:9999"}}, default_backend="order", ws_auto_start=False,
+    ))
+    assert context.settings.base_url == "http://order:9999"
+    assert context.settings is context.backends.primary.settings
+    assert context.http_client.settings.base_url == context.settings.base_url
+
+
+def test_use_backend_routes_session():
+    """测试 use_backend 切换当前会话的目标后端。"""
+    print("🧪 测试会话后端切换...")
+    app = create_app("production", _settings())
+
+    async def scenario():
+        async with Client(app) as client:
+            missing = (await client.call_tool("use_backend", {"name": "missing"})).structured_content
+            switched = (await client.call_tool("use_backend", {"name": "user"})).structured_content
+            listed = (await client.call_tool("list_backends", {})).structured_content
+        return missing, switched, listed
+
+    missing, switched, listed = asyncio.run(scenario())
+    assert missing["error"]["code"] == "backend_not_found"
+    assert switched["active"] == "user"
+    assert listed["active"] == "user"
+    assert [item["name"] for item in listed["backends"]] == ["order", "user"]
+
+    # 后端绑定位于模块中间件外层，变更后的刷新与缓存失效作用于当前后端
+    names = [type(item).__name__ for item in create_app("full", _settings()).middleware]
+    routing = names.index("BackendRoutingMiddleware")
+    assert routing < names.index("_MutationRefreshMiddleware")
+    assert routing < names.index("_ResponseCacheInvalidationMiddleware")
+    print("✅ 会话后端切换正确")
+
+
+if __name__ == "__main__":
+    test_settings_parse_backends()
+    test_merge_tags_items_with_backend()
+    test_fan_out_isolates_slow_backend()
+    test_fan_out_keeps_caller_context()
+    test_dispatch_and_per_backend_clients()
+    test_unbound_settings_follow_primary_backend()
+    test_use_backend_routes_session()
+    print("🎉 所有测试通过")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""测试离线基准测试：合成数据集、本地替身服务与基线回退判定。"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.suite import DEFAULT_CASES, compare_reports, run_suite
+from benchmarks.synthetic import SEARCH_MARKER, SEARCH_MARKER_HITS, build_dataset
+
+
+def test_dataset_is_deterministic():
+    """测试同一种子生成的数据集一致，搜索命中数固定。"""
+    print("🧪 测试合成数据集...")
+    first = build_dataset(1000, seed=7)
+    second = build_dataset(1000, seed=7)
+    assert first.files == second.files
+    assert len(first.files) == len(first.paths) == 1000
+    assert ("GET", "/order0/v0/list0") in first.paths
+    assert len(first.script_hits(SEARCH_MARKER)) == SEARCH_MARKER_HITS
+    assert len(build_dataset(5000).script_hits(SEARCH_MARKER)) == SEARCH_MARKER_HITS
+    print("✅ 数据集确定且规模正确")
+
+
+def test_fake_server_counts_requests():
+    """测试替身服务的接口响应与按端点计数。"""
+    print("🧪 测试替身服务...")
+    with FakeMagicAPIServer(build_dataset(200), script_latency=0) as server:
+        tree = requests.get(f"{server.base_url}/magic/web/resource", timeout=5).json()
+        assert tree["code"] == 1 and tree["data"]["api"]["children"]
+        business = requests.get(f"{server.base_url}/order0/v0/list0", timeout=5).json()
+        assert business["code"] == 1
+        missing = requests.get(f"{server.base_url}/nope", timeout=5)
+        assert missing.status_code == 404 or missing.json()["code"] != 1
+        counts = server.request_counts()
+    assert sum(counts.values()) >= 3
+    print(f"✅ 请求计数: {counts}")
+
+
+def test_run_suite_small():
+    """测试在小规模数据集上运行部分用例。"""
+    print("🧪 测试小规模基准...")
+    cases = [case for case in DEFAULT_CASES if case.category in {"query", "search"}]
+    report = asyncio.run(run_suite(sizes=[200], repeat=1, cases=cases))
+    results = report["sizes"]["200"]["cases"]
+    assert set(results) == {case.name for case in cases}
+    for name, result in results.items():
+        assert "error" not in result, (name, result.get("error"))
+        assert result["p50_ms"] is not None and result["response_bytes"] > 0
+    assert sum(results["search_scripts"]["requests_per_call"].values()) > 0
+    print("✅ 小规模基准运行成功")
+
+
+def test_compare_reports():
+    """测试基线对比：请求数增加或 p50 超出阈值视为回退。"""
+    baseline = {"sizes": {"1000": {"cases": {
+        "tree": {"p50_ms": 10.0, "requests_cold": {"resource": 1}, "requests_per_call": {}},
+    }}}}
+    current = {"sizes": {"1000": {"cases": {
+        "tree": {"p50_ms": 11.0, "requests_cold": {"resource": 1}, "requests_per_call": {"resource": 1}},
+    }}}}
+    comparison = compare_reports(current, baseline)
+    assert comparison["regressed"]
+    assert [item["metric"] for item in comparison["regressions"]] == ["requests_per_call:resource"]
+
+    current["sizes"]["1000"]["cases"]["tree"].update(p50_ms=20.0, requests_per_call={})
+    comparison = compare_reports(current, baseline, tolerance=0.5)
+    assert [item["metric"] for item in comparison["regressions"]] == ["p50_ms"]
+    assert not compare_reports(baseline, baseline)["regressed"]
+
+
+if __name__ == "__main__":
+    test_dataset_is_deterministic()
+    test_fake_server_counts_requests()
+    test_run_suite_small()
+    test_compare_reports()
+    print("🎉 所有测试通过")
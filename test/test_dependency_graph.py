@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""测试脚本依赖图：引用提取、反向索引查询、影响分析与随资源树变化的增量更新。"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.dependency_graph import DependencyGraph, extract_references
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.tree_cache import ResourceTreeCache
+
+
+def _dataset():
+    """在合成数据集上加入函数 /common/money，并让部分接口导入它、接口之间互相导入。"""
+    dataset = build_dataset(100)
+    function = {"id": "f0001", "name": "金额格式化", "path": "money", "groupId": "fg01", "type": "function",
+                "updateTime": 1700000000000}
+    dataset.tree["function"]["children"].append({
+        "node": {"id": "fg01", "name": "公共", "path": "common", "parentId": "0", "type": "function"},
+        "children": [{"node": dict(function), "children": []}],
+    })
+    dataset.files["f0001"] = {**function, "script": "return db.select('select * from t_currency')"}
+    for file_id in ("a0000000", "a0000001"):
+        dataset.files[file_id]["script"] = "import '@/common/money' as money;\nreturn money(1)"
+    dataset.files["a0000002"]["script"] = "import '@get:/order0/v0/list0' as list;\nreturn list()"
+    return dataset
+
+
+def test_extract_references():
+    """测试导入、调用与表引用的提取。"""
+    script = (
+        "import '@/common/money' as money\n"
+        "import '@post:/user/save' as save\n"
+        "import log\n"
+        "var rows = db.table('T_Order').where().eq('id', 1).select()\n"
+        'var total = db.selectInt("""select count(1) from t_item i left join t_sku s on i.sku = s.id""")\n'
+        "db.update('update t_stock set n = n - 1')\n"
+        "// from comment_table 不是 SQL\n"
+        "return money(total)"
+    )
+    edges = extract_references(script).edges
+    assert edges["function:/common/money"] == {"import", "call"}
+    assert edges["api:POST:/user/save"] == {"import"}
+    assert {key for key in edges if key.startswith("table:")} == {
+        "table:t_order", "table:t_item", "table:t_sku", "table:t_stock",
+    }
+
+
+def test_dependents_and_incremental_update():
+    """测试依赖查询为内存查找、影响分析逐层向上，脚本修改后只补拉变化的文件。"""
+    print("🧪 测试依赖图...")
+    with FakeMagicAPIServer(_dataset(), script_latency=0) as server:
+        client = MagicAPIHTTPClient(MagicAPISettings(base_url=server.base_url, ws_auto_start=False))
+        cache = ResourceTreeCache(client)
+        graph = DependencyGraph(client, tree_cache=cache)
+        assert graph.affected_ids(["f0001"]) is None
+        graph.ensure()
+        assert server.request_counts()["/magic/web/resource/file/{id}"] == 101
+
+        started = time.perf_counter()
+        key = graph.resolve("@/common/money")
+        dependents = graph.dependents(key)
+        elapsed = time.perf_counter() - started
+        assert [entry["id"] for entry in dependents] == ["a0000000", "a0000001"]
+        assert dependents[0]["edges"] == ["call", "import"]
+        assert elapsed < 0.001, f"依赖查询耗时 {elapsed * 1000:.3f}ms"
+
+        levels = graph.impact(graph.resolve("t_currency"))
+        assert [[entry["id"] for entry in level] for level in levels] == [["f0001"], ["a0000000", "a0000001"], ["a0000002"]]
+        assert graph.resolve("GET /order0/v0/list0") == graph.resolve("a0000000")
+        assert graph.affected_ids(["f0001"]) == {"f0001", "a0000000", "a0000001", "a0000002"}
+        assert len(graph.dependents(graph.resolve("t_order"))) > 10
+
+        server.edit_script("a0000001", "return 1")
+        cache.refresh()
+        graph.ensure()
+        assert server.request_counts()["/magic/web/resource/file/{id}"] == 102
+        assert [entry["id"] for entry in graph.dependents(key)] == ["a0000000"]
+
+        # 增量更新期间的查询等待更新完成，而不是遍历正在修改的索引
+        load, release, results = graph._load, threading.Event(), []
+        graph._load = lambda ids: (release.wait(5), load(ids))
+        server.edit_script("a0000001", "import '@/common/money' as money;\nreturn money(2)")
+        cache.refresh()
+        updater = threading.Thread(target=graph.ensure)
+        updater.start()
+        time.sleep(0.05)
+        reader = threading.Thread(target=lambda: results.append(graph.impact(key)))
+        reader.start()
+        reader.join(0.2)
+        assert reader.is_alive() and not results
+        release.set()
+        updater.join(5)
+        reader.join(5)
+        assert [entry["id"] for entry in results[0][0]] == ["a0000000", "a0000001"]
+    print(f"✅ 依赖查询耗时 {elapsed * 1000:.3f}ms，修改后只补拉 1 个脚本")
+
+
+def test_dependency_tools():
+    """测试 find_dependents / impact_of_change 工具。"""
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    with FakeMagicAPIServer(_dataset(), script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+
+        async def run():
+            async with Client(app) as client:
+                found = (await client.call_tool("find_dependents", {
+                    "target": "/common/money", "include_dependencies": True,
+                })).structured_content
+                impact = (await client.call_tool("impact_of_change", {"target": "f0001"})).structured_content
+                return found, impact
+
+        try:
+            found, impact = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    assert found["target"]["id"] == "f0001" and found["total_dependents"] == 2
+    assert found["dependencies"][0]["key"] == "table:t_currency"
+    assert impact["affected_apis"] == 3 and impact["depth"] == 2
+    assert impact["levels"][1][0]["via"] == "api:GET:/order0/v0/list0"
+
+
+if __name__ == "__main__":
+    test_extract_references()
+    test_dependents_and_incremental_update()
+    test_dependency_tools()
+    print("🎉 所有测试通过")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""测试 DTO 的 slots 布局、按类生成的 to_dict、延迟时间戳与工具结果的 JSON 编码。"""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pydantic_core
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.domain.dtos import ApiCallResponse, ClassInfo, ClassSearchResponse, MethodInfo, QueryResponse
+from magicapi_tools.domain.dtos.backup_dtos import BackupOperationResponse
+from magicapi_tools.domain.models.base_model import dumps
+
+
+def test_generated_to_dict_and_lazy_timestamps():
+    """测试嵌套对象展开、跳过 None 值，时间戳在首次序列化时补齐且之后保持不变。"""
+    response = ApiCallResponse(success=True, data={"id": 1}, endpoint_info={"id": "a1", "method": "GET"})
+    assert response.created_at is None and not hasattr(response, "__dict__")
+    try:
+        response.unknown = 1
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("slots DTO 不应允许新增属性")
+
+    first = response.to_dict()
+    assert first["endpoint_info"] == {"id": "a1", "method": "GET", "path": ""}
+    assert "error" not in first and first["data"] == {"id": 1}
+    assert first["created_at"] == first["updated_at"] == response.created_at.isoformat()
+    assert response.to_dict()["created_at"] == first["created_at"]
+
+    classes = ClassSearchResponse(success=True, class_details=[ClassInfo("A", [MethodInfo("get")])])
+    assert classes.to_dict()["class_details"] == [{
+        "class_name": "A",
+        "methods": [{"name": "get", "return_type": "Object", "parameters": []}],
+        "fields": [],
+    }]
+    backups = BackupOperationResponse(success=True, backups=[{"id": "b1", "create_time": "2024-01-01T08:00:00"}])
+    assert backups.to_dict()["backups"] == [{"id": "b1", "create_time": "2024-01-01T08:00:00"}]
+    query = QueryResponse(success=True, results=[{"id": "a1"}])
+    assert query.to_dict()["filters_applied"] == {} and json.loads(query.to_json())["results"] == [{"id": "a1"}]
+
+
+def test_dumps_matches_default_encoding():
+    """测试 dumps 与 FastMCP 默认的 pydantic_core 编码结果一致（含时间、集合与非字符串键）。"""
+    data = {"name": "订单", "when": datetime(2024, 1, 1, 8, 30), "tags": {"a"}, "ids": {1: "x"}, "n": 1.5}
+    assert json.loads(dumps(data)) == json.loads(pydantic_core.to_json(data, fallback=str))
+    assert "订单" in dumps(data)
+
+
+def test_tool_text_matches_structured_content():
+    """测试工具结果文本与结构化内容一致。"""
+    print("🧪 测试工具结果编码...")
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    with FakeMagicAPIServer(build_dataset(100), script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+
+        async def run():
+            async with Client(app) as client:
+                return await client.call_tool("search_api_endpoints", {"path_filter": "order0"})
+
+        try:
+            result = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    assert json.loads(result.content[0].text) == result.structured_content
+    print(f"✅ 文本 {len(result.content[0].text)} 字符")
+
+
+def test_serialize_benchmark_runs():
+    """测试序列化基准在小样本上可运行，两种实现输出相同大小的文本。"""
+    from benchmarks.dto_serialize import run_benchmark
+
+    report = run_benchmark(items=200, rounds=1)
+    assert set(report["cases"]) == {"QueryResponse", "ClassSearchResponse", "BackupOperationResponse"}
+    modes = report["cases"]["QueryResponse"]["modes"]
+    assert modes["legacy"]["chars"] == modes["fast"]["chars"]
+
+
+if __name__ == "__main__":
+    test_generated_to_dict_and_lazy_timestamps()
+    test_dumps_matches_default_encoding()
+    test_tool_text_matches_structured_content()
+    test_serialize_benchmark_runs()
+    print("🎉 所有测试通过")
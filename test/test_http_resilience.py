@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""测试 HTTP 弹性策略：重试、熔断与自适应超时（离线）。"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResiliencePolicy,
+    RetryPolicy,
+    endpoint_family,
+)
+
+
+class _Response:
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self._payload = payload if payload is not None else {"code": 1, "data": {}}
+        self.text = ""
+        self.headers = {"Content-Type": "application/json"}
+        self.elapsed = type("elapsed", (), {"total_seconds": staticmethod(lambda: 0.01)})()
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+
+class _ScriptedSession:
+    """按脚本依次返回响应或抛出异常的 Session。"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = []
+        self.headers = {}
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs.get("timeout")))
+        item = self.script.pop(0) if self.script else _Response()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def _client(script, **overrides):
+    settings = MagicAPISettings(http_retry_backoff=0.0, **overrides)
+    client = MagicAPIHTTPClient(settings)
+    client.session = _ScriptedSession(script)
+    return client
+
+
+def test_endpoint_family():
+    """测试端点族识别。"""
+    print("🧪 测试端点族识别...")
+    assert endpoint_family("http://h/magic/web/resource") == "resource"
+    assert endpoint_family("http://h/magic/web/resource/file/1") == "resource"
+    assert endpoint_family("http://h/magic/web/classes.txt") == "classes"
+    assert endpoint_family("http://h/magic/web/class") == "classes"
+    assert endpoint_family("http://h/magic/web/search") == "search"
+    assert endpoint_family("http://h/magic/web/backups") == "backup"
+    assert endpoint_family("http://h/magic/web/login") == "web"
+    assert endpoint_family("http://h/user/list") == "api"
+    print("✅ 端点族识别正确")
+
+
+def test_idempotent_read_retries_then_succeeds():
+    """测试幂等读请求在连接异常与 503 后重试成功。"""
+    print("🧪 测试读请求重试...")
+    client = _client([requests.ConnectionError("reset"), _Response(503), _Response(payload={"code": 1, "data": {"id": "x"}})])
+    ok, data = client.api_detail("x")
+    assert ok and data == {"id": "x"}
+    assert len(client.session.calls) == 3
+    assert client.diagnostics()["resilience"]["families"]["resource"]["retries"] == 2
+    print("✅ 读请求重试正确")
+
+
+def test_non_idempotent_calls_are_not_retried():
+    """测试业务接口调用不重试。"""
+    print("🧪 测试非幂等请求不重试...")
+    client = _client([requests.ConnectionError("reset")])
+    ok, payload = client.call_api("POST", "/user/save", data={"a": 1})
+    assert not ok and payload["code"] == "network_error"
+    assert len(client.session.calls) == 1
+    print("✅ 非幂等请求未重试")
+
+
+def test_request_routes_forms_through_policy():
+    """测试 request() 透传表单参数并应用策略。"""
+    client = _client([requests.Timeout("slow"), _Response()])
+    response = client.request("POST", "/magic/web/search", idempotent=True, data={"keyword": "k"})
+    assert response.status_code == 200
+    assert [call[1] for call in client.session.calls] == [f"{client.settings.base_url}/magic/web/search"] * 2
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    """测试熔断器状态流转。"""
+    print("🧪 测试熔断器...")
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.0)
+    assert breaker.allow()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.trips == 1
+    # reset_timeout=0，立即进入半开，只放行一个探测请求
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+    client = _client([requests.ConnectionError("down")] * 10, http_breaker_threshold=2, http_max_retries=0)
+    for _ in range(2):
+        client.resource_tree()
+    ok, payload = client.resource_tree()
+    assert not ok and "熔断" in payload["detail"]
+    assert len(client.session.calls) == 2
+    assert isinstance(CircuitOpenError("resource", 1.0), requests.RequestException)
+    print("✅ 熔断器正确")
+
+
+def _half_open_policy():
+    policy = ResiliencePolicy(default_timeout=5.0, retry=RetryPolicy(max_retries=0),
+                              breaker_threshold=1, breaker_reset=0.0)
+    breaker = policy.family("resource").breaker
+    breaker.record_failure()
+    assert breaker.state == "open"
+    return policy, breaker
+
+
+def _raise(exc):
+    def send(timeout):
+        raise exc
+    return send
+
+
+def test_half_open_probe_released_on_uncounted_failure():
+    """测试半开探测以显式超时或其他网络异常结束时释放探测名额，后续请求仍可继续探测。"""
+    url = "http://127.0.0.1:1/magic/web/resource"
+    for exc in (requests.ReadTimeout("slow"), requests.TooManyRedirects("loop")):
+        policy, breaker = _half_open_policy()
+        try:
+            policy.execute("GET", url, _raise(exc), timeout=1.0)
+        except requests.RequestException as raised:
+            assert raised is exc
+        assert breaker.state == "half_open" and breaker.failures == 1
+        response = policy.execute("GET", url, lambda timeout: _Response(200))
+        assert response.status_code == 200 and breaker.state == "closed"
+
+
+def test_business_api_breaker_is_per_path():
+    """测试业务接口按路径熔断，一个故障接口不影响其他接口。"""
+    policy = ResiliencePolicy(default_timeout=5.0, retry=RetryPolicy(max_retries=0), breaker_threshold=2)
+    for _ in range(2):
+        assert policy.execute("GET", "http://h/order/list", lambda t: _Response(503)).status_code == 503
+    try:
+        policy.execute("GET", "http://h/order/list?page=2", lambda t: _Response())
+    except CircuitOpenError as exc:
+        assert exc.family == "api /order/list"
+    else:
+        raise AssertionError("故障接口应熔断")
+    assert policy.execute("GET", "http://h/user/list", lambda t: _Response()).status_code == 200
+    snapshot = policy.snapshot()["families"]["api"]
+    assert snapshot["state"] == "open" and snapshot["open_paths"] == ["/order/list"] and snapshot["trips"] == 1
+
+
+def test_adaptive_timeout_uses_p99():
+    """测试自适应超时。"""
+    print("🧪 测试自适应超时...")
+    policy = ResiliencePolicy(default_timeout=30.0, retry=RetryPolicy(max_retries=0), min_samples=5)
+    assert policy.timeout_for("resource") == 30.0
+    state = policy.family("resource")
+    for latency in (0.1, 0.2, 0.3, 0.4, 1.0):
+        state.latency.record(latency)
+    assert policy.timeout_for("resource") == 3.0  # p99=1.0 × 3
+    for _ in range(5):
+        state.latency.record(0.01)
+    assert policy.timeout_for("resource") == 3.0
+    assert policy.timeout_for("api") == 30.0  # 业务接口不做自适应
+
+    client = _client([])
+    ok, _ = client.resource_tree()
+    assert ok and client.session.calls[0][2] == client.settings.timeout_seconds
+
+    # 非幂等写入不使用读请求得出的自适应超时
+    sent = []
+    policy.execute("POST", "http://h/magic/web/resource/file/api/save", lambda t: sent.append(t) or _Response())
+    policy.execute("GET", "http://h/magic/web/resource/file/1", lambda t: sent.append(t) or _Response())
+    assert sent == [30.0, 3.0]
+    print("✅ 自适应超时正确")
+
+
+if __name__ == "__main__":
+    test_endpoint_family()
+    test_idempotent_read_retries_then_succeeds()
+    test_non_idempotent_calls_are_not_retried()
+    test_request_routes_forms_through_policy()
+    test_circuit_breaker_opens_and_half_opens()
+    test_half_open_probe_released_on_uncounted_failure()
+    test_business_api_breaker_is_per_path()
+    test_adaptive_timeout_uses_p99()
+    print("🎉 所有测试通过")
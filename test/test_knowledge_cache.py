@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""测试静态知识工具的响应缓存与 knowledge_version。"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magicapi_tools.utils.kb_cache import KnowledgeCache, knowledge_version, memoized_knowledge
+
+
+def test_memoized_knowledge_decorator():
+    """测试缓存命中、版本字段、not_modified 与错误响应不缓存。"""
+    calls = []
+
+    @memoized_knowledge("demo")
+    def tool(topic: str = "a", known_version=None):
+        calls.append(topic)
+        if topic == "missing":
+            return {"error": {"code": "not_found"}}
+        return {"topic": topic}
+
+    version = knowledge_version()
+    assert len(version) == 16 and knowledge_version() == version
+    first = tool(topic="a")
+    assert first == {"topic": "a", "knowledge_version": version}
+    assert tool(topic="a") is first
+    tool(topic="b")
+    tool(topic="missing")
+    tool(topic="missing")
+    assert calls == ["a", "b", "missing", "missing"]
+    assert tool(topic="a", known_version=version) == {"knowledge_version": version, "not_modified": True}
+    assert tool(topic="a", known_version="stale") is first
+
+    cache = KnowledgeCache(maxsize=2)
+    for key in ("x", "y", "z"):
+        cache.get_or_build(key, lambda key=key: key)
+    assert len(cache) == 2
+
+
+def test_knowledge_tools_expose_version():
+    """测试知识工具通过 MCP 返回 knowledge_version 并支持跳过未变化内容。"""
+    print("🧪 测试知识工具缓存...")
+    from fastmcp import Client
+
+    from magicapi_mcp.settings import MagicAPISettings
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+    from magicapi_tools.utils.metrics import metrics
+
+    app = create_app("documentation", MagicAPISettings(ws_auto_start=False))
+    metrics.reset()
+
+    async def run():
+        async with Client(app) as client:
+            first = (await client.call_tool("get_full_magic_script_syntax", {"max_bytes": 0})).structured_content
+            second = (await client.call_tool("get_full_magic_script_syntax", {"max_bytes": 0})).structured_content
+            skipped = (await client.call_tool("get_full_magic_script_syntax", {
+                "max_bytes": 0, "known_version": first["knowledge_version"],
+            })).structured_content
+            overview = (await client.call_tool("get_knowledge_overview", {})).structured_content
+            docs = (await client.call_tool("get_documentation", {"name_or_category": "db"})).structured_content
+            return first, second, skipped, overview, docs
+
+    try:
+        first, second, skipped, overview, docs = asyncio.run(run())
+    finally:
+        tool_registry.context.close()
+
+    version = knowledge_version()
+    assert first == second and first["knowledge_version"] == version
+    assert skipped == {"knowledge_version": version, "not_modified": True}
+    assert overview["knowledge_version"] == version and docs["knowledge_version"] == version
+    assert metrics.snapshot()["caches"]["knowledge"]["hit"] >= 1
+    print(f"✅ knowledge_version={version}")
+
+
+if __name__ == "__main__":
+    test_memoized_knowledge_decorator()
+    test_knowledge_tools_expose_version()
+    print("🎉 所有测试通过")
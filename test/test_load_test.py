@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""测试接口压测：模板渲染、分位数统计、请求数/爬坡控制与基线回退判定（本地 HTTP 服务）。"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.load_test import (
+    LoadTestConfig,
+    compare_with_baseline,
+    latency_histogram,
+    load_baseline,
+    percentile,
+    render_template,
+    run_load_test,
+    save_baseline,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        _Handler.seen.append(query)
+        if query.get("fail") == ["1"]:
+            self.send_response(500)
+            self.end_headers()
+            return
+        time.sleep(0.005)
+        body = json.dumps({"code": 1, "data": "x" * int(query.get("size", ["10"])[0])}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _client(server):
+    return MagicAPIHTTPClient(MagicAPISettings(base_url=f"http://127.0.0.1:{server.server_port}"))
+
+
+def test_render_template():
+    """测试模板占位符渲染。"""
+    rendered = render_template(
+        {"id": "{{seq}}", "name": "user-{{worker}}", "page": "{{random:3:3}}", "tags": ["{{choice:a}}"]},
+        seq=7, worker=2,
+    )
+    assert rendered == {"id": 7, "name": "user-2", "page": 3, "tags": ["a"]}
+    assert len(render_template("{{uuid}}", 0, 0)) == 32
+
+
+def test_invalid_placeholders_fail_validation():
+    """测试非法占位符在校验阶段报告，压测服务返回 validation_error 而不是抛出异常。"""
+    from types import SimpleNamespace
+
+    from magicapi_tools.services.api_service import ApiService
+
+    config = LoadTestConfig(
+        method="GET", path="/order/list",
+        params={"page": "{{random:x:y}}", "n": "{{random:5:1}}"},
+        data=[{"name": "{{foo}}"}], headers={"X-Id": "{{choice:}}"},
+    )
+    errors = config.validate()
+    assert len(errors) == 4 and errors[0].startswith("params: ") and "{{foo}}" in errors[2]
+    assert LoadTestConfig(method="GET", path="/a", params={"a": "{{seq}}-{{random:1:2}}"}).validate() == []
+
+    service = ApiService(SimpleNamespace(http_client=object()))
+    assert service.load_test(config)["error"]["code"] == "validation_error"
+    # 执行期间的异常转换为错误响应
+    result = service.load_test(LoadTestConfig(method="GET", path="/a", total_requests=1))
+    assert result["error"]["code"] == "load_test_error"
+
+
+def test_percentile_and_histogram():
+    """测试最近秩分位数与延迟直方图。"""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert latency_histogram([1, 4, 7, 20000]) == [
+        {"le": "5", "count": 2}, {"le": "10", "count": 1}, {"le": "+Inf", "count": 1},
+    ]
+
+
+def test_run_by_request_count_with_templates():
+    """测试按请求数压测，参数模板按请求序号轮换。"""
+    print("🧪 测试按请求数压测...")
+    server = _server()
+    _Handler.seen = []
+    try:
+        config = LoadTestConfig(
+            method="GET", path="/order/list", concurrency=4, total_requests=40, ramp_up_seconds=0.1,
+            params=[{"size": "{{random:10:10}}", "seq": "{{seq}}"}, {"size": "100", "seq": "{{seq}}"}],
+        )
+        snapshots = []
+        report = run_load_test(_client(server), config, snapshots.append, progress_interval=0.05)
+    finally:
+        server.shutdown()
+
+    assert report["requests"] == 40 and report["errors"] == 0
+    assert report["status_codes"] == {"200": 40}
+    assert sorted(int(q["seq"][0]) for q in _Handler.seen) == list(range(40))
+    latency = report["latency_ms"]
+    assert latency["min"] <= latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+    assert sum(bucket["count"] for bucket in latency["histogram"]) == 40
+    assert report["response_size_bytes"]["min"] < report["response_size_bytes"]["max"]
+    assert snapshots and snapshots[-1]["completed"] <= 40
+    print(f"✅ {report['throughput_rps']} req/s, p99 {latency['p99']}ms")
+
+
+def test_errors_and_duration_stop():
+    """测试按时长停止并统计错误率。"""
+    server = _server()
+    try:
+        config = LoadTestConfig(method="GET", path="/fail", concurrency=2, duration_seconds=0.3,
+                                params={"fail": "1"})
+        started = time.monotonic()
+        report = run_load_test(_client(server), config)
+    finally:
+        server.shutdown()
+    assert time.monotonic() - started < 2
+    assert report["requests"] > 0 and report["error_rate"] == 1.0
+    assert report["error_samples"][0]["status"] == 500
+
+
+def test_baseline_regression():
+    """测试基线保存与回退判定。"""
+    print("🧪 测试基线对比...")
+    baseline = {"latency_ms": {"p50": 10, "p90": 20, "p99": 40}, "throughput_rps": 100.0, "error_rate": 0.0}
+    current = {"latency_ms": {"p50": 11, "p90": 30, "p99": 41}, "throughput_rps": 95.0, "error_rate": 0.0}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = save_baseline(os.path.join(tmp, "nested", "base.json"), baseline)
+        comparison = compare_with_baseline(current, load_baseline(path), tolerance=0.2)
+    assert comparison["regressed"]
+    assert comparison["regressions"] == ["latency_p90_ms"]
+    assert comparison["metrics"]["throughput_rps"]["change_pct"] == -5.0
+    print("✅ 基线对比正确")
+
+
+if __name__ == "__main__":
+    test_render_template()
+    test_invalid_placeholders_fail_validation()
+    test_percentile_and_histogram()
+    test_run_by_request_count_with_templates()
+    test_errors_and_duration_stop()
+    test_baseline_regression()
+    print("🎉 所有测试通过")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""测试运行时指标：直方图与导出格式、工具调用的上游请求归属、get_server_metrics 工具与 /metrics 端点。"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.metrics import Histogram, MetricsRegistry, metrics, normalize_endpoint
+
+
+def test_histogram_and_endpoint_labels():
+    """测试直方图分位数与端点归一化。"""
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005, 0.05, 0.05, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.01", 1), ("0.1", 3), ("1", 4), ("+Inf", 5)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1.0) == 3.0
+
+    assert normalize_endpoint("http://h/magic/web/resource/file/a0001") == "/magic/web/resource/file/{id}"
+    assert normalize_endpoint("http://h/magic/web/classes.txt") == "/magic/web/classes.txt"
+    assert normalize_endpoint("http://h/order/v1/list") == "business"
+
+
+def test_render_formats():
+    """测试 Prometheus 与 OpenMetrics 文本输出。"""
+    registry = MetricsRegistry()
+    with registry.tool_scope("demo") as scope:
+        registry.record_http_request("GET", "http://h/magic/web/resource", "200", 0.02, 512)
+    registry.record_tool_call(scope, 0.03, True, 100)
+    registry.record_cache("resource_tree", True)
+
+    text = registry.render()
+    assert 'magicapi_tool_calls_total{tool="demo",status="ok"} 1' in text
+    assert 'magicapi_tool_upstream_requests_bucket{tool="demo",le="1"} 1' in text
+    assert "# TYPE magicapi_http_requests_total counter" in text
+
+    openmetrics = registry.render(openmetrics=True)
+    assert "# TYPE magicapi_http_requests counter" in openmetrics
+    assert openmetrics.endswith("# EOF\n")
+
+    registry.enabled = False
+    registry.record_cache("resource_tree", False)
+    assert registry.snapshot()["caches"]["resource_tree"] == {"hit": 1, "miss": 0, "hit_ratio": 1.0}
+
+
+def test_tool_metrics_end_to_end():
+    """测试工具调用指标、上游请求归属与 /metrics 端点。"""
+    print("🧪 测试工具调用指标...")
+    from fastmcp import Client
+    from starlette.testclient import TestClient
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    with FakeMagicAPIServer(build_dataset(100), script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+        metrics.reset()
+
+        async def run():
+            async with Client(app) as client:
+                for _ in range(2):
+                    await client.call_tool("get_resource_statistics", {})
+                await client.call_tool("get_api_details_by_path", {"path": "GET /order0/v0/list0"})
+                # 资源读取走共享资源树缓存：第一次未命中，第二次命中
+                for _ in range(2):
+                    await client.read_resource("magicapi://stats")
+                result = await client.call_tool("get_server_metrics", {})
+                return result.structured_content
+
+        try:
+            snapshot = asyncio.run(run())["metrics"]
+            with TestClient(app.http_app()) as http:
+                response = http.get("/metrics")
+                openmetrics = http.get("/metrics", headers={"Accept": "application/openmetrics-text"})
+        finally:
+            tool_registry.context.close()
+
+    stats = snapshot["tools"]["get_resource_statistics"]
+    assert stats["calls"] == 2 and stats["errors"] == 0
+    assert stats["upstream_requests_per_call"] == 1.0
+    assert stats["latency_ms"]["count"] == 2
+    assert snapshot["caches"]["resource_tree"] == {"hit": 1, "miss": 1, "hit_ratio": 0.5}
+    assert snapshot["upstream"]["/magic/web/resource"]["requests"] >= 1
+    assert snapshot["tools"]["get_api_details_by_path"]["upstream_requests_per_call"] >= 1
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'magicapi_tool_calls_total{tool="get_resource_statistics",status="ok"} 2' in response.text
+    assert openmetrics.headers["content-type"].startswith("application/openmetrics-text")
+    print("✅ 指标采集正确")
+
+
+if __name__ == "__main__":
+    test_histogram_and_endpoint_labels()
+    test_render_formats()
+    test_tool_metrics_end_to_end()
+    print("🎉 所有测试通过")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""测试资源树缓存变更检测与 MCP 资源订阅通知（离线）。"""
+
+import asyncio
+import copy
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magicapi_tools.utils.tree_cache import ResourceTreeCache, compute_tree_stats
+
+
+def _tree():
+    return {
+        "api": {
+            "node": {"id": "0"},
+            "children": [{
+                "node": {"id": "g1", "name": "用户", "path": "user", "parentId": "0"},
+                "children": [
+                    {"node": {"id": "a1", "name": "列表", "method": "GET", "path": "list", "groupId": "g1", "updateTime": 1}, "children": []},
+                    {"node": {"id": "a2", "name": "保存", "method": "POST", "path": "save", "groupId": "g1", "updateTime": 1}, "children": []},
+                ],
+            }],
+        }
+    }
+
+
+class FakeHTTPClient:
+    def __init__(self):
+        self.tree = _tree()
+        self.tree_calls = 0
+
+    def resource_tree(self):
+        self.tree_calls += 1
+        return True, copy.deepcopy(self.tree)
+
+    def api_detail(self, file_id):
+        for child in self.tree["api"]["children"][0]["children"]:
+            if child["node"]["id"] == file_id:
+                return True, dict(child["node"], script="return 1")
+        return False, {"message": "not found"}
+
+    def touch(self, index, update_time):
+        self.tree["api"]["children"][0]["children"][index]["node"]["updateTime"] = update_time
+
+
+def test_tree_cache_ttl_and_diff():
+    """测试缓存 TTL 与变化检测。"""
+    print("🧪 测试资源树缓存...")
+    client = FakeHTTPClient()
+    cache = ResourceTreeCache(client, ttl_seconds=60)
+    changes = []
+    cache.add_listener(changes.append)
+
+    ok, _ = cache.get_tree()
+    ok2, _ = cache.get_tree()
+    assert ok and ok2 and client.tree_calls == 1
+    assert changes == []  # 首次加载只建立基线
+
+    client.touch(1, 2)
+    client.tree["api"]["children"][0]["children"].pop(0)
+    cache.refresh()
+    assert len(changes) == 1
+    assert changes[0].modified == ["a2"] and changes[0].removed == ["a1"] and changes[0].added == []
+
+    cache.refresh()
+    assert len(changes) == 1  # 无变化不通知
+    print("✅ 缓存与变化检测正确")
+
+
+def test_check_file_triggers_refresh():
+    """测试 WS 文件切换事件触发的单文件检查。"""
+    print("🧪 测试单文件变化检查...")
+    client = FakeHTTPClient()
+    cache = ResourceTreeCache(client, ttl_seconds=60)
+    cache.get_tree()
+    assert cache.check_file("a1") is False
+    client.touch(1, 5)
+    assert cache.check_file("a2") is True
+    assert cache.get_node("a2")["updateTime"] == 5
+    print("✅ 单文件检查正确")
+
+
+def test_compute_tree_stats():
+    """测试统计口径。"""
+    stats = compute_tree_stats(_tree())
+    assert stats["total_resources"] == 3
+    assert stats["api_endpoints"] == 2
+    assert stats["by_method"] == {"GET": 1, "POST": 1}
+
+
+def test_subscribe_and_notify():
+    """测试订阅资源后收到 notifications/resources/updated。"""
+    print("🧪 测试 MCP 资源订阅通知...")
+    from fastmcp import Client, FastMCP
+    from magicapi_tools.tools.resource_feed import ResourceFeedTools
+
+    async def scenario():
+        http_client = FakeHTTPClient()
+        context = SimpleNamespace(http_client=http_client, tree_cache=ResourceTreeCache(http_client, ttl_seconds=60))
+        app = FastMCP("test")
+        ResourceFeedTools().register_tools(app, context)
+
+        updates = []
+
+        async def handler(message):
+            root = getattr(message, "root", None)
+            if getattr(root, "method", None) == "notifications/resources/updated":
+                updates.append(str(root.params.uri))
+
+        async with Client(app, message_handler=handler) as client:
+            caps = client.initialize_result.capabilities
+            assert caps.resources.subscribe is True
+
+            tree = json.loads((await client.read_resource("magicapi://tree"))[0].text)
+            assert tree["version"] == 1
+            detail = json.loads((await client.read_resource("magicapi://api/a1"))[0].text)
+            assert detail["script"] == "return 1"
+
+            await client.session.subscribe_resource("magicapi://tree")
+            await client.session.subscribe_resource("magicapi://api/a2")
+
+            http_client.touch(1, 9)
+            await asyncio.get_running_loop().run_in_executor(None, context.tree_cache.refresh)
+            for _ in range(50):
+                if len(updates) >= 2:
+                    break
+                await asyncio.sleep(0.02)
+
+        assert sorted(updates) == ["magicapi://api/a2", "magicapi://tree"], updates
+        assert context.resource_subscriptions.notifications_sent == 2
+
+    asyncio.run(scenario())
+    print("✅ 订阅通知正确")
+
+
+if __name__ == "__main__":
+    test_tree_cache_ttl_and_diff()
+    test_check_file_triggers_refresh()
+    test_compute_tree_stats()
+    test_subscribe_and_notify()
+    print("🎉 所有测试通过")
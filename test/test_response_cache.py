@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""测试 call_magic_api 的 GET 响应缓存：按请求键命中、TTL、保存脚本后失效，以及 replay_api_call 差异比较。"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.response_cache import ResponseCache, diff_values, request_key
+from magicapi_tools.utils.tree_cache import TreeChange
+
+NO_LOGS = {"pre": 0, "post": 0}
+
+
+def test_cache_keys_and_invalidation():
+    """测试键忽略调试请求头与参数书写形式，失效后不再命中但保留录制。"""
+    key = request_key("get", "/user", '{"b": 2, "a": 1}', {"X-Tenant": "t1", "Magic-Request-Client-Id": "c1"})
+    assert key == request_key("GET", "/user", {"a": 1, "b": 2}, {"x-tenant": "t1"})
+    assert key != request_key("GET", "/user", {"a": 1, "b": 2}, {"x-tenant": "t2"})
+
+    cache = ResponseCache(max_entries=2)
+    cache.put(key, "GET", "/user", None, None, "a1", {"data": 1}, ttl=60)
+    assert cache.get(key).hits == 1
+    cache.on_tree_change(TreeChange(version=2, modified=["a1"]))
+    assert cache.get(key) is None and cache.entry(key).stale
+
+    cache.put("k2", "GET", "/b", None, None, "a2", {"data": 2}, ttl=0.05)
+    time.sleep(0.06)
+    assert cache.get("k2") is None
+    cache.put("k3", "GET", "/c", None, None, "a3", {"data": 3}, ttl=60)
+    assert cache.entry(key) is None and [item["key"] for item in cache.entries()] == ["k3", "k2"]
+
+    # 按依赖图扩展：修改函数时导入它的接口也失效；无法确定时全部失效
+    graph = {"f1": {"f1", "a1"}}
+    expanding = ResponseCache(expand=lambda ids: set().union(*(graph[i] for i in ids)) if ids <= set(graph) else None)
+    for item in ("a1", "a2"):
+        expanding.put(item, "GET", f"/{item}", None, None, item, {}, ttl=60)
+    assert expanding.invalidate(["f1"]) == 1 and expanding.get("a2") is not None
+    assert expanding.invalidate(["unknown"]) == 1 and expanding.get("a2") is None
+
+    differences, truncated = diff_values({"a": 1, "list": [1, 2]}, {"a": 2, "list": [1], "b": 0})
+    assert [(item["path"], item["change"]) for item in differences] == [
+        ("$.a", "changed"), ("$.list[1]", "removed"), ("$.b", "added"),
+    ]
+    assert not truncated and diff_values(list(range(5)), list(range(1, 6)), limit=2)[1]
+
+
+def test_cached_call_and_replay_tools():
+    """测试命中缓存时不访问上游，保存脚本后失效，重放返回 updateTime 的差异。"""
+    print("🧪 测试接口响应缓存与重放...")
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    dataset = build_dataset(10)
+    path = "/" + next(path for (method, path), file_id in dataset.paths.items() if file_id == "a0000001").lstrip("/")
+    with FakeMagicAPIServer(dataset, script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+
+        async def call(client, **arguments):
+            return (await client.call_tool("call_magic_api", {
+                "method": "GET", "path": path, "include_ws_logs": NO_LOGS, **arguments,
+            })).structured_content
+
+        async def run():
+            async with Client(app) as client:
+                first = await call(client, cache_ttl=60)
+                second = await call(client, cache_ttl=60)
+                uncached = await call(client)
+                business = server.request_counts()["business"]
+                await client.call_tool("replace_api_script", {
+                    "id": "a0000001", "search": "return", "replacement": "return",
+                })
+                after_save = await call(client, cache_ttl=60)
+                server.edit_script("a0000001", "return 2")
+                replayed = (await client.call_tool("replay_api_call", {"key": first["cache"]["key"]})).structured_content
+                again = (await client.call_tool("replay_api_call", {"path": f"GET {path}"})).structured_content
+                listed = (await client.call_tool("replay_api_call", {})).structured_content
+                missing = (await client.call_tool("replay_api_call", {"key": "nope"})).structured_content
+                return first, second, uncached, business, after_save, replayed, again, listed, missing
+
+        try:
+            first, second, uncached, business, after_save, replayed, again, listed, missing = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    assert first["cache"]["hit"] is False and second["cache"]["hit"] is True
+    assert second["data"] == first["data"] and "cache" not in uncached
+    assert business == 2, f"缓存命中仍访问了上游: {business}"
+    assert after_save["cache"]["hit"] is False and after_save["data"]["updateTime"] != first["data"]["updateTime"]
+
+    assert replayed["identical"] is False
+    assert [item["path"] for item in replayed["differences"]] == ["$.updateTime"]
+    assert again["identical"] is True and again["baseline"]["stale"] is False
+    assert listed["recordings"][0]["replays"] == 2
+    assert missing["error"]["code"] == "recording_not_found"
+    print(f"✅ 命中缓存跳过上游调用，重放差异: {replayed['differences'][0]['path']}")
+
+
+if __name__ == "__main__":
+    test_cache_keys_and_invalidation()
+    test_cached_call_and_replay_tools()
+    print("🎉 所有测试通过")
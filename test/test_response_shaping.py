@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""测试响应裁剪：字节/条目预算、稳定游标、字段投影，以及知识库与资源树工具的分页。"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.response_shaping import (
+    CursorError,
+    ShapeOptions,
+    json_size,
+    paginate,
+    paginate_tree,
+    project,
+)
+
+
+def _tree():
+    def leaf(i):
+        return {"node": {"id": f"f{i}", "name": f"api{i}", "path": f"/a{i}", "script": "x" * 200}, "children": []}
+
+    return {
+        "node": {"id": "root", "name": "root"},
+        "children": [
+            {"node": {"id": "g1", "name": "g1", "path": "/g1"}, "children": [leaf(i) for i in range(5)]},
+            {"node": {"id": "g2", "name": "g2", "path": "/g2"}, "children": [leaf(i) for i in range(5, 8)]},
+        ],
+    }
+
+
+def test_paginate_cursor_and_projection():
+    """测试列表分页的预算、游标续取与失效。"""
+    items = [{"id": i, "path": f"/p{i}", "body": "y" * 100} for i in range(10)]
+    options = ShapeOptions(max_bytes=400, fields=["id", "path"])
+    collected = []
+    cursor = None
+    while True:
+        options.cursor = cursor
+        page_items, page = paginate(items, options, "scope")
+        assert json_size(page_items) <= 400 + len(page_items)
+        collected.extend(page_items)
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert collected == [{"id": i, "path": f"/p{i}"} for i in range(10)]
+
+    first, page = paginate(items, ShapeOptions(max_items=3), "scope")
+    assert len(first) == 3 and page["limited_by"] == "max_items"
+    # 同一游标总是得到同一页
+    again = ShapeOptions(max_items=3, cursor=page["next_cursor"])
+    assert paginate(items, again, "scope")[0] == paginate(items, again, "scope")[0]
+    for scope, data in (("other", items), ("scope", items[:-1])):
+        try:
+            paginate(data, again, scope)
+        except CursorError:
+            pass
+        else:
+            raise AssertionError("游标应失效")
+
+    # 单条超出预算时仍至少返回一条
+    assert len(paginate(items, ShapeOptions(max_bytes=1), "scope")[0]) == 1
+    assert project({"node": {"id": 1, "path": "/x", "script": "s"}}, ["node.id"]) == {"node": {"id": 1}}
+    assert ShapeOptions.from_params(0, None, " ", "id, path").fields == ["id", "path"]
+
+
+def test_paginate_tree_keeps_ancestors():
+    """测试资源树分页保留祖先上下文并标记截断。"""
+    tree = _tree()
+    options = ShapeOptions(max_items=4, fields=["id", "path"])
+    seen = []
+    while True:
+        page_tree, page = paginate_tree(tree, options, "tree")
+        stack = list(page_tree["children"])
+        while stack:
+            entry = stack.pop()
+            assert set(entry["node"]) <= {"id", "path"}
+            seen.append(entry["node"]["id"])
+            stack.extend(entry["children"])
+        if not page["has_more"]:
+            break
+        assert page_tree.get("truncated") or any(child.get("truncated") for child in page_tree["children"])
+        options.cursor = page["next_cursor"]
+
+    assert page["total"] == 10
+    # 祖先分组可能在多页重复出现，叶子节点恰好出现一次
+    leaves = [node_id for node_id in seen if node_id.startswith("f")]
+    assert sorted(leaves) == sorted(f"f{i}" for i in range(8))
+
+
+def test_tools_paginate_large_results():
+    """测试知识库与资源树工具默认预算生效、游标可续取、非法游标返回错误。"""
+    print("🧪 测试工具分页...")
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    with FakeMagicAPIServer(build_dataset(300), script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False,
+                                    response_max_bytes=4096)
+        app = create_app("full", settings)
+
+        async def run():
+            async with Client(app) as client:
+                results = {}
+                call = client.call_tool
+                results["syntax"] = (await call("get_full_magic_script_syntax", {})).structured_content
+                results["syntax_fields"] = (await call(
+                    "get_full_magic_script_syntax", {"fields": ["keywords", "operators"], "max_bytes": 0}
+                )).structured_content
+                results["search"] = (await call("search_knowledge", {"keyword": "for"})).structured_content
+                json_pages = []
+                arguments = {"format": "json", "fields": ["id", "path"], "max_items": 100}
+                while True:
+                    page = (await call("get_resource_tree", arguments)).structured_content
+                    json_pages.append(page)
+                    if not page["page"]["has_more"]:
+                        break
+                    arguments = dict(arguments, cursor=page["page"]["next_cursor"])
+                results["json_pages"] = json_pages
+                results["tree"] = (await call("get_resource_tree", {})).structured_content
+                results["bad"] = (await call("get_resource_tree", {"cursor": "bogus"})).structured_content
+                return results
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    syntax = results["syntax"]
+    assert syntax["page"]["has_more"] and json_size(syntax) < 4096 + 2048
+    assert "critical_differences" in syntax
+    assert list(results["syntax_fields"]["sections"]) == ["keywords", "operators"]
+
+    search = results["search"]
+    assert "full_content" not in str(search["results"])
+    if search["total"]:
+        assert search["page"]["total"] == search["total"]
+
+    nodes = [node for page in results["json_pages"] for node in page["nodes"]]
+    assert len(nodes) == results["json_pages"][0]["count"] > 100
+    assert all(set(node) <= {"id", "path"} for node in nodes)
+    assert len({node["id"] for node in nodes}) == len(nodes)
+
+    tree = results["tree"]
+    assert tree["page"]["has_more"] and tree["page"]["limited_by"] == "max_bytes"
+    assert json_size(tree["tree"]) < 4096 * 2
+    assert results["bad"]["error"]["code"] == "invalid_cursor"
+    print(f"✅ json 分 {len(results['json_pages'])} 页，共 {len(nodes)} 个节点")
+
+
+if __name__ == "__main__":
+    test_paginate_cursor_and_projection()
+    test_paginate_tree_keeps_ancestors()
+    test_tools_paginate_large_results()
+    print("🎉 所有测试通过")
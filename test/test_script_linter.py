@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""测试 Magic-Script 静态性能检查：N+1 查询、未分页查询、重复查询、内存处理与缓存缺失。"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.script_linter import lint_script
+
+SCRIPT = '''import log
+var orders = db.select("select * from t_order")
+for (o in orders) {
+    o.items = db.select("""
+        select * from t_item where order_id = #{o.id} limit 100
+    """)
+}
+var users = orders.map(it => db.selectOne("select * from t_user where id = #{it.uid}"))
+var total = orders.size()
+var c1 = db.selectInt("select count(1) from t_order where status = 1")
+var c2 = db.selectInt("select  count(1) from t_order where status = 1")
+for (x in orders) db.table('t_log').insert({id: x.id})
+// db.select("select * from t_ignored")
+return db.table('t_order').where().eq('deleted', 0).page()
+'''
+
+
+def test_lint_rules_and_ranking():
+    """测试各规则命中的行号，以及按代价从高到低排序。"""
+    findings = lint_script(SCRIPT, "GET")
+    by_rule = {}
+    for item in findings:
+        by_rule.setdefault(item.rule, []).append(item.line)
+
+    assert by_rule["query_in_loop"] == [4, 8, 12]
+    assert by_rule["unbounded_select"] == [2]
+    assert by_rule["in_memory_processing"] == [9]
+    assert by_rule["repeated_query"] == [11]
+    assert by_rule["missing_cache"] == [2]
+    assert [item.cost for item in findings] == sorted((item.cost for item in findings), reverse=True)
+    assert findings[-1].rule == "missing_cache"
+    assert next(item for item in findings if item.line == 12).suggestion.startswith("循环外一次性批量写入")
+    assert all(item.tip for item in findings)
+
+    nested = lint_script("while (true) {\n  for (a in b) {\n    db.update('update t set a = 1')\n  }\n}")
+    assert nested[0].rule == "query_in_loop" and nested[0].cost == 15
+    assert lint_script("return db.page('select * from t_order')", "GET")[0].rule == "missing_cache"
+    assert lint_script("return db.cache('k', 60).page('select * from t_order')", "GET") == []
+
+
+def test_analyze_group_with_tool():
+    """测试按分组检查时并发获取脚本，只返回有问题的接口并按代价排序。"""
+    print("🧪 测试脚本性能检查工具...")
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    dataset = build_dataset(100)
+    dataset.files["a0000003"]["script"] = SCRIPT
+    with FakeMagicAPIServer(dataset, script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+
+        async def run():
+            async with Client(app) as client:
+                group = (await client.call_tool("analyze_script_performance", {
+                    "group_id": "m00000g00", "min_severity": "medium", "limit": 3,
+                })).structured_content
+                single = (await client.call_tool("analyze_script_performance", {
+                    "file_id": "a0000003",
+                })).structured_content
+                inline = (await client.call_tool("analyze_script_performance", {
+                    "script": "for (i in list) { db.selectOne('select 1') }",
+                })).structured_content
+                missing = (await client.call_tool("analyze_script_performance", {
+                    "group_id": "nope",
+                })).structured_content
+                return group, single, inline, missing
+
+        try:
+            group, single, inline, missing = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    assert group["scanned"] == 50 and len(group["results"]) <= 3
+    assert group["results"][0]["id"] == "a0000003"
+    assert group["results"][0]["path"] == "/order0/v0/" + dataset.files["a0000003"]["path"]
+    assert all(item["severity"] != "low" for result in group["results"] for item in result["findings"])
+    assert single["results"][0]["by_rule"]["query_in_loop"] == 3
+    assert inline["results"][0]["findings"][0]["rule"] == "query_in_loop"
+    assert missing["error"]["code"] == "not_found"
+    print(f"✅ 扫描 {group['scanned']} 个接口，最高代价 {group['results'][0]['cost']}")
+
+
+if __name__ == "__main__":
+    test_lint_rules_and_ranking()
+    test_analyze_group_with_tool()
+    print("🎉 所有测试通过")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""测试脚本双向同步：三方合并、增量拉取、防抖批量推送与冲突处理。"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.script_sync import ScriptSyncEngine
+from magicapi_tools.utils.three_way_merge import has_conflict_markers, merge3
+from magicapi_tools.utils.tree_cache import ResourceTreeCache
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.02)
+
+
+def _edit(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        handle.write(text)
+
+
+def _read(path):
+    with open(path, encoding="utf-8", newline="") as handle:
+        return handle.read()
+
+
+def test_merge3():
+    """测试互不重叠的修改自动合并，重叠的修改输出冲突标记。"""
+    base = "a\nb\nc\nd\ne\n"
+    assert merge3(base, "a\nB\nc\nd\ne\n", "a\nb\nc\nD\ne\n").text == "a\nB\nc\nD\ne\n"
+    assert merge3(base, "z\na\nb\nc\nd\ne\n", "a\nb\nc\nd\ne\nf\n").text == "z\na\nb\nc\nd\ne\nf\n"
+    assert merge3(base, "a\nX\nc\nd\ne\n", "a\nX\nc\nd\ne\n").clean
+
+    result = merge3(base, "a\nL\nc\nd\ne\n", "a\nR\nc\nd\ne\n")
+    assert result.conflicts == 1 and has_conflict_markers(result.text)
+    assert result.text == "a\n<<<<<<< local\nL\n=======\nR\n>>>>>>> remote\nc\nd\ne\n"
+
+
+def test_pull_push_and_conflicts():
+    """测试首次拉取、只推送修改过的文件、远端修改的增量拉取与合并。"""
+    print("🧪 测试脚本双向同步...")
+    with FakeMagicAPIServer(build_dataset(60), script_latency=0) as server, tempfile.TemporaryDirectory() as root:
+        client = MagicAPIHTTPClient(MagicAPISettings(base_url=server.base_url, ws_auto_start=False))
+        cache = ResourceTreeCache(client)
+        engine = ScriptSyncEngine(client, root, tree_cache=cache)
+        try:
+            first = engine.pull()
+            assert len(first["pulled"]) == 60
+            script = os.path.join(root, "api", "order0", "v0", "list0.ms")
+            assert _read(script) == server.dataset.files["a0000000"]["script"]
+            assert os.path.exists(os.path.join(root, "api", "order0", "v0", "list0.meta.json"))
+
+            # 远端未变化时不再请求详情
+            before = server.request_counts()["/magic/web/resource/file/{id}"]
+            assert engine.pull()["unchanged"] == 60
+            assert server.request_counts()["/magic/web/resource/file/{id}"] == before
+
+            # 只推送修改过的文件，保存时不再请求详情
+            _edit(script, _read(script) + "\n// local")
+            pushed = engine.push()
+            assert pushed["pushed"] == ["api/order0/v0/list0.ms"]
+            assert server.dataset.files["a0000000"]["script"].endswith("// local")
+            assert server.request_counts()["/magic/web/resource/file/api/save"] == 1
+            assert server.request_counts()["/magic/web/resource/file/{id}"] == before
+            assert engine.push()["pushed"] == []
+
+            # 远端修改首行、本地修改末行：自动合并后推送
+            remote = server.dataset.files["a0000000"]["script"]
+            server.edit_script("a0000000", "// remote\n" + remote)
+            _edit(script, remote + "\n// more")
+            merged = engine.push()
+            assert merged["merged"] == ["api/order0/v0/list0.ms"] and merged["pushed"] == merged["merged"]
+            assert server.dataset.files["a0000000"]["script"] == "// remote\n" + remote + "\n// more"
+
+            # 双方修改同一行：写入冲突标记，解决前拒绝推送
+            server.edit_script("a0000001", "return 'remote'")
+            conflict_path = os.path.join(root, "api", "order0", "v0", "detail1.ms")
+            _edit(conflict_path, "return 'local'")
+            pulled = engine.pull()
+            assert pulled["conflicts"] == ["api/order0/v0/detail1.ms"]
+            assert has_conflict_markers(_read(conflict_path))
+            assert engine.push()["conflicts"] == ["api/order0/v0/detail1.ms"]
+            assert engine.status()["conflicts"] == ["api/order0/v0/detail1.ms"]
+            _edit(conflict_path, "return 'resolved'")
+            assert engine.push()["pushed"] == ["api/order0/v0/detail1.ms"]
+            assert server.dataset.files["a0000001"]["script"] == "return 'resolved'"
+        finally:
+            engine.stop()
+    print("✅ 增量拉取、合并与冲突处理正常")
+
+
+def test_watch_debounces_edits_into_one_batch():
+    """测试监听模式：连续编辑多个文件合并为一批推送，远端修改经资源树缓存自动拉取。"""
+    with FakeMagicAPIServer(build_dataset(20), script_latency=0) as server, tempfile.TemporaryDirectory() as root:
+        client = MagicAPIHTTPClient(MagicAPISettings(base_url=server.base_url, ws_auto_start=False))
+        cache = ResourceTreeCache(client)
+        engine = ScriptSyncEngine(client, root, tree_cache=cache, debounce=0.3)
+        try:
+            engine.start(watch=True)
+            tree_requests = server.request_counts()["/magic/web/resource"]
+            directory = os.path.join(root, "api", "order0", "v0")
+            names = sorted(name for name in os.listdir(directory) if name.endswith(".ms"))[:5]
+            for name in names:
+                path = os.path.join(directory, name)
+                _edit(path, _read(path) + "\n// batch")
+            _wait_for(lambda: server.request_counts().get("/magic/web/resource/file/api/save", 0) == 5)
+            _wait_for(lambda: engine.last_push is not None and engine.last_push["pushed"] == 5)
+            # 一批推送只在保存前后各刷新一次资源树
+            assert server.request_counts()["/magic/web/resource"] - tree_requests == 2
+
+            server.edit_script("a0000010", "return 'from editor'")
+            cache.refresh()
+            target = next(os.path.join(directory, name) for name in os.listdir(directory)
+                          if name.endswith(".meta.json") and '"a0000010"' in _read(os.path.join(directory, name)))
+            target = target[: -len(".meta.json")] + ".ms"
+            _wait_for(lambda: _read(target) == "return 'from editor'")
+            assert engine.status()["modified"] == []
+        finally:
+            engine.stop()
+    print(f"✅ 5 个文件的编辑合并为一批推送（监听方式: {engine.watcher or 'stopped'}）")
+
+
+def test_sync_tools():
+    """测试 start_script_sync / get_sync_status / stop_script_sync 工具。"""
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    with FakeMagicAPIServer(build_dataset(10), script_latency=0) as server, tempfile.TemporaryDirectory() as root:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+
+        async def run():
+            async with Client(app) as client:
+                started = (await client.call_tool("start_script_sync", {"directory": root})).structured_content
+                again = (await client.call_tool("start_script_sync", {"directory": root})).structured_content
+                status = (await client.call_tool("get_sync_status", {})).structured_content
+                synced = (await client.call_tool("sync_scripts", {"direction": "pull"})).structured_content
+                stopped = (await client.call_tool("stop_script_sync", {})).structured_content
+                return started, again, status, synced, stopped
+
+        try:
+            started, again, status, synced, stopped = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    assert started["success"] and len(started["initial"]["pulled"]) == 10
+    assert again["error"]["code"] == "sync_exists"
+    assert status["syncs"][0]["tracked"] == 10 and status["syncs"][0]["watching"]
+    assert synced["pull"]["unchanged"] == 10
+    assert stopped["success"] and not tool_registry.context.script_syncs
+
+
+if __name__ == "__main__":
+    test_merge3()
+    test_pull_push_and_conflicts()
+    test_watch_debounces_edits_into_one_batch()
+    test_sync_tools()
+    print("🎉 所有测试通过")
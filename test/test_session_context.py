@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""测试按 MCP 会话隔离的工具上下文（离线）。"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magicapi_mcp.session_context import _current_session
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_mcp.tool_registry import ToolContext, ToolRegistry
+
+
+def _context(**overrides):
+    settings = MagicAPISettings(ws_auto_start=False, session_isolation=True, **overrides)
+    return ToolContext(settings)
+
+
+def _in_session(session):
+    """在指定会话中执行的辅助上下文。"""
+    class _Bind:
+        def __enter__(self):
+            self.token = _current_session.set(session)
+            return session
+
+        def __exit__(self, *exc):
+            _current_session.reset(self.token)
+
+    return _Bind()
+
+
+def test_session_isolation_defaults_by_transport():
+    """测试会话隔离默认按传输协议启用。"""
+    print("🧪 测试会话隔离开关...")
+    assert MagicAPISettings(transport="stdio").session_isolation_enabled is False
+    assert MagicAPISettings(transport="http").session_isolation_enabled is True
+    assert MagicAPISettings(transport="http", session_isolation=False).session_isolation_enabled is False
+    assert MagicAPISettings.from_env({"MAGIC_API_SESSION_ISOLATION": "1"}).session_isolation is True
+    assert MagicAPISettings.from_env({}).session_isolation is None
+    print("✅ 会话隔离开关正确")
+
+
+def test_sessions_have_independent_debug_state():
+    """测试不同会话的断点、客户端 ID 与调试会话表互相独立，共享后端一致。"""
+    print("🧪 测试会话级状态隔离...")
+    context = _context()
+    try:
+        alice = context.sessions.get("alice")
+        bob = context.sessions.get("bob")
+
+        with _in_session(alice):
+            context.ws_debug_service.set_breakpoint_tool(line_number=3)
+            context.debug_sessions["s1"] = {"status": "running"}
+            alice_client = context.ws_manager.client.client_id
+        with _in_session(bob):
+            context.ws_debug_service.set_breakpoint_tool(line_number=7)
+            bob_client = context.ws_manager.client.client_id
+            assert context.debug_sessions == {}
+            assert context.debug_tools is bob.ws_debug_service
+
+        assert alice.ws_debug_service.breakpoints == {3}
+        assert bob.ws_debug_service.breakpoints == {7}
+        assert alice_client != bob_client != context.ws_manager.client.client_id
+        # 会话外访问的是进程级实例
+        assert context.ws_debug_service.breakpoints == set()
+        assert alice.ws_debug_service.http_client is context.http_client
+        assert context.sessions.get("alice") is alice
+    finally:
+        context.close()
+    print("✅ 会话级状态隔离正确")
+
+
+def test_idle_and_capacity_eviction():
+    """测试空闲回收与容量上限回收。"""
+    print("🧪 测试会话回收...")
+    context = _context(session_idle_ttl_seconds=0.0, max_sessions=2)
+    try:
+        first = context.sessions.get("a")
+        first.ws_manager  # 建立会话级 WebSocket 管理器（事件循环线程）
+        thread = first._ws_manager._loop_thread
+        assert context.sessions.evict_idle() >= 1
+        assert not thread.is_alive()
+        assert context.sessions.peek("a") is None
+
+        context.sessions.idle_ttl = 3600.0
+        for key in ("x", "y", "z"):
+            context.sessions.get(key)
+        stats = context.sessions.stats()
+        assert stats["active"] == 2
+        assert [item["session_id"] for item in stats["sessions"]] == ["y", "z"]
+    finally:
+        context.close()
+    print("✅ 会话回收正确")
+
+
+def test_token_refresh_reaches_session_clients():
+    """测试令牌刷新同步到所有会话的 WebSocket 客户端。"""
+    context = _context()
+    try:
+        session = context.sessions.get("s")
+        manager = session.ws_manager
+        context.http_client.auth.handle_refresh_token({"token": "rotated"})
+        assert manager.client.token == "rotated"
+    finally:
+        context.close()
+
+
+def test_mcp_clients_get_separate_breakpoints():
+    """测试两个 MCP 客户端通过中间件获得独立的断点集合。"""
+    print("🧪 测试 MCP 会话隔离...")
+    from fastmcp import Client, FastMCP
+    from magicapi_tools.tools.debug_api import DebugAPITools
+
+    registry = ToolRegistry()
+    registry.context = _context()
+    registry.add_module(DebugAPITools())
+    app = FastMCP("session-test")
+    registry.register_all_tools(app)
+
+    async def scenario():
+        async with Client(app) as first, Client(app) as second:
+            await first.call_tool("set_breakpoint", {"line_number": 5})
+            await second.call_tool("set_breakpoint", {"line_number": 9})
+            first_result = (await first.call_tool("list_breakpoints", {})).data
+            second_result = (await second.call_tool("list_breakpoints", {})).data
+        return first_result, second_result
+
+    try:
+        first_result, second_result = asyncio.run(scenario())
+        assert first_result["breakpoints"] == [5], first_result
+        assert second_result["breakpoints"] == [9], second_result
+        assert registry.context.sessions.stats()["active"] == 2
+    finally:
+        registry.context.close()
+    print("✅ MCP 会话隔离正确")
+
+
+if __name__ == "__main__":
+    test_session_isolation_defaults_by_transport()
+    test_sessions_have_independent_debug_state()
+    test_idle_and_capacity_eviction()
+    test_token_refresh_reaches_session_clients()
+    test_mcp_clients_get_separate_breakpoints()
+    print("🎉 所有测试通过")
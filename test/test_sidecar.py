@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""测试 sidecar 守护进程：Unix Socket 服务、前端代理与单实例锁（离线）。"""
+
+import asyncio
+import fcntl
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client, Context, FastMCP
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_mcp.sidecar import create_client, default_socket_path, is_daemon_alive, run_daemon, serve_app
+
+
+def _backend_app():
+    app = FastMCP("sidecar-backend")
+    calls = {"count": 0}
+
+    @app.tool(name="counter")
+    def counter(ctx: Context) -> dict:
+        calls["count"] += 1
+        return {"count": calls["count"], "session_id": ctx.session_id}
+
+    return app
+
+
+class _ServerThread:
+    """在独立线程的事件循环中运行守护进程服务。"""
+
+    def __init__(self, app, socket_path):
+        self.loop = asyncio.new_event_loop()
+        self.task = None
+        self.thread = threading.Thread(target=self._run, args=(app, socket_path), daemon=True)
+
+    def _run(self, app, socket_path):
+        asyncio.set_event_loop(self.loop)
+        self.task = self.loop.create_task(serve_app(app, socket_path))
+        try:
+            self.loop.run_until_complete(self.task)
+        except (asyncio.CancelledError, SystemExit):
+            pass
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(5)
+
+
+def test_default_socket_path_is_stable_and_private():
+    """测试 Socket 路径按后端与工具组合区分，且目录仅当前用户可访问。"""
+    print("🧪 测试 Socket 路径...")
+    settings = MagicAPISettings()
+    first = default_socket_path(settings, "full")
+    assert first == default_socket_path(settings, "full")
+    assert first != default_socket_path(settings, "minimal")
+    assert first != default_socket_path(MagicAPISettings(base_url="http://other:9999"), "full")
+    assert oct(first.parent.stat().st_mode & 0o777) == oct(0o700)
+    assert default_socket_path(MagicAPISettings(sidecar_socket="/tmp/x.sock")) == Path("/tmp/x.sock")
+    print("✅ Socket 路径正确")
+
+
+def test_frontend_proxies_to_daemon_with_one_session():
+    """测试前端代理经 Unix Socket 转发，且多次调用复用同一个守护进程会话。"""
+    print("🧪 测试前端代理...")
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = Path(tmp) / "sidecar.sock"
+        with _ServerThread(_backend_app(), socket_path):
+            deadline = time.monotonic() + 10
+            while not is_daemon_alive(socket_path) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert is_daemon_alive(socket_path)
+
+            async def scenario():
+                async with create_client(socket_path, timeout=10) as upstream:
+                    proxy = FastMCP.as_proxy(upstream, name="frontend")
+                    async with Client(proxy) as editor:
+                        first = (await editor.call_tool("counter", {})).structured_content
+                        second = (await editor.call_tool("counter", {})).structured_content
+                return first, second
+
+            first, second = asyncio.run(scenario())
+            assert (first["count"], second["count"]) == (1, 2)
+            assert first["session_id"] == second["session_id"]
+    print("✅ 前端代理正确")
+
+
+def test_second_daemon_exits_when_lock_held():
+    """测试已有守护进程持有锁时，新的守护进程直接退出且不删除 Socket。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = Path(tmp) / "sidecar.sock"
+        socket_path.write_text("placeholder")
+        with open(f"{socket_path}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            run_daemon("minimal", MagicAPISettings(ws_auto_start=False), socket_path)
+        assert socket_path.read_text() == "placeholder"
+
+
+if __name__ == "__main__":
+    test_default_socket_path_is_stable_and_private()
+    test_frontend_proxies_to_daemon_with_one_session()
+    test_second_daemon_exits_when_lock_held()
+    print("🎉 所有测试通过")
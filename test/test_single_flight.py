@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""测试 HTTP 请求合并（single-flight）。"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.single_flight import SingleFlight, request_key
+
+
+class _FakeResponse:
+    status_code = 200
+    text = ""
+    elapsed = type("elapsed", (), {"total_seconds": staticmethod(lambda: 0.05)})()
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        import copy
+        return copy.deepcopy(self._payload)
+
+
+class _SlowSession:
+    """模拟慢响应的 Session，统计真实发出的请求数。"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.headers = {}
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.calls.append((method, url))
+        time.sleep(0.1)
+        if url.endswith("/magic/web/resource"):
+            return _FakeResponse({"code": 1, "data": {"api": {"node": {}, "children": []}}})
+        if "/file/boom" in url:
+            raise requests.ConnectionError("boom")
+        return _FakeResponse({"code": 1, "data": {"id": url.rsplit("/", 1)[-1], "script": "return 1"}})
+
+
+def _client(single_flight=True):
+    # 关闭重试，确保统计的是真实发出的请求数
+    client = MagicAPIHTTPClient(MagicAPISettings(http_single_flight=single_flight, http_max_retries=0))
+    client.session = _SlowSession()
+    return client
+
+
+def test_request_key():
+    """测试合并键。"""
+    print("🧪 测试合并键...")
+    assert request_key("get", "http://x/a") == request_key("GET", "http://x/a")
+    assert request_key("POST", "http://x/a", body={"a": 1, "b": 2}) == request_key("POST", "http://x/a", body={"b": 2, "a": 1})
+    assert request_key("POST", "http://x/a", body={"a": 1}) != request_key("POST", "http://x/a", body={"a": 2})
+    assert request_key("GET", "http://x/a", params={"q": 1}) != request_key("GET", "http://x/a")
+    print("✅ 合并键正确")
+
+
+def test_concurrent_identical_reads_share_one_request():
+    """测试并发相同读请求只发出一次。"""
+    print("🧪 测试并发合并...")
+    client = _client()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        trees = list(pool.map(lambda _: client.resource_tree(), range(8)))
+        details = list(pool.map(lambda _: client.api_detail("abc"), range(8)))
+
+    assert all(ok for ok, _ in trees) and all(ok for ok, _ in details)
+    assert len(client.session.calls) == 2, client.session.calls
+    # 每个调用方拿到独立解析的数据，互不影响
+    details[0][1]["script"] = "changed"
+    assert details[1][1]["script"] == "return 1"
+
+    stats = client.diagnostics()["single_flight"]
+    assert stats["enabled"] is True
+    assert stats["misses"] == 2 and stats["hits"] == 14
+    print("✅ 并发请求已合并")
+
+
+def test_errors_are_shared_and_not_cached():
+    """测试异常会传递给所有等待者，且不会被缓存。"""
+    print("🧪 测试异常传播...")
+    client = _client()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: client.api_detail("boom"), range(4)))
+    assert all(not ok and payload["code"] == "network_error" for ok, payload in results)
+    assert len(client.session.calls) == 1
+
+    client.api_detail("boom")
+    assert len(client.session.calls) == 2
+    print("✅ 异常传播正确")
+
+
+def test_disabled_single_flight():
+    """测试关闭合并时每个请求都会发出。"""
+    client = _client(single_flight=False)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: client.api_detail("abc"), range(4)))
+    assert len(client.session.calls) == 4
+    assert client.diagnostics()["single_flight"] == {"enabled": False}
+
+
+def test_single_flight_sequential_calls_not_merged():
+    """测试顺序调用不会复用旧结果。"""
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do("k", lambda: next(counter)) == 0
+    assert flight.do("k", lambda: next(counter)) == 1
+    assert flight.stats()["misses"] == 2
+
+
+if __name__ == "__main__":
+    test_request_key()
+    test_concurrent_identical_reads_share_one_request()
+    test_errors_are_shared_and_not_cached()
+    test_disabled_single_flight()
+    test_single_flight_sequential_calls_not_merged()
+    print("🎉 所有测试通过")
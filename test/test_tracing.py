@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""测试调用链追踪：span 嵌套与阶段拆解、traceparent 传播、JSONL/OTLP 导出与 get_last_traces 工具。"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.tracing import Tracer, stage_breakdown, to_otlp, tracer
+
+
+class _Collector(BaseHTTPRequestHandler):
+    """记录请求头与请求体，充当上游服务与 OTLP 收集器。"""
+
+    received = []
+
+    def _record(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        _Collector.received.append({"path": self.path, "headers": dict(self.headers), "body": body})
+        payload = b'{"code": 1, "data": null}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _record
+    do_POST = _record
+
+    def log_message(self, *args):
+        pass
+
+
+def _collector():
+    _Collector.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_nested_spans_and_breakdown():
+    """测试 span 嵌套、自身耗时拆解与错误状态。"""
+    local = Tracer()
+    with local.span("child-outside-trace") as span:
+        assert span.traceparent is None
+    with local.span("tool demo", start_trace=True):
+        with local.span("service.load"):
+            time.sleep(0.02)
+            with local.span("http GET /x"):
+                time.sleep(0.03)
+        try:
+            with local.span("ws.wait"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+    trace = local.last_traces(1)[0]
+    assert [span["name"] for span in trace["spans"]] == ["tool demo", "service.load", "http GET /x", "ws.wait"]
+    assert trace["status"] == "error"
+    stages = {item["stage"]: item for item in stage_breakdown(trace)}
+    assert stages["http GET /x"]["self_ms"] >= 25
+    assert 15 <= stages["service.load"]["self_ms"] < stages["http GET /x"]["self_ms"] + 20
+    assert local.last_traces(5, min_duration_ms=10_000) == []
+
+
+def test_traceparent_continuation_and_propagation():
+    """测试延续外部 trace 并把 traceparent 传播到上游请求。"""
+    server = _collector()
+    try:
+        client = MagicAPIHTTPClient(MagicAPISettings(base_url=f"http://127.0.0.1:{server.server_port}"))
+        incoming = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+        with tracer.span("tool propagate", start_trace=True, traceparent=incoming) as root:
+            client.request("GET", "/magic/web/resource")
+    finally:
+        server.shutdown()
+
+    assert root.trace_id == "a" * 32 and root.parent_id == "b" * 16
+    header = _Collector.received[0]["headers"].get("traceparent")
+    assert header and header.startswith(f"00-{'a' * 32}-")
+    trace = tracer.last_traces(1, name="tool propagate")[0]
+    http_span = trace["spans"][1]
+    assert http_span["name"] == "http GET /magic/web/resource"
+    assert http_span["attributes"]["http.status_code"] == 200
+    assert header.split("-")[2] == http_span["span_id"]
+
+
+def test_jsonl_and_otlp_export():
+    """测试导出到 JSONL 文件与 OTLP/HTTP 收集器。"""
+    print("🧪 测试 trace 导出...")
+    server = _collector()
+    local = Tracer()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces", "out.jsonl")
+        local.configure(export_file=path, otlp_endpoint=f"http://127.0.0.1:{server.server_port}")
+        try:
+            for index in range(2):
+                with local.span("tool export", start_trace=True, index=index):
+                    with local.span("step"):
+                        pass
+        finally:
+            local.shutdown()
+            server.shutdown()
+        with open(path, encoding="utf-8") as handle:
+            lines = [json.loads(line) for line in handle]
+
+    assert len(lines) == 2 and lines[0]["spans"][0]["attributes"] == {"index": 0}
+    posted = [item for item in _Collector.received if item["path"] == "/v1/traces"]
+    assert len(posted) == 2
+    body = json.loads(posted[0]["body"])
+    spans = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert to_otlp(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "tool export"
+    print("✅ 导出正确")
+
+
+def test_get_last_traces_tool():
+    """测试工具调用被拆解为服务、脚本 ID 解析与 HTTP 阶段。"""
+    print("🧪 测试 get_last_traces...")
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    # trace 缓冲区是进程级的，清掉其他测试留下的 call_magic_api 调用
+    tracer.clear()
+    with FakeMagicAPIServer(build_dataset(100), script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+
+        async def run():
+            async with Client(app) as client:
+                await client.call_tool("call_magic_api", {
+                    "method": "GET", "path": "/order0/v0/list0", "include_ws_logs": {"pre": 0, "post": 0},
+                })
+                result = await client.call_tool("get_last_traces", {"tool": "call_magic_api", "include_spans": True})
+                return result.structured_content
+
+        try:
+            result = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    assert result["count"] == 1
+    trace = result["traces"][0]
+    names = [span["name"] for span in trace["spans"]]
+    assert names[0] == "tool call_magic_api"
+    assert "resolve_script_id_by_path" in names
+    assert "http POST /magic/web/resource" in names
+    assert "http GET business" in names
+    assert trace["tree"][0].startswith("tool call_magic_api")
+    assert {item["stage"] for item in trace["breakdown"]} == set(names)
+    print(f"✅ {len(names)} 个 span")
+
+
+if __name__ == "__main__":
+    test_nested_spans_and_breakdown()
+    test_traceparent_continuation_and_propagation()
+    test_jsonl_and_otlp_export()
+    test_get_last_traces_tool()
+    print("🎉 所有测试通过")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""测试资源树流式导出器（离线，使用伪造的 HTTP 客户端）。"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from magicapi_tools.utils.tree_exporter import ResourceTreeExporter, TreeExportError, iter_tree_records
+
+
+def _build_tree(group_count=3, api_per_group=5):
+    groups = []
+    for g in range(group_count):
+        children = []
+        for a in range(api_per_group):
+            children.append({
+                "node": {
+                    "id": f"api-{g}-{a}",
+                    "name": f"接口{g}-{a}",
+                    "method": "GET",
+                    "path": f"item{a}",
+                    "full_path": f"/group{g}/item{a}",
+                    "groupId": f"group-{g}",
+                },
+                "children": [],
+            })
+        groups.append({
+            "node": {"id": f"group-{g}", "name": f"分组{g}", "path": f"group{g}", "parentId": "0", "type": "api"},
+            "children": children,
+        })
+    return {"api": {"node": {"id": "0"}, "children": groups}}
+
+
+class FakeHTTPClient:
+    """伪造的 HTTP 客户端，记录并发拉取情况。"""
+
+    def __init__(self, tree, fail_ids=()):
+        self.tree = tree
+        self.fail_ids = set(fail_ids)
+        self.detail_calls = 0
+        self.lock = threading.Lock()
+
+    def resource_tree(self):
+        return True, self.tree
+
+    def api_detail(self, file_id):
+        with self.lock:
+            self.detail_calls += 1
+        if file_id in self.fail_ids:
+            return False, {"code": 500, "message": "boom"}
+        return True, {"id": file_id, "script": f"return '{file_id}'"}
+
+
+def test_iter_tree_records_order_and_types():
+    """测试节点遍历顺序与类型判断。"""
+    print("🧪 测试节点遍历...")
+    records = list(iter_tree_records(_build_tree(2, 2), "api"))
+    assert [r["id"] for r in records] == ["group-0", "api-0-0", "api-0-1", "group-1", "api-1-0", "api-1-1"]
+    assert records[0]["type"] == "api-group" and records[0]["_is_group"]
+    assert records[1]["type"] == "api" and records[1]["full_path"] == "/group0/item0"
+    assert records[1]["depth"] == 2
+    assert list(iter_tree_records(_build_tree(), "function")) == []
+    print("✅ 节点遍历正确")
+
+
+def test_export_ndjson_to_file_with_scripts():
+    """测试导出 NDJSON 到文件并并发拉取脚本。"""
+    print("🧪 测试 NDJSON 文件导出...")
+    client = FakeHTTPClient(_build_tree(), fail_ids={"api-1-1"})
+    exporter = ResourceTreeExporter(client)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out", "tree.ndjson")
+        result = exporter.export(format="ndjson", output_path=path, include_script=True, max_workers=3)
+
+        assert result["success"] is True
+        assert result["records"] == 18 and result["groups"] == 3 and result["files"] == 15
+        assert result["bytes_written"] == os.path.getsize(path)
+        assert result["scripts_fetched"] == 14 and result["script_error_count"] == 1
+        assert client.detail_calls == 15
+
+        with open(path, encoding="utf-8") as handle:
+            lines = [json.loads(line) for line in handle]
+        assert len(lines) == 18
+        assert lines[1]["script"] == "return 'api-0-0'"
+        assert "_is_group" not in lines[0]
+    print("✅ NDJSON 文件导出正确")
+
+
+def test_export_csv_chunks_readable():
+    """测试 CSV 分块导出与分块读取。"""
+    print("🧪 测试 CSV 分块导出...")
+    with tempfile.TemporaryDirectory() as tmp:
+        exporter = ResourceTreeExporter(FakeHTTPClient(_build_tree()), export_root=tmp)
+        result = exporter.export(format="csv", chunk_bytes=200)
+
+        chunks = result["chunks"]
+        assert len(chunks) > 1
+        assert chunks[0]["uri"] == f"magicapi://exports/{result['export_id']}/0"
+        assert sum(c["bytes"] for c in chunks) == result["bytes_written"]
+        assert sum(c["records"] for c in chunks) == result["records"] == 18
+
+        content = "".join(exporter.read_chunk(result["export_id"], c["index"]) for c in chunks)
+        rows = list(csv.reader(content.splitlines()))
+        assert rows[0][:3] == ["id", "name", "type"]
+        assert len(rows) == 19
+    print("✅ CSV 分块导出正确")
+
+
+def test_chunked_exports_are_pruned():
+    """测试新建分块导出时清理超出个数与过期的旧导出，不动其他文件。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        exporter = ResourceTreeExporter(FakeHTTPClient(_build_tree(1, 1)), export_root=tmp, max_exports=2)
+        ids = [exporter.export()["export_id"] for _ in range(3)]
+        os.makedirs(os.path.join(tmp, "keep-me"))
+        assert sorted(os.listdir(tmp)) == sorted(ids[1:] + ["keep-me"])
+
+        # 个数未超限时仍按保留时长清理
+        exporter.max_exports = 5
+        os.utime(os.path.join(tmp, ids[1]), (0, 0))
+        latest = exporter.export()["export_id"]
+        assert sorted(os.listdir(tmp)) == sorted([ids[2], latest, "keep-me"])
+        assert exporter.read_chunk(ids[2], 0)
+
+
+def test_export_rejects_invalid_input():
+    """测试非法参数。"""
+    print("🧪 测试非法参数...")
+    exporter = ResourceTreeExporter(FakeHTTPClient(_build_tree()))
+    for kwargs in ({"format": "xml"}, {"format": "parquet"}):
+        try:
+            exporter.export(**kwargs)
+        except TreeExportError:
+            pass
+        else:
+            raise AssertionError(f"应当拒绝: {kwargs}")
+    try:
+        exporter.read_chunk("../etc", 0)
+    except TreeExportError:
+        pass
+    else:
+        raise AssertionError("应当拒绝非法导出ID")
+    print("✅ 非法参数被拒绝")
+
+
+if __name__ == "__main__":
+    test_iter_tree_records_order_and_types()
+    test_export_ndjson_to_file_with_scripts()
+    test_export_csv_chunks_readable()
+    test_chunked_exports_are_pruned()
+    test_export_rejects_invalid_input()
+    print("🎉 所有测试通过")
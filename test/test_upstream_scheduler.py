@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""测试上游调度：优先级放行顺序、令牌桶限速、诊断中的排队深度，以及批量任务下交互请求的延迟。"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.upstream_scheduler import (
+    ClassLimit,
+    UpstreamScheduler,
+    current_priority,
+    upstream_priority,
+    with_priority,
+)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.005)
+
+
+def test_priority_order_and_snapshot():
+    """测试槽位释放时先放行高优先级等待者，并在快照中报告排队深度。"""
+    scheduler = UpstreamScheduler(max_concurrency=1)
+    order = []
+    release = threading.Event()
+
+    def hold():
+        with scheduler.slot("read"):
+            release.wait(5)
+
+    def request(priority):
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    _wait_for(lambda: scheduler.snapshot()["active"] == 1)
+    threads = []
+    for priority in ("bulk", "read", "interactive"):
+        thread = threading.Thread(target=request, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        _wait_for(lambda: scheduler.snapshot()["classes"][priority]["waiting"] == 1)
+
+    snapshot = scheduler.snapshot()
+    assert snapshot["queue_depth"] == 3 and snapshot["classes"]["read"]["active"] == 1
+    release.set()
+    for thread in [holder, *threads]:
+        thread.join(5)
+
+    assert order == ["interactive", "read", "bulk"]
+    final = scheduler.snapshot()
+    assert final["queue_depth"] == 0 and final["classes"]["bulk"]["admitted"] == 1
+    assert final["classes"]["bulk"]["wait_max_ms"] > 0
+
+
+def test_token_bucket_and_context():
+    """测试限速类别按令牌间隔放行，且优先级上下文可传递到线程池任务。"""
+    scheduler = UpstreamScheduler({"bulk": ClassLimit(concurrency=4, rate=20, burst=1)})
+    started = time.monotonic()
+    for _ in range(4):
+        with scheduler.slot("bulk"):
+            pass
+    assert time.monotonic() - started >= 0.14
+
+    assert current_priority() is None
+    with upstream_priority("read"):
+        assert current_priority() == "read"
+    assert with_priority("bulk", current_priority)() == "bulk"
+    try:
+        upstream_priority("urgent").__enter__()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未知优先级应抛出 ValueError")
+
+    settings = MagicAPISettings(upstream_limits={"bulk": {"concurrency": 2}, "unknown": {"rate": 1}})
+    configured = UpstreamScheduler.from_settings(settings).snapshot()["classes"]
+    assert configured["bulk"]["concurrency"] == 2 and configured["read"]["concurrency"] == 8
+    assert UpstreamScheduler.from_settings(MagicAPISettings(upstream_scheduler=False)) is None
+
+
+def _interactive_latency(server, settings, path):
+    """8 个线程持续发起批量调用时，测量交互式调用的中位延迟。"""
+    client = MagicAPIHTTPClient(settings)
+    stop = threading.Event()
+
+    def flood():
+        with upstream_priority("bulk"):
+            while not stop.is_set():
+                client.call_api("GET", path)
+
+    workers = [threading.Thread(target=flood) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    try:
+        time.sleep(0.3)
+        samples = []
+        for _ in range(3):
+            started = time.perf_counter()
+            with upstream_priority("interactive"):
+                ok, _ = client.call_api("GET", path)
+            samples.append(time.perf_counter() - started)
+            assert ok
+        diagnostics = client.diagnostics()["scheduler"]
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(10)
+    return statistics.median(samples), diagnostics
+
+
+def test_interactive_latency_under_bulk_load():
+    """测试批量任务占满上游时，启用调度后交互请求不再排在批量请求之后。"""
+    print("🧪 测试批量负载下的交互延迟...")
+    dataset = build_dataset(10)
+    path = next(path for (method, path), file_id in dataset.paths.items() if file_id == "a0000000")
+    with FakeMagicAPIServer(dataset, script_latency=0.1) as server:
+        server.business_concurrency = 2
+        base = dict(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        scheduled, diagnostics = _interactive_latency(
+            server, MagicAPISettings(upstream_limits={"bulk": {"concurrency": 1}}, **base), path
+        )
+        unscheduled, disabled = _interactive_latency(
+            server, MagicAPISettings(upstream_scheduler=False, **base), path
+        )
+
+    assert diagnostics["classes"]["bulk"]["waiting"] > 0 and diagnostics["classes"]["interactive"]["admitted"] == 3
+    assert disabled == {"enabled": False}
+    assert scheduled < 0.2, f"启用调度后交互延迟过高: {scheduled * 1000:.1f}ms"
+    assert unscheduled > 0.25, f"未启用调度时交互延迟异常偏低: {unscheduled * 1000:.1f}ms"
+    print(f"✅ 交互延迟 {scheduled * 1000:.1f}ms（未调度 {unscheduled * 1000:.1f}ms）")
+
+
+def test_load_test_and_latency_respect_scheduler():
+    """测试压测请求按 bulk 排队，且自适应超时的延迟样本不含排队时间。"""
+    from datetime import timedelta
+
+    from magicapi_tools.utils.load_test import LoadTestConfig, run_load_test
+    from magicapi_tools.utils.resilience import ResiliencePolicy, RetryPolicy
+
+    class _Response:
+        status_code = 200
+        elapsed = timedelta(milliseconds=10)
+
+    def queued_send(timeout):
+        time.sleep(0.1)  # 模拟在调度槽位前排队
+        return _Response()
+
+    policy = ResiliencePolicy(default_timeout=5.0, retry=RetryPolicy(max_retries=0))
+    policy.execute("GET", "http://h/magic/web/resource", queued_send)
+    assert policy.family("resource").latency.percentile(99) == 0.01
+
+    dataset = build_dataset(10)
+    path = next(path for (method, path), file_id in dataset.paths.items() if file_id == "a0000000")
+    with FakeMagicAPIServer(dataset, script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False,
+                                    upstream_limits={"bulk": {"concurrency": 2}})
+        client = MagicAPIHTTPClient(settings)
+        report = run_load_test(client, LoadTestConfig(method="GET", path=path, concurrency=6, total_requests=12))
+    assert report["requests"] == 12 and report["errors"] == 0
+    assert report["scheduler"]["priority"] == "bulk" and report["scheduler"]["effective_concurrency"] == 2
+    assert client.diagnostics()["scheduler"]["classes"]["bulk"]["admitted"] == 12
+
+
+if __name__ == "__main__":
+    test_priority_order_and_snapshot()
+    test_token_bucket_and_context()
+    test_interactive_latency_under_bulk_load()
+    test_load_test_and_latency_respect_scheduler()
+    print("🎉 所有测试通过")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""测试工作区批量导出/导入：脚本文件格式、按分组/路径筛选、流式解包，以及单次请求完成迁移。"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.resource_manager import MagicAPIResourceManager
+from magicapi_tools.utils.workspace_archive import (
+    ArchiveSelection,
+    WorkspaceArchiveError,
+    WorkspaceTransfer,
+    format_script_file,
+    parse_script_file,
+    unpack_archive,
+)
+
+
+def _archive():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("api/订单/group.json", '{"id": "g1", "name": "订单", "path": "/order"}')
+        archive.writestr("api/订单/v1/group.json", '{"id": "g2", "name": "v1", "path": "v1"}')
+        archive.writestr("api/订单/v1/列表.ms", format_script_file({"path": "list"}, "return 1"))
+        archive.writestr("api/用户/group.json", '{"id": "g3", "name": "用户", "path": "/user"}')
+        archive.writestr("api/用户/详情.ms", format_script_file({"path": "/detail"}, "return 2"))
+    buffer.seek(0)
+    return buffer
+
+
+def test_script_format_and_selection():
+    """测试 .ms 文件往返、按分组与路径前缀筛选时带上祖先分组。"""
+    text = format_script_file({"id": "a1", "path": "/x", "script": "ignored"}, "var a = 1\nreturn a")
+    meta, script = parse_script_file(text)
+    assert meta == {"id": "a1", "path": "/x"} and script == "var a = 1\nreturn a"
+
+    with zipfile.ZipFile(_archive()) as archive:
+        by_group = [info.filename for info in ArchiveSelection.from_params(groups=["g2"]).select(archive)]
+        by_path = [info.filename for info in ArchiveSelection.from_params(path_prefixes=["/user"]).select(archive)]
+        both = ArchiveSelection.from_params(groups=["订单"], path_prefixes=["user"]).select(archive)
+    assert by_group == ["api/订单/group.json", "api/订单/v1/group.json", "api/订单/v1/列表.ms"]
+    assert by_path == ["api/用户/group.json", "api/用户/详情.ms"]
+    assert both == []
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = unpack_archive(_archive(), directory, ArchiveSelection.from_params(path_prefixes=["/order/v1/list"]))
+        assert result["scripts"] == 1 and result["groups"] == 2
+        with open(os.path.join(directory, "api", "订单", "v1", "列表.ms"), encoding="utf-8") as handle:
+            assert parse_script_file(handle.read())[1] == "return 1"
+
+        evil = io.BytesIO()
+        with zipfile.ZipFile(evil, "w") as archive:
+            archive.writestr("../escape.ms", "{}")
+        evil.seek(0)
+        try:
+            unpack_archive(evil, directory)
+        except WorkspaceArchiveError:
+            pass
+        else:
+            raise AssertionError("应拒绝路径穿越条目")
+
+
+def test_copy_file_uses_keyword_arguments():
+    """测试 copy_file 按 save_api_file 的关键字参数保存并返回新文件 ID。"""
+
+    class Recorder(MagicAPIResourceManager):
+        def get_file_detail(self, file_id):
+            return {"name": "查询", "method": "POST", "path": "/q", "script": "return 1",
+                    "requestBodyDefinition": {"name": "body"}}
+
+        def save_api_file(self, **kwargs):
+            self.saved = kwargs
+            return {"id": "new-id", "full_path": "/g/q"}
+
+    manager = Recorder("http://127.0.0.1:1")
+    assert manager.copy_file("src", "target-group") == "new-id"
+    assert manager.saved["group_id"] == "target-group"
+    assert manager.saved["name"] == "查询_副本" and manager.saved["method"] == "POST"
+    assert manager.saved["request_body_definition"] == {"name": "body"}
+
+
+def test_export_and_import_in_single_requests():
+    """测试导出与导入各只发一次请求，按路径前缀解包、按分组导入。"""
+    print("🧪 测试工作区导出/导入...")
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    with FakeMagicAPIServer(build_dataset(120), script_latency=0) as server, \
+            tempfile.TemporaryDirectory() as workdir:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url, ws_auto_start=False)
+        app = create_app("full", settings)
+        archive_path = os.path.join(workdir, "ws.zip")
+        unpack_dir = os.path.join(workdir, "tree")
+
+        async def run():
+            async with Client(app) as client:
+                exported = (await client.call_tool("export_workspace", {
+                    "output_path": archive_path,
+                    "unpack_dir": unpack_dir,
+                    "path_prefixes": ["/order0/v1"],
+                })).structured_content
+                dry = (await client.call_tool("import_workspace", {
+                    "source": archive_path, "groups": ["m00000g02"], "dry_run": True,
+                })).structured_content
+                imported = (await client.call_tool("import_workspace", {"source": unpack_dir})).structured_content
+                missing = (await client.call_tool("import_workspace", {
+                    "source": os.path.join(workdir, "nope.zip"),
+                })).structured_content
+                return exported, dry, imported, missing
+
+        try:
+            exported, dry, imported, missing = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+        counts = server.request_counts()
+
+    assert exported["summary"]["scripts"] == 120
+    assert exported["unpacked"]["scripts"] == 50 and exported["unpacked"]["groups"] == 2
+    assert dry["dry_run"] and dry["summary"]["scripts"] == 20 and "response" not in dry
+    assert imported["summary"]["scripts"] == 50 and imported["response"] is True
+    assert missing["error"]["code"] == "import_failed"
+
+    assert len(server.uploads) == 1 and server.uploads[0]["mode"] == "increment"
+    assert sum(name.endswith(".ms") for name in server.uploads[0]["names"]) == 50
+    assert not any(key.startswith("/magic/web/resource/file") for key in counts)
+    print(f"✅ 导出 {exported['summary']['scripts']} 个脚本、导入 50 个脚本，请求: {counts}")
+
+
+def test_transfer_uses_workspace_timeout():
+    """测试批量下载/上传使用工作区超时，而不是端点族的自适应超时。"""
+
+    class _Response:
+        status_code = 200
+        headers = {"Content-Type": "application/json"}
+
+        def json(self):
+            return {"code": 1, "data": True}
+
+    class _Client:
+        settings = MagicAPISettings(workspace_timeout_seconds=120.0)
+        timeouts = []
+
+        def request(self, method, path, **kwargs):
+            self.timeouts.append(kwargs.get("timeout"))
+            return _Response()
+
+    client = _Client()
+    with tempfile.TemporaryDirectory() as workdir:
+        archive_path = os.path.join(workdir, "ws.zip")
+        with open(archive_path, "wb") as handle:
+            handle.write(_archive().getvalue())
+        assert WorkspaceTransfer(client).upload(archive_path) is True
+    assert client.timeouts == [120.0]
+
+
+if __name__ == "__main__":
+    test_script_format_and_selection()
+    test_copy_file_uses_keyword_arguments()
+    test_export_and_import_in_single_requests()
+    test_transfer_uses_workspace_timeout()
+    print("🎉 所有测试通过")
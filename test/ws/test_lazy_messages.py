@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""测试 WebSocket 帧快速识别与延迟解码。"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from magicapi_tools.ws.messages import MessageType, WSMessage, classify_ws_frame, is_heartbeat, parse_ws_message
+from magicapi_tools.ws.state import EnvironmentState, LogBuffer
+
+
+def test_classify_without_decoding():
+    """测试按前缀识别类型与内容位置。"""
+    raw = 'logs,["a","b"]'
+    message_type, offset = classify_ws_frame(raw)
+    assert message_type == MessageType.LOGS and raw[offset:] == '["a","b"]'
+    assert classify_ws_frame("ping") == (MessageType.PING, 4)
+    assert is_heartbeat(classify_ws_frame(" PONG \n")[0])
+    assert classify_ws_frame("x" * 40 + ",tail")[0] == MessageType.UNKNOWN
+
+    message = parse_ws_message('  logs,["a","b"]  ')
+    assert not message.decoded
+    assert message.data["logs"] == ["a", "b"] and message.text == "a\nb"
+    assert message.decoded
+
+
+def test_log_frames_stay_undecoded():
+    """测试日志帧经过缓冲区与状态处理后仍未解码，其它帧按需解码。"""
+    state = EnvironmentState()
+    buffer = LogBuffer(maxlen=10)
+    log = parse_ws_message('logs,["x"]')
+    buffer.append(log)
+    state.handle_message(log, default_client_id="c1")
+    assert not log.decoded
+
+    login = parse_ws_message('login_response,1,{"clientId":"c1"}')
+    state.handle_message(login, default_client_id="c1")
+    assert login.decoded and login.data["client_id"] == "c1"
+
+    built = WSMessage(type=MessageType.LOG, raw="log,hi", payload="hi")
+    assert built.decoded and built.text == "hi" and built.data == {}
+    lazy = parse_ws_message("log,hi")
+    assert lazy == WSMessage(type=MessageType.LOG, raw="log,hi", payload="hi", text="hi",
+                             timestamp=lazy.timestamp, data={"logs": ["hi"]})
+
+
+def test_parse_benchmark_runs():
+    """测试解析基准在小样本上可运行，快速路径丢弃心跳帧。"""
+    print("🧪 测试帧解析基准...")
+    from benchmarks.ws_parse import recorded_frames, run_benchmark
+
+    frames = recorded_frames(2000)
+    report = run_benchmark(frames, rounds=1)
+    heartbeats = sum(1 for raw in frames if raw in ("ping", "pong"))
+    assert report["modes"]["eager"]["messages"] == 2000
+    assert report["modes"]["fast"]["messages"] == 2000 - heartbeats
+    print(f"✅ 加速比 {report['speedup']}x")
+
+
+if __name__ == "__main__":
+    test_classify_without_decoding()
+    test_log_frames_stay_undecoded()
+    test_parse_benchmark_runs()
+    print("🎉 所有测试通过")
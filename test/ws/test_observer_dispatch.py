@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""测试观察者分发：每个观察者独立的有界队列、溢出策略与投递指标。"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.metrics import metrics
+from magicapi_tools.utils.resource_manager import MagicAPIResourceManager
+from magicapi_tools.ws.dispatch import ObserverChannel, OverflowPolicy
+from magicapi_tools.ws.manager import WSManager
+from magicapi_tools.ws.messages import MessageType, parse_ws_message
+from magicapi_tools.ws.observers import BaseObserver
+
+
+class _Recorder(BaseObserver):
+    def __init__(self, delay: float = 0.0, gate: asyncio.Event = None):
+        self.delay = delay
+        self.gate = gate
+        self.messages = []
+        self.disconnected = False
+
+    async def on_message(self, message, environment):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.messages.append(message)
+
+    async def on_disconnect(self):
+        self.disconnected = True
+
+
+def test_overflow_policies():
+    """测试 drop_oldest / coalesce_logs / block 三种溢出策略。"""
+
+    async def run():
+        gate = asyncio.Event()
+        results = {}
+        for policy in OverflowPolicy:
+            observer = _Recorder(gate=gate)
+            channel = ObserverChannel(observer, maxsize=2, policy=policy)
+            channel.start()
+            frames = ["log,a", "log,b", "log,c", "log,d"]
+            accepted = [channel.offer(parse_ws_message(raw), None) for raw in frames]
+            results[policy] = (channel, observer, accepted)
+        gate.set()
+
+        channel, observer, accepted = results[OverflowPolicy.BLOCK]
+        # 队列满时 offer 返回 False，put 等到消费者腾出空间
+        assert accepted == [True, True, False, False]
+        await asyncio.wait_for(channel.put(parse_ws_message("log,c"), None), 1)
+        for channel, _, _ in results.values():
+            channel.notify("disconnect")
+            await asyncio.wait_for(channel.aclose(), 1)
+        return results
+
+    results = asyncio.run(run())
+
+    channel, observer, _ = results[OverflowPolicy.DROP_OLDEST]
+    assert [m.text for m in observer.messages] == ["c", "d"]
+    assert channel.stats()["dropped"] == 2 and observer.disconnected
+
+    channel, observer, _ = results[OverflowPolicy.COALESCE_LOGS]
+    assert [m.text for m in observer.messages] == ["a", "b\nc\nd"]
+    assert observer.messages[-1].data["coalesced"] == 3
+    assert channel.stats()["coalesced"] == 2 and channel.stats()["dropped"] == 0
+
+    channel, observer, _ = results[OverflowPolicy.BLOCK]
+    assert [m.text for m in observer.messages] == ["a", "b", "c"]
+    assert channel.stats()["dropped"] == 0
+
+
+def test_slow_observer_does_not_block_reader():
+    """测试慢观察者不阻塞监听循环，快观察者按类型过滤且及时收到消息。"""
+    settings = MagicAPISettings(ws_auto_start=False, ws_observer_queue_size=5)
+    manager = WSManager(settings, MagicAPIResourceManager(settings.base_url))
+    slow = _Recorder(delay=0.05)
+    fast = _Recorder()
+    fast.message_types = frozenset({MessageType.EXCEPTION})
+    manager.add_observer(slow)
+    manager.add_observer(fast)
+    manager.add_observer(fast)
+
+    async def feed():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for index in range(50):
+            await manager._notify_observers(parse_ws_message(f"log,line {index}"), None)
+        await manager._notify_observers(parse_ws_message('exception,{"message":"boom"}'), None)
+        elapsed = loop.time() - started
+        await asyncio.sleep(0.01)
+        return elapsed
+
+    try:
+        elapsed = manager._submit(feed()).result(5)
+        assert elapsed < 0.05, f"监听循环被慢观察者阻塞: {elapsed:.3f}s"
+        assert [m.type for m in fast.messages] == [MessageType.EXCEPTION]
+
+        stats = {item["observer"]: item for item in manager.observer_stats()}
+        assert len(manager.observer_stats()) == 2
+        assert stats["_Recorder"]["capacity"] == 5
+        assert sum(item["dropped"] for item in manager.observer_stats()) >= 40
+
+        snapshot = metrics.snapshot()["ws_observers"]
+        assert snapshot["_Recorder"]["dropped"] >= 40 and snapshot["_Recorder"]["delivered"] >= 1
+        print(f"✅ 投递 51 条消息耗时 {elapsed * 1000:.1f}ms，慢观察者丢弃最旧消息")
+    finally:
+        manager.remove_observer(slow)
+        manager.remove_observer(fast)
+        assert manager.observer_stats() == []
+        manager.shutdown_sync()
+
+
+if __name__ == "__main__":
+    test_overflow_policies()
+    test_slow_observer_does_not_block_reader()
+    print("🎉 所有测试通过")
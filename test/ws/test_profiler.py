@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""测试逐行耗时分析：可执行行识别、自动单步驱动、热点行排名与 IO/抽样模式。"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.http_client import MagicAPIHTTPClient
+from magicapi_tools.utils.resource_manager import MagicAPIResourceManager
+from magicapi_tools.utils.script_linter import executable_lines
+from magicapi_tools.ws.manager import WSManager
+from magicapi_tools.ws.profiler import ScriptProfiler
+
+SCRIPT = '''import log
+var page = 1
+var orders = db.select("""
+    select * from t_order limit 10
+""")
+// 注释行
+if (orders) {
+    var total = orders.size()
+} else {
+    total = 0
+}
+var remote = http.connect('http://example.com').get()
+return total
+'''
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.01)
+
+
+def _server():
+    dataset = build_dataset(10)
+    dataset.files["a0000000"]["script"] = SCRIPT
+    path = next(path for (method, path), file_id in dataset.paths.items() if file_id == "a0000000")
+    server = FakeMagicAPIServer(dataset, script_latency=0)
+    server.step_timeout = 5.0
+    server.line_latency = {3: 0.2, 12: 0.1}
+    return server, path
+
+
+def test_executable_lines():
+    """测试跳过注释、多行字符串续行、括号行与 import，IO 模式只保留 db./http. 行。"""
+    assert executable_lines(SCRIPT) == [2, 3, 7, 8, 10, 12, 13]
+    assert executable_lines(SCRIPT, io_only=True) == [3, 12]
+
+
+def test_profile_steps_every_line():
+    """测试逐句单步时每个可执行行各停一次，热点行按耗时排名。"""
+    print("🧪 测试逐行耗时分析...")
+    server, path = _server()
+    with server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url)
+        manager = WSManager(settings, MagicAPIResourceManager(server.base_url))
+        profiler = ScriptProfiler(manager, MagicAPIHTTPClient(settings))
+        try:
+            manager.start_sync()
+            _wait_for(lambda: manager.client.connected)
+            full = asyncio.run(profiler.profile("GET", path, top=3))
+            io = asyncio.run(profiler.profile("GET", path, mode="io"))
+            capped = asyncio.run(profiler.profile("GET", path, max_steps=2))
+        finally:
+            manager.shutdown_sync()
+
+    assert full["success"] and full["response_ok"] and not full["truncated"]
+    assert full["steps"] == 7 and [item["line"] for item in full["lines"]] == [2, 3, 7, 8, 10, 12, 13]
+    assert len(full["hot_lines"]) == 3 and [item["line"] for item in full["hot_lines"][:2]] == [3, 12]
+    hot = full["hot_lines"][0]
+    assert hot["total_ms"] >= 200 and hot["hits"] == 1 and hot["snippet"].startswith("var orders")
+    assert hot["self_ms"] <= hot["total_ms"] and hot["percent"] > 50
+
+    assert io["steps"] == 2 and [item["line"] for item in io["lines"]] == [3, 12]
+    assert io["lines"][0]["total_ms"] >= 200
+    assert capped["truncated"] and capped["steps"] == 2
+    resumes = [message for message in server.console_messages if message.startswith("resume_breakpoint,")]
+    assert resumes[0] == "resume_breakpoint,a0000000,1,2|3|7|8|10|12|13"
+    print(f"✅ 热点行第 {hot['line']} 行 {hot['total_ms']:.1f}ms，单步开销约 {full['step_overhead_ms']:.2f}ms")
+
+
+def test_profile_tool():
+    """测试 profile_api_script 工具的抽样模式与参数校验。"""
+    from fastmcp import Client
+
+    from magicapi_mcp.tool_composer import create_app
+    from magicapi_mcp.tool_registry import tool_registry
+
+    server, path = _server()
+    with server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url)
+        app = create_app("full", settings)
+
+        async def run():
+            async with Client(app) as client:
+                sampled = (await client.call_tool("profile_api_script", {
+                    "path": f"GET {path}", "sample_every": 3,
+                })).structured_content
+                invalid = (await client.call_tool("profile_api_script", {
+                    "path": path, "mode": "fast",
+                })).structured_content
+                return sampled, invalid
+
+        try:
+            sampled, invalid = asyncio.run(run())
+        finally:
+            tool_registry.context.close()
+
+    assert sampled["breakpoints"] == 3 and [item["line"] for item in sampled["lines"]] == [2, 8, 13]
+    assert sampled["lines"][0]["total_ms"] >= 200
+    assert invalid["error"]["code"] == "invalid_mode"
+
+
+if __name__ == "__main__":
+    test_executable_lines()
+    test_profile_steps_every_line()
+    test_profile_tool()
+    print("🎉 所有测试通过")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""测试 WebSocket 断线重连：指数退避、会话指令重放与日志缺口标记。"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from benchmarks.fake_server import FakeMagicAPIServer
+from benchmarks.synthetic import build_dataset
+from magicapi_mcp.settings import MagicAPISettings
+from magicapi_tools.utils.resource_manager import MagicAPIResourceManager
+from magicapi_tools.ws.client import WSClient
+from magicapi_tools.ws.manager import WSManager
+from magicapi_tools.ws.messages import parse_ws_message
+from magicapi_tools.ws.state import LogBuffer
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.01)
+
+
+def test_backoff_and_log_gaps():
+    """测试退避时间从毫秒级增长并封顶，缺口与缓冲区溢出按窗口报告。"""
+    client = WSClient("ws://127.0.0.1:1/console", reconnect_interval=2.0, reconnect_initial=0.05)
+    delays = [client.backoff_delay(attempt) for attempt in range(10)]
+    assert 0.025 <= delays[0] <= 0.05
+    assert all(1.0 <= delay <= 2.0 for delay in delays[6:])
+
+    buffer = LogBuffer(maxlen=3)
+    buffer.open_gap(10.0)
+    assert buffer.gaps_between(11.0, 12.0) == [{"reason": "disconnected", "start": 10.0, "end": None}]
+    buffer.close_gap(10.5)
+    assert buffer.gaps_between(11.0, 12.0) == []
+    assert buffer.gaps_between(9.0, 10.2)[0]["end"] == 10.5
+
+    for index in range(5):
+        message = parse_ws_message(f"log,{index}")
+        message.timestamp = 20.0 + index
+        buffer.append(message)
+    assert [gap["reason"] for gap in buffer.gaps_between(20.5, 30.0)] == ["buffer_overflow"]
+    assert buffer.gaps_between(22.0, 30.0) == []
+
+
+def test_reconnect_replays_session_and_marks_gap():
+    """测试服务端断开后快速重连、重新登录并重放 SET_FILE_ID，断线区间标记为日志缺口。"""
+    with FakeMagicAPIServer(build_dataset(10), script_latency=0) as server:
+        settings = MagicAPISettings(base_url=server.base_url, ws_url=server.ws_url,
+                                    ws_reconnect_initial=0.01, ws_reconnect_interval=0.5)
+        manager = WSManager(settings, MagicAPIResourceManager(server.base_url))
+        try:
+            manager.start_sync()
+            _wait_for(lambda: manager.client.connected)
+            client_id = manager.client.client_id
+            manager._submit(manager.send_set_file_id("file-1")).result(5)
+            _wait_for(lambda: "set_file_id,file-1" in server.console_messages)
+
+            before = time.time()
+            server.drop_connections()
+            started = time.monotonic()
+            _wait_for(lambda: manager.client.reconnects == 1)
+            elapsed = time.monotonic() - started
+            _wait_for(lambda: server.console_messages.count("set_file_id,file-1") == 2)
+
+            assert elapsed < 1.0, f"重连耗时过长: {elapsed:.3f}s"
+            assert manager.client.client_id == client_id
+            logins = [m for m in server.console_messages if m.startswith("login,")]
+            assert len(logins) == 2 and all(m.endswith(client_id) for m in logins)
+
+            notice = manager.log_gap_notice(before, time.time(), pre=0, post=0)
+            assert notice and notice["gaps"][0]["reason"] == "disconnected"
+            assert notice["gaps"][0]["end"] is not None
+            assert manager.log_gap_notice(time.time() + 1, time.time() + 2, pre=0, post=0) is None
+
+            server.broadcast("log,after reconnect")
+            _wait_for(lambda: any(m.text == "after reconnect" for m in manager.recent_logs()))
+            print(f"✅ {elapsed * 1000:.0f}ms 内完成重连并重放会话指令")
+        finally:
+            manager.shutdown_sync()
+
+
+def test_immediate_close_keeps_backing_off():
+    """测试服务端接受后立即关闭连接时退避持续增长，不会形成紧密重连循环。"""
+    import websockets
+
+    async def scenario():
+        accepted = []
+
+        async def reject(websocket):
+            accepted.append(time.monotonic())
+            await websocket.close()
+
+        async with websockets.serve(reject, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = WSClient(f"ws://127.0.0.1:{port}/console", reconnect_interval=0.5, reconnect_initial=0.01)
+
+            async def consume():
+                async for _ in client.iter_messages():
+                    pass
+
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(1.5)
+            await client.close()
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        return accepted
+
+    accepted = asyncio.run(scenario())
+    gaps = [later - earlier for earlier, later in zip(accepted, accepted[1:])]
+    assert 3 <= len(accepted) <= 12, f"重连次数异常: {len(accepted)}"
+    assert gaps[-1] >= 0.2, f"退避未增长: {gaps}"
+
+
+if __name__ == "__main__":
+    test_backoff_and_log_gaps()
+    test_reconnect_replays_session_and_marks_gap()
+    test_immediate_close_keeps_backing_off()
+    print("🎉 所有测试通过")